@@ -0,0 +1,94 @@
+# coding: utf-8
+"""
+Compare aiohttp output_stream throughput (items/sec) and client side
+inter-item latency (p50, p99) between unbuffered writes (one socket write per
+item) and batched writes.
+
+Usage: python benchmark/stream.py [--items 100000]
+"""
+import argparse
+import asyncio
+import time
+
+from aiohttp import web
+from aiohttp.test_utils import TestClient
+from aiohttp.test_utils import TestServer
+import marshmallow
+
+from hapic import Hapic
+from hapic.ext.aiohttp.context import AiohttpContext
+from hapic.processor.marshmallow import MarshmallowProcessor
+
+
+class ItemSchema(marshmallow.Schema):
+    item_id = marshmallow.fields.Integer(required=True)
+    name = marshmallow.fields.String(required=True)
+
+
+def get_app(items: int) -> web.Application:
+    hapic = Hapic(async_=True, processor_class=MarshmallowProcessor)
+    app = web.Application()
+    hapic.set_context(AiohttpContext(app))
+
+    async def get_items(request):
+        for item_id in range(items):
+            yield {"item_id": item_id, "name": "item{}".format(item_id)}
+
+    @hapic.with_api_doc()
+    @hapic.output_stream(ItemSchema(), flush_size=0)
+    async def unbuffered(request):
+        return get_items(request)
+
+    @hapic.with_api_doc()
+    @hapic.output_stream(ItemSchema())
+    async def batched(request):
+        return get_items(request)
+
+    app.router.add_get("/unbuffered", unbuffered)
+    app.router.add_get("/batched", batched)
+    return app
+
+
+def get_percentile(values: list, percentile: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * percentile))]
+
+
+async def measure(client: TestClient, path: str, items: int) -> None:
+    latencies = []
+    received = 0
+    start = last = time.perf_counter()
+    response = await client.get(path)
+    async for _ in response.content:
+        now = time.perf_counter()
+        latencies.append(now - last)
+        last = now
+        received += 1
+    duration = time.perf_counter() - start
+    assert received == items, "{} items received".format(received)
+
+    print(
+        "{:<11} {:10.0f} items/sec  p50 {:8.2f} µs  p99 {:8.2f} µs".format(
+            path[1:],
+            items / duration,
+            get_percentile(latencies, 0.5) * 1e6,
+            get_percentile(latencies, 0.99) * 1e6,
+        )
+    )
+
+
+async def main(items: int) -> None:
+    client = TestClient(TestServer(get_app(items)))
+    await client.start_server()
+    try:
+        for path in ("/unbuffered", "/batched"):
+            await measure(client, path, items)
+    finally:
+        await client.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--items", type=int, default=100000)
+    args = parser.parse_args()
+    asyncio.get_event_loop().run_until_complete(main(args.items))
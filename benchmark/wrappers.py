@@ -0,0 +1,88 @@
+# coding: utf-8
+"""
+Compare per-request overhead of stacked hapic wrappers (each decorator call
+the next one and build its own request parameters) and fused pipeline wrapper
+built by with_api_doc.
+
+Usage: python benchmark/wrappers.py [--number 20000]
+"""
+import argparse
+import timeit
+
+import marshmallow
+from multidict import MultiDict
+
+from hapic import Hapic
+from hapic.ext.agnostic.context import AgnosticContext
+from hapic.processor.marshmallow import MarshmallowProcessor
+
+
+class PathSchema(marshmallow.Schema):
+    user_id = marshmallow.fields.Integer(required=True)
+
+
+class QuerySchema(marshmallow.Schema):
+    full = marshmallow.fields.Boolean(missing=False)
+
+
+class HeadersSchema(marshmallow.Schema):
+    x_request_id = marshmallow.fields.String(load_from="x-request-id", missing=None)
+
+
+class BodySchema(marshmallow.Schema):
+    name = marshmallow.fields.String(required=True)
+
+
+class UserSchema(marshmallow.Schema):
+    user_id = marshmallow.fields.Integer(required=True)
+    name = marshmallow.fields.String(required=True)
+
+
+def get_controller(hapic: Hapic):
+    @hapic.with_api_doc()
+    @hapic.handle_exception(ZeroDivisionError)
+    @hapic.output_body(UserSchema())
+    @hapic.input_body(BodySchema())
+    @hapic.input_headers(HeadersSchema())
+    @hapic.input_query(QuerySchema())
+    @hapic.input_path(PathSchema())
+    def controller(hapic_data=None):
+        return {"user_id": hapic_data.path["user_id"], "name": hapic_data.body["name"]}
+
+    return controller
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--number", type=int, default=20000)
+    args = parser.parse_args()
+
+    hapic = Hapic(processor_class=MarshmallowProcessor)
+    hapic.set_context(
+        AgnosticContext(
+            app=None,
+            path_parameters={"user_id": "42"},
+            query_parameters=MultiDict((("full", "1"),)),
+            header_parameters={"x-request-id": "abc"},
+            body_parameters={"name": "bob"},
+        )
+    )
+    get_controller(hapic)
+    reference = hapic.controllers[0].reference
+
+    results = {}
+    for name, func in (("stacked", reference.wrapped), ("fused", reference.wrapper)):
+        func()  # warm up lazy processor/schema creation
+        results[name] = min(timeit.repeat(func, number=args.number, repeat=5)) / args.number
+        print("{:<8} {:8.2f} µs/request".format(name, results[name] * 1e6))
+
+    print(
+        "fused pipeline save {:.2f} µs/request ({:.1%})".format(
+            (results["stacked"] - results["fused"]) * 1e6,
+            1 - results["fused"] / results["stacked"],
+        )
+    )
+
+
+if __name__ == "__main__":
+    main()
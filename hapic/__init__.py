@@ -34,3 +34,4 @@ reset_context = _hapic_default.reset_context
 add_documentation_view = _hapic_default.add_documentation_view
 handle_exception = _hapic_default.handle_exception
 output_stream = _hapic_default.output_stream
+output_cache = _hapic_default.output_cache
@@ -9,7 +9,9 @@ from hapic.description import InputFormsDescription
 from hapic.description import InputHeadersDescription
 from hapic.description import InputPathDescription
 from hapic.description import InputQueryDescription
+from hapic.description import InputStreamDescription
 from hapic.description import OutputBodyDescription
+from hapic.description import OutputCacheDescription
 from hapic.description import OutputFileDescription
 from hapic.description import OutputHeadersDescription
 from hapic.description import OutputStreamDescription
@@ -86,6 +88,16 @@ class DecorationBuffer(object):
             raise AlreadyDecoratedException()
         self._description.input_files = description
 
+    @property
+    def input_stream(self) -> InputStreamDescription:
+        return self._description.input_stream
+
+    @input_stream.setter
+    def input_stream(self, description: InputStreamDescription) -> None:
+        if self._description.input_stream is not None:
+            raise AlreadyDecoratedException()
+        self._description.input_stream = description
+
     @property
     def output_body(self) -> OutputBodyDescription:
         return self._description.output_body
@@ -126,6 +138,16 @@ class DecorationBuffer(object):
             raise AlreadyDecoratedException()
         self._description.output_headers = description
 
+    @property
+    def output_cache(self) -> OutputCacheDescription:
+        return self._description.output_cache
+
+    @output_cache.setter
+    def output_cache(self, description: OutputCacheDescription) -> None:
+        if self._description.output_cache is not None:
+            raise AlreadyDecoratedException()
+        self._description.output_cache = description
+
     @property
     def errors(self) -> typing.List[ErrorDescription]:
         return self._description.errors
@@ -0,0 +1,242 @@
+# coding: utf-8
+import asyncio
+from collections import OrderedDict
+import threading
+import time
+import typing
+
+from multidict import MultiDict
+
+from hapic.data import HapicData
+from hapic.exception import ConfigurationException
+
+try:  # Python 3.7+ (or dataclasses backport)
+    import dataclasses
+except ImportError:
+    dataclasses = None
+
+TYPE_CACHE_KEY = typing.Hashable
+
+
+class CacheEntry(object):
+    """
+    Cached response: serialized body and http code
+    """
+
+    __slots__ = ("body", "http_code", "expire_at")
+
+    def __init__(self, body: bytes, http_code: int, expire_at: float) -> None:
+        self.body = body
+        self.http_code = http_code
+        self.expire_at = expire_at
+
+
+class OutputCache(object):
+    """
+    LRU cache of serialized responses with TTL eviction, used by
+    output_cache decorator. When a key is missing, concurrent requests of
+    this key wait for one computation instead of computing the same response
+    (stampede protection).
+    Hits and misses are counted in `hits` and `misses` attributes.
+    """
+
+    def __init__(
+        self,
+        ttl: float = 60,
+        max_entries: int = 1024,
+        clock: typing.Callable[[], float] = time.monotonic,
+    ) -> None:
+        """
+        :param ttl: time to live of cached responses, in seconds
+        :param max_entries: max number of cached responses. Least recently
+            used responses are dropped when this size is reached.
+        :param clock: function returning current time, in seconds
+        """
+        if ttl <= 0:
+            raise ConfigurationException("Output cache ttl must be positive")
+
+        if max_entries < 1:
+            raise ConfigurationException("Output cache max_entries must be positive")
+
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._clock = clock
+        self._entries = OrderedDict()  # type: typing.Dict[TYPE_CACHE_KEY, CacheEntry]
+        self._pending = {}  # type: typing.Dict[TYPE_CACHE_KEY, threading.Event]
+        self._lock = threading.Lock()
+
+    def get(self, key: TYPE_CACHE_KEY) -> typing.Optional[CacheEntry]:
+        """
+        :param key: cache key
+        :return: cached entry of key or None if missing or expired
+        """
+        with self._lock:
+            return self._get(key)
+
+    def set(self, key: TYPE_CACHE_KEY, body: bytes, http_code: int) -> CacheEntry:
+        """
+        Cache given response
+        :param key: cache key
+        :param body: serialized response body
+        :param http_code: response http code
+        :return: created entry
+        """
+        entry = self.create_entry(body, http_code)
+        with self._lock:
+            self._set(key, entry)
+        return entry
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get_or_compute(
+        self, key: TYPE_CACHE_KEY, compute: typing.Callable[[], typing.Optional[CacheEntry]]
+    ) -> typing.Optional[CacheEntry]:
+        """
+        Return cached entry of key. If missing, call compute to produce it
+        and cache it. Concurrent calls with same key wait for the running
+        computation. If compute return None (response must not be cached),
+        waiting calls compute their own response.
+        :param key: cache key
+        :param compute: callable returning entry to cache or None
+        :return: cached or computed entry
+        """
+        while True:
+            with self._lock:
+                entry = self._get(key)
+                if entry is not None:
+                    self.hits += 1
+                    return entry
+
+                event = self._pending.get(key)
+                if event is None:
+                    event = self._pending[key] = threading.Event()
+                    self.misses += 1
+                    break
+
+            event.wait()
+
+        try:
+            entry = compute()
+            if entry is not None:
+                with self._lock:
+                    self._set(key, entry)
+            return entry
+        finally:
+            with self._lock:
+                del self._pending[key]
+            event.set()
+
+    def create_entry(self, body: bytes, http_code: int) -> CacheEntry:
+        """
+        :return: entry expiring after ttl, to be returned by compute
+            function of get_or_compute
+        """
+        return CacheEntry(body, http_code, self._clock() + self.ttl)
+
+    def _get(self, key: TYPE_CACHE_KEY) -> typing.Optional[CacheEntry]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+
+        if entry.expire_at <= self._clock():
+            del self._entries[key]
+            return None
+
+        self._entries.move_to_end(key)
+        return entry
+
+    def _set(self, key: TYPE_CACHE_KEY, entry: CacheEntry) -> None:
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+
+class AsyncOutputCache(OutputCache):
+    """
+    Asyncio version of OutputCache: concurrent requests of a missing key
+    wait for computation without blocking event loop.
+    """
+
+    async def get_or_compute(
+        self,
+        key: TYPE_CACHE_KEY,
+        compute: typing.Callable[[], typing.Awaitable[typing.Optional[CacheEntry]]],
+    ) -> typing.Optional[CacheEntry]:
+        while True:
+            entry = self._get(key)
+            if entry is not None:
+                self.hits += 1
+                return entry
+
+            event = self._pending.get(key)
+            if event is None:
+                event = self._pending[key] = asyncio.Event()
+                self.misses += 1
+                break
+
+            await event.wait()
+
+        try:
+            entry = await compute()
+            if entry is not None:
+                self._set(key, entry)
+            return entry
+        finally:
+            del self._pending[key]
+            event.set()
+
+
+def get_hashable(value: typing.Any) -> TYPE_CACHE_KEY:
+    """
+    Return hashable representation of given validated data (dict,
+    dataclass, list, etc.) to be used in cache keys
+    """
+    if isinstance(value, (dict, MultiDict)):
+        # Stable sort: order of values of a same multidict key is kept
+        return tuple(
+            sorted(
+                ((key, get_hashable(value_)) for key, value_ in value.items()),
+                key=lambda item: item[0],
+            )
+        )
+
+    if isinstance(value, (list, tuple)):
+        return tuple(get_hashable(value_) for value_ in value)
+
+    if isinstance(value, (set, frozenset)):
+        return frozenset(get_hashable(value_) for value_ in value)
+
+    if dataclasses is not None and dataclasses.is_dataclass(value) and not isinstance(value, type):
+        return (type(value), get_hashable(dataclasses.asdict(value)))
+
+    return value
+
+
+def get_default_cache_key(
+    hapic_data: HapicData, headers: typing.Optional[typing.List[str]] = None
+) -> TYPE_CACHE_KEY:
+    """
+    Default output cache key: validated path and query data and given
+    validated headers.
+    :param hapic_data: view hapic data
+    :param headers: names of headers to use in key
+    :return: hashable key
+    """
+    key = (get_hashable(hapic_data.path), get_hashable(hapic_data.query))
+
+    if headers:
+        if isinstance(hapic_data.headers, dict):
+            header_values = [hapic_data.headers.get(name) for name in headers]
+        else:
+            header_values = [getattr(hapic_data.headers, name, None) for name in headers]
+        key += (get_hashable(header_values),)
+
+    return key
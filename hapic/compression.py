@@ -0,0 +1,371 @@
+# coding: utf-8
+import functools
+import io
+import typing
+import zlib
+
+from hapic.exception import ConfigurationException
+from hapic.exception import RequestBodyException
+from hapic.exception import RequestBodyTooLargeException
+from hapic.exception import UnsupportedContentEncodingException
+from hapic.type import TYPE_RESPONSE_HEADERS
+from hapic.util import get_response_body_length
+
+COMPRESSION_GZIP = "gzip"
+COMPRESSION_DEFLATE = "deflate"
+# zlib window bits producing each content coding: gzip header and trailer
+# for gzip, zlib header and trailer for deflate (see RFC 7230 section 4.2)
+COMPRESSION_WBITS = {COMPRESSION_GZIP: 16 + zlib.MAX_WBITS, COMPRESSION_DEFLATE: zlib.MAX_WBITS}
+# WSGI environ key where WSGI contexts keep request object reading
+# decompressed body, because compressed body can be read only once
+DECOMPRESSED_REQUEST_ENVIRON_KEY = "hapic.decompressed_request"
+
+
+class ResponseCompression(object):
+    """
+    Compression of response bodies, negotiated with request Accept-Encoding
+    header. Compression is made with zlib only, so compressed bodies are the
+    same whatever the used context.
+    """
+
+    def __init__(
+        self,
+        min_size: int = 1024,
+        level: int = 6,
+        encodings: typing.Tuple[str, ...] = (COMPRESSION_GZIP, COMPRESSION_DEFLATE),
+    ) -> None:
+        """
+        :param min_size: bodies smaller than this size (in bytes) are not
+            compressed
+        :param level: zlib compression level, from 1 (fastest) to 9 (best
+            compression)
+        :param encodings: accepted content codings, by order of preference
+        """
+        if not 1 <= level <= 9:
+            raise ConfigurationException("Compression level must be between 1 and 9")
+
+        for encoding in encodings:
+            if encoding not in COMPRESSION_WBITS:
+                raise ConfigurationException(
+                    'Unknown compression encoding "{}", must be one of: {}'.format(
+                        encoding, ", ".join(COMPRESSION_WBITS.keys())
+                    )
+                )
+
+        self.min_size = min_size
+        self.level = level
+        self.encodings = encodings
+
+    @classmethod
+    def from_value(
+        cls, value: typing.Union[None, bool, "ResponseCompression"]
+    ) -> typing.Optional["ResponseCompression"]:
+        """
+        :param value: hapic compression parameter value: True for default
+            compression, False or None for no compression, or instance
+        :return: ResponseCompression instance or None
+        """
+        if value is True:
+            return cls()
+        if not value:
+            return None
+        return value
+
+    def get_encoding(self, accept_encoding: typing.Optional[str]) -> typing.Optional[str]:
+        """
+        :param accept_encoding: request Accept-Encoding header value
+        :return: content coding to use, or None if client accept none of
+            the supported codings
+        """
+        if not accept_encoding:
+            return None
+
+        qualities = {}  # type: typing.Dict[str, float]
+        for item in accept_encoding.split(","):
+            coding, _, parameters = item.strip().partition(";")
+            quality = 1.0
+            parameter_name, _, parameter_value = parameters.strip().partition("=")
+            if parameter_name.strip() == "q":
+                try:
+                    quality = float(parameter_value)
+                except ValueError:
+                    quality = 0.0
+            qualities[coding.strip().lower()] = quality
+
+        best_encoding = None
+        best_quality = 0.0
+        for encoding in self.encodings:
+            quality = qualities.get(encoding, qualities.get("*", 0.0))
+            if quality > best_quality:
+                best_encoding = encoding
+                best_quality = quality
+
+        return best_encoding
+
+    def get_compressor(self, encoding: str) -> "zlib._Compress":
+        """
+        :param encoding: content coding
+        :return: zlib compress object producing given content coding
+        """
+        return zlib.compressobj(self.level, zlib.DEFLATED, COMPRESSION_WBITS[encoding])
+
+    def compress(self, body: typing.Union[bytes, memoryview], encoding: str) -> bytes:
+        """
+        :param body: bytes like body to compress
+        :param encoding: content coding
+        :return: compressed body
+        """
+        compressor = self.get_compressor(encoding)
+        return compressor.compress(body) + compressor.flush()
+
+    def compress_response(
+        self,
+        body: typing.Union[bytes, memoryview],
+        headers: typing.Optional[TYPE_RESPONSE_HEADERS],
+        accept_encoding: typing.Optional[str],
+    ) -> typing.Tuple[typing.Union[bytes, memoryview], TYPE_RESPONSE_HEADERS]:
+        """
+        Compress given response body if it is big enough and if client
+        accept it.
+        :param body: bytes like response body
+        :param headers: response headers
+        :param accept_encoding: request Accept-Encoding header value
+        :return: body and headers to use in response
+        """
+        headers = list(headers or [])
+        if "content-encoding" in [name.lower() for name, _ in headers]:
+            return body, headers
+
+        # NOTE: response representation depends on Accept-Encoding as soon
+        # as compression is enabled, even if this body is not compressed
+        headers.append(("Vary", "Accept-Encoding"))
+        if get_response_body_length(body) < self.min_size:
+            return body, headers
+
+        encoding = self.get_encoding(accept_encoding)
+        if encoding is None:
+            return body, headers
+
+        # NOTE: compressed body is another representation: its ETag must
+        # not be strong
+        for index, (name, value) in enumerate(headers):
+            if name.lower() == "etag" and not value.startswith("W/"):
+                headers[index] = (name, "W/" + value)
+
+        headers.append(("Content-Encoding", encoding))
+        return self.compress(body, encoding), headers
+
+    def compress_stream(
+        self, chunks: typing.Iterable[bytes], encoding: str
+    ) -> typing.Iterator[bytes]:
+        """
+        :param chunks: body chunks to compress
+        :param encoding: content coding
+        :return: compressed chunks. Each chunk is flushed to permit client
+            to read it without wait for the end of stream.
+        """
+        compressor = self.get_compressor(encoding)
+        for chunk in chunks:
+            yield compressor.compress(chunk) + compressor.flush(zlib.Z_SYNC_FLUSH)
+        yield compressor.flush()
+
+    def compress_stream_response(
+        self,
+        chunks: typing.Iterable[bytes],
+        headers: typing.Optional[TYPE_RESPONSE_HEADERS],
+        accept_encoding: typing.Optional[str],
+    ) -> typing.Tuple[typing.Iterator[bytes], TYPE_RESPONSE_HEADERS]:
+        """
+        Like compress_response for a streamed body. Body size is not known,
+        so stream is compressed whatever its size if client accept it.
+        :param chunks: body chunks
+        :param headers: response headers
+        :param accept_encoding: request Accept-Encoding header value
+        :return: body chunks and headers to use in response
+        """
+        headers = list(headers or [])
+        if "content-encoding" in [name.lower() for name, _ in headers]:
+            return iter(chunks), headers
+
+        headers.append(("Vary", "Accept-Encoding"))
+        encoding = self.get_encoding(accept_encoding)
+        if encoding is None:
+            return iter(chunks), headers
+
+        headers.append(("Content-Encoding", encoding))
+        return self.compress_stream(chunks, encoding), headers
+
+
+class BodyDecompressor(object):
+    """
+    Decompress a request body chunk by chunk. Decompressed data never exceed
+    max_size + 1 bytes in memory: RequestBodyTooLargeException is raised as
+    soon as decompressed body is bigger than max_size, to stop zip bombs.
+    """
+
+    def __init__(self, encoding: str, max_size: int) -> None:
+        self._decompressor = zlib.decompressobj(COMPRESSION_WBITS[encoding])
+        self._max_size = max_size
+        self._chunks = []  # type: typing.List[bytes]
+        self._size = 0
+
+    def feed(self, chunk: bytes) -> None:
+        """
+        Decompress given compressed chunk.
+        Raise RequestBodyException if data is not valid compressed data or
+        if it follows the end of compressed data.
+        """
+        if self._decompressor.eof:
+            if chunk:
+                raise RequestBodyException("Unexpected data after end of compressed request body")
+            return
+
+        try:
+            # NOTE: max_length permit to not decompress more than needed to
+            # know that body is too large, unconsumed input is kept in
+            # unconsumed_tail
+            self._append(self._decompressor.decompress(chunk, self._max_size - self._size + 1))
+            while self._decompressor.unconsumed_tail:
+                self._append(
+                    self._decompressor.decompress(
+                        self._decompressor.unconsumed_tail, self._max_size - self._size + 1
+                    )
+                )
+        except zlib.error as exc:
+            raise RequestBodyException("Invalid compressed request body: {}".format(exc)) from exc
+
+        if self._decompressor.unused_data:
+            raise RequestBodyException("Unexpected data after end of compressed request body")
+
+    def finish(self) -> bytes:
+        """
+        :return: decompressed body
+        Raise RequestBodyException if compressed data is truncated.
+        """
+        try:
+            self._append(self._decompressor.flush())
+        except zlib.error as exc:
+            raise RequestBodyException("Invalid compressed request body: {}".format(exc)) from exc
+
+        if not self._decompressor.eof:
+            raise RequestBodyException("Truncated compressed request body")
+
+        return b"".join(self._chunks)
+
+    def _append(self, data: bytes) -> None:
+        self._size += len(data)
+        if self._size > self._max_size:
+            raise RequestBodyTooLargeException(
+                "Decompressed request body exceed {} bytes".format(self._max_size),
+                max_size=self._max_size,
+                size=self._size,
+            )
+        self._chunks.append(data)
+
+
+class RequestDecompression(object):
+    """
+    Decompression of request bodies sent with a Content-Encoding header.
+    Compressed body is read and decompressed by chunks with a maximum
+    decompressed size.
+    """
+
+    def __init__(
+        self,
+        max_size: int = 10 * 1024 * 1024,
+        chunk_size: int = 64 * 1024,
+        encodings: typing.Tuple[str, ...] = (COMPRESSION_GZIP, COMPRESSION_DEFLATE),
+    ) -> None:
+        """
+        :param max_size: maximum size (in bytes) of decompressed bodies,
+            bigger bodies produce a 413 (request entity too large) response
+        :param chunk_size: size of compressed chunks read from request
+        :param encodings: accepted content codings, others produce a 415
+            (unsupported media type) response
+        """
+        if max_size < 1 or chunk_size < 1:
+            raise ConfigurationException("Decompression max_size and chunk_size must be positive")
+
+        for encoding in encodings:
+            if encoding not in COMPRESSION_WBITS:
+                raise ConfigurationException(
+                    'Unknown decompression encoding "{}", must be one of: {}'.format(
+                        encoding, ", ".join(COMPRESSION_WBITS.keys())
+                    )
+                )
+
+        self.max_size = max_size
+        self.chunk_size = chunk_size
+        self.encodings = encodings
+
+    @classmethod
+    def from_value(
+        cls, value: typing.Union[bool, "RequestDecompression"]
+    ) -> typing.Optional["RequestDecompression"]:
+        """
+        :param value: hapic decompression parameter value: True for default
+            decompression, False for no decompression, or instance
+        :return: RequestDecompression instance or None
+        """
+        if value is True:
+            return cls()
+        if not value:
+            return None
+        return value
+
+    def get_encoding(self, content_encoding: typing.Optional[str]) -> typing.Optional[str]:
+        """
+        :param content_encoding: request Content-Encoding header value
+        :return: content coding of body, or None if body is not compressed
+        Raise UnsupportedContentEncodingException if content coding is not
+        one of accepted ones.
+        """
+        encoding = (content_encoding or "").strip().lower()
+        if not encoding or encoding == "identity":
+            return None
+
+        if encoding not in self.encodings:
+            raise UnsupportedContentEncodingException(
+                'Unsupported request body content coding "{}", must be one of: {}'.format(
+                    encoding, ", ".join(self.encodings)
+                )
+            )
+
+        return encoding
+
+    def get_decompressor(self, encoding: str) -> BodyDecompressor:
+        return BodyDecompressor(encoding, self.max_size)
+
+    def decompress_file(self, file_object: typing.BinaryIO, encoding: str) -> bytes:
+        """
+        :param file_object: file like object of compressed body
+        :param encoding: content coding
+        :return: decompressed body
+        """
+        decompressor = self.get_decompressor(encoding)
+        for chunk in iter(functools.partial(file_object.read, self.chunk_size), b""):
+            decompressor.feed(chunk)
+        return decompressor.finish()
+
+
+def get_decompressed_wsgi_environ(
+    environ: typing.Dict[str, typing.Any],
+    body: bytes,
+    excluded_key_prefixes: typing.Tuple[str, ...] = (),
+) -> typing.Dict[str, typing.Any]:
+    """
+    :param environ: WSGI environ of request with compressed body
+    :param body: decompressed body
+    :param excluded_key_prefixes: prefixes of environ keys to not copy,
+        like framework cached request values (parsed body, forms ...)
+    :return: copy of given environ where input is decompressed body
+    """
+    decompressed_environ = {
+        key: value
+        for key, value in environ.items()
+        if not key.startswith(excluded_key_prefixes)
+        and key not in ("HTTP_CONTENT_ENCODING", "HTTP_TRANSFER_ENCODING")
+    }
+    decompressed_environ["wsgi.input"] = io.BytesIO(body)
+    decompressed_environ["CONTENT_LENGTH"] = str(len(body))
+    return decompressed_environ
@@ -1,16 +1,25 @@
 # -*- coding: utf-8 -*-
-import json
 import typing
 
+from hapic.compression import RequestDecompression
+from hapic.compression import ResponseCompression
 from hapic.data import HapicFile
 from hapic.error.main import ErrorBuilderInterface
 from hapic.exception import ConfigurationException
 from hapic.exception import OutputValidationException
 from hapic.exception import ProcessException
 from hapic.exception import ValidationException
+from hapic.json_backend import JsonBackend
+from hapic.json_backend import StdlibJsonBackend
 from hapic.processor.main import Processor
 from hapic.processor.main import ProcessValidationError
 from hapic.processor.main import RequestParameters
+from hapic.processor.main import processor_registry
+from hapic.stream import DEFAULT_STREAM_FORMAT
+from hapic.stream import StreamFormat
+from hapic.type import TYPE_RESPONSE_BODY
+from hapic.type import TYPE_RESPONSE_HEADERS
+from hapic.util import is_body_allowed
 
 try:  # Python 3.5+
     from http import HTTPStatus
@@ -43,13 +52,92 @@ class ContextInterface(object):
         """
         raise NotImplementedError()
 
+    @property
+    def json_backend(self) -> JsonBackend:
+        """
+        JSON backend to use to encode responses and decode requests
+        """
+        raise NotImplementedError()
+
+    def set_json_backend(self, json_backend: JsonBackend) -> None:
+        """
+        Set JSON backend to be used in the context. Hapic automatically set
+        it in `hapic.hapic.Hapic#set_context` if hapic have a json_backend.
+        :param json_backend: JsonBackend instance
+        """
+        raise NotImplementedError()
+
+    @property
+    def compression(self) -> typing.Optional[ResponseCompression]:
+        """
+        Compression of responses, None if responses are not compressed
+        """
+        raise NotImplementedError()
+
+    def set_compression(self, compression: typing.Optional[ResponseCompression]) -> None:
+        """
+        Set response compression used in the context. Hapic automatically
+        set it in `hapic.hapic.Hapic#set_context` if hapic have a compression.
+        :param compression: ResponseCompression instance or None
+        """
+        raise NotImplementedError()
+
+    @property
+    def decompression(self) -> typing.Optional[RequestDecompression]:
+        """
+        Decompression of compressed request bodies, None if request bodies
+        are read as is
+        """
+        raise NotImplementedError()
+
+    def set_decompression(self, decompression: typing.Optional[RequestDecompression]) -> None:
+        """
+        Set request decompression used in the context. Hapic automatically
+        set it in `hapic.hapic.Hapic#set_context` if hapic have a
+        decompression.
+        :param decompression: RequestDecompression instance or None
+        """
+        raise NotImplementedError()
+
     def get_response(
         self,
         # TODO BS 20171228: rename into response_content
-        response: str,
+        response: TYPE_RESPONSE_BODY,
         http_code: int,
         mimetype: str = "application/json",
+        headers: typing.Optional[TYPE_RESPONSE_HEADERS] = None,
+        compress: bool = True,
+    ) -> typing.Any:
+        """
+        Must return framework response with given body. Body can be str or
+        bytes like object (bytes, memoryview), which must be used without
+        copy when possible. Response must not have body and Content-Type if
+        http code does not permit it (see hapic.util.is_body_allowed).
+        :param headers: additional response headers
+        :param compress: if False, body is not compressed even if context
+            have a compression
+        """
+        raise NotImplementedError()
+
+    def get_stream_response(
+        self,
+        serialized_items: typing.Iterable[typing.Any],
+        http_code: int,
+        stream_format: StreamFormat = DEFAULT_STREAM_FORMAT,
+        headers: typing.Optional[TYPE_RESPONSE_HEADERS] = None,
+        compress: bool = True,
     ) -> typing.Any:
+        """
+        Must return framework streaming response writing each given
+        serialized item. Given iterable is lazy: items must be consumed only
+        when response is sent, to keep memory usage flat.
+        :param serialized_items: iterable of dumped items
+        :param stream_format: wire format of stream, giving response
+            Content-Type
+        :param headers: additional response headers
+        :param compress: if False, stream is not compressed even if context
+            have a compression
+        """
         raise NotImplementedError()
 
     def get_file_response(self, file_response: HapicFile, http_code: int) -> typing.Any:
@@ -73,6 +161,25 @@ class ContextInterface(object):
         """
         raise NotImplementedError()
 
+    @property
+    def disconnect_check_interval(self) -> typing.Optional[float]:
+        """
+        :return: interval in seconds between two checks of client connection
+            while a view or a stream is running (see is_client_disconnected).
+            None if context can't detect client disconnection.
+        """
+        raise NotImplementedError()
+
+    def is_client_disconnected(
+        self, func_args: typing.Tuple[typing.Any, ...], func_kwargs: typing.Dict[str, typing.Any]
+    ) -> bool:
+        """
+        :param func_args: view arguments
+        :param func_kwargs: view keyword arguments
+        :return: True if client of current request closed its connection
+        """
+        raise NotImplementedError()
+
     # TODO BS 20171228: rename into "bypass"
     def by_pass_output_wrapping(self, response: typing.Any) -> bool:
         """
@@ -180,6 +287,15 @@ class ContextInterface(object):
         """
         raise NotImplementedError()
 
+    def client_disconnection_caught(
+        self, func_args: typing.Tuple[typing.Any, ...], func_kwargs: typing.Dict[str, typing.Any]
+    ) -> None:
+        """
+        This method is called when hapic stop a view or a stream because
+        client closed its connection
+        """
+        raise NotImplementedError()
+
 
 class HandledException(object):
     """
@@ -207,6 +323,9 @@ class BaseContext(ContextInterface):
         """
         self._processor_class = processor_class
         self._default_error_builder = default_error_builder
+        self._json_backend = StdlibJsonBackend()  # type: JsonBackend
+        self._compression = None  # type: typing.Optional[ResponseCompression]
+        self._decompression = None  # type: typing.Optional[RequestDecompression]
 
     @property
     def default_error_builder(self) -> ErrorBuilderInterface:
@@ -231,6 +350,104 @@ class BaseContext(ContextInterface):
         """
         self._processor_class = processor_class
 
+    @property
+    def json_backend(self) -> JsonBackend:
+        return self._json_backend
+
+    def set_json_backend(self, json_backend: JsonBackend) -> None:
+        """
+        Change JSON backend used by this context (and by hapic decorators
+        using this context)
+        :param json_backend: JsonBackend instance
+        """
+        self._json_backend = json_backend
+
+    @property
+    def compression(self) -> typing.Optional[ResponseCompression]:
+        return self._compression
+
+    def set_compression(self, compression: typing.Optional[ResponseCompression]) -> None:
+        """
+        Change response compression used by this context
+        :param compression: ResponseCompression instance or None
+        """
+        self._compression = compression
+
+    @property
+    def decompression(self) -> typing.Optional[RequestDecompression]:
+        return self._decompression
+
+    def set_decompression(self, decompression: typing.Optional[RequestDecompression]) -> None:
+        """
+        Change request decompression used by this context
+        :param decompression: RequestDecompression instance or None
+        """
+        self._decompression = decompression
+
+    def _get_request_body_encoding(
+        self, content_encoding: typing.Optional[str]
+    ) -> typing.Optional[str]:
+        """
+        :param content_encoding: request Content-Encoding header value
+        :return: content coding of request body to decompress, or None if
+            body must be read as is
+        Raise UnsupportedContentEncodingException if content coding is not
+        supported.
+        """
+        if self._decompression is None:
+            return None
+        return self._decompression.get_encoding(content_encoding)
+
+    def _get_request_accept_encoding(self) -> typing.Optional[str]:
+        """
+        Override it to return Accept-Encoding header of current request, if
+        context can known it. Used by _compress_response_body.
+        """
+        return None
+
+    def _compress_response_body(
+        self,
+        body: typing.Union[bytes, memoryview],
+        http_code: int,
+        headers: typing.Optional[TYPE_RESPONSE_HEADERS],
+        compress: bool = True,
+    ) -> typing.Tuple[typing.Union[bytes, memoryview], TYPE_RESPONSE_HEADERS]:
+        """
+        Compress given response body for current request if context have a
+        compression.
+        :return: body and headers to use in response
+        """
+        if not compress or self._compression is None or not is_body_allowed(http_code):
+            return body, list(headers or [])
+
+        return self._compression.compress_response(
+            body, headers, self._get_request_accept_encoding()
+        )
+
+    def _get_stream_body(
+        self,
+        serialized_items: typing.Iterable[typing.Any],
+        stream_format: StreamFormat,
+        headers: typing.Optional[TYPE_RESPONSE_HEADERS],
+        compress: bool = True,
+    ) -> typing.Tuple[typing.Iterator[bytes], TYPE_RESPONSE_HEADERS]:
+        """
+        Encode given serialized items, framed with given stream format, and
+        compress them for current request if context have a compression.
+        :return: body chunks iterator and headers to use in response
+            (without Content-Type)
+        """
+        body = stream_format.get_chunks(
+            self.json_backend.encode(serialized_item) for serialized_item in serialized_items
+        )
+        headers = list(stream_format.headers) + list(headers or [])
+        if not compress or self._compression is None:
+            return body, headers
+
+        return self._compression.compress_stream_response(
+            body, headers, self._get_request_accept_encoding()
+        )
+
     def handle_exception(self, exception_class: typing.Type[Exception], http_code: int) -> None:
         self._add_exception_class_to_catch(exception_class, http_code)
 
@@ -252,9 +469,13 @@ class BaseContext(ContextInterface):
         error_body = error_builder.build_from_exception(
             exception, include_traceback=self.is_debug()
         )
-        processor = self._processor_class(error_builder.get_schema())
+        processor = processor_registry.get_processor(
+            self._processor_class, error_builder.get_schema()
+        )
 
         try:
+            if not error_builder.validate_errors:
+                return processor.dump_without_validation(error_body)
             return processor.dump(error_body)
         except ValidationException as exc:
             raise OutputValidationException(
@@ -271,9 +492,13 @@ class BaseContext(ContextInterface):
         """
         error_builder = self.default_error_builder
         error_content = error_builder.build_from_validation_error(error)
-        processor = self._processor_class(error_builder.get_schema())
+        processor = processor_registry.get_processor(
+            self._processor_class, error_builder.get_schema()
+        )
 
         try:
+            if not error_builder.validate_errors:
+                return processor.dump_without_validation(error_content)
             return processor.dump(error_content)
         except ValidationException as exc:
             raise OutputValidationException(
@@ -304,7 +529,7 @@ class BaseContext(ContextInterface):
                         self.global_exception_caught(exc)
                         dumped_error = self._get_dumped_error_from_exception_error(exc)
                         return self.get_response(
-                            json.dumps(dumped_error), handled_exception.http_code
+                            self.json_backend.encode(dumped_error), handled_exception.http_code
                         )
                 raise exc
 
@@ -361,3 +586,21 @@ class BaseContext(ContextInterface):
         is invalid.
         """
         pass
+
+    @property
+    def disconnect_check_interval(self) -> typing.Optional[float]:
+        return None
+
+    def is_client_disconnected(
+        self, func_args: typing.Tuple[typing.Any, ...], func_kwargs: typing.Dict[str, typing.Any]
+    ) -> bool:
+        return False
+
+    def client_disconnection_caught(
+        self, func_args: typing.Tuple[typing.Any, ...], func_kwargs: typing.Dict[str, typing.Any]
+    ) -> None:
+        """
+        See parent docstring. Override it to perform action (like count
+        aborted requests) when client disconnection stop a view or a stream.
+        """
+        pass
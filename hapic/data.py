@@ -12,6 +12,8 @@ class HapicData(object):
         self.headers = {}
         self.forms = {}
         self.files = {}
+        # InputStream of request body items (hapic.input_stream)
+        self.stream = None
 
 
 class HapicFile(object):
@@ -1,24 +1,53 @@
 # -*- coding: utf-8 -*-
+import asyncio
+import collections
+import concurrent.futures
 import functools
-import json
+import inspect
+import itertools
 import logging
 import traceback
 import typing
+import weakref
 
 from multidict import MultiDict
 
+from hapic.cache import TYPE_CACHE_KEY
+from hapic.cache import CacheEntry
+from hapic.cache import OutputCache
+from hapic.cache import get_default_cache_key
 from hapic.context import ContextInterface
 from hapic.data import HapicData
 from hapic.description import ControllerDescription
 from hapic.error.main import ErrorBuilderInterface
+from hapic.exception import ConfigurationException
+from hapic.exception import DecorationException
+from hapic.exception import InputStreamValidationException
 from hapic.exception import OutputValidationException
 from hapic.exception import ProcessException
+from hapic.exception import RequestBodyException
 from hapic.exception import ValidationException
+from hapic.file import check_uploads_size
+from hapic.file import close_uploads
 from hapic.processor.main import Processor
 from hapic.processor.main import ProcessValidationError
 from hapic.processor.main import RequestParameters
+from hapic.processor.main import StreamField
+from hapic.stream import DEFAULT_STREAM_FORMAT
+from hapic.stream import JSON_ARRAY_CHUNKS_STREAM_FORMAT
+from hapic.stream import BufferedStreamWriter
+from hapic.stream import InputStream
+from hapic.stream import JsonArrayMemberParser
+from hapic.stream import StreamFormat
+from hapic.stream import check_input_stream_error_policy
+from hapic.stream import get_lines
 from hapic.type import TYPE_SCHEMA
 from hapic.util import LOGGER_NAME
+from hapic.util import get_body_etag
+from hapic.util import get_version_headers
+from hapic.util import is_etag_matching
+from hapic.util import is_version_not_modified
+from hapic.validation import OutputValidation
 
 try:  # Python 3.5+
     from http import HTTPStatus
@@ -29,6 +58,133 @@ except ImportError:
 # TODO: Ensure usage of DECORATION_ATTRIBUTE_NAME is documented and
 # var names correctly choose.  see #6
 DECORATION_ATTRIBUTE_NAME = "_hapic_decoration_token"
+# Attribute set on functions returned by ControllerWrapper.get_wrapper. Its
+# value is a (controller_wrapper, wrapped_function) tuple used by
+# ControllerPipeline to fold stacked wrappers.
+CONTROLLER_WRAPPER_ATTRIBUTE_NAME = "_hapic_controller_wrapper"
+# Attribute set on functions returned by output body wrappers which can't be
+# folded by ControllerPipeline (etag_func and async stream responses). Its
+# value is a (controller_wrapper, wrapped_function) tuple used by
+# output_cache to refuse them.
+UNFOLDED_OUTPUT_WRAPPER_ATTRIBUTE_NAME = "_hapic_unfolded_output_wrapper"
+
+
+def dump_output(processor: Processor, response: typing.Any, validate: bool) -> typing.Any:
+    """
+    Dump given response with given processor, validate it if required.
+    Module level function, so it can be executed by a process pool.
+    """
+    if validate:
+        return processor.dump(response)
+    return processor.dump_without_validation(response)
+
+
+# Tasks already watched by await_while_connected
+_WATCHED_TASKS = weakref.WeakSet()  # type: typing.MutableSet[asyncio.Future]
+
+
+def _get_current_task() -> typing.Optional[asyncio.Future]:
+    try:
+        return asyncio.current_task()
+    except AttributeError:
+        # NOTE: asyncio.current_task is available since python 3.7
+        return asyncio.Task.current_task()
+
+
+async def await_while_connected(
+    context: ContextInterface,
+    awaitable: typing.Awaitable[typing.Any],
+    func_args: typing.Tuple[typing.Any, ...],
+    func_kwargs: typing.Dict[str, typing.Any],
+) -> typing.Any:
+    """
+    Await given awaitable (view or stream writing) while client of request
+    is connected. If client disconnect, awaitable is cancelled, context is
+    informed (see ContextInterface.client_disconnection_caught) and
+    CancelledError is raised, like aiohttp does on premature disconnection.
+    """
+    check_interval = context.disconnect_check_interval
+    if check_interval is None or _get_current_task() in _WATCHED_TASKS:
+        return await awaitable
+
+    task = asyncio.ensure_future(awaitable)
+    _WATCHED_TASKS.add(task)
+
+    while True:
+        try:
+            await asyncio.wait((task,), timeout=check_interval)
+        except asyncio.CancelledError:
+            # NOTE: aiohttp can cancel request handler itself when client
+            # disconnect
+            task.cancel()
+            await asyncio.wait((task,))
+            if context.is_client_disconnected(func_args, func_kwargs):
+                context.client_disconnection_caught(func_args, func_kwargs)
+            raise
+
+        if task.done():
+            return task.result()
+
+        if context.is_client_disconnected(func_args, func_kwargs):
+            task.cancel()
+            # let cancelled view or stream finish (close generators, etc)
+            await asyncio.wait((task,))
+            context.client_disconnection_caught(func_args, func_kwargs)
+            raise asyncio.CancelledError()
+
+
+async def aclose_iterable(iterable: typing.Any) -> None:
+    """
+    Close given async iterable if it can be (like async generators), so its
+    finally clauses are executed now instead of when garbage collected.
+    """
+    aclose = getattr(iterable, "aclose", None)
+    if aclose is not None:
+        await aclose()
+
+
+async def aiter_iterable(
+    iterable: typing.Union[typing.Iterable[typing.Any], typing.AsyncIterable[typing.Any]]
+) -> typing.AsyncIterator[typing.Any]:
+    """
+    :param iterable: sync or async iterable
+    :return: async iterator of given iterable items
+    """
+    if hasattr(iterable, "__aiter__"):
+        async for item in iterable:
+            yield item
+    else:
+        for item in iterable:
+            yield item
+
+
+def get_stream_body_exception(exc: ValueError) -> ValidationException:
+    """
+    :param exc: error raised by JsonArrayMemberParser or json decoding
+    :return: validation exception of malformed body
+    """
+    return ValidationException(
+        str(exc),
+        validation_error=ProcessValidationError(
+            message="Request body is not valid json: {}".format(exc),
+            details={},
+            original_exception=exc,
+        ),
+    )
+
+
+def check_stream_body_tail(parser: JsonArrayMemberParser) -> None:
+    """
+    Raise ValidationException if body have members after stream field array:
+    they would be read after view consumed elements.
+    """
+    if parser.has_tail_members:
+        message = 'Body members after "{0}" are not supported, send them before "{0}"'.format(
+            parser.key
+        )
+        raise ValidationException(
+            message, validation_error=ProcessValidationError(message=message, details={})
+        )
 
 
 class ControllerReference(object):
@@ -62,6 +218,10 @@ class ControllerReference(object):
 
 
 class ControllerWrapper(object):
+    # If True, after_wrapped_function is called with parameters of current
+    # request as request_parameters argument
+    need_request_parameters = False
+
     def __init__(
         self,
         context: typing.Union[ContextInterface, typing.Callable[[], ContextInterface]],
@@ -114,6 +274,20 @@ class ControllerWrapper(object):
     def after_wrapped_function(self, response: typing.Any) -> typing.Any:
         return response
 
+    def get_after_wrapped_function_response(
+        self,
+        response: typing.Any,
+        func_args: typing.Tuple[typing.Any, ...],
+        func_kwargs: typing.Dict[str, typing.Any],
+    ) -> typing.Any:
+        """
+        Call after_wrapped_function with request parameters if needed
+        """
+        if self.need_request_parameters:
+            request_parameters = self.context.get_request_parameters(*func_args, **func_kwargs)
+            return self.after_wrapped_function(response, request_parameters=request_parameters)
+        return self.after_wrapped_function(response)
+
     def get_wrapper(self, func: "typing.Callable") -> "typing.Callable":
         # async def wrapper(*args, **kwargs) -> typing.Any:
         def wrapper(*args, **kwargs) -> typing.Any:
@@ -124,10 +298,24 @@ class ControllerWrapper(object):
                 return replacement_response
 
             response = self._execute_wrapped_function(func, args, kwargs)
-            new_response = self.after_wrapped_function(response)
+            new_response = self.get_after_wrapped_function_response(response, args, kwargs)
             return new_response
 
-        return functools.update_wrapper(wrapper, func)
+        return self._update_wrapper(wrapper, func)
+
+    def _update_wrapper(
+        self, wrapper: "typing.Callable", func: "typing.Callable"
+    ) -> "typing.Callable":
+        """
+        Make given wrapper look like wrapped function and mark it as produced
+        by this controller wrapper (see ControllerPipeline).
+        :param wrapper: wrapper function built by get_wrapper
+        :param func: wrapped function
+        :return: updated wrapper
+        """
+        wrapper = functools.update_wrapper(wrapper, func)
+        setattr(wrapper, CONTROLLER_WRAPPER_ATTRIBUTE_NAME, (self, func))
+        return wrapper
 
     def _execute_wrapped_function(self, func, func_args, func_kwargs) -> typing.Any:
         return func(*func_args, **func_kwargs)
@@ -141,18 +329,29 @@ class InputControllerWrapper(InputOutputControllerWrapper):
     def before_wrapped_func(
         self, func_args: typing.Tuple[typing.Any, ...], func_kwargs: typing.Dict[str, typing.Any]
     ) -> typing.Any:
+        request_parameters = self.get_request_parameters(func_args, func_kwargs)
+        return self.process_request_parameters(request_parameters, func_kwargs)
+
+    def process_request_parameters(
+        self, request_parameters: RequestParameters, func_kwargs: typing.Dict[str, typing.Any]
+    ) -> typing.Any:
+        """
+        Validate request parameters and update hapic_data with processed data.
+        :param request_parameters: parameters of current request
+        :param func_kwargs: wrapped function kwargs
+        :return: error response if validation failed, else None
+        """
         # Retrieve hapic_data instance or create new one
         # hapic_data is given though decorators
         # Important note here: func_kwargs is update by reference !
         hapic_data = self.ensure_hapic_data(func_kwargs)
-        request_parameters = self.get_request_parameters(func_args, func_kwargs)
 
         try:
             processed_data = self.get_processed_data(request_parameters)
             self.update_hapic_data(hapic_data, processed_data)
         except ProcessException as exc:
             self.context.input_validation_error_caught(request_parameters, exc)
-            error_response = self.get_error_response(request_parameters)
+            error_response = self.get_error_response(request_parameters, exc)
             return error_response
 
     @classmethod
@@ -183,9 +382,25 @@ class InputControllerWrapper(InputOutputControllerWrapper):
     ) -> None:
         raise NotImplementedError()
 
-    def get_error_response(self, request_parameters: RequestParameters) -> typing.Any:
-        parameters_data = self.get_parameters_data(request_parameters)
-        error = self._get_processor_error(parameters_data)
+    def get_error_response(
+        self,
+        request_parameters: RequestParameters,
+        process_exception: typing.Optional[ProcessException] = None,
+    ) -> typing.Any:
+        """
+        Build error response of input validation error.
+        :param request_parameters: parameters of current request
+        :param process_exception: exception raised by processor. If it
+            contains validation error, processor is not used a second time
+            to produce it.
+        :return: error response
+        """
+        if process_exception is not None and process_exception.validation_error is not None:
+            error = process_exception.validation_error
+        else:
+            parameters_data = self.get_parameters_data(request_parameters)
+            error = self._get_processor_error(parameters_data)
+
         error_response = self.context.get_validation_error_response(
             error, http_code=self.error_http_code
         )
@@ -211,23 +426,28 @@ class AsyncInputControllerWrapper(InputControllerWrapper):
             new_response = self.after_wrapped_function(response)
             return new_response
 
-        return functools.update_wrapper(wrapper, func)
+        return self._update_wrapper(wrapper, func)
 
     async def before_wrapped_func(
         self, func_args: typing.Tuple[typing.Any, ...], func_kwargs: typing.Dict[str, typing.Any]
+    ) -> typing.Any:
+        request_parameters = self.get_request_parameters(func_args, func_kwargs)
+        return await self.process_request_parameters(request_parameters, func_kwargs)
+
+    async def process_request_parameters(
+        self, request_parameters: RequestParameters, func_kwargs: typing.Dict[str, typing.Any]
     ) -> typing.Any:
         # Retrieve hapic_data instance or create new one
         # hapic_data is given though decorators
         # Important note here: func_kwargs is update by reference !
         hapic_data = self.ensure_hapic_data(func_kwargs)
-        request_parameters = self.get_request_parameters(func_args, func_kwargs)
 
         try:
             processed_data = await self.get_processed_data(request_parameters)
             self.update_hapic_data(hapic_data, processed_data)
         except ProcessException as exc:
             self.context.input_validation_error_caught(request_parameters, exc)
-            error_response = await self.get_error_response(request_parameters)
+            error_response = await self.get_error_response(request_parameters, exc)
             return error_response
 
     async def get_processed_data(self, request_parameters: RequestParameters) -> typing.Any:
@@ -243,32 +463,294 @@ class OutputControllerWrapper(InputOutputControllerWrapper):
         processor_factory: typing.Callable[[typing.Optional[TYPE_SCHEMA]], Processor],
         error_http_code: HTTPStatus = HTTPStatus.INTERNAL_SERVER_ERROR,
         default_http_code: HTTPStatus = HTTPStatus.OK,
+        output_validation: typing.Optional[OutputValidation] = None,
+        etag: bool = False,
+        etag_func: typing.Optional[typing.Callable[[HapicData], typing.Any]] = None,
+        compress: bool = True,
+        stream: bool = False,
+        stream_chunk_size: int = 1000,
     ) -> None:
+        """
+        See ControllerWrapper.__init__ for other parameters
+        :param output_validation: output validation policy, default is full
+            validation
+        :param etag: if True, set ETag header computed from response body
+            and return a not modified response if it match with request
+            If-None-Match header
+        :param etag_func: function returning version token of response
+            from hapic_data (see OutputBodyControllerWrapper)
+        :param compress: if False, responses are never compressed, even if
+            context have a compression
+        :param stream: if True, view response is an iterable of items (like
+            a generator) dumped by chunks of stream_chunk_size items and
+            written as a json array while dumped. Processor must dump lists
+            (like a many=True schema).
+        :param stream_chunk_size: count of items dumped and encoded together
+        """
         super().__init__(context, processor_factory, error_http_code, default_http_code)
+        if stream and (etag or etag_func is not None):
+            raise ConfigurationException("stream responses can't be versioned with etag")
+        if stream_chunk_size < 1:
+            raise ConfigurationException("stream_chunk_size must be greater than 0")
+
+        self.output_validation = output_validation or OutputValidation()
+        self.etag = etag
+        self.etag_func = etag_func
+        self.compress = compress
+        self.stream = stream
+        self.stream_chunk_size = stream_chunk_size
+
+    @property
+    def need_request_parameters(self) -> bool:
+        return self.etag
+
+    def _update_unfolded_wrapper(
+        self, wrapper: "typing.Callable", func: "typing.Callable"
+    ) -> "typing.Callable":
+        """
+        Make given wrapper look like wrapped function and mark it as an
+        output wrapper which can't be folded by ControllerPipeline: it is
+        seen as a controller by outer wrappers.
+        :param wrapper: wrapper function built by get_wrapper
+        :param func: wrapped function
+        :return: updated wrapper
+        """
+        wrapper = functools.update_wrapper(wrapper, func)
+        setattr(wrapper, UNFOLDED_OUTPUT_WRAPPER_ATTRIBUTE_NAME, (self, func))
+        return wrapper
+
+    def get_error_response(
+        self, response: typing.Any, process_exception: typing.Optional[ProcessException] = None
+    ) -> typing.Any:
+        """
+        Build error response of output validation error.
+        :param response: view response
+        :param process_exception: exception raised by processor. If it
+            contains validation error, processor is not used a second time
+            to produce it.
+        :return: error response
+        """
+        if process_exception is not None and process_exception.validation_error is not None:
+            error = process_exception.validation_error
+        else:
+            error = self._get_processor_error(response)
 
-    def get_error_response(self, response: typing.Any) -> typing.Any:
-        error = self.processor.get_output_validation_error(response)
         error_response = self.context.get_validation_error_response(
             error, http_code=self.error_http_code
         )
         return error_response
 
-    def after_wrapped_function(self, response: typing.Any) -> typing.Any:
+    def after_wrapped_function(
+        self, response: typing.Any, request_parameters: typing.Optional[RequestParameters] = None
+    ) -> typing.Any:
+        if self.context.by_pass_output_wrapping(response):
+            return response
+        if self.stream:
+            return self.get_stream_body_response(response)
+
         try:
-            if self.context.by_pass_output_wrapping(response):
-                return response
+            response_body = self.get_response_body(response)
+        except ProcessException as exc:
+            return self.get_output_error_response(response, exc)
+
+        return self.get_body_response(response_body, request_parameters)
+
+    def get_stream_body_response(self, response: typing.Iterable[typing.Any]) -> typing.Any:
+        """
+        Build a stream response writing given view items as a json array.
+        Items are dumped by chunks while response is sent. First chunk is
+        dumped before: if it is not valid, an error response is returned.
+        :param response: view items
+        :return: stream response
+        """
+        dumped_chunks = self._get_dumped_chunks(response)
+        try:
+            first_dumped_chunk = next(dumped_chunks, None)
+        except ProcessException as exc:
+            return self.get_stream_error_response(exc)
+
+        if first_dumped_chunk is not None:
+            dumped_chunks = itertools.chain([first_dumped_chunk], dumped_chunks)
+
+        return self.context.get_stream_response(
+            dumped_chunks,
+            self.default_http_code,
+            stream_format=JSON_ARRAY_CHUNKS_STREAM_FORMAT,
+            compress=self.compress,
+        )
+
+    def get_stream_error_response(self, process_exception: ProcessException) -> typing.Any:
+        """
+        Build error response of first chunk of a stream response
+        :param process_exception: exception raised by get_dumped_chunk, its
+            validation error is the one of invalid chunk
+        :return: error response
+        """
+        return self.context.get_validation_error_response(
+            process_exception.validation_error, http_code=self.error_http_code
+        )
+
+    def _get_dumped_chunks(self, items: typing.Iterable[typing.Any]) -> typing.Iterator[list]:
+        chunk = []
+        for item in items:
+            chunk.append(item)
+            if len(chunk) >= self.stream_chunk_size:
+                yield self.get_dumped_chunk(chunk)
+                chunk = []
+
+        if chunk:
+            yield self.get_dumped_chunk(chunk)
+
+    def get_dumped_chunk(self, chunk: typing.List[typing.Any]) -> list:
+        """
+        Dump given chunk of stream response items.
+        Raise ProcessException if validation fail (context is informed):
+        if response is already started, it is interrupted.
+        :param chunk: view items
+        :return: dumped items
+        """
+        try:
+            return self.get_processed_response(chunk)
+        except ProcessException as exc:
+            self.context.output_validation_error_caught(chunk, exc)
+            # NOTE: error is built from this chunk because view items
+            # iterable is consumed and can't be processed again
+            if exc.validation_error is None:
+                exc.validation_error = self._get_processor_error(chunk)
+            raise
+
+    def get_body_response(
+        self,
+        response_body: bytes,
+        request_parameters: typing.Optional[RequestParameters] = None,
+        http_code: typing.Optional[int] = None,
+    ) -> typing.Any:
+        """
+        Build response with given serialized body. If etag is enabled,
+        response have an ETag header and is a not modified response if
+        request If-None-Match header match with it.
+        :param response_body: serialized response body
+        :param request_parameters: parameters of current request, required
+            to return not modified response
+        :param http_code: http code to use, default is default_http_code
+        :return: response
+        """
+        http_code = http_code or self.default_http_code
+        if not self.etag:
+            return self.context.get_response(response_body, http_code, compress=self.compress)
+
+        etag = get_body_etag(response_body)
+        headers = [("ETag", etag)]
+        if request_parameters is not None and is_etag_matching(
+            request_parameters.header_parameters.get("if-none-match"), etag
+        ):
+            return self.context.get_response(b"", HTTPStatus.NOT_MODIFIED, headers=headers)
+
+        return self.context.get_response(
+            response_body, http_code, headers=headers, compress=self.compress
+        )
 
-            processed_response = self.processor.dump(response)
-            prepared_response = self.context.get_response(
-                json.dumps(processed_response), self.default_http_code
+    def get_not_modified_response(
+        self, version: typing.Any, request_parameters: RequestParameters
+    ) -> typing.Any:
+        """
+        :param version: version token returned by etag_func
+        :param request_parameters: parameters of current request
+        :return: not modified response if request conditional headers
+            match with given version, else None
+        """
+        if is_version_not_modified(version, request_parameters.header_parameters):
+            return self.context.get_response(
+                b"", HTTPStatus.NOT_MODIFIED, headers=get_version_headers(version)
             )
-            return prepared_response
+        return None
+
+    def get_versioned_response(self, response: typing.Any, version: typing.Any) -> typing.Any:
+        """
+        Like after_wrapped_function, but response have ETag (and
+        Last-Modified) headers of given version.
+        :param response: view response
+        :param version: version token returned by etag_func
+        :return: response
+        """
+        if self.context.by_pass_output_wrapping(response):
+            return response
+
+        try:
+            response_body = self.get_response_body(response)
         except ProcessException as exc:
-            self.context.output_validation_error_caught(response, exc)
-            # TODO: ici ou ailleurs: il faut pas forcement donner le detail
-            # de l'erreur (mode debug par exemple)  see #8
-            error_response = self.get_error_response(response)
-            return error_response
+            return self.get_output_error_response(response, exc)
+
+        return self.context.get_response(
+            response_body,
+            self.default_http_code,
+            headers=get_version_headers(version),
+            compress=self.compress,
+        )
+
+    def get_response_body(self, response: typing.Any) -> bytes:
+        """
+        Dump and encode given view response.
+        Raise ProcessException if validation fail.
+        :param response: view response
+        :return: response body
+        """
+        return self.context.json_backend.encode(self.get_processed_response(response))
+
+    def get_output_error_response(
+        self, response: typing.Any, process_exception: ProcessException
+    ) -> typing.Any:
+        """
+        Inform context about output validation error and build error response
+        :param response: view response
+        :param process_exception: exception raised by processor
+        :return: error response
+        """
+        self.context.output_validation_error_caught(response, process_exception)
+        # TODO: ici ou ailleurs: il faut pas forcement donner le detail
+        # de l'erreur (mode debug par exemple)  see #8
+        return self.get_error_response(response, process_exception)
+
+    def get_processed_response(self, response: typing.Any) -> typing.Any:
+        """
+        Dump given view response. Dumped data is validated or not depending
+        on output validation policy.
+        Raise ProcessException if validation fail.
+        :param response: view response
+        :return: dumped data
+        """
+        validate = self.output_validation.must_validate()
+        try:
+            processed_response = dump_output(self.processor, response, validate)
+        except ProcessException:
+            if validate:
+                self.output_validation.validation_failed()
+            raise
+
+        self.output_processed(response, processed_response, validate)
+        return processed_response
+
+    def output_processed(
+        self, response: typing.Any, processed_response: typing.Any, validated: bool
+    ) -> None:
+        """
+        Update output validation policy after a successful dump of response
+        :param validated: True if response have been validated when dumped
+        """
+        if validated:
+            self.output_validation.validation_succeed()
+            return
+
+        shadow_validator = self.output_validation.shadow_validator
+        if self.output_validation.shadow and shadow_validator is not None:
+            shadow_validator.submit(
+                self.processor,
+                processed_response,
+                functools.partial(self.context.output_validation_error_caught, response),
+            )
+
+    def _get_processor_error(self, response: typing.Any) -> ProcessValidationError:
+        return self.processor.get_output_validation_error(response)
 
 
 class DecoratedController(object):
@@ -293,7 +775,40 @@ class DecoratedController(object):
 
 
 class OutputBodyControllerWrapper(OutputControllerWrapper):
-    pass
+    """
+    Output wrapper of views returning serialized data. If etag_func is
+    given, it is called with validated input data (hapic_data) before view:
+    if returned version match with request If-None-Match (or
+    If-Modified-Since if version is a datetime) header, a not modified
+    response is returned without call view. To get hapic_data, returned
+    wrapper run wrapped function wrappers (see ControllerPipeline) with a
+    controller doing this check.
+    """
+
+    def get_wrapper(self, func: "typing.Callable") -> "typing.Callable":
+        if self.etag_func is None:
+            return super().get_wrapper(func)
+
+        pipeline = ControllerPipeline.from_decorated_function(func)
+        controller = pipeline.controller
+
+        def versioned_controller(
+            *args, request_parameters: RequestParameters, **kwargs
+        ) -> typing.Any:
+            version = self.etag_func(kwargs.get("hapic_data") or HapicData())
+            not_modified_response = self.get_not_modified_response(version, request_parameters)
+            if not_modified_response is not None:
+                return not_modified_response
+
+            response = controller(*args, **kwargs)
+            return self.get_versioned_response(response, version)
+
+        # NOTE: wrapper is not marked as a controller wrapper, so it is seen
+        # as a controller by pipeline of outer wrappers
+        wrapper = ControllerPipeline(
+            pipeline.wrappers, versioned_controller, controller_stage_wrapper=self
+        ).get_wrapper()
+        return self._update_unfolded_wrapper(wrapper, func)
 
 
 # TODO BS 2018-07-23: This class is an async version of
@@ -302,6 +817,11 @@ class OutputBodyControllerWrapper(OutputControllerWrapper):
 # Please re-think about code refact. TAG: REFACT_ASYNC
 class AsyncOutputBodyControllerWrapper(OutputControllerWrapper):
     def get_wrapper(self, func: "typing.Callable") -> "typing.Callable":
+        if self.etag_func is not None:
+            return self._get_versioned_wrapper(func)
+        if self.stream:
+            return self._get_stream_wrapper(func)
+
         # async def wrapper(*args, **kwargs) -> typing.Any:
         async def wrapper(*args, **kwargs) -> typing.Any:
             # Note: Design of before_wrapped_func can be to update kwargs
@@ -310,17 +830,146 @@ class AsyncOutputBodyControllerWrapper(OutputControllerWrapper):
             if replacement_response is not None:
                 return replacement_response
 
-            response = await self._execute_wrapped_function(func, args, kwargs)
-            new_response = self.after_wrapped_function(response)
+            response = await await_while_connected(
+                self.context, self._execute_wrapped_function(func, args, kwargs), args, kwargs
+            )
+            new_response = self.get_after_wrapped_function_response(response, args, kwargs)
             return new_response
 
-        return functools.update_wrapper(wrapper, func)
+        return self._update_wrapper(wrapper, func)
+
+    def _get_versioned_wrapper(self, func: "typing.Callable") -> "typing.Callable":
+        """
+        Async version of OutputBodyControllerWrapper.get_wrapper with
+        etag_func. etag_func can be a coroutine function.
+        """
+        pipeline = ControllerPipeline.from_decorated_function(func)
+        controller = pipeline.controller
+
+        async def versioned_controller(
+            *args, request_parameters: RequestParameters, **kwargs
+        ) -> typing.Any:
+            version = self.etag_func(kwargs.get("hapic_data") or HapicData())
+            if inspect.isawaitable(version):
+                version = await version
+            not_modified_response = self.get_not_modified_response(version, request_parameters)
+            if not_modified_response is not None:
+                return not_modified_response
+
+            response = controller(*args, **kwargs)
+            if inspect.isawaitable(response):
+                response = await await_while_connected(self.context, response, args, kwargs)
+            return self.get_versioned_response(response, version)
+
+        wrapper = ControllerPipeline(
+            pipeline.wrappers, versioned_controller, controller_stage_wrapper=self
+        ).get_async_wrapper()
+        return self._update_unfolded_wrapper(wrapper, func)
+
+    def _get_stream_wrapper(self, func: "typing.Callable") -> "typing.Callable":
+        """
+        Async version of get_stream_body_response: view can return an
+        iterable or an async iterable (or be an async generator).
+        """
+
+        async def wrapper(*args, **kwargs) -> typing.Any:
+            # Note: Design of before_wrapped_func can be to update kwargs
+            # by reference here
+            replacement_response = self.before_wrapped_func(args, kwargs)
+            if replacement_response is not None:
+                return replacement_response
+
+            response = func(*args, **kwargs)
+            if inspect.isawaitable(response):
+                response = await await_while_connected(self.context, response, args, kwargs)
+            if self.context.by_pass_output_wrapping(response):
+                return response
 
+            try:
+                return await self._get_stream_response(response, args, kwargs)
+            finally:
+                # view generator is closed now, even if stream was stopped
+                await aclose_iterable(response)
 
-class AsyncOutputStreamControllerWrapper(OutputControllerWrapper):
+        # NOTE: this wrapper is not folded by ControllerPipeline because
+        # response is written after view call
+        return self._update_unfolded_wrapper(wrapper, func)
+
+    async def _get_stream_response(
+        self,
+        response: typing.Union[typing.Iterable[typing.Any], typing.AsyncIterable[typing.Any]],
+        func_args: typing.Tuple[typing.Any, ...],
+        func_kwargs: typing.Dict[str, typing.Any],
+    ) -> typing.Any:
+        dumped_chunks = self._get_async_dumped_chunks(response)
+        try:
+            try:
+                first_dumped_chunk = await dumped_chunks.__anext__()
+            except StopAsyncIteration:
+                first_dumped_chunk = None
+            except ProcessException as exc:
+                return self.get_stream_error_response(exc)
+
+            stream_response = await self.context.get_stream_response_object(
+                func_args,
+                func_kwargs,
+                http_code=self.default_http_code,
+                headers={"Content-Type": JSON_ARRAY_CHUNKS_STREAM_FORMAT.mimetype},
+                compress=self.compress,
+            )
+            try:
+                await await_while_connected(
+                    self.context,
+                    self._write_dumped_chunks(stream_response, first_dumped_chunk, dumped_chunks),
+                    func_args,
+                    func_kwargs,
+                )
+            except ConnectionError:
+                self.context.client_disconnection_caught(func_args, func_kwargs)
+                raise asyncio.CancelledError()
+            return stream_response
+        finally:
+            await aclose_iterable(dumped_chunks)
+
+    async def _get_async_dumped_chunks(
+        self, items: typing.Union[typing.Iterable[typing.Any], typing.AsyncIterable[typing.Any]]
+    ) -> typing.AsyncIterator[list]:
+        chunk = []
+        async for item in aiter_iterable(items):
+            chunk.append(item)
+            if len(chunk) >= self.stream_chunk_size:
+                yield self.get_dumped_chunk(chunk)
+                chunk = []
+
+        if chunk:
+            yield self.get_dumped_chunk(chunk)
+
+    async def _write_dumped_chunks(
+        self,
+        stream_response: typing.Any,
+        first_dumped_chunk: typing.Optional[list],
+        dumped_chunks: typing.AsyncIterator[list],
+    ) -> None:
+        stream_format = JSON_ARRAY_CHUNKS_STREAM_FORMAT
+        await stream_response.write(stream_format.get_start())
+        if first_dumped_chunk is not None:
+            await stream_response.write(
+                stream_format.get_item(self.context.get_stream_item_bytes(first_dumped_chunk), 0)
+            )
+            index = 1
+            async for dumped_chunk in dumped_chunks:
+                await stream_response.write(
+                    stream_format.get_item(self.context.get_stream_item_bytes(dumped_chunk), index)
+                )
+                index += 1
+        await stream_response.write(stream_format.get_end())
+
+
+class OutputStreamControllerWrapper(OutputControllerWrapper):
     """
     This controller wrapper produce a wrapper who caught the http view items
-    to check and serialize them into a stream response.
+    (any iterable, like a generator) to check and serialize them into a
+    stream response. Items are consumed lazily while response is sent.
     """
 
     def __init__(
@@ -330,9 +979,99 @@ class AsyncOutputStreamControllerWrapper(OutputControllerWrapper):
         error_http_code: HTTPStatus = HTTPStatus.INTERNAL_SERVER_ERROR,
         default_http_code: HTTPStatus = HTTPStatus.OK,
         ignore_on_error: bool = True,
+        output_validation: typing.Optional[OutputValidation] = None,
+        compress: bool = True,
+        stream_format: typing.Optional[StreamFormat] = None,
     ) -> None:
-        super().__init__(context, processor_factory, error_http_code, default_http_code)
+        """
+        See OutputControllerWrapper.__init__ for other parameters
+        :param ignore_on_error: if True, items failing serialization are
+            skipped, else stream is ended at first failing item
+        :param stream_format: wire format of stream, default is newline
+            separated json documents
+        """
+        super().__init__(
+            context,
+            processor_factory,
+            error_http_code,
+            default_http_code,
+            output_validation=output_validation,
+            compress=compress,
+        )
         self.ignore_on_error = ignore_on_error
+        self.stream_format = stream_format or DEFAULT_STREAM_FORMAT
+
+    def after_wrapped_function(self, response: typing.Any) -> typing.Any:
+        if self.context.by_pass_output_wrapping(response):
+            return response
+
+        return self.context.get_stream_response(
+            self._get_serialized_items(response),
+            self.default_http_code,
+            stream_format=self.stream_format,
+            compress=self.compress,
+        )
+
+    def _get_serialized_items(self, items: typing.Iterable[typing.Any]) -> typing.Iterator[dict]:
+        for stream_item in items:
+            try:
+                yield self._get_serialized_item(stream_item)
+            except ValidationException as exc:
+                self.context.output_validation_error_caught(stream_item, exc)
+                if not self.ignore_on_error:
+                    # NOTE: response is already started, its http code can't
+                    # be changed: stream is ended
+                    return
+
+    def _get_serialized_item(self, item_object: typing.Any) -> dict:
+        return self.get_processed_response(item_object)
+
+
+class AsyncOutputStreamControllerWrapper(OutputStreamControllerWrapper):
+    def __init__(
+        self,
+        context: typing.Union[ContextInterface, typing.Callable[[], ContextInterface]],
+        processor_factory: typing.Callable[[typing.Optional[TYPE_SCHEMA]], Processor],
+        error_http_code: HTTPStatus = HTTPStatus.INTERNAL_SERVER_ERROR,
+        default_http_code: HTTPStatus = HTTPStatus.OK,
+        ignore_on_error: bool = True,
+        output_validation: typing.Optional[OutputValidation] = None,
+        compress: bool = True,
+        stream_format: typing.Optional[StreamFormat] = None,
+        flush_size: int = 64 * 1024,
+        flush_interval: float = 0.05,
+        max_queue_size: int = 256,
+        executor: typing.Optional[concurrent.futures.Executor] = None,
+        max_in_flight: int = 16,
+    ) -> None:
+        """
+        See OutputStreamControllerWrapper.__init__ for other parameters and
+        BufferedStreamWriter.__init__ for flush_size, flush_interval and
+        max_queue_size
+        :param executor: if given, stream items are dumped by this executor
+            (thread or process pool) instead of event loop. Processor and
+            items must be picklable to use a process pool.
+        :param max_in_flight: with executor, max count of items being dumped
+            at same time. Items are written in view order.
+        """
+        if max_in_flight < 1:
+            raise ConfigurationException("max_in_flight must be greater than 0")
+
+        super().__init__(
+            context,
+            processor_factory,
+            error_http_code,
+            default_http_code,
+            ignore_on_error=ignore_on_error,
+            output_validation=output_validation,
+            compress=compress,
+            stream_format=stream_format,
+        )
+        self.stream_writer = BufferedStreamWriter(
+            flush_size=flush_size, flush_interval=flush_interval, max_queue_size=max_queue_size
+        )
+        self.executor = executor
+        self.max_in_flight = max_in_flight
 
     def get_wrapper(self, func: "typing.Callable") -> "typing.Callable":
         # async def wrapper(*args, **kwargs) -> typing.Any:
@@ -343,40 +1082,151 @@ class AsyncOutputStreamControllerWrapper(OutputControllerWrapper):
             if replacement_response is not None:
                 return replacement_response
 
-            stream_response = await self.context.get_stream_response_object(args, kwargs)
+            stream_response = await self.context.get_stream_response_object(
+                args,
+                kwargs,
+                headers=dict(
+                    [("Content-Type", self.stream_format.mimetype)] + self.stream_format.headers
+                ),
+                compress=self.compress,
+            )
 
             response_object = self._execute_wrapped_function(func, args, kwargs)
 
-            # To be compatible with python3.5 and python3.7, we must inspect
-            # the object. If it is an async_generator, nothing to do. Else,
-            # we must await it.
-            # To see example, in python3.5:
-            #    tests.ext.unit.test_aiohttp.TestAiohttpExt#test_aiohttp_output_stream__ok__nominal_case
-            # In python 3.6+:
-            #    tests.ext.unit.test_aiohttp.TestAiohttpExt#test_aiohttp_output_stream__ok__py37
+            # View can be an async generator function or a coroutine function
+            # returning an iterable: we must inspect the object. If it is an
+            # async_generator, nothing to do. Else, we must await it.
             # TODO BS 2018-11-19: A cleaner way to test if it is an
             # async_generator object ?
             if type(response_object).__name__ == "async_generator":
                 iterable_response_object = response_object
             else:
-                iterable_response_object = await response_object
-
-            async for stream_item in iterable_response_object:
-                try:
-                    serialized_item = self._get_serialized_item(stream_item)
-                    await self.context.feed_stream_response(stream_response, serialized_item)
-                except ValidationException:
-                    if not self.ignore_on_error:
-                        # TODO BS 2018-07-31: Something should inform about
-                        # error, a log ?
-                        return stream_response
+                iterable_response_object = await await_while_connected(
+                    self.context, response_object, args, kwargs
+                )
+
+            try:
+                await await_while_connected(
+                    self.context,
+                    self.stream_writer.write_chunks(
+                        self._get_stream_chunks(iterable_response_object),
+                        stream_response.write,
+                        keep_alive_chunk=self.stream_format.keep_alive_chunk,
+                        keep_alive_interval=self.stream_format.keep_alive_interval,
+                    ),
+                    args,
+                    kwargs,
+                )
+            except ConnectionError:
+                # NOTE: client closed connection before end of stream, stop
+                # like aiohttp does on premature disconnection
+                self.context.client_disconnection_caught(args, kwargs)
+                raise asyncio.CancelledError()
+            finally:
+                # view generator is closed now, even if stream was stopped
+                await aclose_iterable(iterable_response_object)
 
             return stream_response
 
         return functools.update_wrapper(wrapper, func)
 
-    def _get_serialized_item(self, item_object: typing.Any) -> dict:
-        return self.processor.dump(item_object)
+    async def _get_stream_chunks(
+        self, iterable_response_object: typing.AsyncIterable[typing.Any]
+    ) -> typing.AsyncIterator[bytes]:
+        start = self.stream_format.get_start()
+        if start:
+            yield start
+
+        if self.executor is None:
+            serialized_items = self._get_serialized_stream_items(iterable_response_object)
+        else:
+            serialized_items = self._get_executor_serialized_stream_items(iterable_response_object)
+
+        index = 0
+        try:
+            async for serialized_item in serialized_items:
+                yield self.stream_format.get_item(
+                    self.context.get_stream_item_bytes(serialized_item), index
+                )
+                index += 1
+        finally:
+            await aclose_iterable(serialized_items)
+
+        end = self.stream_format.get_end()
+        if end:
+            yield end
+
+    async def _get_serialized_stream_items(
+        self, iterable_response_object: typing.AsyncIterable[typing.Any]
+    ) -> typing.AsyncIterator[typing.Any]:
+        async for stream_item in iterable_response_object:
+            try:
+                serialized_item = self._get_serialized_item(stream_item)
+            except ValidationException as exc:
+                self.context.output_validation_error_caught(stream_item, exc)
+                if not self.ignore_on_error:
+                    # TODO BS 2018-07-31: Something should inform about
+                    # error, a log ?
+                    return
+                continue
+
+            yield serialized_item
+
+    async def _get_executor_serialized_stream_items(
+        self, iterable_response_object: typing.AsyncIterable[typing.Any]
+    ) -> typing.AsyncIterator[typing.Any]:
+        """
+        Like _get_serialized_stream_items, but items are dumped by executor.
+        View items are consumed while previous items are dumped, up to
+        max_in_flight items, and dumped items are given in view order.
+        """
+        loop = asyncio.get_event_loop()
+        items_iterator = iterable_response_object.__aiter__()
+        view_exhausted = False
+        # (stream_item, validate, future) tuples in view order
+        in_flight = collections.deque()  # type: typing.Deque[tuple]
+
+        try:
+            while in_flight or not view_exhausted:
+                if in_flight and (
+                    view_exhausted or len(in_flight) >= self.max_in_flight or in_flight[0][2].done()
+                ):
+                    stream_item, validate, future = in_flight.popleft()
+                    try:
+                        serialized_item = await future
+                    except ProcessException as exc:
+                        if validate:
+                            self.output_validation.validation_failed()
+                        if not isinstance(exc, ValidationException):
+                            raise
+                        self.context.output_validation_error_caught(stream_item, exc)
+                        if not self.ignore_on_error:
+                            return
+                        continue
+
+                    self.output_processed(stream_item, serialized_item, validate)
+                    yield serialized_item
+                    continue
+
+                try:
+                    stream_item = await items_iterator.__anext__()
+                except StopAsyncIteration:
+                    view_exhausted = True
+                    continue
+
+                validate = self.output_validation.must_validate()
+                in_flight.append(
+                    (
+                        stream_item,
+                        validate,
+                        loop.run_in_executor(
+                            self.executor, dump_output, self.processor, stream_item, validate
+                        ),
+                    )
+                )
+        finally:
+            for _, _, future in in_flight:
+                future.cancel()
 
 
 class OutputHeadersControllerWrapper(OutputControllerWrapper):
@@ -409,7 +1259,7 @@ class OutputFileControllerWrapper(OutputControllerWrapper):
             self.context.output_validation_error_caught(response, exc)
             # TODO: ici ou ailleurs: il faut pas forcement donner le detail
             # de l'erreur (mode debug par exemple)  see #8
-            error_response = self.get_error_response(response)
+            error_response = self.get_error_response(response, exc)
             return error_response
 
 
@@ -431,7 +1281,7 @@ class AsyncOutputFileControllerWrapper(OutputFileControllerWrapper):
             new_response = self.after_wrapped_function(response)
             return new_response
 
-        return functools.update_wrapper(wrapper, func)
+        return self._update_wrapper(wrapper, func)
 
 
 class InputPathControllerWrapper(InputControllerWrapper):
@@ -460,7 +1310,7 @@ class AsyncInputPathControllerWrapper(InputPathControllerWrapper):
             new_response = self.after_wrapped_function(response)
             return new_response
 
-        return functools.update_wrapper(wrapper, func)
+        return self._update_wrapper(wrapper, func)
 
     async def _execute_wrapped_function(self, func, func_args, func_kwargs) -> typing.Any:
         return await func(*func_args, **func_kwargs)
@@ -520,33 +1370,266 @@ class AsyncInputQueryControllerWrapper(InputQueryControllerWrapper):
             new_response = self.after_wrapped_function(response)
             return new_response
 
-        return functools.update_wrapper(wrapper, func)
+        return self._update_wrapper(wrapper, func)
 
     async def _execute_wrapped_function(self, func, func_args, func_kwargs) -> typing.Any:
         return await func(*func_args, **func_kwargs)
 
 
 class InputBodyControllerWrapper(InputControllerWrapper):
+    def __init__(
+        self,
+        context: typing.Union[ContextInterface, typing.Callable[[], ContextInterface]],
+        processor_factory: typing.Callable[[typing.Optional[TYPE_SCHEMA]], Processor],
+        error_http_code: HTTPStatus = HTTPStatus.BAD_REQUEST,
+        default_http_code: HTTPStatus = HTTPStatus.OK,
+        stream_on_error: str = "abort",
+        stream_chunk_size: int = 64 * 1024,
+        stream_max_item_size: int = 1024 * 1024,
+    ) -> None:
+        super().__init__(context, processor_factory, error_http_code, default_http_code)
+        if stream_chunk_size < 1 or stream_max_item_size < 1:
+            raise ConfigurationException(
+                "stream_chunk_size and stream_max_item_size must be greater than 0"
+            )
+        self.stream_on_error = check_input_stream_error_policy(stream_on_error)
+        self.stream_chunk_size = stream_chunk_size
+        self.stream_max_item_size = stream_max_item_size
+
+    def get_wrapper(self, func: "typing.Callable") -> "typing.Callable":
+        def wrapper(*args, **kwargs) -> typing.Any:
+            # Note: Design of before_wrapped_func can be to update kwargs
+            # by reference here
+            replacement_response = self.before_wrapped_func(args, kwargs)
+            if replacement_response is not None:
+                return replacement_response
+
+            try:
+                response = self._execute_wrapped_function(func, args, kwargs)
+            except InputStreamValidationException as exc:
+                if not self.is_input_stream_exception(exc, kwargs["hapic_data"]):
+                    raise
+                return self.get_input_stream_error_response(exc)
+            return self.get_after_wrapped_function_response(response, args, kwargs)
+
+        # NOTE: stream field is not resolved here to not build processor at
+        # decoration time: invalid stream field elements raised by view are
+        # handled by this wrapper, or by ControllerPipeline when folded
+        return self._update_wrapper(wrapper, func)
+
+    def is_input_stream_exception(
+        self, exc: InputStreamValidationException, hapic_data: HapicData
+    ) -> bool:
+        """
+        :param exc: exception raised by wrapped function
+        :param hapic_data: hapic data of current request
+        :return: True if exception was raised by stream field of this wrapper
+        """
+        input_stream = self.get_input_stream(hapic_data)
+        return input_stream is not None and exc.input_stream is input_stream
+
+    def get_input_stream_error_response(self, exc: InputStreamValidationException) -> typing.Any:
+        """
+        :param exc: exception raised by stream field of this wrapper
+        :return: validation error response
+        """
+        return self.context.get_validation_error_response(
+            exc.validation_error, http_code=self.error_http_code
+        )
+
     def update_hapic_data(self, hapic_data: HapicData, processed_data: typing.Any) -> None:
         hapic_data.body = processed_data
 
     def get_parameters_data(self, request_parameters: RequestParameters) -> dict:
         return request_parameters.body_parameters
 
+    def get_stream_field(self) -> typing.Optional[StreamField]:
+        """
+        :return: schema list field read incrementally, if any: its elements
+            are given lazily by an InputStream in processed body
+        """
+        return self.processor.get_stream_field()
+
+    def get_input_stream(self, hapic_data: HapicData) -> typing.Optional[InputStream]:
+        """
+        :return: InputStream of stream field in processed body
+        """
+        stream_field = self.get_stream_field()
+        if stream_field is None or not isinstance(hapic_data.body, dict):
+            return None
+        return hapic_data.body.get(stream_field.attribute)
+
+    def get_processed_data(self, request_parameters: RequestParameters) -> typing.Any:
+        stream_field = self.get_stream_field()
+        if stream_field is None:
+            return super().get_processed_data(request_parameters)
+
+        try:
+            chunks = request_parameters.get_body_chunks(self.stream_chunk_size)
+        except NotImplementedError:
+            # NOTE: context can't read body incrementally, stream field is
+            # loaded as others
+            return super().get_processed_data(request_parameters)
+
+        parser = JsonArrayMemberParser(stream_field.key, self.stream_max_item_size)
+        elements = []  # type: typing.List[typing.Optional[bytes]]
+        try:
+            for chunk in chunks:
+                elements.extend(parser.feed(chunk))
+                if parser.array_found:
+                    break
+            else:
+                parser.close()
+        except ValueError as exc:
+            raise get_stream_body_exception(exc) from exc
+
+        return self.get_stream_processed_data(
+            request_parameters,
+            stream_field,
+            parser,
+            self._get_stream_elements(parser, chunks, elements),
+        )
+
+    def get_stream_processed_data(
+        self,
+        request_parameters: RequestParameters,
+        stream_field: StreamField,
+        parser: JsonArrayMemberParser,
+        elements: typing.Union[
+            typing.Iterable[typing.Optional[bytes]], typing.AsyncIterable[typing.Optional[bytes]]
+        ],
+    ) -> typing.Any:
+        """
+        :param request_parameters: parameters of current request
+        :param stream_field: stream field of schema
+        :param parser: parser of body who read body until stream field
+            array start (or body end if there is not)
+        :param elements: stream field elements, read while iterating
+        :return: processed body, with an InputStream of stream field
+        """
+        try:
+            data = self.context.json_backend.decode(parser.head) if parser.head.strip() else None
+        except ValueError as exc:
+            raise get_stream_body_exception(exc) from exc
+
+        if not parser.array_found:
+            return self.processor.load(data)
+
+        processed_data = self.processor.load_stream_head(data)
+        processed_data[stream_field.attribute] = InputStream(
+            elements,
+            decode=self.context.json_backend.decode,
+            load=stream_field.load_item,
+            on_error=self.stream_on_error,
+            error_caught=functools.partial(
+                self.context.input_validation_error_caught, request_parameters
+            ),
+            location_format='"{}" element {{}}'.format(stream_field.key),
+        )
+        return processed_data
+
+    def _get_stream_elements(
+        self,
+        parser: JsonArrayMemberParser,
+        chunks: typing.Iterator[bytes],
+        elements: typing.List[typing.Optional[bytes]],
+    ) -> typing.Iterator[typing.Optional[bytes]]:
+        yield from elements
+        try:
+            for chunk in chunks:
+                yield from parser.feed(chunk)
+            parser.close()
+        except ValueError as exc:
+            raise get_stream_body_exception(exc) from exc
+        check_stream_body_tail(parser)
+
 
 # TODO BS 2018-07-23: This class is an async version of InputControllerWrapper
 # to permit async compatibility. Please re-think about code refact
 # TAG: REFACT_ASYNC
-class AsyncInputBodyControllerWrapper(AsyncInputControllerWrapper):
-    def update_hapic_data(self, hapic_data: HapicData, processed_data: typing.Any) -> None:
-        hapic_data.body = processed_data
+class AsyncInputBodyControllerWrapper(InputBodyControllerWrapper, AsyncInputControllerWrapper):
+    def get_wrapper(self, func: "typing.Callable") -> "typing.Callable":
+        async def wrapper(*args, **kwargs) -> typing.Any:
+            # Note: Design of before_wrapped_func can be to update kwargs
+            # by reference here
+            replacement_response = await self.before_wrapped_func(args, kwargs)
+            if replacement_response is not None:
+                return replacement_response
+
+            try:
+                response = await await_while_connected(
+                    self.context, self._execute_wrapped_function(func, args, kwargs), args, kwargs
+                )
+            except InputStreamValidationException as exc:
+                if not self.is_input_stream_exception(exc, kwargs["hapic_data"]):
+                    raise
+                return self.get_input_stream_error_response(exc)
+            return self.after_wrapped_function(response)
+
+        return self._update_wrapper(wrapper, func)
 
     async def get_parameters_data(self, request_parameters: RequestParameters) -> dict:
         return await request_parameters.body_parameters
 
-    async def get_error_response(self, request_parameters: RequestParameters) -> typing.Any:
-        parameters_data = await self.get_parameters_data(request_parameters)
-        error = self.processor.get_input_validation_error(parameters_data)
+    async def get_processed_data(self, request_parameters: RequestParameters) -> typing.Any:
+        stream_field = self.get_stream_field()
+        if stream_field is None:
+            return await AsyncInputControllerWrapper.get_processed_data(self, request_parameters)
+
+        try:
+            chunks = request_parameters.get_body_chunks(self.stream_chunk_size)
+        except NotImplementedError:
+            return await AsyncInputControllerWrapper.get_processed_data(self, request_parameters)
+
+        parser = JsonArrayMemberParser(stream_field.key, self.stream_max_item_size)
+        elements = []  # type: typing.List[typing.Optional[bytes]]
+        try:
+            async for chunk in chunks:
+                elements.extend(parser.feed(chunk))
+                if parser.array_found:
+                    break
+            else:
+                parser.close()
+        except ValueError as exc:
+            raise get_stream_body_exception(exc) from exc
+
+        return self.get_stream_processed_data(
+            request_parameters,
+            stream_field,
+            parser,
+            self._get_async_stream_elements(parser, chunks, elements),
+        )
+
+    async def _get_async_stream_elements(
+        self,
+        parser: JsonArrayMemberParser,
+        chunks: typing.AsyncIterator[bytes],
+        elements: typing.List[typing.Optional[bytes]],
+    ) -> typing.AsyncIterator[typing.Optional[bytes]]:
+        for element in elements:
+            yield element
+        try:
+            async for chunk in chunks:
+                for element in parser.feed(chunk):
+                    yield element
+            parser.close()
+        except ValueError as exc:
+            raise get_stream_body_exception(exc) from exc
+        finally:
+            await aclose_iterable(chunks)
+        check_stream_body_tail(parser)
+
+    async def get_error_response(
+        self,
+        request_parameters: RequestParameters,
+        process_exception: typing.Optional[ProcessException] = None,
+    ) -> typing.Any:
+        if process_exception is not None and process_exception.validation_error is not None:
+            error = process_exception.validation_error
+        else:
+            parameters_data = await self.get_parameters_data(request_parameters)
+            error = self.processor.get_input_validation_error(parameters_data)
+
         error_response = self.context.get_validation_error_response(
             error, http_code=self.error_http_code
         )
@@ -569,7 +1652,81 @@ class InputFormsControllerWrapper(InputControllerWrapper):
         return request_parameters.form_parameters
 
 
+class AsyncInputFormsControllerWrapper(AsyncInputBodyControllerWrapper):
+    def update_hapic_data(self, hapic_data: HapicData, processed_data: typing.Any) -> None:
+        hapic_data.forms = processed_data
+
+    def get_stream_field(self) -> typing.Optional[StreamField]:
+        # NOTE: forms are never read incrementally
+        return None
+
+    async def get_parameters_data(self, request_parameters: RequestParameters) -> dict:
+        return await request_parameters.form_parameters
+
+
 class InputFilesControllerWrapper(InputControllerWrapper):
+    def __init__(
+        self,
+        context: typing.Union[ContextInterface, typing.Callable[[], ContextInterface]],
+        processor_factory: typing.Callable[[typing.Optional[TYPE_SCHEMA]], Processor],
+        error_http_code: HTTPStatus = HTTPStatus.BAD_REQUEST,
+        default_http_code: HTTPStatus = HTTPStatus.OK,
+        spool_threshold: typing.Optional[int] = None,
+        max_size: typing.Optional[int] = None,
+    ) -> None:
+        """
+        See ControllerWrapper.__init__ for other parameters
+        :param spool_threshold: if given, multipart body is parsed while
+            read and uploaded files bigger than this size (in bytes) are
+            written on disk (when context support it)
+        :param max_size: if given, max size (in bytes) of an uploaded file
+        """
+        super().__init__(context, processor_factory, error_http_code, default_http_code)
+        if spool_threshold is not None and spool_threshold < 0:
+            raise ConfigurationException("spool_threshold must be positive")
+        if max_size is not None and max_size < 1:
+            raise ConfigurationException("max_size must be greater than 0")
+        self.spool_threshold = spool_threshold
+        self.max_size = max_size
+
+    @property
+    def spooled(self) -> bool:
+        return self.spool_threshold is not None or self.max_size is not None
+
+    def get_wrapper(self, func: "typing.Callable") -> "typing.Callable":
+        if not self.spooled:
+            return super().get_wrapper(func)
+        return self._get_spooled_wrapper(func)
+
+    def _get_spooled_wrapper(self, func: "typing.Callable") -> "typing.Callable":
+        def wrapper(*args, **kwargs) -> typing.Any:
+            request_parameters = self.get_request_parameters(args, kwargs)
+            try:
+                files_parameters = self.get_files_parameters(request_parameters)
+            except RequestBodyException as exc:
+                return self.get_request_body_error_response(exc)
+
+            # NOTE: contexts parse files once, so request parameters
+            # processing use these same files: they are closed on all paths
+            try:
+                try:
+                    replacement_response = self.process_request_parameters(
+                        request_parameters, kwargs
+                    )
+                except RequestBodyException as exc:
+                    return self.get_request_body_error_response(exc)
+
+                if replacement_response is not None:
+                    return replacement_response
+                response = self._execute_wrapped_function(func, args, kwargs)
+                return self.after_wrapped_function(response)
+            finally:
+                close_uploads(files_parameters)
+
+        # NOTE: this wrapper is not folded by ControllerPipeline because
+        # uploaded files are closed (and temporary files removed) after view
+        return functools.update_wrapper(wrapper, func)
+
     def update_hapic_data(self, hapic_data: HapicData, processed_data: typing.Any) -> None:
         hapic_data.files = processed_data
 
@@ -579,8 +1736,37 @@ class InputFilesControllerWrapper(InputControllerWrapper):
         return processed_data
 
     def get_parameters_data(self, request_parameters: RequestParameters) -> dict:
+        files_parameters = self.get_files_parameters(request_parameters)
+        if self.max_size is not None:
+            # NOTE: files not spooled by hapic are already read by context:
+            # their size is checked after
+            check_uploads_size(files_parameters, self.max_size)
+        return files_parameters
+
+    def get_files_parameters(self, request_parameters: RequestParameters) -> dict:
+        """
+        :return: uploaded files of request, without size check. They are
+            parsed while read if spool_threshold is given (and context
+            support it).
+        """
+        if self.spool_threshold is not None:
+            try:
+                return request_parameters.get_spooled_files_parameters(
+                    self.spool_threshold, self.max_size
+                )
+            except NotImplementedError:
+                pass
+
         return request_parameters.files_parameters
 
+    def get_request_body_error_response(self, exc: RequestBodyException) -> typing.Any:
+        """
+        :param exc: error raised while reading uploaded files
+        :return: error response with http code of given error
+        """
+        error = ProcessValidationError(message=str(exc), details={}, original_exception=exc)
+        return self.context.get_validation_error_response(error, http_code=exc.http_code)
+
     def _get_processor_error(self, parameters_data: typing.Any) -> ProcessValidationError:
         return self.processor.get_input_files_validation_error(parameters_data)
 
@@ -589,7 +1775,36 @@ class InputFilesControllerWrapper(InputControllerWrapper):
 # InputFilesControllerWrapper to permit async compatibility.
 # Please re-think about code refact
 # TAG: REFACT_ASYNC
-class AsyncInputFilesControllerWrapper(AsyncInputControllerWrapper):
+class AsyncInputFilesControllerWrapper(InputFilesControllerWrapper, AsyncInputControllerWrapper):
+    def _get_spooled_wrapper(self, func: "typing.Callable") -> "typing.Callable":
+        async def wrapper(*args, **kwargs) -> typing.Any:
+            request_parameters = self.get_request_parameters(args, kwargs)
+            try:
+                files_parameters = await self.get_files_parameters(request_parameters)
+            except RequestBodyException as exc:
+                return self.get_request_body_error_response(exc)
+
+            # NOTE: contexts parse files once, so request parameters
+            # processing use these same files: they are closed on all paths
+            try:
+                try:
+                    replacement_response = await self.process_request_parameters(
+                        request_parameters, kwargs
+                    )
+                except RequestBodyException as exc:
+                    return self.get_request_body_error_response(exc)
+
+                if replacement_response is not None:
+                    return replacement_response
+                response = await self._execute_wrapped_function(func, args, kwargs)
+                return self.after_wrapped_function(response)
+            finally:
+                close_uploads(files_parameters)
+
+        # NOTE: this wrapper is not folded by ControllerPipeline because
+        # uploaded files are closed (and temporary files removed) after view
+        return functools.update_wrapper(wrapper, func)
+
     def update_hapic_data(self, hapic_data: HapicData, processed_data: typing.Any) -> None:
         hapic_data.files = processed_data
 
@@ -599,20 +1814,116 @@ class AsyncInputFilesControllerWrapper(AsyncInputControllerWrapper):
         return processed_data
 
     async def get_parameters_data(self, request_parameters: RequestParameters) -> dict:
+        files_parameters = await self.get_files_parameters(request_parameters)
+        if self.max_size is not None:
+            # NOTE: files not spooled by hapic are already read by context:
+            # their size is checked after
+            check_uploads_size(files_parameters, self.max_size)
+        return files_parameters
+
+    async def get_files_parameters(self, request_parameters: RequestParameters) -> dict:
+        if self.spool_threshold is not None:
+            try:
+                return await request_parameters.get_spooled_files_parameters(
+                    self.spool_threshold, self.max_size
+                )
+            except NotImplementedError:
+                pass
+
         return await request_parameters.files_parameters
 
     def _get_processor_error(self, parameters_data: typing.Any) -> ProcessValidationError:
         return self.processor.get_input_files_validation_error(parameters_data)
 
-    async def get_error_response(self, request_parameters: RequestParameters) -> typing.Any:
-        parameters_data = await self.get_parameters_data(request_parameters)
-        error = self._get_processor_error(parameters_data)
+    async def get_error_response(
+        self,
+        request_parameters: RequestParameters,
+        process_exception: typing.Optional[ProcessException] = None,
+    ) -> typing.Any:
+        if process_exception is not None and process_exception.validation_error is not None:
+            error = process_exception.validation_error
+        else:
+            parameters_data = await self.get_parameters_data(request_parameters)
+            error = self._get_processor_error(parameters_data)
+
         error_response = self.context.get_validation_error_response(
             error, http_code=self.error_http_code
         )
         return error_response
 
 
+class AsyncInputStreamControllerWrapper(AsyncInputControllerWrapper):
+    """
+    Give to view an InputStream (as hapic_data.stream) of newline delimited
+    json request body items. Request body is read and each item validated
+    while view iterate on it.
+    """
+
+    def __init__(
+        self,
+        context: typing.Union[ContextInterface, typing.Callable[[], ContextInterface]],
+        processor_factory: typing.Callable[[typing.Optional[TYPE_SCHEMA]], Processor],
+        error_http_code: HTTPStatus = HTTPStatus.BAD_REQUEST,
+        default_http_code: HTTPStatus = HTTPStatus.OK,
+        on_error: str = "abort",
+        chunk_size: int = 64 * 1024,
+        max_line_size: int = 1024 * 1024,
+    ) -> None:
+        super().__init__(context, processor_factory, error_http_code, default_http_code)
+        if chunk_size < 1 or max_line_size < 1:
+            raise ConfigurationException("chunk_size and max_line_size must be greater than 0")
+        self.on_error = check_input_stream_error_policy(on_error)
+        self.chunk_size = chunk_size
+        self.max_line_size = max_line_size
+
+    def get_wrapper(self, func: "typing.Callable") -> "typing.Callable":
+        async def wrapper(*args, **kwargs) -> typing.Any:
+            # Note: Design of before_wrapped_func can be to update kwargs
+            # by reference here
+            replacement_response = await self.before_wrapped_func(args, kwargs)
+            if replacement_response is not None:
+                return replacement_response
+
+            input_stream = kwargs["hapic_data"].stream
+            try:
+                response = await await_while_connected(
+                    self.context, self._execute_wrapped_function(func, args, kwargs), args, kwargs
+                )
+            except InputStreamValidationException as exc:
+                # NOTE: invalid item ("abort" policy) not handled by view
+                if exc.input_stream is not input_stream:
+                    raise
+                return self.context.get_validation_error_response(
+                    exc.validation_error, http_code=self.error_http_code
+                )
+            return self.after_wrapped_function(response)
+
+        # NOTE: this wrapper is not folded by ControllerPipeline because
+        # invalid items are raised by view, after input stage
+        return functools.update_wrapper(wrapper, func)
+
+    async def process_request_parameters(
+        self, request_parameters: RequestParameters, func_kwargs: typing.Dict[str, typing.Any]
+    ) -> typing.Any:
+        hapic_data = self.ensure_hapic_data(func_kwargs)
+        hapic_data.stream = self.get_input_stream(request_parameters)
+
+    def get_input_stream(self, request_parameters: RequestParameters) -> InputStream:
+        """
+        :param request_parameters: parameters of current request
+        :return: InputStream of request body items, not yet read
+        """
+        return InputStream(
+            get_lines(request_parameters.get_body_chunks(self.chunk_size), self.max_line_size),
+            decode=self.context.json_backend.decode,
+            load=self.processor.load,
+            on_error=self.on_error,
+            error_caught=functools.partial(
+                self.context.input_validation_error_caught, request_parameters
+            ),
+        )
+
+
 class ExceptionHandlerControllerWrapper(ControllerWrapper):
     """
     This wrapper is used to wrap a controller and catch given exception if
@@ -660,23 +1971,37 @@ class ExceptionHandlerControllerWrapper(ControllerWrapper):
         try:
             return super()._execute_wrapped_function(func, func_args, func_kwargs)
         except self.handled_exception_class as exc:
-            self.context.local_exception_caught(exc)
-            return self._build_error_response(exc)
+            return self.get_exception_response(exc)
+
+    def get_exception_response(self, exc: Exception) -> typing.Any:
+        """
+        Inform context about caught exception and build the error response.
+        :param exc: caught exception
+        :return: error response
+        """
+        self.context.local_exception_caught(exc)
+        return self._build_error_response(exc)
 
     def _build_error_response(self, exc: Exception) -> typing.Any:
-        response_content = self.error_builder.build_from_exception(
+        error_builder = self.error_builder
+        response_content = error_builder.build_from_exception(
             exc, include_traceback=self.context.is_debug()
         )
-        processor = self._processor_factory(self.error_builder.get_schema())
+        processor = self._processor_factory(error_builder.get_schema())
         # Check error format
         try:
-            dumped = processor.dump(response_content)
+            if error_builder.validate_errors:
+                dumped = processor.dump(response_content)
+            else:
+                dumped = processor.dump_without_validation(response_content)
         except ValidationException as exc:
             raise OutputValidationException(
                 "Validation error during dump " "of error response: {}".format(str(exc))
             ) from exc
 
-        error_response = self.context.get_response(json.dumps(dumped), self.error_http_code)
+        error_response = self.context.get_response(
+            self.context.json_backend.encode(dumped), self.error_http_code
+        )
         self._logger = logging.getLogger(LOGGER_NAME)
         self._logger.info(
             "Exception {exc} occured, return "
@@ -708,11 +2033,406 @@ class AsyncExceptionHandlerControllerWrapper(ExceptionHandlerControllerWrapper):
             new_response = self.after_wrapped_function(response)
             return new_response
 
-        return functools.update_wrapper(wrapper, func)
+        return self._update_wrapper(wrapper, func)
 
     async def _execute_wrapped_function(self, func, func_args, func_kwargs) -> typing.Any:
         try:
             return await func(*func_args, **func_kwargs)
         except self.handled_exception_class as exc:
-            self.context.local_exception_caught(exc)
-            return self._build_error_response(exc)
+            return self.get_exception_response(exc)
+
+
+class ControllerPipeline(object):
+    """
+    Fused version of stacked controller wrappers. Stacked wrappers call each
+    other as nested functions and each input wrapper builds its own
+    RequestParameters. Pipeline run all wrappers stages, then controller, in
+    one function call and build request parameters once for input wrappers.
+    Stacked semantic is kept: an exception handler wrapper only catch
+    exceptions raised by wrappers declared under it (or by controller).
+    """
+
+    def __init__(
+        self,
+        wrappers: typing.List[ControllerWrapper],
+        controller: typing.Callable,
+        controller_stage_wrapper: typing.Optional[ControllerWrapper] = None,
+    ) -> None:
+        """
+        :param wrappers: controller wrappers, from the outer to the inner one
+        :param controller: function wrapped by the inner wrapper
+        :param controller_stage_wrapper: if given, controller is a stage of
+            this wrapper: it receives request parameters (built with context
+            of this wrapper) in request_parameters keyword argument
+        """
+        self.wrappers = wrappers
+        self.controller = controller
+        self.controller_stage_wrapper = controller_stage_wrapper
+        # Input wrappers using default before_wrapped_func can share request
+        # parameters: their before stage is replaced by process_request_parameters
+        default_before_funcs = (
+            InputControllerWrapper.before_wrapped_func,
+            AsyncInputControllerWrapper.before_wrapped_func,
+        )
+        self._input_stages = [
+            isinstance(wrapper, InputControllerWrapper)
+            and type(wrapper).before_wrapped_func in default_before_funcs
+            for wrapper in wrappers
+        ]
+
+    @classmethod
+    def from_decorated_function(cls, func: typing.Callable) -> "ControllerPipeline":
+        """
+        Build pipeline by unstacking hapic wrappers of given function. Unstack
+        stop at first function which is not a hapic wrapper (like controller
+        or any other decorator), it will be used as pipeline controller.
+        :param func: function decorated by hapic decorators
+        :return: ControllerPipeline instance
+        """
+        wrappers = []  # type: typing.List[ControllerWrapper]
+
+        while True:
+            mark = getattr(func, CONTROLLER_WRAPPER_ATTRIBUTE_NAME, None)
+            # Mark can be copied by functools.update_wrapper in other
+            # decorators: wrapped function must match to be a hapic wrapper
+            if mark is None or mark[1] is not getattr(func, "__wrapped__", None):
+                break
+
+            controller_wrapper, func = mark
+            wrappers.append(controller_wrapper)
+
+        return cls(wrappers, func)
+
+    def get_wrapper(self) -> typing.Callable:
+        wrappers = self.wrappers
+        input_stages = self._input_stages
+        controller = self.controller
+        controller_stage_wrapper = self.controller_stage_wrapper
+
+        def wrapper(*args, **kwargs) -> typing.Any:
+            request_parameters = None
+            request_context = None
+            depth = 0
+
+            try:
+                while depth < len(wrappers):
+                    controller_wrapper = wrappers[depth]
+                    if input_stages[depth]:
+                        context = controller_wrapper.context
+                        if request_parameters is None or context is not request_context:
+                            request_parameters = controller_wrapper.get_request_parameters(
+                                args, kwargs
+                            )
+                            request_context = context
+                        replacement_response = controller_wrapper.process_request_parameters(
+                            request_parameters, kwargs
+                        )
+                    else:
+                        replacement_response = controller_wrapper.before_wrapped_func(args, kwargs)
+
+                    if replacement_response is not None:
+                        response = replacement_response
+                        break
+                    depth += 1
+                else:
+                    if controller_stage_wrapper is not None:
+                        context = controller_stage_wrapper.context
+                        if request_parameters is None or context is not request_context:
+                            request_parameters = context.get_request_parameters(*args, **kwargs)
+                            request_context = context
+                        response = controller(
+                            *args, request_parameters=request_parameters, **kwargs
+                        )
+                    else:
+                        response = controller(*args, **kwargs)
+            except Exception as exc:
+                response, depth = self._get_exception_response(exc, depth, kwargs)
+
+            # Like stacked wrappers, after stage of a wrapper is not executed
+            # if its before stage returned a replacement response
+            while depth:
+                depth -= 1
+                controller_wrapper = wrappers[depth]
+                try:
+                    if controller_wrapper.need_request_parameters:
+                        context = controller_wrapper.context
+                        if request_parameters is None or context is not request_context:
+                            request_parameters = context.get_request_parameters(*args, **kwargs)
+                            request_context = context
+                        response = controller_wrapper.after_wrapped_function(
+                            response, request_parameters=request_parameters
+                        )
+                    else:
+                        response = controller_wrapper.after_wrapped_function(response)
+                except Exception as exc:
+                    response, depth = self._get_exception_response(exc, depth, kwargs)
+
+            return response
+
+        return wrapper
+
+    def get_async_wrapper(self) -> typing.Callable:
+        wrappers = self.wrappers
+        input_stages = self._input_stages
+        async_stages = [
+            asyncio.iscoroutinefunction(
+                wrapper.process_request_parameters if input_stage else wrapper.before_wrapped_func
+            )
+            for wrapper, input_stage in zip(wrappers, input_stages)
+        ]
+        controller = self.controller
+        controller_stage_wrapper = self.controller_stage_wrapper
+
+        async def wrapper(*args, **kwargs) -> typing.Any:
+            request_parameters = None
+            request_context = None
+            depth = 0
+
+            try:
+                while depth < len(wrappers):
+                    controller_wrapper = wrappers[depth]
+                    if input_stages[depth]:
+                        context = controller_wrapper.context
+                        if request_parameters is None or context is not request_context:
+                            request_parameters = controller_wrapper.get_request_parameters(
+                                args, kwargs
+                            )
+                            request_context = context
+                        replacement_response = controller_wrapper.process_request_parameters(
+                            request_parameters, kwargs
+                        )
+                    else:
+                        replacement_response = controller_wrapper.before_wrapped_func(args, kwargs)
+
+                    if async_stages[depth]:
+                        replacement_response = await replacement_response
+
+                    if replacement_response is not None:
+                        response = replacement_response
+                        break
+                    depth += 1
+                else:
+                    if controller_stage_wrapper is not None:
+                        context = controller_stage_wrapper.context
+                        if request_parameters is None or context is not request_context:
+                            request_parameters = context.get_request_parameters(*args, **kwargs)
+                            request_context = context
+                        response = controller(
+                            *args, request_parameters=request_parameters, **kwargs
+                        )
+                    else:
+                        response = controller(*args, **kwargs)
+                    if inspect.isawaitable(response) and wrappers:
+                        response = await await_while_connected(
+                            wrappers[0].context, response, args, kwargs
+                        )
+                    elif inspect.isawaitable(response):
+                        response = await response
+            except Exception as exc:
+                response, depth = self._get_exception_response(exc, depth, kwargs)
+
+            while depth:
+                depth -= 1
+                controller_wrapper = wrappers[depth]
+                try:
+                    if controller_wrapper.need_request_parameters:
+                        context = controller_wrapper.context
+                        if request_parameters is None or context is not request_context:
+                            request_parameters = context.get_request_parameters(*args, **kwargs)
+                            request_context = context
+                        response = controller_wrapper.after_wrapped_function(
+                            response, request_parameters=request_parameters
+                        )
+                    else:
+                        response = controller_wrapper.after_wrapped_function(response)
+                except Exception as exc:
+                    response, depth = self._get_exception_response(exc, depth, kwargs)
+
+            return response
+
+        return wrapper
+
+    def _get_exception_response(
+        self, exc: Exception, depth: int, func_kwargs: typing.Dict[str, typing.Any]
+    ) -> typing.Tuple[typing.Any, int]:
+        """
+        Search the inner exception handler wrapper (or input body wrapper
+        for exceptions raised by its stream field) declared above given
+        depth and able to handle given exception.
+        Raise given exception if no wrapper can handle it.
+        :param exc: raised exception
+        :param depth: index of wrapper where exception was raised (or
+        wrappers length if raised by controller)
+        :param func_kwargs: keyword arguments of current call
+        :return: error response and index of wrapper who handled it
+        """
+        for index in range(depth - 1, -1, -1):
+            controller_wrapper = self.wrappers[index]
+            if isinstance(controller_wrapper, ExceptionHandlerControllerWrapper) and isinstance(
+                exc, controller_wrapper.handled_exception_class
+            ):
+                try:
+                    return controller_wrapper.get_exception_response(exc), index
+                except Exception as error_response_exc:
+                    return self._get_exception_response(error_response_exc, index, func_kwargs)
+
+            if (
+                isinstance(controller_wrapper, InputBodyControllerWrapper)
+                and isinstance(exc, InputStreamValidationException)
+                and controller_wrapper.is_input_stream_exception(exc, func_kwargs["hapic_data"])
+            ):
+                try:
+                    return controller_wrapper.get_input_stream_error_response(exc), index
+                except Exception as error_response_exc:
+                    return self._get_exception_response(error_response_exc, index, func_kwargs)
+
+        raise exc
+
+
+class OutputCacheControllerWrapper(ControllerWrapper):
+    """
+    This wrapper cache serialized responses of an output body wrapper. Cache
+    key is built from validated input data (hapic_data), so input wrappers
+    are executed before cache lookup. On cache hit, controller is not called
+    and response is not dumped again.
+    Wrapped function must be decorated by an output body wrapper: returned
+    wrapper run wrapped function wrappers (see ControllerPipeline) with a
+    controller reading and feeding the cache.
+    """
+
+    def __init__(
+        self,
+        context: typing.Union[ContextInterface, typing.Callable[[], ContextInterface]],
+        cache: OutputCache,
+        key: typing.Optional[typing.Callable[[HapicData], TYPE_CACHE_KEY]] = None,
+        headers: typing.Optional[typing.List[str]] = None,
+    ) -> None:
+        """
+        :param context: context to use with this wrapper
+        :param cache: cache where responses are stored
+        :param key: function returning cache key from hapic_data. Default
+            key is built from path, query and given headers validated data.
+        :param headers: names of validated headers to use in default key
+        """
+        super().__init__(context, processor_factory=lambda: None)
+        self.cache = cache
+        self.headers = headers
+        self._key = key
+
+    def get_cache_key(self, func_kwargs: typing.Dict[str, typing.Any]) -> TYPE_CACHE_KEY:
+        """
+        :param func_kwargs: controller kwargs, with hapic_data filled by
+            input wrappers
+        :return: cache key of current request
+        """
+        hapic_data = func_kwargs.get("hapic_data") or HapicData()
+        if self._key is not None:
+            return self._key(hapic_data)
+        return get_default_cache_key(hapic_data, self.headers)
+
+    def get_wrapper(self, func: "typing.Callable") -> "typing.Callable":
+        pipeline = ControllerPipeline.from_decorated_function(func)
+        output_wrapper = self._get_output_wrapper(pipeline)
+        controller = pipeline.controller
+
+        def cached_controller(*args, **kwargs) -> typing.Any:
+            not_cached_response = None
+
+            def compute() -> typing.Optional[CacheEntry]:
+                nonlocal not_cached_response
+                response = controller(*args, **kwargs)
+                entry, not_cached_response = self._get_cache_entry(output_wrapper, response)
+                return entry
+
+            entry = self.cache.get_or_compute(self.get_cache_key(kwargs), compute)
+            if entry is None:
+                return not_cached_response
+            return self._get_entry_response(output_wrapper, entry, args, kwargs)
+
+        # NOTE: wrapper is not marked as a controller wrapper, so it is seen
+        # as a controller by pipeline of outer wrappers
+        wrapper = ControllerPipeline(pipeline.wrappers, cached_controller).get_wrapper()
+        return functools.update_wrapper(wrapper, func)
+
+    def _get_output_wrapper(self, pipeline: ControllerPipeline) -> OutputControllerWrapper:
+        for wrapper in pipeline.wrappers:
+            if isinstance(wrapper, (OutputBodyControllerWrapper, AsyncOutputBodyControllerWrapper)):
+                self._check_output_wrapper(wrapper)
+                return wrapper
+
+        # NOTE: etag_func and async stream output wrappers are not folded,
+        # they are seen as pipeline controller
+        mark = getattr(pipeline.controller, UNFOLDED_OUTPUT_WRAPPER_ATTRIBUTE_NAME, None)
+        if mark is not None and mark[1] is getattr(pipeline.controller, "__wrapped__", None):
+            self._check_output_wrapper(mark[0])
+
+        raise DecorationException("output_cache decorator must be used above output_body decorator")
+
+    def _check_output_wrapper(self, output_wrapper: OutputControllerWrapper) -> None:
+        """
+        Raise DecorationException if responses of given output wrapper can't
+        be cached: stream responses are not serialized at once, and
+        responses of etag_func are versioned before view call.
+        """
+        if output_wrapper.stream:
+            raise DecorationException("output_cache can't be used with stream output_body")
+        if output_wrapper.etag_func is not None:
+            raise DecorationException("output_cache can't be used with etag_func output_body")
+
+    def _get_entry_response(
+        self,
+        output_wrapper: OutputControllerWrapper,
+        entry: CacheEntry,
+        func_args: typing.Tuple[typing.Any, ...],
+        func_kwargs: typing.Dict[str, typing.Any],
+    ) -> typing.Any:
+        request_parameters = None
+        if output_wrapper.need_request_parameters:
+            request_parameters = self.context.get_request_parameters(*func_args, **func_kwargs)
+        return output_wrapper.get_body_response(entry.body, request_parameters, entry.http_code)
+
+    def _get_cache_entry(
+        self, output_wrapper: OutputControllerWrapper, response: typing.Any
+    ) -> typing.Tuple[typing.Optional[CacheEntry], typing.Any]:
+        """
+        Serialize controller response.
+        :param output_wrapper: output wrapper of controller
+        :param response: controller response
+        :return: entry to cache and None, or None and final response if
+            response must not be cached (framework response, invalid output)
+        """
+        if self.context.by_pass_output_wrapping(response):
+            return None, response
+
+        try:
+            response_body = output_wrapper.get_response_body(response)
+        except ProcessException as exc:
+            return None, output_wrapper.get_output_error_response(response, exc)
+
+        return self.cache.create_entry(response_body, output_wrapper.default_http_code), None
+
+
+class AsyncOutputCacheControllerWrapper(OutputCacheControllerWrapper):
+    def get_wrapper(self, func: "typing.Callable") -> "typing.Callable":
+        pipeline = ControllerPipeline.from_decorated_function(func)
+        output_wrapper = self._get_output_wrapper(pipeline)
+        controller = pipeline.controller
+
+        async def cached_controller(*args, **kwargs) -> typing.Any:
+            not_cached_response = None
+
+            async def compute() -> typing.Optional[CacheEntry]:
+                nonlocal not_cached_response
+                response = controller(*args, **kwargs)
+                if inspect.isawaitable(response):
+                    response = await response
+                entry, not_cached_response = self._get_cache_entry(output_wrapper, response)
+                return entry
+
+            entry = await self.cache.get_or_compute(self.get_cache_key(kwargs), compute)
+            if entry is None:
+                return not_cached_response
+            return self._get_entry_response(output_wrapper, entry, args, kwargs)
+
+        wrapper = ControllerPipeline(pipeline.wrappers, cached_controller).get_async_wrapper()
+        return functools.update_wrapper(wrapper, func)
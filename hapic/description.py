@@ -34,6 +34,10 @@ class InputFilesDescription(Description):
     pass
 
 
+class InputStreamDescription(Description):
+    pass
+
+
 class OutputBodyDescription(Description):
     pass
 
@@ -50,6 +54,10 @@ class OutputHeadersDescription(Description):
     pass
 
 
+class OutputCacheDescription(Description):
+    pass
+
+
 class ErrorDescription(Description):
     pass
 
@@ -63,10 +71,12 @@ class ControllerDescription(object):
         input_headers: InputHeadersDescription = None,
         input_forms: InputFormsDescription = None,
         input_files: InputFilesDescription = None,
+        input_stream: InputStreamDescription = None,
         output_body: OutputBodyDescription = None,
         output_stream: OutputStreamDescription = None,
         output_file: OutputFileDescription = None,
         output_headers: OutputHeadersDescription = None,
+        output_cache: OutputCacheDescription = None,
         errors: typing.List[ErrorDescription] = None,
         tags: typing.List[str] = None,
         disable_doc: bool = False,
@@ -77,10 +87,12 @@ class ControllerDescription(object):
         self.input_headers = input_headers
         self.input_forms = input_forms
         self.input_files = input_files
+        self.input_stream = input_stream
         self.output_body = output_body
         self.output_stream = output_stream
         self.output_file = output_file
         self.output_headers = output_headers
+        self.output_cache = output_cache
         self.errors = errors or []
         self.tags = tags or []
         self.disable_doc = disable_doc
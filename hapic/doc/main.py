@@ -8,12 +8,18 @@ from apispec.core import VALID_METHODS_OPENAPI_V2
 from apispec.exceptions import DuplicateComponentNameError
 import yaml
 
+from hapic.compression import RequestDecompression
 from hapic.context import ContextInterface
 from hapic.context import RouteRepresentation
 from hapic.decorator import DecoratedController
 from hapic.description import ControllerDescription
 from hapic.doc.schema import SchemaUsage
 
+try:  # Python 3.5+
+    from http import HTTPStatus
+except ImportError:
+    from http import client as HTTPStatus
+
 if typing.TYPE_CHECKING:
     from hapic.hapic import Hapic
 
@@ -89,7 +95,10 @@ def generate_fields_description(
 
 
 def generate_operations(
-    main_plugin: BasePlugin, route: RouteRepresentation, description: ControllerDescription
+    main_plugin: BasePlugin,
+    route: RouteRepresentation,
+    description: ControllerDescription,
+    decompression: typing.Optional[RequestDecompression] = None,
 ):
     method_operations = dict()
     if description.input_body:
@@ -98,6 +107,18 @@ def generate_operations(
             {"in": "body", "name": "body", "schema": schema_ref}
         )
 
+    if description.input_stream:
+        schema_ref = description.input_stream.wrapper.processor.generate_schema_ref(main_plugin)
+        method_operations.setdefault("parameters", []).append(
+            {
+                "in": "body",
+                "name": "body",
+                "description": "Stream of newline delimited json items",
+                "schema": {"type": "array", "items": schema_ref},
+            }
+        )
+        method_operations.setdefault("consumes", []).append("application/x-ndjson")
+
     if description.output_body:
         schema_ref = description.output_body.wrapper.processor.generate_schema_ref(main_plugin)
         method_operations.setdefault("responses", {})[
@@ -107,6 +128,16 @@ def generate_operations(
             "schema": schema_ref,
         }
 
+        output_body_wrapper = description.output_body.wrapper
+        if output_body_wrapper.etag or output_body_wrapper.etag_func is not None:
+            etag_header = {"ETag": {"type": "string", "description": "Response body version"}}
+            default_http_code = int(output_body_wrapper.default_http_code)
+            method_operations["responses"][default_http_code]["headers"] = etag_header
+            method_operations["responses"][int(HTTPStatus.NOT_MODIFIED)] = {
+                "description": "Not modified: response body match with If-None-Match header",
+                "headers": etag_header,
+            }
+
     if description.output_stream:
         schema_ref = description.output_stream.wrapper.processor.generate_schema_ref(main_plugin)
         method_operations.setdefault("responses", {})[
@@ -115,6 +146,9 @@ def generate_operations(
             "description": str(int(description.output_stream.wrapper.default_http_code)),
             "schema": {"type": "array", "items": schema_ref},
         }
+        method_operations.setdefault("produces", []).append(
+            description.output_stream.wrapper.stream_format.mimetype
+        )
 
     if description.output_file:
         method_operations.setdefault("produces", []).extend(
@@ -226,6 +260,23 @@ def generate_operations(
                 )
             )
 
+    if decompression is not None and (description.input_body or description.input_forms):
+        method_operations.setdefault("parameters", []).append(
+            {
+                "in": "header",
+                "name": "Content-Encoding",
+                "type": "string",
+                "enum": list(decompression.encodings) + ["identity"],
+                "required": False,
+                "description": "Content coding of compressed request body",
+            }
+        )
+        method_operations.setdefault("responses", {})[int(HTTPStatus.REQUEST_ENTITY_TOO_LARGE)] = {
+            "description": "Decompressed request body exceed {} bytes".format(
+                decompression.max_size
+            )
+        }
+
     if description.tags:
         method_operations["tags"] = description.tags
 
@@ -279,6 +330,7 @@ class DocGenerator(object):
                 description.input_path,
                 description.input_query,
                 description.input_forms,
+                description.input_stream,
                 description.output_body,
             ]:
                 if description_item:
@@ -312,7 +364,9 @@ class DocGenerator(object):
             route = context.find_route(controller)
             swagger_path = context.get_swagger_path(route.rule)
 
-            operations = generate_operations(main_plugin, route, controller.description)
+            operations = generate_operations(
+                main_plugin, route, controller.description, context.decompression
+            )
 
             # Special cases compliance by replacing "*" by acceptable methods (apispec crash
             # because OpenAPI only accepted valid http method)
@@ -13,6 +13,10 @@ class ErrorBuilderInterface(metaclass=abc.ABCMeta):
     can generate a response content from exception (build_from_exception)
     """
 
+    # If False, built error content is considered as trusted and is dumped
+    # without validation
+    validate_errors = True
+
     @abc.abstractmethod
     def build_from_exception(
         self, exception: Exception, include_traceback: bool = False
@@ -43,6 +47,13 @@ class ErrorBuilderInterface(metaclass=abc.ABCMeta):
 
 
 class DefaultErrorBuilder(ErrorBuilderInterface):
+    def __init__(self, validate_errors: bool = True) -> None:
+        """
+        :param validate_errors: if False, errors built by this error builder
+            are dumped without validation.
+        """
+        self.validate_errors = validate_errors
+
     def build_from_exception(self, exception: Exception, include_traceback: bool = False) -> dict:
         """
         See hapic.error.ErrorBuilderInterface#build_from_exception docstring
@@ -15,5 +15,10 @@ class DefaultErrorSchema(marshmallow.Schema):
 # consequences are a marshmallow dependency. We must resolve that.
 # See #124
 class MarshmallowDefaultErrorBuilder(DefaultErrorBuilder):
+    def __init__(self, validate_errors: bool = True) -> None:
+        super().__init__(validate_errors=validate_errors)
+        # NOTE: Same schema instance is returned to permit processor reuse
+        self._schema = DefaultErrorSchema()
+
     def get_schema(self) -> TYPE_SCHEMA:
-        return DefaultErrorSchema()
+        return self._schema
@@ -1,4 +1,9 @@
 # -*- coding: utf-8 -*-
+from http import HTTPStatus
+import typing
+
+if typing.TYPE_CHECKING:
+    from hapic.processor.main import ProcessValidationError  # noqa: F401
 
 
 class HapicException(Exception):
@@ -22,7 +27,15 @@ class AlreadyDecoratedException(DecorationException):
 
 
 class ProcessException(HapicException):
-    pass
+    def __init__(
+        self, *args, validation_error: typing.Optional["ProcessValidationError"] = None
+    ) -> None:
+        """
+        :param validation_error: detail of validation error if known. Permit
+            to build error response without re-run validation process.
+        """
+        super().__init__(*args)
+        self.validation_error = validation_error
 
 
 class ValidationException(ProcessException):
@@ -45,6 +58,44 @@ class OutputValidationException(OutputWorkflowException, ValidationException):
     pass
 
 
+class InputStreamValidationException(InputValidationException):
+    """Raised while iterating an input stream when an item is invalid"""
+
+    def __init__(self, *args, input_stream: typing.Any = None, **kwargs) -> None:
+        """
+        :param input_stream: InputStream who raised this exception
+        """
+        super().__init__(*args, **kwargs)
+        self.input_stream = input_stream
+
+
+class RequestBodyException(InputWorkflowException):
+    """Raised when request body can't be read, like bad compressed data"""
+
+    http_code = HTTPStatus.BAD_REQUEST
+
+
+class RequestBodyTooLargeException(RequestBodyException):
+    """Raised when decompressed request body exceed maximum size"""
+
+    http_code = HTTPStatus.REQUEST_ENTITY_TOO_LARGE
+
+    def __init__(self, *args, max_size: int, size: int) -> None:
+        """
+        :param max_size: maximum allowed size (in bytes)
+        :param size: size of already decompressed body (in bytes)
+        """
+        super().__init__(*args)
+        self.max_size = max_size
+        self.size = size
+
+
+class UnsupportedContentEncodingException(RequestBodyException):
+    """Raised when request body content coding is not supported"""
+
+    http_code = HTTPStatus.UNSUPPORTED_MEDIA_TYPE
+
+
 class DocumentationException(HapicException):
     pass
 
@@ -1,6 +1,5 @@
 # flask regular expression to locate url parameters
 from http import HTTPStatus
-import json
 import re
 import typing
 
@@ -15,6 +14,10 @@ from hapic.error.marshmallow import MarshmallowDefaultErrorBuilder
 from hapic.exception import RouteNotFound
 from hapic.processor.main import ProcessValidationError
 from hapic.processor.main import RequestParameters
+from hapic.stream import DEFAULT_STREAM_FORMAT
+from hapic.stream import StreamFormat
+from hapic.type import TYPE_RESPONSE_BODY
+from hapic.type import TYPE_RESPONSE_HEADERS
 
 PATH_URL_REGEX = re.compile(r"<([^:<>]+)(?::[^<>]+)?>")
 
@@ -33,10 +36,11 @@ class AgnosticApp(object):
 
 
 class AgnosticResponse(object):
-    def __init__(self, response, http_code, mimetype):
+    def __init__(self, response, http_code, mimetype, headers=None):
         self.response = response
         self.http_code = http_code
         self.mimetype = mimetype
+        self.headers = dict(headers or [])
 
     @property
     def status_code(self):
@@ -44,6 +48,9 @@ class AgnosticResponse(object):
 
     @property
     def body(self):
+        # NOTE: Keep str body for readability of agnostic responses
+        if isinstance(self.response, (bytes, memoryview)):
+            return bytes(self.response).decode("utf-8")
         return self.response
 
 
@@ -97,7 +104,7 @@ class AgnosticContext(BaseContext):
         self, error: ProcessValidationError, http_code: HTTPStatus = HTTPStatus.BAD_REQUEST
     ) -> typing.Any:
         return self.get_response(
-            response=json.dumps(
+            response=self.json_backend.encode(
                 {
                     "original_error": {"details": error.details, "message": error.message},
                     "http_code": http_code,
@@ -145,11 +152,27 @@ class AgnosticContext(BaseContext):
     def get_response(
         self,
         # TODO BS 20171228: rename into response_content
-        response: str,
+        response: TYPE_RESPONSE_BODY,
         http_code: int,
         mimetype: str = "application/json",
+        headers: typing.Optional[TYPE_RESPONSE_HEADERS] = None,
+        compress: bool = True,
     ):
-        return AgnosticResponse(response, http_code, mimetype)
+        # NOTE: agnostic responses are never compressed
+        return AgnosticResponse(response, http_code, mimetype, headers=headers)
+
+    def get_stream_response(
+        self,
+        serialized_items: typing.Iterable[typing.Any],
+        http_code: int,
+        stream_format: StreamFormat = DEFAULT_STREAM_FORMAT,
+        headers: typing.Optional[TYPE_RESPONSE_HEADERS] = None,
+        compress: bool = True,
+    ):
+        body, headers = self._get_stream_body(
+            serialized_items, stream_format, headers, compress=False
+        )
+        return AgnosticResponse(body, http_code, stream_format.mimetype, headers=headers)
 
     def is_debug(self) -> bool:
         return self.debug
@@ -1,15 +1,28 @@
 # coding: utf-8
+import asyncio
+from concurrent.futures import Executor
 from http import HTTPStatus
-import json
+import io
 import re
 import typing
+from urllib.parse import parse_qsl
+import zlib
 
+from aiohttp import hdrs
 from aiohttp import web
+from aiohttp.multipart import BodyPartReader
+from aiohttp.multipart import MultipartReader
+from aiohttp.streams import StreamReader
+from aiohttp.web_fileresponse import NOSENDFILE
+from aiohttp.web_protocol import RequestPayloadError
 from aiohttp.web_request import FileField
 from aiohttp.web_request import Request
 from aiohttp.web_response import Response
 from multidict import MultiDict
+from multidict import MultiDictProxy
 
+from hapic.compression import RequestDecompression
+from hapic.compression import ResponseCompression
 from hapic.context import BaseContext
 from hapic.context import HandledException
 from hapic.context import RouteRepresentation
@@ -17,22 +30,270 @@ from hapic.data import HapicFile
 from hapic.decorator import DECORATION_ATTRIBUTE_NAME
 from hapic.decorator import DecoratedController
 from hapic.error.main import ErrorBuilderInterface
+from hapic.exception import ConfigurationException
 from hapic.exception import NoRoutesException
+from hapic.exception import RequestBodyException
+from hapic.exception import RequestBodyTooLargeException
 from hapic.exception import RouteNotFound
+from hapic.exception import UnsupportedContentEncodingException
 from hapic.exception import WorkflowException
+from hapic.file import DEFAULT_FILE_CHUNK_SIZE
+from hapic.file import ConditionalFileResponse
+from hapic.file import SpooledUploadFile
+from hapic.file import get_file_descriptor
+from hapic.json_backend import JsonBackend
+from hapic.json_backend import StdlibJsonBackend
 from hapic.processor.main import Processor
 from hapic.processor.main import ProcessValidationError
 from hapic.processor.main import RequestParameters
+from hapic.stream import DEFAULT_STREAM_FORMAT
+from hapic.type import TYPE_RESPONSE_BODY
+from hapic.type import TYPE_RESPONSE_HEADERS
 from hapic.util import LowercaseKeysDict
+from hapic.util import get_response_body_bytes
+from hapic.util import is_body_allowed
 
 # Aiohttp regular expression to locate url parameters
 AIOHTTP_RE_PATH_URL = re.compile(r"{([^:<>]+)(?::[^<>]+)?}")
+# Default max count of file chunks read before being written
+DEFAULT_FILE_READ_AHEAD = 2
+
+
+class CompressibleResponse(Response):
+    """
+    Response compressed with hapic compression when prepared, because
+    request Accept-Encoding header is not known when response is built.
+    """
+
+    def __init__(self, *args, body: bytes, compression: ResponseCompression, **kwargs) -> None:
+        super().__init__(*args, body=body, **kwargs)
+        self._hapic_body = body
+        self._hapic_compression = compression
+
+    async def prepare(self, request: Request) -> typing.Any:
+        if not self.prepared:
+            body, headers = self._hapic_compression.compress_response(
+                self._hapic_body,
+                list(self.headers.items()),
+                request.headers.get(hdrs.ACCEPT_ENCODING),
+            )
+            self.headers.clear()
+            self.headers.extend(headers)
+            if body is not self._hapic_body:
+                self.headers.popall(hdrs.CONTENT_LENGTH, None)
+                self.body = body
+
+        return await super().prepare(request)
+
+
+class HapicFileResponse(web.StreamResponse):
+    """
+    Response of a HapicFile. Conditional and range request headers are
+    evaluated when prepared (see ConditionalFileResponse), then only needed
+    byte windows of file are sent. Event loop is never blocked by file:
+    - file with a file descriptor (file_path or real file object) of known
+      size is sent with loop.sendfile (without copy when possible)
+    - else file is read in executor by chunks of chunk_size bytes, with at
+      most read_ahead chunks read before being written.
+    """
+
+    def __init__(
+        self,
+        file_response: HapicFile,
+        status: int = HTTPStatus.OK,
+        chunk_size: int = DEFAULT_FILE_CHUNK_SIZE,
+        read_ahead: int = DEFAULT_FILE_READ_AHEAD,
+        executor: typing.Optional[Executor] = None,
+    ) -> None:
+        """
+        :param file_response: file to send
+        :param status: http code of full file response
+        :param chunk_size: size of file reads
+        :param read_ahead: max count of chunks read but not written yet
+        :param executor: executor of blocking file calls (stat, read, etc.),
+            default is event loop default executor (thread pool)
+        """
+        super().__init__(status=status)
+        self._file_response = file_response
+        self._chunk_size = chunk_size
+        self._read_ahead = read_ahead
+        self._executor = executor
+
+    async def _run(self, func: typing.Callable[..., typing.Any], *args) -> typing.Any:
+        return await asyncio.get_event_loop().run_in_executor(self._executor, func, *args)
+
+    async def prepare(self, request: Request) -> typing.Any:
+        if self.prepared:
+            return await super().prepare(request)
+
+        conditional_response = await self._run(
+            ConditionalFileResponse, self._file_response, request.headers, self.status
+        )
+        self.set_status(conditional_response.http_code)
+        self.headers.extend(conditional_response.get_headers())
+        if not conditional_response.has_body or request.method == hdrs.METH_HEAD:
+            if conditional_response.http_code == HTTPStatus.NOT_MODIFIED:
+                # NOTE: like aiohttp FileResponse, not modified response have
+                # no Content-Length and is not chunked
+                self._length_check = False
+            await self._run(conditional_response.close)
+            return await super().prepare(request)
+
+        if conditional_response.ranges is not None:
+            parts = conditional_response.get_parts()
+        elif conditional_response.seekable:
+            parts = [(conditional_response.offset, conditional_response.size)]
+        else:
+            parts = [(None, conditional_response.size)]
+
+        file_object = await self._run(conditional_response.open)
+        try:
+            writer = await super().prepare(request)
+            sendfile = (
+                conditional_response.seekable
+                and conditional_response.size is not None
+                and self._can_sendfile(file_object)
+            )
+            for part in parts:
+                if isinstance(part, bytes):
+                    await self.write(part)
+                    continue
+                if sendfile:
+                    # NOTE: if not supported, next parts are written too
+                    sendfile = await self._sendfile_window(request, file_object, *part)
+                if not sendfile:
+                    await self._write_window(file_object, *part)
+            return writer
+        finally:
+            await self._run(file_object.close)
+
+    def _can_sendfile(self, file_object: typing.Any) -> bool:
+        # NOTE: loop.sendfile is available since python 3.7
+        if NOSENDFILE or self.compression or not hasattr(asyncio.get_event_loop(), "sendfile"):
+            return False
+        return get_file_descriptor(file_object) is not None
+
+    async def _sendfile_window(
+        self, request: Request, file_object: typing.Any, offset: int, length: int
+    ) -> bool:
+        """
+        Send length bytes of file object from offset with loop.sendfile.
+        :return: False if sendfile is not supported by transport (nothing
+            was sent)
+        """
+        if not length:
+            return True
+
+        # NOTE: written data (headers, multipart delimiters) are sent before
+        await self._payload_writer.drain()
+        try:
+            await asyncio.get_event_loop().sendfile(request.transport, file_object, offset, length)
+        except NotImplementedError:
+            return False
+        return True
+
+    async def _write_window(
+        self, file_object: typing.Any, offset: typing.Optional[int], length: typing.Optional[int]
+    ) -> None:
+        """
+        Write length bytes of file object from offset (or from its current
+        position if offset is None, until its end if length is None). Chunks
+        are read while previous ones are written.
+        """
+        if offset is not None:
+            await self._run(file_object.seek, offset)
+
+        chunks = asyncio.Queue(maxsize=self._read_ahead)
+        reading = asyncio.ensure_future(self._read_window(file_object, length, chunks))
+        try:
+            while True:
+                chunk = await chunks.get()
+                if chunk is None:
+                    break
+                if isinstance(chunk, Exception):
+                    raise chunk
+                await self.write(chunk)
+        finally:
+            if not reading.done():
+                reading.cancel()
+                await asyncio.wait([reading])
+
+    async def _read_window(
+        self, file_object: typing.Any, length: typing.Optional[int], chunks: asyncio.Queue
+    ) -> None:
+        """
+        Put read chunks in given queue, then None at end (or read error).
+        """
+        remaining = length
+        try:
+            while remaining is None or remaining > 0:
+                size = self._chunk_size if remaining is None else min(self._chunk_size, remaining)
+                read = asyncio.ensure_future(self._run(file_object.read, size))
+                try:
+                    chunk = await asyncio.shield(read)
+                except asyncio.CancelledError:
+                    # NOTE: let running read end, before file is closed
+                    await asyncio.wait([read])
+                    raise
+                if not chunk:
+                    break
+                if remaining is not None:
+                    remaining -= len(chunk)
+                await chunks.put(chunk)
+        except Exception as exc:
+            await chunks.put(exc)
+            return
+        await chunks.put(None)
+
+
+class CompressedStreamResponse(web.StreamResponse):
+    """
+    Stream response compressed with given compressor. Each write is flushed
+    to permit client to read written data without wait for the end.
+    """
+
+    def __init__(self, *args, compressor: "zlib._Compress", **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self._compressor = compressor
+        self._compressor_flushed = False
+
+    async def write(self, data: bytes) -> None:
+        data = self._compressor.compress(data) + self._compressor.flush(zlib.Z_SYNC_FLUSH)
+        await super().write(data)
+
+    async def write_eof(self, data: bytes = b"") -> None:
+        if not self._compressor_flushed:
+            self._compressor_flushed = True
+            data = self._compressor.compress(data) + self._compressor.flush()
+        await super().write_eof(data)
+
+
+def get_request_body_http_exception(exc: RequestBodyException) -> web.HTTPException:
+    """
+    :param exc: request body exception
+    :return: aiohttp http exception to raise for given exception
+    """
+    if isinstance(exc, RequestBodyTooLargeException):
+        return web.HTTPRequestEntityTooLarge(
+            max_size=exc.max_size, actual_size=exc.size, text=str(exc)
+        )
+    if isinstance(exc, UnsupportedContentEncodingException):
+        return web.HTTPUnsupportedMediaType(text=str(exc))
+    return web.HTTPBadRequest(text=str(exc))
 
 
 class AiohttpRequestParameters(RequestParameters):
-    def __init__(self, request: Request) -> None:
+    def __init__(
+        self,
+        request: Request,
+        json_backend: typing.Optional[JsonBackend] = None,
+        decompression: typing.Optional[RequestDecompression] = None,
+    ) -> None:
         self._request = request
+        self._json_backend = json_backend or StdlibJsonBackend()
+        self._decompression = decompression
         self._parsed_body = None
+        self._spooled_files_parameters = None
 
     @property
     async def body_parameters(self) -> dict:
@@ -40,13 +301,213 @@ class AiohttpRequestParameters(RequestParameters):
             content_type = self.header_parameters.get("Content-Type", "")
             is_json = content_type.lower() == "application/json"
 
-            if is_json:
-                self._parsed_body = await self._request.json()
-            else:
-                self._parsed_body = await self._request.post()
+            try:
+                encoding = None
+                if self._decompression is not None:
+                    encoding = self._decompression.get_encoding(
+                        self._request.headers.get(hdrs.CONTENT_ENCODING)
+                    )
+
+                if encoding is None and is_json:
+                    self._parsed_body = self._json_backend.decode(await self._request.read())
+                elif encoding is None:
+                    self._parsed_body = await self._request.post()
+                elif is_json:
+                    body = await self._read_decompressed_body()
+                    self._parsed_body = self._json_backend.decode(body)
+                else:
+                    body = await self._read_decompressed_body()
+                    self._parsed_body = await self._parse_form_body(body)
+            except RequestBodyException as exc:
+                raise get_request_body_http_exception(exc)
 
         return self._parsed_body
 
+    async def _read_decompressed_body(self) -> bytes:
+        """
+        aiohttp server decompress compressed request payloads itself (see
+        its auto_decompress parameter): decompressed payload is read here with
+        maximum size of context decompression.
+        :return: decompressed body
+        """
+        body = bytearray()
+        chunks = self._request.content.iter_chunked(self._decompression.chunk_size)
+        try:
+            async for chunk in chunks:
+                body.extend(chunk)
+                if len(body) > self._decompression.max_size:
+                    raise RequestBodyTooLargeException(
+                        "Decompressed request body exceed {} bytes".format(
+                            self._decompression.max_size
+                        ),
+                        max_size=self._decompression.max_size,
+                        size=len(body),
+                    )
+        except RequestPayloadError as exc:
+            raise RequestBodyException("Invalid compressed request body: {}".format(exc)) from exc
+
+        return bytes(body)
+
+    async def _parse_form_body(self, body: bytes) -> MultiDictProxy:
+        """
+        Parse given (decompressed) request body like aiohttp Request.post do
+        with request body.
+        :param body: decompressed request body
+        :return: form parameters, including FileField of sent files
+        """
+        form = MultiDict()  # type: MultiDict[typing.Union[str, bytes, FileField]]
+        content_type = self._request.content_type
+        if content_type == "application/x-www-form-urlencoded":
+            charset = self._request.charset or "utf-8"
+            form.extend(
+                parse_qsl(body.rstrip().decode(charset), keep_blank_values=True, encoding=charset)
+            )
+        elif content_type == "multipart/form-data":
+            content = StreamReader(self._request.protocol, limit=2**16)
+            content.feed_data(body)
+            content.feed_eof()
+            reader = MultipartReader(self._request.headers, content)
+            try:
+                part = await reader.next()
+                while part is not None:
+                    if not isinstance(part, BodyPartReader):
+                        raise ValueError("nested multipart is not supported")
+
+                    if part.filename:
+                        value = part.decode(await part.read())
+                        form.add(
+                            part.name,
+                            FileField(
+                                part.name,
+                                part.filename,
+                                io.BytesIO(value),
+                                part.headers.get(hdrs.CONTENT_TYPE, "application/octet-stream"),
+                                part.headers,
+                            ),
+                        )
+                    else:
+                        form.add(part.name, await self._read_form_part(part))
+                    part = await reader.next()
+            except ValueError as exc:
+                raise RequestBodyException(
+                    "Invalid multipart request body: {}".format(exc)
+                ) from exc
+
+        return MultiDictProxy(form)
+
+    async def get_body_chunks(self, chunk_size: int) -> typing.AsyncIterator[bytes]:
+        # NOTE: aiohttp server decompress compressed request payloads itself
+        try:
+            async for chunk in self._request.content.iter_chunked(chunk_size):
+                yield chunk
+        except RequestPayloadError as exc:
+            raise get_request_body_http_exception(
+                RequestBodyException("Invalid request body: {}".format(exc))
+            ) from exc
+
+    async def get_spooled_files_parameters(
+        self, spool_threshold: int, max_size: typing.Optional[int] = None
+    ) -> typing.Dict[str, FileField]:
+        if self._spooled_files_parameters is not None:
+            return self._spooled_files_parameters
+
+        request = self._request
+        # NOTE: compressed body is decompressed in memory (see body_parameters)
+        if (
+            self._parsed_body is not None
+            or request.content_type != "multipart/form-data"
+            or (self._decompression is not None and hdrs.CONTENT_ENCODING in request.headers)
+        ):
+            raise NotImplementedError()
+
+        form = MultiDict()  # type: MultiDict[typing.Union[str, bytes, FileField]]
+        files_parameters = {}  # type: typing.Dict[str, FileField]
+        uploads = []  # type: typing.List[SpooledUploadFile]
+        try:
+            try:
+                reader = await request.multipart()
+                part = await reader.next()
+                while part is not None:
+                    if not isinstance(part, BodyPartReader):
+                        raise ValueError("nested multipart is not supported")
+
+                    if part.filename:
+                        upload = SpooledUploadFile(spool_threshold, max_size)
+                        uploads.append(upload)
+                        await self._spool_part(part, upload, spool_threshold)
+                        file_field = FileField(
+                            part.name,
+                            part.filename,
+                            upload,
+                            part.headers.get(hdrs.CONTENT_TYPE, "application/octet-stream"),
+                            part.headers,
+                        )
+                        files_parameters[part.name] = file_field
+                        form.add(part.name, file_field)
+                    else:
+                        form.add(part.name, await self._read_form_part(part, max_size))
+                    part = await reader.next()
+            except (ValueError, RequestPayloadError) as exc:
+                raise RequestBodyException(
+                    "Invalid multipart request body: {}".format(exc)
+                ) from exc
+        except BaseException:
+            for upload in uploads:
+                upload.close()
+            raise
+
+        self._parsed_body = MultiDictProxy(form)
+        self._spooled_files_parameters = files_parameters
+        return files_parameters
+
+    async def _spool_part(
+        self, part: BodyPartReader, upload: SpooledUploadFile, spool_threshold: int
+    ) -> None:
+        """
+        Write content of a multipart body part in given upload file
+        """
+        loop = asyncio.get_event_loop()
+        while True:
+            chunk = await part.read_chunk(DEFAULT_FILE_CHUNK_SIZE)
+            if not chunk:
+                break
+
+            chunk = part.decode(chunk)
+            # NOTE: writes on disk (including move of in memory content on
+            # disk) are made in executor to not block event loop
+            if upload.on_disk or upload.size + len(chunk) > spool_threshold:
+                await loop.run_in_executor(None, upload.write, chunk)
+            else:
+                upload.write(chunk)
+        upload.seek(0)
+
+    async def _read_form_part(
+        self, part: BodyPartReader, max_size: typing.Optional[int] = None
+    ) -> typing.Union[str, bytes]:
+        """
+        :return: value of a (not file) multipart body part, decoded like
+            aiohttp Request.post does
+        """
+        value = bytearray()
+        while True:
+            chunk = await part.read_chunk(DEFAULT_FILE_CHUNK_SIZE)
+            if not chunk:
+                break
+
+            value.extend(chunk)
+            if max_size is not None and len(value) > max_size:
+                raise RequestBodyTooLargeException(
+                    "Form field exceed {} bytes".format(max_size),
+                    max_size=max_size,
+                    size=len(value),
+                )
+
+        value = part.decode(bytes(value))
+        content_type = part.headers.get(hdrs.CONTENT_TYPE)
+        if content_type is None or content_type.startswith("text/"):
+            return value.decode(part.get_charset(default="utf-8"))
+        return value
+
     @property
     def path_parameters(self):
         return dict(self._request.match_info)
@@ -84,10 +545,33 @@ class AiohttpContext(BaseContext):
         processor_class: typing.Optional[typing.Type[Processor]] = None,
         default_error_builder: ErrorBuilderInterface = None,
         debug: bool = False,
+        disconnect_check_interval: typing.Optional[float] = None,
+        file_chunk_size: int = DEFAULT_FILE_CHUNK_SIZE,
+        file_read_ahead: int = DEFAULT_FILE_READ_AHEAD,
+        file_executor: typing.Optional[Executor] = None,
     ) -> None:
+        """
+        :param disconnect_check_interval: interval in seconds between two
+            checks of client connection while a view or a stream is running.
+            When client is disconnected, view or stream is cancelled. Checks
+            are disabled by default (None).
+        :param file_chunk_size: size of file reads of file responses (when
+            file can't be sent with sendfile)
+        :param file_read_ahead: max count of file chunks read but not
+            written yet, for each file response
+        :param file_executor: executor of blocking file calls of file
+            responses, default is event loop default executor (thread pool)
+        """
         super().__init__(processor_class, default_error_builder)
+        if file_chunk_size < 1 or file_read_ahead < 1:
+            raise ConfigurationException("file_chunk_size and file_read_ahead must be positive")
+
         self._app = app
         self._debug = debug
+        self._disconnect_check_interval = disconnect_check_interval
+        self._file_chunk_size = file_chunk_size
+        self._file_read_ahead = file_read_ahead
+        self._file_executor = file_executor
 
         # Managed exceptions
         @web.middleware
@@ -113,7 +597,9 @@ class AiohttpContext(BaseContext):
                     if isinstance(exc, handled_exception.exception_class):
                         self.global_exception_caught(exc)
                         err = self._get_dumped_error_from_exception_error(exc)
-                        return self.get_response(json.dumps(err), handled_exception.http_code)
+                        return self.get_response(
+                            self.json_backend.encode(err), handled_exception.http_code
+                        )
                 raise exc
 
         self._handled_exceptions = []  # type: typing.List[HandledException]
@@ -127,48 +613,76 @@ class AiohttpContext(BaseContext):
     def get_request_parameters(self, *args, **kwargs) -> RequestParameters:
         for arg in args:
             if isinstance(arg, Request):
-                return AiohttpRequestParameters(arg)
+                return AiohttpRequestParameters(arg, self.json_backend, self.decompression)
 
         raise WorkflowException("Unable to get aiohttp request object")
 
+    @property
+    def disconnect_check_interval(self) -> typing.Optional[float]:
+        return self._disconnect_check_interval
+
+    def is_client_disconnected(
+        self, func_args: typing.Tuple[typing.Any, ...], func_kwargs: typing.Dict[str, typing.Any]
+    ) -> bool:
+        for arg in func_args:
+            if isinstance(arg, Request):
+                transport = arg.transport
+                return transport is None or transport.is_closing()
+
+        return False
+
     def get_file_response(self, file_response: HapicFile, http_code: int) -> "Response":
-        if file_response.file_path:
-            # TODO - G.M - 2019-03-27 - add support for others parameters of
-            # file_response
-            # Extended support for file response:
-            # https://github.com/algoo/hapic/issues/171
-            return web.FileResponse(path=file_response.file_path)
-        else:
-            # TODO - G.M - 2019-03-27 - add support for file object case
-            # Extended support for file response:
-            # https://github.com/algoo/hapic/issues/171
-            raise NotImplementedError()
+        return HapicFileResponse(
+            file_response,
+            status=http_code,
+            chunk_size=self._file_chunk_size,
+            read_ahead=self._file_read_ahead,
+            executor=self._file_executor,
+        )
 
     def get_response(
-        self, response: str, http_code: int, mimetype: str = "application/json"
+        self,
+        response: TYPE_RESPONSE_BODY,
+        http_code: int,
+        mimetype: str = "application/json",
+        headers: typing.Optional[TYPE_RESPONSE_HEADERS] = None,
+        compress: bool = True,
     ) -> typing.Any:
-        # A 204 no content response should not have content type header
-        if http_code == HTTPStatus.NO_CONTENT:
+        # A 204 no content (or 304 not modified) response should not have
+        # content type header
+        if not is_body_allowed(http_code):
             mimetype = None
-            response = ""
-
-        return Response(body=response, status=http_code, content_type=mimetype)
+            response = b""
+
+        if compress and self.compression is not None and is_body_allowed(http_code):
+            return CompressibleResponse(
+                body=get_response_body_bytes(response),
+                compression=self.compression,
+                status=http_code,
+                content_type=mimetype,
+                headers=headers,
+            )
+
+        # NOTE: aiohttp set Content-Length from bytes like body
+        return Response(
+            body=get_response_body_bytes(response),
+            status=http_code,
+            content_type=mimetype,
+            headers=headers,
+        )
 
     def get_validation_error_response(
         self, error: ProcessValidationError, http_code: HTTPStatus = HTTPStatus.BAD_REQUEST
     ) -> typing.Any:
         dumped_error = self._get_dumped_error_from_validation_error(error)
-        return web.Response(
-            text=json.dumps(dumped_error),
-            headers=[("Content-Type", "application/json")],
-            status=int(http_code),
-        )
+        return self.get_response(self.json_backend.encode(dumped_error), int(http_code))
 
     def find_route(self, decorated_controller: DecoratedController) -> RouteRepresentation:
         if not len(self.app.router.routes()):
             raise NoRoutesException("There is no routes in your aiohttp app")
 
         reference = decorated_controller.reference
+        head_route = None
 
         for route in self.app.router.routes():
             route_token = getattr(route.handler, DECORATION_ATTRIBUTE_NAME, None)
@@ -177,22 +691,26 @@ class AiohttpContext(BaseContext):
             match_with_wrapped = route.handler == reference.wrapped
             match_with_token = route_token == reference.token
 
-            # TODO BS 2018-07-27: token is set in HEAD view to, must solve this
-            # case
-            if (
-                not match_with_wrapper
-                and not match_with_wrapped
-                and match_with_token
-                and route.method.lower() == "head"
-            ):
-                continue
-
             if match_with_wrapper or match_with_wrapped or match_with_token:
+                # NOTE BS 2018-07-27: aiohttp add a HEAD route with same
+                # handler for GET routes. HEAD route is used only if no other
+                # route match.
+                if route.method.lower() == "head":
+                    head_route = head_route or route
+                    continue
+
                 return RouteRepresentation(
                     rule=self.get_swagger_path(route.resource.canonical),
                     method=route.method.lower(),
                     original_route_object=route,
                 )
+
+        if head_route is not None:
+            return RouteRepresentation(
+                rule=self.get_swagger_path(head_route.resource.canonical),
+                method=head_route.method.lower(),
+                original_route_object=head_route,
+            )
         # TODO BS 20171010: Raise exception or print error ? see #10
         raise RouteNotFound(
             'Decorated route "{}" was not found in aiohttp routes'.format(decorated_controller.name)
@@ -212,7 +730,9 @@ class AiohttpContext(BaseContext):
     def serve_directory(self, route_prefix: str, directory_path: str) -> None:
         self.app.router.add_static(route_prefix, path=directory_path)
 
-    def is_debug(self,) -> bool:
+    def is_debug(
+        self,
+    ) -> bool:
         return self._debug
 
     def handle_exception(self, exception_class: typing.Type[Exception], http_code: int) -> None:
@@ -243,11 +763,14 @@ class AiohttpContext(BaseContext):
             self.handle_exception(exception_class, http_code)
 
     async def get_stream_response_object(
-        self, func_args, func_kwargs, http_code: HTTPStatus = HTTPStatus.OK, headers: dict = None
+        self,
+        func_args,
+        func_kwargs,
+        http_code: HTTPStatus = HTTPStatus.OK,
+        headers: dict = None,
+        compress: bool = True,
     ) -> web.StreamResponse:
-        headers = headers or {"Content-Type": "text/plain; charset=utf-8"}
-
-        response = web.StreamResponse(status=http_code, headers=headers)
+        headers = dict(headers or {"Content-Type": "text/plain; charset=utf-8"})
 
         try:
             request = func_args[0]
@@ -255,6 +778,21 @@ class AiohttpContext(BaseContext):
             raise WorkflowException("Unable to get aiohttp request object")
         request = typing.cast(Request, request)
 
+        encoding = None
+        if compress and self.compression is not None:
+            headers[hdrs.VARY] = hdrs.ACCEPT_ENCODING
+            encoding = self.compression.get_encoding(request.headers.get(hdrs.ACCEPT_ENCODING))
+
+        if encoding is not None:
+            headers[hdrs.CONTENT_ENCODING] = encoding
+            response = CompressedStreamResponse(
+                status=http_code,
+                headers=headers,
+                compressor=self.compression.get_compressor(encoding),
+            )
+        else:
+            response = web.StreamResponse(status=http_code, headers=headers)
+
         await response.prepare(request)
 
         return response
@@ -263,7 +801,12 @@ class AiohttpContext(BaseContext):
         self, stream_response: web.StreamResponse, serialized_item: dict
     ) -> None:
         await stream_response.write(
-            # FIXME BS 2018-07-25: need \n :/
-            json.dumps(serialized_item).encode("utf-8")
-            + b"\n"
+            DEFAULT_STREAM_FORMAT.get_item(self.get_stream_item_bytes(serialized_item), 0)
         )
+
+    def get_stream_item_bytes(self, serialized_item: dict) -> bytes:
+        """
+        :param serialized_item: serialized stream item
+        :return: encoded item, to be framed by stream format
+        """
+        return self.json_backend.encode(serialized_item)
@@ -1,11 +1,12 @@
 # -*- coding: utf-8 -*-
-import json
 import re
 import typing
 
 import bottle
 from multidict import MultiDict
 
+from hapic.compression import DECOMPRESSED_REQUEST_ENVIRON_KEY
+from hapic.compression import get_decompressed_wsgi_environ
 from hapic.context import BaseContext
 from hapic.context import HandledException
 from hapic.context import RouteRepresentation
@@ -14,11 +15,21 @@ from hapic.decorator import DECORATION_ATTRIBUTE_NAME
 from hapic.decorator import DecoratedController
 from hapic.error.main import ErrorBuilderInterface
 from hapic.exception import NoRoutesException
+from hapic.exception import RequestBodyException
 from hapic.exception import RouteNotFound
+from hapic.file import ConditionalFileResponse
+from hapic.file import get_wsgi_file_body
 from hapic.processor.main import Processor
 from hapic.processor.main import ProcessValidationError
 from hapic.processor.main import RequestParameters
+from hapic.stream import DEFAULT_STREAM_FORMAT
+from hapic.stream import StreamFormat
+from hapic.type import TYPE_RESPONSE_BODY
+from hapic.type import TYPE_RESPONSE_HEADERS
 from hapic.util import LowercaseKeysDict
+from hapic.util import get_response_body_bytes
+from hapic.util import get_response_body_length
+from hapic.util import is_body_allowed
 
 try:  # Python 3.5+
     from http import HTTPStatus
@@ -45,14 +56,24 @@ class BottleContext(BaseContext):
         self.debug = debug
 
     def get_request_parameters(self, *args, **kwargs) -> RequestParameters:
+        body_request = bottle.request
+        try:
+            encoding = self._get_request_body_encoding(
+                bottle.request.headers.get("Content-Encoding")
+            )
+            if encoding is not None:
+                body_request = self._get_decompressed_request(encoding)
+        except RequestBodyException as exc:
+            raise bottle.HTTPError(int(exc.http_code), str(exc))
+
         path_parameters = dict(bottle.request.url_args)
         query_parameters = MultiDict(bottle.request.query.allitems())
-        body_parameters = dict(bottle.request.json or {})
-        form_parameters = MultiDict(bottle.request.forms.allitems())
+        body_parameters = dict(self._get_json_body(body_request) or {})
+        form_parameters = MultiDict(body_request.forms.allitems())
         header_parameters = LowercaseKeysDict(
             [(k.lower(), v) for k, v in bottle.request.headers.items()]
         )
-        files_parameters = dict(bottle.request.files)
+        files_parameters = dict(body_request.files)
 
         return RequestParameters(
             path_parameters=path_parameters,
@@ -63,35 +84,101 @@ class BottleContext(BaseContext):
             files_parameters=files_parameters,
         )
 
+    def _get_decompressed_request(self, encoding: str) -> bottle.BaseRequest:
+        """
+        :param encoding: content coding of current request body
+        :return: request object reading decompressed body (json, forms and
+            files are parsed from it)
+        """
+        decompressed_request = bottle.request.environ.get(DECOMPRESSED_REQUEST_ENVIRON_KEY)
+        if decompressed_request is None:
+            body = self.decompression.decompress_file(bottle.request.body, encoding)
+            decompressed_request = bottle.BaseRequest(
+                get_decompressed_wsgi_environ(bottle.request.environ, body, ("bottle.request",))
+            )
+            bottle.request.environ[DECOMPRESSED_REQUEST_ENVIRON_KEY] = decompressed_request
+        return decompressed_request
+
+    def _get_json_body(self, request: bottle.BaseRequest) -> typing.Any:
+        """
+        Decode request json body with context json backend, like
+        bottle.BaseRequest.json do.
+        :param request: bottle request
+        :return: decoded body or None if request is not a json request
+        """
+        content_type = request.environ.get("CONTENT_TYPE", "").lower().split(";")[0]
+        if content_type not in ("application/json", "application/json-rpc"):
+            return None
+
+        data = request.body.read()
+        if not data:
+            return None
+
+        try:
+            return self.json_backend.decode(data)
+        except ValueError:
+            raise bottle.HTTPError(400, "Invalid JSON")
+
     def get_file_response(self, file_response: HapicFile, http_code: int) -> bottle.HTTPResponse:
-        if file_response.file_path:
-            # TODO - G.M - 2019-03-27 - add support for others parameters of
-            # file_response
-            # Extended support for file response:
-            # https://github.com/algoo/hapic/issues/171
-            return bottle.static_file(file_response.file_path, root="/")
-        else:
-            # TODO - G.M - 2019-03-27 - add support for file object case
-            # Extended support for file response:
-            # https://github.com/algoo/hapic/issues/171
-            raise NotImplementedError()
+        conditional_response = ConditionalFileResponse(
+            file_response, bottle.request.headers, http_code
+        )
+        return bottle.HTTPResponse(
+            body=get_wsgi_file_body(conditional_response, bottle.request.environ),
+            status=conditional_response.http_code,
+            headers=conditional_response.get_headers(),
+        )
 
     def get_response(
-        self, response: str, http_code: int, mimetype: str = "application/json"
+        self,
+        response: TYPE_RESPONSE_BODY,
+        http_code: int,
+        mimetype: str = "application/json",
+        headers: typing.Optional[TYPE_RESPONSE_HEADERS] = None,
+        compress: bool = True,
     ) -> bottle.HTTPResponse:
+        body, headers = self._compress_response_body(
+            get_response_body_bytes(response), http_code, headers, compress
+        )
+        # NOTE: bottle only accept bytes or str body, not other bytes like
+        # objects
+        if isinstance(body, memoryview):
+            body = body.tobytes()
+
+        if is_body_allowed(http_code):
+            response_headers = [
+                ("Content-Type", mimetype),
+                ("Content-Length", str(get_response_body_length(body))),
+            ]
+        else:
+            body = b""
+            response_headers = []
+
+        return bottle.HTTPResponse(body=body, headers=response_headers + headers, status=http_code)
+
+    def get_stream_response(
+        self,
+        serialized_items: typing.Iterable[typing.Any],
+        http_code: int,
+        stream_format: StreamFormat = DEFAULT_STREAM_FORMAT,
+        headers: typing.Optional[TYPE_RESPONSE_HEADERS] = None,
+        compress: bool = True,
+    ) -> bottle.HTTPResponse:
+        body, headers = self._get_stream_body(serialized_items, stream_format, headers, compress)
         return bottle.HTTPResponse(
-            body=response, headers=[("Content-Type", mimetype)], status=http_code
+            body=body,
+            headers=[("Content-Type", stream_format.mimetype)] + headers,
+            status=http_code,
         )
 
+    def _get_request_accept_encoding(self) -> typing.Optional[str]:
+        return bottle.request.headers.get("Accept-Encoding")
+
     def get_validation_error_response(
         self, error: ProcessValidationError, http_code: HTTPStatus = HTTPStatus.BAD_REQUEST
     ) -> typing.Any:
         dumped_error = self._get_dumped_error_from_validation_error(error)
-        return bottle.HTTPResponse(
-            body=json.dumps(dumped_error),
-            headers=[("Content-Type", "application/json")],
-            status=int(http_code),
-        )
+        return self.get_response(self.json_backend.encode(dumped_error), int(http_code))
 
     def find_route(self, decorated_controller: DecoratedController) -> RouteRepresentation:
         if not self.app.routes:
@@ -1,22 +1,33 @@
 # -*- coding: utf-8 -*-
-import json
 import re
 import typing
 
 from flask import Flask
-from flask import send_file
 from flask import send_from_directory
 
+from hapic.compression import DECOMPRESSED_REQUEST_ENVIRON_KEY
+from hapic.compression import get_decompressed_wsgi_environ
 from hapic.context import BaseContext
 from hapic.context import RouteRepresentation
 from hapic.data import HapicFile
 from hapic.decorator import DECORATION_ATTRIBUTE_NAME
 from hapic.decorator import DecoratedController
 from hapic.error.main import ErrorBuilderInterface
+from hapic.exception import RequestBodyException
+from hapic.file import ConditionalFileResponse
+from hapic.file import SpooledUploadFile
+from hapic.file import get_wsgi_file_body
 from hapic.processor.main import Processor
 from hapic.processor.main import ProcessValidationError
 from hapic.processor.main import RequestParameters
+from hapic.stream import DEFAULT_STREAM_FORMAT
+from hapic.stream import StreamFormat
+from hapic.type import TYPE_RESPONSE_BODY
+from hapic.type import TYPE_RESPONSE_HEADERS
 from hapic.util import LowercaseKeysDict
+from hapic.util import get_response_body_bytes
+from hapic.util import get_response_body_length
+from hapic.util import is_body_allowed
 
 try:  # Python 3.5+
     from http import HTTPStatus
@@ -25,13 +36,108 @@ except ImportError:
 
 
 if typing.TYPE_CHECKING:
+    from flask import Request
     from flask import Response
+    from werkzeug.datastructures import MultiDict
     from hapic.context import HandledException  # noqa: F401
 
 # flask regular expression to locate url parameters
 FLASK_RE_PATH_URL = re.compile(r"<(?:[^:<>]+:)?([^<>]+)>")
 
 
+class FlaskRequestParameters(RequestParameters):
+    """
+    Json body is read and decoded only when used, so body can be read
+    incrementally instead (see get_body_chunks).
+    """
+
+    def __init__(
+        self,
+        request: "Request",
+        body_request: "Request",
+        get_json_body: typing.Callable[["Request"], typing.Any],
+    ) -> None:
+        """
+        :param request: flask request
+        :param body_request: request to read body from (decompressed request
+            if request body is compressed)
+        :param get_json_body: function decoding json body of a request
+        """
+        self.path_parameters = request.view_args
+        self.query_parameters = request.args  # TODO: Check
+        self.header_parameters = LowercaseKeysDict(
+            [(k.lower(), v) for k, v in request.headers.items()]
+        )
+        self._body_request = body_request
+        self._get_json_body = get_json_body
+        self._parsed_body = None
+        self._body_parsed = False
+        self._spooled_files_parameters = None
+
+    @property
+    def form_parameters(self) -> "MultiDict":
+        return self._body_request.form
+
+    @property
+    def files_parameters(self) -> "MultiDict":
+        return self._body_request.files
+
+    @property
+    def body_parameters(self) -> typing.Any:
+        if not self._body_parsed:
+            self._parsed_body = self._get_json_body(self._body_request)  # TODO: Check
+            self._body_parsed = True
+        return self._parsed_body
+
+    def get_body_chunks(self, chunk_size: int) -> typing.Iterator[bytes]:
+        stream = self._body_request.stream
+        while True:
+            chunk = stream.read(chunk_size)
+            if not chunk:
+                return
+            yield chunk
+
+    def get_spooled_files_parameters(
+        self, spool_threshold: int, max_size: typing.Optional[int] = None
+    ) -> "MultiDict":
+        if self._spooled_files_parameters is not None:
+            return self._spooled_files_parameters
+
+        request = self._body_request
+        # NOTE: form data can be already parsed (like if form was used)
+        if "form" in request.__dict__ or request.mimetype != "multipart/form-data":
+            raise NotImplementedError()
+
+        uploads = []  # type: typing.List[SpooledUploadFile]
+
+        def stream_factory(
+            total_content_length: typing.Optional[int],
+            content_type: typing.Optional[str],
+            filename: typing.Optional[str],
+            content_length: typing.Optional[int] = None,
+        ) -> SpooledUploadFile:
+            upload = SpooledUploadFile(spool_threshold, max_size)
+            uploads.append(upload)
+            return upload
+
+        parser = request.make_form_data_parser()
+        parser.stream_factory = stream_factory
+        try:
+            data = parser.parse(
+                request.stream, request.mimetype, request.content_length, request.mimetype_params
+            )
+        except BaseException:
+            # NOTE: files spooled before error are not returned: close them
+            for upload in uploads:
+                upload.close()
+            raise
+        # NOTE: values are injected like werkzeug Request._load_form_data
+        # does, so request form and files are the parsed ones
+        request.__dict__["stream"], request.__dict__["form"], request.__dict__["files"] = data
+        self._spooled_files_parameters = request.files
+        return self._spooled_files_parameters
+
+
 class FlaskContext(BaseContext):
     def __init__(
         self,
@@ -46,55 +152,135 @@ class FlaskContext(BaseContext):
         self.debug = debug
 
     def get_request_parameters(self, *args, **kwargs) -> RequestParameters:
+        from flask import abort
         from flask import request
 
-        return RequestParameters(
-            path_parameters=request.view_args,
-            query_parameters=request.args,  # TODO: Check
-            body_parameters=request.get_json(),  # TODO: Check
-            form_parameters=request.form,
-            header_parameters=LowercaseKeysDict(
-                [(k.lower(), v) for k, v in request.headers.items()]
-            ),
-            files_parameters=request.files,
-        )
+        body_request = request
+        try:
+            encoding = self._get_request_body_encoding(request.headers.get("Content-Encoding"))
+            if encoding is not None:
+                body_request = self._get_decompressed_request(request, encoding)
+        except RequestBodyException as exc:
+            abort(int(exc.http_code), description=str(exc))
+
+        return FlaskRequestParameters(request, body_request, get_json_body=self._get_json_body)
+
+    def _get_decompressed_request(self, request: "Request", encoding: str) -> "Request":
+        """
+        :param request: flask request with compressed body
+        :param encoding: content coding of request body
+        :return: request object reading decompressed body (json, forms and
+            files are parsed from it)
+        """
+        decompressed_request = request.environ.get(DECOMPRESSED_REQUEST_ENVIRON_KEY)
+        if decompressed_request is None:
+            body = self.decompression.decompress_file(request.stream, encoding)
+            decompressed_request = request.__class__(
+                get_decompressed_wsgi_environ(request.environ, body, ("werkzeug.",))
+            )
+            request.environ[DECOMPRESSED_REQUEST_ENVIRON_KEY] = decompressed_request
+        return decompressed_request
+
+    def _get_json_body(self, request: "Request") -> typing.Any:
+        """
+        Decode request json body with context json backend, like
+        flask.Request.get_json do.
+        :param request: flask request
+        :return: decoded body or None if request is not a json request
+        """
+        if not request.is_json:
+            return None
+
+        data = request.get_data(cache=True)
+        if not data:
+            return None
+
+        try:
+            return self.json_backend.decode(data)
+        except ValueError as exc:
+            return request.on_json_loading_failed(exc)
 
     def get_file_response(self, file_response: HapicFile, http_code: int) -> "Response":
-        if file_response.file_path:
-            # TODO - G.M - 2019-03-27 - add support for others parameters of
-            # file_response
-            # Extended support for file response:
-            # https://github.com/algoo/hapic/issues/171
-            return send_file(filename_or_fp=file_response.file_path)
-        else:
-            # TODO - G.M - 2019-03-27 - add support for file object case
-            # Extended support for file response:
-            # https://github.com/algoo/hapic/issues/171
-            raise NotImplementedError()
+        from flask import Response
+        from flask import request
+
+        conditional_response = ConditionalFileResponse(file_response, request.headers, http_code)
+        response = Response(
+            response=get_wsgi_file_body(conditional_response, request.environ),
+            status=conditional_response.http_code,
+            headers=conditional_response.get_headers(),
+            direct_passthrough=True,
+        )
+        # NOTE: see get_response, flask always setup content-type
+        if not is_body_allowed(conditional_response.http_code):
+            del response.headers["content-type"]
+        return response
 
     def get_response(
-        self, response: str, http_code: int, mimetype: str = "application/json"
+        self,
+        response: TYPE_RESPONSE_BODY,
+        http_code: int,
+        mimetype: str = "application/json",
+        headers: typing.Optional[TYPE_RESPONSE_HEADERS] = None,
+        compress: bool = True,
     ) -> "Response":
         from flask import Response
 
-        response = Response(response=response, mimetype=mimetype, status=http_code)
+        body, response_headers = self._compress_response_body(
+            get_response_body_bytes(response), http_code, headers, compress
+        )
+        if is_body_allowed(http_code):
+            response_headers.append(("Content-Length", str(get_response_body_length(body))))
+        else:
+            body = b""
+        # NOTE: werkzeug only use bytes as is, other objects are iterated
+        if isinstance(body, memoryview):
+            body = [body]
+
+        response = Response(
+            response=body, mimetype=mimetype, status=http_code, headers=response_headers
+        )
         # INFO - G.M - 2019-04-01 - Response object of flask always setup content-type
         # even when http_code is 204 NO-CONTENT
         # this is a fix to have correct behaviour with 204 response.
-        if http_code == 204:
+        if not is_body_allowed(http_code):
             del response.headers["content-type"]
         return response
 
-    def get_validation_error_response(
-        self, error: ProcessValidationError, http_code: HTTPStatus = HTTPStatus.BAD_REQUEST
-    ) -> typing.Any:
+    def get_stream_response(
+        self,
+        serialized_items: typing.Iterable[typing.Any],
+        http_code: int,
+        stream_format: StreamFormat = DEFAULT_STREAM_FORMAT,
+        headers: typing.Optional[TYPE_RESPONSE_HEADERS] = None,
+        compress: bool = True,
+    ) -> "Response":
         from flask import Response
+        from flask import stream_with_context
 
-        dumped_error = self._get_dumped_error_from_validation_error(error)
+        body, headers = self._get_stream_body(serialized_items, stream_format, headers, compress)
+        # NOTE: stream is consumed after view return, stream_with_context
+        # keep request context to permit view generator to use it
         return Response(
-            response=json.dumps(dumped_error), mimetype="application/json", status=int(http_code)
+            response=stream_with_context(body),
+            status=http_code,
+            headers=[("Content-Type", stream_format.mimetype)] + headers,
         )
 
+    def _get_request_accept_encoding(self) -> typing.Optional[str]:
+        from flask import has_request_context
+        from flask import request
+
+        if not has_request_context():
+            return None
+        return request.headers.get("Accept-Encoding")
+
+    def get_validation_error_response(
+        self, error: ProcessValidationError, http_code: HTTPStatus = HTTPStatus.BAD_REQUEST
+    ) -> typing.Any:
+        dumped_error = self._get_dumped_error_from_validation_error(error)
+        return self.get_response(self.json_backend.encode(dumped_error), int(http_code))
+
     def find_route(self, decorated_controller: "DecoratedController"):
         reference = decorated_controller.reference
         for route in self.app.url_map.iter_rules():
@@ -147,7 +333,7 @@ class FlaskContext(BaseContext):
         def return_response_error(exc):
             self.global_exception_caught(exc)
             dumped_error = self._get_dumped_error_from_exception_error(exc)
-            return self.get_response(json.dumps(dumped_error), http_code)
+            return self.get_response(self.json_backend.encode(dumped_error), http_code)
 
         self.app.register_error_handler(exception_class, return_response_error)
 
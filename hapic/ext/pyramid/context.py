@@ -1,22 +1,33 @@
 # -*- coding: utf-8 -*-
 import cgi
-import json
 import logging
 import re
 import traceback
 import typing
 
+from hapic.compression import DECOMPRESSED_REQUEST_ENVIRON_KEY
+from hapic.compression import get_decompressed_wsgi_environ
 from hapic.context import BaseContext
 from hapic.context import RouteRepresentation
 from hapic.data import HapicFile
 from hapic.decorator import DECORATION_ATTRIBUTE_NAME
 from hapic.decorator import DecoratedController
 from hapic.error.main import ErrorBuilderInterface
+from hapic.exception import RequestBodyException
+from hapic.file import ConditionalFileResponse
+from hapic.file import get_wsgi_file_body
 from hapic.processor.main import Processor
 from hapic.processor.main import ProcessValidationError
 from hapic.processor.main import RequestParameters
+from hapic.stream import DEFAULT_STREAM_FORMAT
+from hapic.stream import StreamFormat
+from hapic.type import TYPE_RESPONSE_BODY
+from hapic.type import TYPE_RESPONSE_HEADERS
 from hapic.util import LOGGER_NAME
 from hapic.util import LowercaseKeysDict
+from hapic.util import get_response_body_bytes
+from hapic.util import get_response_body_length
+from hapic.util import is_body_allowed
 
 try:  # Python 3.5+
     from http import HTTPStatus
@@ -27,6 +38,7 @@ except ImportError:
 if typing.TYPE_CHECKING:
     from pyramid.response import Response
     from pyramid.config import Configurator
+    from pyramid.request import Request
     from hapic.context import HandledException  # noqa: F401
 
 # Bottle regular expression to locate url parameters
@@ -47,12 +59,22 @@ class PyramidContext(BaseContext):
         self.debug = debug
 
     def get_request_parameters(self, *args, **kwargs) -> RequestParameters:
+        from pyramid.httpexceptions import exception_response
+
         req = args[-1]  # TODO : Check
+        body_req = req
+        try:
+            encoding = self._get_request_body_encoding(req.headers.get("Content-Encoding"))
+            if encoding is not None:
+                body_req = self._get_decompressed_request(req, encoding)
+        except RequestBodyException as exc:
+            raise exception_response(int(exc.http_code), detail=str(exc))
+
         # TODO : move this code to check_json
         # same idea as in : https://bottlepy.org/docs/dev/_modules/bottle.html#BaseRequest.json
-        if req.content_type in ("application/json", "application/json-rpc"):
+        if body_req.content_type in ("application/json", "application/json-rpc"):
             try:
-                json_body = req.json_body
+                json_body = self.json_backend.decode(body_req.body)
             # TODO - G.M - 2019-06-06 -  raise exception if not correct ,
             # return 400 if uncorrect instead ?
             except Exception:
@@ -63,7 +85,7 @@ class PyramidContext(BaseContext):
 
         forms_parameters = {}
         files_parameters = {}
-        for name, item in req.POST.items():
+        for name, item in body_req.POST.items():
             if isinstance(item, cgi.FieldStorage):
                 files_parameters[name] = item
             else:
@@ -73,78 +95,104 @@ class PyramidContext(BaseContext):
             path_parameters=req.matchdict,
             query_parameters=req.GET,
             body_parameters=json_body,
-            form_parameters=req.POST,
+            form_parameters=body_req.POST,
             header_parameters=LowercaseKeysDict([(k.lower(), v) for k, v in req.headers.items()]),
             files_parameters=files_parameters,
         )
 
+    def _get_decompressed_request(self, req: "Request", encoding: str) -> "Request":
+        """
+        :param req: pyramid request with compressed body
+        :param encoding: content coding of request body
+        :return: request object reading decompressed body (json, forms and
+            files are parsed from it)
+        """
+        import webob
+
+        decompressed_req = req.environ.get(DECOMPRESSED_REQUEST_ENVIRON_KEY)
+        if decompressed_req is None:
+            body = self.decompression.decompress_file(req.body_file, encoding)
+            decompressed_req = webob.Request(
+                get_decompressed_wsgi_environ(req.environ, body, ("webob.",))
+            )
+            req.environ[DECOMPRESSED_REQUEST_ENVIRON_KEY] = decompressed_req
+        return decompressed_req
+
     def get_response(
-        self, response: str, http_code: int, mimetype: str = "application/json"
+        self,
+        response: TYPE_RESPONSE_BODY,
+        http_code: int,
+        mimetype: str = "application/json",
+        headers: typing.Optional[TYPE_RESPONSE_HEADERS] = None,
+        compress: bool = True,
     ) -> "Response":
+        from pyramid.response import Response
+
+        body, headers = self._compress_response_body(
+            get_response_body_bytes(response), http_code, headers, compress
+        )
         # INFO - G.M - 20-04-2018 - No message_body for some http code,
         # no Content-Type needed if no content
         # see: https://tools.ietf.org/html/rfc2616#section-4.3
-        if http_code in [204, 304] or (100 <= http_code <= 199):
-            headers = []
+        if is_body_allowed(http_code):
+            response_headers = [
+                ("Content-Type", mimetype),
+                ("Content-Length", str(get_response_body_length(body))),
+            ]
         else:
-            headers = [("Content-Type", mimetype)]
+            body = b""
+            response_headers = []
+
+        response_headers.extend(headers)
+        return Response(body=body, headers=response_headers, status=http_code)
+
+    def get_stream_response(
+        self,
+        serialized_items: typing.Iterable[typing.Any],
+        http_code: int,
+        stream_format: StreamFormat = DEFAULT_STREAM_FORMAT,
+        headers: typing.Optional[TYPE_RESPONSE_HEADERS] = None,
+        compress: bool = True,
+    ) -> "Response":
         from pyramid.response import Response
 
-        return Response(body=response, headers=headers, status=http_code)
+        body, headers = self._get_stream_body(serialized_items, stream_format, headers, compress)
+        return Response(
+            app_iter=body,
+            headers=[("Content-Type", stream_format.mimetype)] + headers,
+            status=http_code,
+        )
 
     def get_file_response(self, file_response: HapicFile, http_code: int):
-        if file_response.file_path:
-            from pyramid.response import FileResponse
-
-            # TODO - G.M - 2019-03-27 - add support for overriding parameters of
-            # file_response like content_length
-            # Extended support for file response:
-            # https://github.com/algoo/hapic/issues/171
-            response = FileResponse(
-                path=file_response.file_path,
-                # INFO - G.M - 2018-09-13 - If content_type is no, mimetype
-                # is automatically guessed
-                content_type=file_response.mimetype or None,
-            )
-        else:
-            from pyramid.response import FileIter
-            from pyramid.response import Response
-
-            response = Response(status=http_code)
-            response.content_type = file_response.mimetype
-            response.app_iter = FileIter(file_response.file_object)
-
-        response.conditional_response = file_response.use_conditional_response
-        if file_response.content_length:
-            response.content_length = file_response.content_length
-        if file_response.last_modified:
-            response.last_modified = file_response.last_modified
-        if file_response.etag:
-            response.etag = file_response.etag
-
-        response.status_code = http_code
-
-        # INFO - G.M - 2020-06-03 - Accept bytes range if conditional_response
-        # is accepted.
-        if file_response.use_conditional_response:
-            response.accept_ranges = "bytes"
-        else:
-            response.accept_ranges = "none"
-        response.content_disposition = file_response.get_content_disposition_header_value()
+        from pyramid.response import Response
+        from pyramid.threadlocal import get_current_request
 
-        return response
+        request = get_current_request()
+        request_headers = request.headers if request is not None else {}
+        environ = request.environ if request is not None else {}
+
+        conditional_response = ConditionalFileResponse(file_response, request_headers, http_code)
+        # NOTE: conditional response is evaluated by hapic for all contexts,
+        # so webob conditional_response is not used
+        return Response(
+            status=conditional_response.http_code,
+            headerlist=conditional_response.get_headers(),
+            app_iter=get_wsgi_file_body(conditional_response, environ),
+        )
+
+    def _get_request_accept_encoding(self) -> typing.Optional[str]:
+        from pyramid.threadlocal import get_current_request
+
+        request = get_current_request()
+        if request is None:
+            return None
+        return request.headers.get("Accept-Encoding")
 
     def get_validation_error_response(
         self, error: ProcessValidationError, http_code: HTTPStatus = HTTPStatus.BAD_REQUEST
     ) -> typing.Any:
-        from pyramid.response import Response
-
         dumped_error = self._get_dumped_error_from_validation_error(error)
-        return Response(
-            body=json.dumps(dumped_error),
-            headers=[("Content-Type", "application/json")],
-            status=int(http_code),
-        )
+        return self.get_response(self.json_backend.encode(dumped_error), int(http_code))
 
     def find_route(self, decorated_controller: DecoratedController) -> RouteRepresentation:
         for category in self.configurator.introspector.get_category("views"):
@@ -221,7 +269,7 @@ class PyramidContext(BaseContext):
                 error_body = error_builder.build_from_exception(
                     exc, include_traceback=self.is_debug()
                 )
-                return self.get_response(json.dumps(error_body), http_code)
+                return self.get_response(self.json_backend.encode(error_body), http_code)
 
             return view_func
 
@@ -0,0 +1,632 @@
+# -*- coding: utf-8 -*-
+from collections import OrderedDict
+from datetime import datetime
+from datetime import timezone
+from http import HTTPStatus
+import io
+import mimetypes
+import os
+import stat
+import tempfile
+import threading
+import typing
+import uuid
+
+from hapic.data import HapicFile
+from hapic.exception import ConfigurationException
+from hapic.exception import RequestBodyTooLargeException
+from hapic.util import get_http_date
+from hapic.util import is_body_allowed
+from hapic.util import is_etag_matching
+from hapic.util import parse_http_date
+
+DEFAULT_FILE_CHUNK_SIZE = 64 * 1024
+# Range headers with more ranges are ignored (whole file is sent) to avoid
+# abuse with many small or overlapping ranges
+MAX_RANGES = 100
+
+# A byte window of a file: (offset, length)
+TYPE_FILE_WINDOW = typing.Tuple[int, int]
+
+
+def get_file_descriptor(file_object: typing.Any) -> typing.Optional[int]:
+    """
+    :param file_object: file like object
+    :return: file descriptor of given file object, or None if it is not
+        backed by a real file (like BytesIO)
+    """
+    try:
+        return file_object.fileno()
+    except (AttributeError, OSError, io.UnsupportedOperation):
+        return None
+
+
+def is_seekable(file_object: typing.Any) -> bool:
+    """
+    :param file_object: file like object
+    :return: True if given file object can be read from any position
+    """
+    try:
+        return file_object.seekable()
+    except (AttributeError, OSError, ValueError):
+        return False
+
+
+class FileObjectIterator(object):
+    """
+    Iterate on file object content by chunks of (at most) chunk_size bytes,
+    so only one chunk is in memory at a time. File object is closed at end of
+    iteration or when iterator is closed (as WSGI servers do with response
+    iterables).
+    """
+
+    def __init__(
+        self,
+        file_object: typing.Any,
+        chunk_size: int = DEFAULT_FILE_CHUNK_SIZE,
+        length: typing.Optional[int] = None,
+    ) -> None:
+        """
+        :param file_object: file like object, read from its current position
+        :param chunk_size: max size of read chunks
+        :param length: if given, count of bytes to read
+        """
+        self.file_object = file_object
+        self.chunk_size = chunk_size
+        self.remaining = length
+
+    def __iter__(self) -> "FileObjectIterator":
+        return self
+
+    def __next__(self) -> bytes:
+        size = self.chunk_size
+        if self.remaining is not None:
+            size = min(size, self.remaining)
+
+        chunk = self.file_object.read(size) if size else b""
+        if not chunk:
+            self.close()
+            raise StopIteration()
+
+        if self.remaining is not None:
+            self.remaining -= len(chunk)
+        return chunk
+
+    def close(self) -> None:
+        close = getattr(self.file_object, "close", None)
+        if close is not None:
+            close()
+
+
+def get_wsgi_file_iterable(
+    environ: typing.Dict[str, typing.Any],
+    file_object: typing.Any,
+    chunk_size: int = DEFAULT_FILE_CHUNK_SIZE,
+) -> typing.Iterable[bytes]:
+    """
+    :param environ: WSGI environ of current request
+    :param file_object: file like object to send
+    :param chunk_size: max size of read chunks
+    :return: WSGI response iterable of file object content. If file object
+        has a file descriptor, server wsgi.file_wrapper is used (if any) so
+        server can send it without copy (like with sendfile).
+    """
+    file_wrapper = environ.get("wsgi.file_wrapper")
+    if file_wrapper is not None and get_file_descriptor(file_object) is not None:
+        return file_wrapper(file_object, chunk_size)
+    return FileObjectIterator(file_object, chunk_size)
+
+
+def get_file_ranges_chunks(
+    file_object: typing.Any,
+    parts: typing.Iterable[typing.Union[bytes, TYPE_FILE_WINDOW]],
+    chunk_size: int = DEFAULT_FILE_CHUNK_SIZE,
+) -> typing.Iterator[bytes]:
+    """
+    Read only given byte windows of a seekable file object, by chunks of
+    (at most) chunk_size bytes. File object is closed at end.
+    :param file_object: seekable file like object
+    :param parts: byte windows to read, and bytes to send as is (like
+        multipart delimiters), see ConditionalFileResponse.get_parts
+    :param chunk_size: max size of read chunks
+    :return: response body chunks
+    """
+    try:
+        for part in parts:
+            if isinstance(part, bytes):
+                yield part
+                continue
+
+            offset, remaining = part
+            file_object.seek(offset)
+            while remaining > 0:
+                chunk = file_object.read(min(chunk_size, remaining))
+                if not chunk:
+                    break
+                remaining -= len(chunk)
+                yield chunk
+    finally:
+        file_object.close()
+
+
+def parse_range_header(value: str, size: int) -> typing.Optional[typing.List[TYPE_FILE_WINDOW]]:
+    """
+    Parse a Range request header, see https://tools.ietf.org/html/rfc7233#section-3.1
+    :param value: Range header value, like "bytes=0-499,-500"
+    :param size: size of file
+    :return: satisfiable byte windows as (start, length) tuples (empty list
+        if no range is satisfiable), or None if header is invalid and must
+        be ignored
+    """
+    unit, _, ranges_specifier = value.partition("=")
+    if unit.strip().lower() != "bytes":
+        return None
+
+    specs = [spec.strip() for spec in ranges_specifier.split(",") if spec.strip()]
+    if not specs or len(specs) > MAX_RANGES:
+        return None
+
+    windows = []
+    for spec in specs:
+        first, separator, last = (part.strip() for part in spec.partition("-"))
+        if not separator or not (first or last):
+            return None
+        if (first and not first.isdigit()) or (last and not last.isdigit()):
+            return None
+
+        if not first:
+            # suffix range: last bytes of file
+            suffix_length = int(last)
+            if suffix_length and size:
+                start = max(size - suffix_length, 0)
+                windows.append((start, size - start))
+            continue
+
+        start = int(first)
+        if last and int(last) < start:
+            return None
+        if start < size:
+            end = min(int(last), size - 1) if last else size - 1
+            windows.append((start, end - start + 1))
+
+    return windows
+
+
+class FileMetadata(object):
+    """
+    Metadata of a version of a file, computed once (see FileMetadataCache)
+    """
+
+    # Max count of cached Content-Disposition values (by filename and
+    # as_attachment) of a file
+    max_content_dispositions = 16
+
+    def __init__(self, path: str, stat_result: os.stat_result) -> None:
+        self.stat = stat_result
+        self.size = stat_result.st_size
+        self.last_modified = datetime.fromtimestamp(int(stat_result.st_mtime), tz=timezone.utc)
+        # NOTE: like nginx, strong ETag is built from modification time and
+        # size: file content is not read
+        self.etag = '"{:x}-{:x}"'.format(stat_result.st_mtime_ns, stat_result.st_size)
+        self.mimetype = mimetypes.guess_type(path)[0]
+        self._content_dispositions = {}  # type: typing.Dict[typing.Tuple[str, bool], str]
+
+    def is_version_of(self, stat_result: os.stat_result) -> bool:
+        """
+        :return: True if given stat is stat of file version of this metadata
+        """
+        return (
+            self.stat.st_mtime_ns == stat_result.st_mtime_ns
+            and self.stat.st_size == stat_result.st_size
+        )
+
+    def get_content_disposition(self, file_response: HapicFile) -> str:
+        """
+        :return: Content-Disposition header value of given file response
+        """
+        key = (file_response.filename, file_response.as_attachment)
+        content_disposition = self._content_dispositions.get(key)
+        if content_disposition is None:
+            content_disposition = file_response.get_content_disposition_header_value()
+            if len(self._content_dispositions) < self.max_content_dispositions:
+                self._content_dispositions[key] = content_disposition
+        return content_disposition
+
+
+class FileMetadataCache(object):
+    """
+    LRU cache of file metadata (stat, ETag, mimetype, Content-Disposition),
+    so they are computed once per file version. A file is stat at each get
+    and its metadata are computed again if its modification time or size
+    changed.
+    Hits and misses are counted in `hits` and `misses` attributes.
+    """
+
+    def __init__(self, max_entries: int = 4096) -> None:
+        """
+        :param max_entries: max number of cached files. Least recently used
+            files are dropped when this size is reached.
+        """
+        if max_entries < 1:
+            raise ConfigurationException("File metadata cache max_entries must be positive")
+
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()  # type: typing.Dict[str, FileMetadata]
+        self._lock = threading.Lock()
+
+    def get(self, path: str) -> typing.Optional[FileMetadata]:
+        """
+        Stat given path (blocking call) and return its metadata.
+        :param path: file path
+        :return: metadata of file, or None if path is not a regular file
+        """
+        try:
+            stat_result = os.stat(path)
+        except (OSError, ValueError):
+            return None
+        if not stat.S_ISREG(stat_result.st_mode):
+            return None
+
+        with self._lock:
+            metadata = self._entries.get(path)
+            if metadata is not None and metadata.is_version_of(stat_result):
+                self._entries.move_to_end(path)
+                self.hits += 1
+                return metadata
+
+        metadata = FileMetadata(path, stat_result)
+        with self._lock:
+            self.misses += 1
+            self._entries[path] = metadata
+            self._entries.move_to_end(path)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return metadata
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+# File metadata cache used by processors and contexts
+FILE_METADATA_CACHE = FileMetadataCache()
+
+
+class ConditionalFileResponse(object):
+    """
+    Framework independent evaluation of conditional (If-None-Match,
+    If-Modified-Since) and range (Range, If-Range) request headers for a
+    HapicFile, see RFC 7232 and RFC 7233. It gives response http code,
+    response headers and byte windows of file to send.
+    Ranges need a file_path or a seekable file_object of known size (given
+    by content_length or by seeking it).
+    For file_path, ETag, Last-Modified and mimetype not given by HapicFile
+    come from file metadata (see FileMetadataCache).
+    """
+
+    def __init__(
+        self,
+        file_response: HapicFile,
+        request_headers: typing.Mapping[str, str],
+        http_code: int = HTTPStatus.OK,
+        metadata_cache: FileMetadataCache = FILE_METADATA_CACHE,
+    ) -> None:
+        """
+        Evaluate request headers. File of file_path is stat (blocking call).
+        :param file_response: file to send
+        :param request_headers: request headers, with case insensitive keys
+        :param http_code: http code of full file response
+        :param metadata_cache: cache of file_path metadata
+        """
+        self.file_response = file_response
+        self.http_code = http_code
+        self.ranges = None  # type: typing.Optional[typing.List[TYPE_FILE_WINDOW]]
+        self.boundary = None  # type: typing.Optional[str]
+
+        self.offset = 0
+        self.size = file_response.content_length
+        self.mimetype = file_response.mimetype
+        self.last_modified = file_response.last_modified
+        self.etag = None  # type: typing.Optional[str]
+        if file_response.etag:
+            self.etag = file_response.etag
+            # NOTE: like webob, etag is quoted if not already an entity tag
+            if not self.etag.startswith(('"', 'W/"')):
+                self.etag = '"{}"'.format(self.etag)
+
+        self.seekable = True
+        if file_response.file_path:
+            self._set_file_path_metadata(metadata_cache)
+        else:
+            self._inspect_file_object()
+            self.content_disposition = file_response.get_content_disposition_header_value()
+
+        if file_response.use_conditional_response and http_code == HTTPStatus.OK:
+            self._evaluate(request_headers)
+
+    def _set_file_path_metadata(self, metadata_cache: FileMetadataCache) -> None:
+        file_path = self.file_response.file_path
+        metadata = metadata_cache.get(file_path)
+        if metadata is None:
+            raise FileNotFoundError("File {} do not exist".format(file_path))
+
+        if self.size is None:
+            self.size = metadata.size
+        if self.last_modified is None:
+            self.last_modified = metadata.last_modified
+        if self.etag is None:
+            self.etag = metadata.etag
+        if not self.mimetype:
+            self.mimetype = metadata.mimetype
+        self.content_disposition = metadata.get_content_disposition(self.file_response)
+
+    def _inspect_file_object(self) -> None:
+        file_object = self.file_response.file_object
+        self.seekable = is_seekable(file_object)
+        if not self.seekable:
+            return
+
+        self.offset = file_object.tell()
+        if self.size is None:
+            self.size = file_object.seek(0, io.SEEK_END) - self.offset
+            file_object.seek(self.offset)
+
+    @property
+    def accept_ranges(self) -> bool:
+        return (
+            self.file_response.use_conditional_response and self.seekable and self.size is not None
+        )
+
+    def _evaluate(self, request_headers: typing.Mapping[str, str]) -> None:
+        if self._is_not_modified(request_headers):
+            self.http_code = HTTPStatus.NOT_MODIFIED
+            return
+
+        range_header = request_headers.get("Range")
+        if not range_header or not self.accept_ranges:
+            return
+        if not self._is_range_valid(request_headers.get("If-Range")):
+            return
+
+        ranges = parse_range_header(range_header, self.size)
+        if ranges is None:
+            return
+
+        if not ranges:
+            self.http_code = HTTPStatus.REQUESTED_RANGE_NOT_SATISFIABLE
+            return
+
+        self.http_code = HTTPStatus.PARTIAL_CONTENT
+        self.ranges = ranges
+        if len(ranges) > 1:
+            self.boundary = uuid.uuid4().hex
+
+    def _is_not_modified(self, request_headers: typing.Mapping[str, str]) -> bool:
+        if_none_match = request_headers.get("If-None-Match")
+        if if_none_match:
+            return self.etag is not None and is_etag_matching(if_none_match, self.etag)
+
+        if self.last_modified is not None:
+            if_modified_since = parse_http_date(request_headers.get("If-Modified-Since"))
+            if if_modified_since is not None:
+                return self._get_last_modified() <= if_modified_since
+
+        return False
+
+    def _is_range_valid(self, if_range: typing.Optional[str]) -> bool:
+        """
+        :param if_range: If-Range header value
+        :return: False if Range header must be ignored because file changed,
+            see https://tools.ietf.org/html/rfc7233#section-3.2
+        """
+        if not if_range:
+            return True
+
+        if if_range.startswith(('"', 'W/"')):
+            # If-Range need a strong comparison
+            is_strong = self.etag is not None and not self.etag.startswith("W/")
+            return is_strong and if_range == self.etag
+
+        if_range_date = parse_http_date(if_range)
+        if if_range_date is None or self.last_modified is None:
+            return False
+        return self._get_last_modified() == if_range_date
+
+    def _get_last_modified(self) -> datetime:
+        last_modified = self.last_modified
+        if last_modified.tzinfo is None:
+            last_modified = last_modified.replace(tzinfo=timezone.utc)
+        # HTTP dates have a one second precision
+        return last_modified.replace(microsecond=0)
+
+    @property
+    def has_body(self) -> bool:
+        return is_body_allowed(self.http_code) and (
+            self.http_code != HTTPStatus.REQUESTED_RANGE_NOT_SATISFIABLE
+        )
+
+    def get_headers(self) -> typing.List[typing.Tuple[str, str]]:
+        """
+        :return: response headers
+        """
+        headers = []
+        if self.etag:
+            headers.append(("ETag", self.etag))
+        if self.last_modified:
+            headers.append(("Last-Modified", get_http_date(self.last_modified)))
+        if self.http_code == HTTPStatus.NOT_MODIFIED:
+            return headers
+
+        headers.append(("Accept-Ranges", "bytes" if self.accept_ranges else "none"))
+        if self.http_code == HTTPStatus.REQUESTED_RANGE_NOT_SATISFIABLE:
+            headers.append(("Content-Range", "bytes */{}".format(self.size)))
+            headers.append(("Content-Length", "0"))
+            return headers
+
+        headers.append(("Content-Disposition", self.content_disposition))
+        if self.boundary:
+            content_type = "multipart/byteranges; boundary={}".format(self.boundary)
+            content_length = sum(
+                len(part) if isinstance(part, bytes) else part[1] for part in self.get_parts()
+            )
+        else:
+            content_type = self._get_content_type()
+            content_length = self.ranges[0][1] if self.ranges else self.size
+
+        headers.append(("Content-Type", content_type))
+        if content_length is not None:
+            headers.append(("Content-Length", str(content_length)))
+        if self.ranges and not self.boundary:
+            headers.append(("Content-Range", self._get_content_range(self.ranges[0])))
+        return headers
+
+    def _get_content_type(self) -> str:
+        return self.mimetype or "application/octet-stream"
+
+    def _get_content_range(self, window: TYPE_FILE_WINDOW) -> str:
+        start, length = window
+        return "bytes {}-{}/{}".format(start, start + length - 1, self.size)
+
+    def get_parts(self) -> typing.List[typing.Union[bytes, TYPE_FILE_WINDOW]]:
+        """
+        :return: content of partial response: byte windows of file (with
+            absolute offsets) to send and multipart delimiters if many
+            ranges were requested
+        """
+        if not self.boundary:
+            return [(self.offset + start, length) for start, length in self.ranges]
+
+        parts = []
+        for index, window in enumerate(self.ranges):
+            parts.append(
+                "{}--{}\r\nContent-Type: {}\r\nContent-Range: {}\r\n\r\n".format(
+                    "\r\n" if index else "",
+                    self.boundary,
+                    self._get_content_type(),
+                    self._get_content_range(window),
+                ).encode("ascii")
+            )
+            parts.append((self.offset + window[0], window[1]))
+        parts.append("\r\n--{}--\r\n".format(self.boundary).encode("ascii"))
+        return parts
+
+    def open(self) -> typing.Any:
+        """
+        :return: file object to read (file of file_path is opened)
+        """
+        if self.file_response.file_path:
+            return open(self.file_response.file_path, "rb")
+        return self.file_response.file_object
+
+    def close(self) -> None:
+        """
+        Close file object of file response if response have no body
+        """
+        if self.file_response.file_object is not None:
+            self.file_response.file_object.close()
+
+
+def get_wsgi_file_body(
+    conditional_response: ConditionalFileResponse,
+    environ: typing.Dict[str, typing.Any],
+    chunk_size: int = DEFAULT_FILE_CHUNK_SIZE,
+) -> typing.Iterable[bytes]:
+    """
+    :param conditional_response: evaluated file response
+    :param environ: WSGI environ of current request
+    :param chunk_size: max size of read chunks
+    :return: WSGI response iterable of file response body
+    """
+    if not conditional_response.has_body:
+        conditional_response.close()
+        return []
+
+    file_object = conditional_response.open()
+    if conditional_response.ranges is None:
+        return get_wsgi_file_iterable(environ, file_object, chunk_size)
+    return get_file_ranges_chunks(file_object, conditional_response.get_parts(), chunk_size)
+
+
+class SpooledUploadFile(tempfile.SpooledTemporaryFile):
+    """
+    Temporary file receiving content of an uploaded file: content is kept in
+    memory until it exceed spool_threshold bytes, then it is moved to an
+    anonymous file on disk. Writes raise RequestBodyTooLargeException when
+    content exceed max_size bytes, so too large files are not fully read.
+    """
+
+    def __init__(self, spool_threshold: int, max_size: typing.Optional[int] = None) -> None:
+        """
+        :param spool_threshold: max size (in bytes) of content kept in memory
+        :param max_size: max size (in bytes) of content, None for no limit
+        """
+        super().__init__(max_size=spool_threshold)
+        self.upload_max_size = max_size
+        self.size = 0
+        # NOTE: SpooledTemporaryFile never roll over with a max_size of 0
+        if not spool_threshold:
+            self.rollover()
+
+    @property
+    def on_disk(self) -> bool:
+        return self._rolled
+
+    def write(self, data: bytes) -> int:
+        self.size += len(data)
+        if self.upload_max_size is not None and self.size > self.upload_max_size:
+            raise RequestBodyTooLargeException(
+                "Uploaded file exceed {} bytes".format(self.upload_max_size),
+                max_size=self.upload_max_size,
+                size=self.size,
+            )
+        return super().write(data)
+
+
+def get_upload_file_object(upload: typing.Any) -> typing.Any:
+    """
+    :param upload: uploaded file given by a framework (like werkzeug
+        FileStorage, aiohttp FileField, bottle FileUpload or cgi FieldStorage)
+    :return: file object of uploaded file content, or None if unknown
+    """
+    for attribute_name in ("file", "stream"):
+        file_object = getattr(upload, attribute_name, None)
+        if file_object is not None and hasattr(file_object, "read"):
+            return file_object
+    return None
+
+
+def check_uploads_size(uploads: typing.Any, max_size: int) -> None:
+    """
+    Check size of already read uploaded files: raise
+    RequestBodyTooLargeException if one of them exceed max_size bytes.
+    :param uploads: dict like of uploaded files
+    :param max_size: max size (in bytes) of an uploaded file
+    """
+    for upload in uploads.values():
+        file_object = get_upload_file_object(upload)
+        if file_object is None or not is_seekable(file_object):
+            continue
+
+        position = file_object.tell()
+        size = file_object.seek(0, io.SEEK_END)
+        file_object.seek(position)
+        if size > max_size:
+            raise RequestBodyTooLargeException(
+                "Uploaded file exceed {} bytes".format(max_size), max_size=max_size, size=size
+            )
+
+
+def close_uploads(uploads: typing.Any) -> None:
+    """
+    Close file objects (and so remove temporary files) of uploaded files.
+    :param uploads: dict like of uploaded files
+    """
+    for upload in uploads.values():
+        file_object = get_upload_file_object(upload)
+        if file_object is not None:
+            file_object.close()
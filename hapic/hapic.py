@@ -1,4 +1,5 @@
 # -*- coding: utf-8 -*-
+import concurrent.futures
 import functools
 import logging
 import os
@@ -6,16 +7,25 @@ import typing
 import uuid
 
 from hapic.buffer import DecorationBuffer
+from hapic.cache import AsyncOutputCache
+from hapic.cache import OutputCache
+from hapic.compression import RequestDecompression
+from hapic.compression import ResponseCompression
 from hapic.context import ContextInterface
+from hapic.data import HapicData
 from hapic.decorator import DECORATION_ATTRIBUTE_NAME
 from hapic.decorator import AsyncExceptionHandlerControllerWrapper
 from hapic.decorator import AsyncInputBodyControllerWrapper
 from hapic.decorator import AsyncInputFilesControllerWrapper
+from hapic.decorator import AsyncInputFormsControllerWrapper
 from hapic.decorator import AsyncInputPathControllerWrapper
 from hapic.decorator import AsyncInputQueryControllerWrapper
+from hapic.decorator import AsyncInputStreamControllerWrapper
 from hapic.decorator import AsyncOutputBodyControllerWrapper
+from hapic.decorator import AsyncOutputCacheControllerWrapper
 from hapic.decorator import AsyncOutputFileControllerWrapper
 from hapic.decorator import AsyncOutputStreamControllerWrapper
+from hapic.decorator import ControllerPipeline
 from hapic.decorator import ControllerReference
 from hapic.decorator import DecoratedController
 from hapic.decorator import ExceptionHandlerControllerWrapper
@@ -26,8 +36,10 @@ from hapic.decorator import InputHeadersControllerWrapper
 from hapic.decorator import InputPathControllerWrapper
 from hapic.decorator import InputQueryControllerWrapper
 from hapic.decorator import OutputBodyControllerWrapper
+from hapic.decorator import OutputCacheControllerWrapper
 from hapic.decorator import OutputFileControllerWrapper
 from hapic.decorator import OutputHeadersControllerWrapper
+from hapic.decorator import OutputStreamControllerWrapper
 from hapic.description import ErrorDescription
 from hapic.description import InputBodyDescription
 from hapic.description import InputFilesDescription
@@ -35,15 +47,26 @@ from hapic.description import InputFormsDescription
 from hapic.description import InputHeadersDescription
 from hapic.description import InputPathDescription
 from hapic.description import InputQueryDescription
+from hapic.description import InputStreamDescription
 from hapic.description import OutputBodyDescription
+from hapic.description import OutputCacheDescription
 from hapic.description import OutputFileDescription
 from hapic.description import OutputHeadersDescription
 from hapic.description import OutputStreamDescription
 from hapic.doc.main import DocGenerator
 from hapic.error.main import ErrorBuilderInterface
 from hapic.exception import ConfigurationException
+from hapic.json_backend import JsonBackend
+from hapic.json_backend import get_json_backend
 from hapic.processor.main import Processor
+from hapic.processor.main import processor_registry
+from hapic.stream import StreamFormat
+from hapic.stream import get_stream_format
 from hapic.util import LOGGER_NAME
+from hapic.validation import OUTPUT_VALIDATION_FULL
+from hapic.validation import AsyncShadowOutputValidator
+from hapic.validation import OutputValidation
+from hapic.validation import ShadowOutputValidator
 
 try:  # Python 3.5+
     from http import HTTPStatus
@@ -57,13 +80,51 @@ except ImportError:
 
 class Hapic(object):
     def __init__(
-        self, processor_class: typing.Optional[typing.Type[Processor]] = None, async_: bool = False
+        self,
+        processor_class: typing.Optional[typing.Type[Processor]] = None,
+        async_: bool = False,
+        fused_wrappers: bool = True,
+        output_validation: typing.Union[str, OutputValidation] = OUTPUT_VALIDATION_FULL,
+        json_backend: typing.Union[None, str, JsonBackend] = None,
+        compression: typing.Union[None, bool, ResponseCompression] = None,
+        decompression: typing.Union[None, bool, RequestDecompression] = None,
     ) -> None:
+        """
+        :param processor_class: default Processor class used by decorators
+        :param async_: produce async wrappers (eg. for aiohttp)
+        :param fused_wrappers: if True, with_api_doc fold hapic stacked
+        wrappers of controller into one wrapper (see ControllerPipeline)
+        :param output_validation: default output validation of output_body
+        and output_stream decorators: "full", "sample", "trusted", "auto",
+        "shadow" or OutputValidation instance (see
+        hapic.validation.OutputValidation)
+        :param json_backend: JSON backend given to context and used to
+        encode responses and decode requests: JsonBackend instance or backend
+        name ("stdlib", "orjson", "rapidjson", "ujson" or "auto" for fastest
+        installed one). If not given, context one is used (stdlib by default).
+        :param compression: gzip/deflate compression of responses, negotiated
+        with request Accept-Encoding header: True for default compression
+        (bodies of 1024 bytes or more) or ResponseCompression instance. Given
+        to context. Disabled by default.
+        :param decompression: decompression of gzip/deflate request bodies
+        (see Content-Encoding header) read by input decorators: True for
+        default decompression (maximum decompressed body size of 10 MiB) or
+        RequestDecompression instance (eg. to change maximum decompressed
+        body size). Given to context. Disabled by default.
+        """
         self._buffer = DecorationBuffer()
         self._controllers = []  # type: typing.List[DecoratedController]
         self._context = None  # type: ContextInterface
         self._error_builder = None  # type: ErrorBuilderInterface
         self._async = async_
+        self._fused_wrappers = fused_wrappers
+        self._output_validation = OutputValidation.from_value(output_validation)
+        self._shadow_validator = None  # type: ShadowOutputValidator
+        self._json_backend = None  # type: JsonBackend
+        if json_backend is not None:
+            self._json_backend = get_json_backend(json_backend)
+        self._compression = ResponseCompression.from_value(compression)
+        self._decompression = RequestDecompression.from_value(decompression)
         self.doc_generator = DocGenerator()
 
         self.logger = logging.getLogger(LOGGER_NAME)
@@ -107,11 +168,24 @@ class Hapic(object):
     def context(self) -> ContextInterface:
         return self._context
 
+    @property
+    def json_backend(self) -> typing.Optional[JsonBackend]:
+        return self._json_backend
+
     def set_context(self, context: ContextInterface) -> None:
         assert not self._context
         self._context = context
         self._context.set_processor_class(self.processor_class)
 
+        if self._json_backend is not None:
+            self._context.set_json_backend(self._json_backend)
+
+        if self._compression is not None:
+            self._context.set_compression(self._compression)
+
+        if self._decompression is not None:
+            self._context.set_decompression(self._decompression)
+
         try:
             self._context.default_error_builder
         except ConfigurationException:
@@ -147,6 +221,35 @@ class Hapic(object):
 
         return get_default_processor
 
+    @property
+    def shadow_validator(self) -> ShadowOutputValidator:
+        """
+        Default validator used by output validation in "shadow" mode. It is
+        created at first usage.
+        """
+        if self._shadow_validator is None:
+            if self._async:
+                self._shadow_validator = AsyncShadowOutputValidator()
+            else:
+                self._shadow_validator = ShadowOutputValidator()
+
+        return self._shadow_validator
+
+    def _get_output_validation(
+        self, output_validation: typing.Union[None, str, OutputValidation]
+    ) -> OutputValidation:
+        """
+        :param output_validation: decorator output validation parameter
+        :return: new OutputValidation for a decorator
+        """
+        output_validation = OutputValidation.from_value(
+            output_validation, default=self._output_validation
+        )
+        if output_validation.shadow and output_validation.shadow_validator is None:
+            output_validation.shadow_validator = self.shadow_validator
+
+        return output_validation
+
     def with_api_doc(self, tags: typing.List["str"] = None, disable_doc: bool = False):
         """
         Permit to generate doc about a controller. Use as a decorator:
@@ -158,7 +261,9 @@ class Hapic(object):
         ```
 
         What it do: Register this controller with all previous given
-        information like `@hapic.input_path(...)` etc.
+        information like `@hapic.input_path(...)` etc. If hapic is built with
+        `fused_wrappers`, returned wrapper run all hapic decorators stages in
+        one call instead of calling stacked wrappers.
 
         :param tags: list of string tags (OpenApi)
         :return: The decorator
@@ -168,9 +273,19 @@ class Hapic(object):
         tags = tags or []  # FDV
 
         def decorator(func):
-            @functools.wraps(func)
-            def wrapper(*args, **kwargs):
-                return func(*args, **kwargs)
+            pipeline = ControllerPipeline.from_decorated_function(func)
+
+            if self._fused_wrappers and pipeline.wrappers:
+                if self._async:
+                    wrapper = pipeline.get_async_wrapper()
+                else:
+                    wrapper = pipeline.get_wrapper()
+                wrapper = functools.update_wrapper(wrapper, func)
+            else:
+
+                @functools.wraps(func)
+                def wrapper(*args, **kwargs):
+                    return func(*args, **kwargs)
 
             token = uuid.uuid4().hex
             self.logger.debug(
@@ -202,9 +317,50 @@ class Hapic(object):
         context: ContextInterface = None,
         error_http_code: HTTPStatus = HTTPStatus.INTERNAL_SERVER_ERROR,
         default_http_code: HTTPStatus = HTTPStatus.OK,
+        output_validation: typing.Union[None, str, OutputValidation] = None,
+        etag: bool = False,
+        etag_func: typing.Optional[typing.Callable[[HapicData], typing.Any]] = None,
+        compress: bool = True,
+        stream: bool = False,
+        stream_chunk_size: int = 1000,
     ) -> typing.Callable[[typing.Callable[..., typing.Any]], typing.Any]:
+        """
+        Decorate with a wrapper who check and serialize view response.
+
+        :param schema: Schema of output
+        :param processor: Processor object to process with given
+        schema
+        :param context: Context to use here
+        :param error_http_code: http code in case of error
+        :param default_http_code: http code in case of success
+        :param output_validation: output validation mode ("full", "sample",
+        "trusted", "auto", "shadow") or OutputValidation instance. Default is
+        hapic output validation.
+        :param etag: if True, set a strong ETag header computed from
+        serialized response and return an empty 304 (not modified) response
+        if request If-None-Match header match with it
+        :param etag_func: cheap function returning a version token (like a
+        last update datetime) from validated hapic_data. It is called before
+        the view: if version match with request If-None-Match (or
+        If-Modified-Since for datetime versions) header, an empty 304 response
+        is returned without calling view. Else response have ETag (and
+        Last-Modified) header built from version. With async hapic, it can be
+        a coroutine function. Not usable with output_cache.
+        :param compress: if False, response is never compressed, even if
+        hapic compression is enabled (eg. for already compressed content)
+        :param stream: if True, view return an iterable of items (like a
+        generator, or an async generator with async hapic) and response is
+        written as a json array while items are serialized. Schema must
+        dump lists (eg. many=True marshmallow schema). Only first chunk
+        errors produce an error response: later errors interrupt response.
+        Not usable with etag, etag_func or output_cache.
+        :param stream_chunk_size: count of items serialized and encoded
+        together when stream is True: memory usage is bound by it
+        :return: decorator
+        """
         processor_factory = self._get_processor_factory(schema, processor)
         context = context or self._context_getter
+        output_validation = self._get_output_validation(output_validation)
 
         if self._async:
             decoration = AsyncOutputBodyControllerWrapper(
@@ -212,6 +368,12 @@ class Hapic(object):
                 processor_factory=processor_factory,
                 error_http_code=error_http_code,
                 default_http_code=default_http_code,
+                output_validation=output_validation,
+                etag=etag,
+                etag_func=etag_func,
+                compress=compress,
+                stream=stream,
+                stream_chunk_size=stream_chunk_size,
             )
         else:
             decoration = OutputBodyControllerWrapper(
@@ -219,6 +381,12 @@ class Hapic(object):
                 processor_factory=processor_factory,
                 error_http_code=error_http_code,
                 default_http_code=default_http_code,
+                output_validation=output_validation,
+                etag=etag,
+                etag_func=etag_func,
+                compress=compress,
+                stream=stream,
+                stream_chunk_size=stream_chunk_size,
             )
 
         def decorator(func):
@@ -235,10 +403,20 @@ class Hapic(object):
         error_http_code: HTTPStatus = HTTPStatus.INTERNAL_SERVER_ERROR,
         default_http_code: HTTPStatus = HTTPStatus.OK,
         ignore_on_error: bool = True,
+        output_validation: typing.Union[None, str, OutputValidation] = None,
+        compress: bool = True,
+        format: typing.Union[str, StreamFormat] = "text",
+        flush_size: int = 64 * 1024,
+        flush_interval: float = 0.05,
+        max_queue_size: int = 256,
+        executor: typing.Optional[concurrent.futures.Executor] = None,
+        max_in_flight: int = 16,
     ) -> typing.Callable[[typing.Callable[..., typing.Any]], typing.Any]:
         """
         Decorate with a wrapper who check and serialize each items in output
-        stream.
+        stream. With sync hapic, view must return an iterable of items (like
+        a generator): it is consumed while response is sent, so memory usage
+        does not depend on stream size.
 
         :param item_schema: Schema of output stream items
         :param processor: Processor object to process with given
@@ -248,10 +426,35 @@ class Hapic(object):
         :param default_http_code: http code in case of success
         :param ignore_on_error: if set, an error of serialization will be
         ignored: stream will not send this failed object
+        :param output_validation: stream items validation mode ("full",
+        "sample", "trusted", "auto", "shadow") or OutputValidation instance.
+        Default is hapic output validation.
+        :param compress: if False, stream is never compressed, even if hapic
+        compression is enabled. Else each written item is flushed to the
+        client through the compressed stream.
+        :param format: stream wire format: "text" (default, newline separated
+        json documents as text/plain), "ndjson" (application/x-ndjson),
+        "json" (items of a json array) or "sse" (text/event-stream, with
+        keep-alive comments on async streams). StreamFormat instance is
+        accepted to customize it, like SseStreamFormat(keep_alive_interval=5).
+        :param flush_size: (async only) serialized items are written by
+        batch when this bytes count is buffered. 0 write each item alone.
+        :param flush_interval: (async only) max time in seconds an item is
+        buffered before being written.
+        :param max_queue_size: (async only) max count of serialized items
+        waiting to be written. When reached (slow client), view items are no
+        longer consumed until some are written.
+        :param executor: (async only) thread or process pool executor used to
+        dump items out of event loop, for heavy items. Processor and items
+        must be picklable to use a process pool.
+        :param max_in_flight: (async only) with executor, max count of items
+        dumped at same time. Items are always written in view order.
         :return: decorator
         """
         processor_factory = self._get_processor_factory(item_schema, processor)
         context = context or self._context_getter
+        output_validation = self._get_output_validation(output_validation)
+        stream_format = get_stream_format(format)
 
         if self._async:
             decoration = AsyncOutputStreamControllerWrapper(
@@ -260,10 +463,26 @@ class Hapic(object):
                 error_http_code=error_http_code,
                 default_http_code=default_http_code,
                 ignore_on_error=ignore_on_error,
+                output_validation=output_validation,
+                compress=compress,
+                stream_format=stream_format,
+                flush_size=flush_size,
+                flush_interval=flush_interval,
+                max_queue_size=max_queue_size,
+                executor=executor,
+                max_in_flight=max_in_flight,
             )
         else:
-            # TODO BS 2018-07-25: To do
-            raise NotImplementedError("todo")
+            decoration = OutputStreamControllerWrapper(
+                context=context,
+                processor_factory=processor_factory,
+                error_http_code=error_http_code,
+                default_http_code=default_http_code,
+                ignore_on_error=ignore_on_error,
+                output_validation=output_validation,
+                compress=compress,
+                stream_format=stream_format,
+            )
 
         def decorator(func):
             self._buffer.output_stream = OutputStreamDescription(decoration)
@@ -295,6 +514,57 @@ class Hapic(object):
 
         return decorator
 
+    def output_cache(
+        self,
+        ttl: float = 60,
+        max_entries: int = 1024,
+        key: typing.Optional[typing.Callable[[HapicData], typing.Hashable]] = None,
+        headers: typing.Optional[typing.List[str]] = None,
+        cache: typing.Optional[OutputCache] = None,
+        context: ContextInterface = None,
+    ) -> typing.Callable[[typing.Callable[..., typing.Any]], typing.Any]:
+        """
+        Decorate with a wrapper who cache serialized responses of view. Must
+        be used above output_body decorator. Cache key is built from
+        validated input data: on cache hit, view is not called and response
+        is not serialized again. Concurrent requests of a not cached key
+        wait for one view call. Only success responses are cached.
+        output_body with stream or etag_func parameter can't be cached:
+        DecorationException is raised.
+
+        :param ttl: time to live of cached responses, in seconds
+        :param max_entries: max number of cached responses (least recently
+        used are dropped)
+        :param key: function returning hashable cache key from hapic_data.
+        Default key is built from validated path, query and headers given
+        by `headers` parameter.
+        :param headers: names of validated headers (see input_headers) to
+        use in default key
+        :param cache: OutputCache instance to use instead of build one with
+        ttl and max_entries. Its hits and misses attributes count cache hits
+        and misses.
+        :param context: Context to use here
+        :return: decorator
+        """
+        context = context or self._context_getter
+
+        if self._async:
+            cache = cache or AsyncOutputCache(ttl=ttl, max_entries=max_entries)
+            decoration = AsyncOutputCacheControllerWrapper(
+                context=context, cache=cache, key=key, headers=headers
+            )
+        else:
+            cache = cache or OutputCache(ttl=ttl, max_entries=max_entries)
+            decoration = OutputCacheControllerWrapper(
+                context=context, cache=cache, key=key, headers=headers
+            )
+
+        def decorator(func):
+            self._buffer.output_cache = OutputCacheDescription(decoration)
+            return decoration.get_wrapper(func)
+
+        return decorator
+
     # TODO BS 20171102: Think about possibilities to validate output ?
     # (with mime type, or validator)
     def output_file(
@@ -426,7 +696,35 @@ class Hapic(object):
         context: ContextInterface = None,
         error_http_code: HTTPStatus = HTTPStatus.BAD_REQUEST,
         default_http_code: HTTPStatus = HTTPStatus.OK,
+        stream_on_error: str = "abort",
+        stream_chunk_size: int = 64 * 1024,
+        stream_max_item_size: int = 1024 * 1024,
     ) -> typing.Callable[[typing.Callable[..., typing.Any]], typing.Any]:
+        """
+        Decorate with a wrapper who validate json request body and give it
+        to view as hapic_data.body.
+
+        If schema have a list field marked to be streamed (with marshmallow:
+        `fields.List(fields.Nested(ItemSchema), stream=True)`) and context
+        can read body incrementally (aiohttp, flask), body is parsed while
+        read: members before this field are validated before view call and
+        the field is given as an InputStream (async iterator with async
+        hapic) of validated elements, read while view iterate on it. Body
+        members after this field are not supported.
+
+        :param schema: Schema of body
+        :param processor: Processor object to process with given
+        schema
+        :param context: Context to use here
+        :param error_http_code: http code in case of error
+        :param default_http_code: http code in case of success
+        :param stream_on_error: invalid stream field element policy: "abort",
+        "skip" or "collect" (see input_stream)
+        :param stream_chunk_size: max size of body chunks read from socket
+        :param stream_max_item_size: max size of a stream field element, and
+        of other body members
+        :return: decorator
+        """
         processor_factory = self._get_processor_factory(schema, processor)
         context = context or self._context_getter
 
@@ -436,6 +734,9 @@ class Hapic(object):
                 processor_factory=processor_factory,
                 error_http_code=error_http_code,
                 default_http_code=default_http_code,
+                stream_on_error=stream_on_error,
+                stream_chunk_size=stream_chunk_size,
+                stream_max_item_size=stream_max_item_size,
             )
         else:
             decoration = InputBodyControllerWrapper(
@@ -443,6 +744,9 @@ class Hapic(object):
                 processor_factory=processor_factory,
                 error_http_code=error_http_code,
                 default_http_code=default_http_code,
+                stream_on_error=stream_on_error,
+                stream_chunk_size=stream_chunk_size,
+                stream_max_item_size=stream_max_item_size,
             )
 
         def decorator(func):
@@ -462,12 +766,20 @@ class Hapic(object):
         processor_factory = self._get_processor_factory(schema, processor)
         context = context or self._context_getter
 
-        decoration = InputFormsControllerWrapper(
-            context=context,
-            processor_factory=processor_factory,
-            error_http_code=error_http_code,
-            default_http_code=default_http_code,
-        )
+        if self._async:
+            decoration = AsyncInputFormsControllerWrapper(
+                context=context,
+                processor_factory=processor_factory,
+                error_http_code=error_http_code,
+                default_http_code=default_http_code,
+            )
+        else:
+            decoration = InputFormsControllerWrapper(
+                context=context,
+                processor_factory=processor_factory,
+                error_http_code=error_http_code,
+                default_http_code=default_http_code,
+            )
 
         def decorator(func):
             self._buffer.input_forms = InputFormsDescription(decoration)
@@ -482,7 +794,28 @@ class Hapic(object):
         context: ContextInterface = None,
         error_http_code: HTTPStatus = HTTPStatus.BAD_REQUEST,
         default_http_code: HTTPStatus = HTTPStatus.OK,
+        spool_threshold: typing.Optional[int] = None,
+        max_size: typing.Optional[int] = None,
     ) -> typing.Callable[[typing.Callable[..., typing.Any]], typing.Any]:
+        """
+        Decorate with a wrapper who give to view, as hapic_data.files,
+        validated uploaded files of a multipart request body.
+
+        :param schema: Schema of uploaded files
+        :param processor: Processor object to process with given
+        schema
+        :param context: Context to use here
+        :param error_http_code: http code in case of validation error
+        :param default_http_code: http code in case of success
+        :param spool_threshold: if given, multipart body is parsed while read
+        (with aiohttp and flask contexts): uploaded files bigger than this
+        size (in bytes) are written in temporary files instead of memory.
+        Uploaded files are closed (and temporary files removed) after view.
+        :param max_size: if given, max size (in bytes) of an uploaded file.
+        Bigger files produce a 413 error response (while read when body is
+        parsed while read, else after)
+        :return: decorator
+        """
         processor_factory = self._get_processor_factory(schema, processor)
         context = context or self._context_getter
 
@@ -492,6 +825,8 @@ class Hapic(object):
                 processor_factory=processor_factory,
                 error_http_code=error_http_code,
                 default_http_code=default_http_code,
+                spool_threshold=spool_threshold,
+                max_size=max_size,
             )
         else:
             decoration = InputFilesControllerWrapper(
@@ -499,6 +834,8 @@ class Hapic(object):
                 processor_factory=processor_factory,
                 error_http_code=error_http_code,
                 default_http_code=default_http_code,
+                spool_threshold=spool_threshold,
+                max_size=max_size,
             )
 
         def decorator(func):
@@ -507,6 +844,62 @@ class Hapic(object):
 
         return decorator
 
+    def input_stream(
+        self,
+        item_schema: typing.Any,
+        processor: Processor = None,
+        context: ContextInterface = None,
+        error_http_code: HTTPStatus = HTTPStatus.BAD_REQUEST,
+        default_http_code: HTTPStatus = HTTPStatus.OK,
+        on_error: str = "abort",
+        chunk_size: int = 64 * 1024,
+        max_line_size: int = 1024 * 1024,
+    ) -> typing.Callable[[typing.Callable[..., typing.Any]], typing.Any]:
+        """
+        Decorate with a wrapper who give to view, as hapic_data.stream, an
+        async iterator of validated items of a newline delimited json
+        request body (like application/x-ndjson). Body is read from socket
+        while view iterate, so memory usage does not depend on body size.
+        Only available with async hapic (ConfigurationException is raised
+        with sync hapic).
+
+        :param item_schema: Schema of input stream items
+        :param processor: Processor object to process with given
+        schema
+        :param context: Context to use here
+        :param error_http_code: http code of response when view does not
+        catch an invalid item error ("abort" policy)
+        :param default_http_code: http code in case of success
+        :param on_error: invalid item policy: "abort" (default, iteration
+        raise InputStreamValidationException), "skip" (item is ignored) or
+        "collect" (item is ignored and its error added to stream errors)
+        :param chunk_size: max size of body chunks read from socket
+        :param max_line_size: max size of a line, longer lines are not read
+        and considered as invalid items
+        :return: decorator
+        """
+        processor_factory = self._get_processor_factory(item_schema, processor)
+        context = context or self._context_getter
+
+        if self._async:
+            decoration = AsyncInputStreamControllerWrapper(
+                context=context,
+                processor_factory=processor_factory,
+                error_http_code=error_http_code,
+                default_http_code=default_http_code,
+                on_error=on_error,
+                chunk_size=chunk_size,
+                max_line_size=max_line_size,
+            )
+        else:
+            raise ConfigurationException("input_stream is only available with async hapic")
+
+        def decorator(func):
+            self._buffer.input_stream = InputStreamDescription(decoration)
+            return decoration.get_wrapper(func)
+
+        return decorator
+
     def handle_exception(
         self,
         handled_exception_class: typing.Type[Exception] = Exception,
@@ -527,7 +920,9 @@ class Hapic(object):
                 description=description,
                 # We must give a processor factory because wrapper will check
                 # it's own error format
-                processor_factory=lambda schema_: self.processor_class(schema_),
+                processor_factory=lambda schema_: processor_registry.get_processor(
+                    self.processor_class, schema_
+                ),
             )
 
         else:
@@ -539,7 +934,9 @@ class Hapic(object):
                 description=description,
                 # We must give a processor factory because wrapper will check
                 # it's own error format
-                processor_factory=lambda schema_: self.processor_class(schema_),
+                processor_factory=lambda schema_: processor_registry.get_processor(
+                    self.processor_class, schema_
+                ),
             )
 
         def decorator(func):
@@ -0,0 +1,173 @@
+# coding: utf-8
+import abc
+import json
+import typing
+
+from hapic.exception import ConfigurationException
+
+JSON_BACKEND_STDLIB = "stdlib"
+JSON_BACKEND_ORJSON = "orjson"
+JSON_BACKEND_RAPIDJSON = "rapidjson"
+JSON_BACKEND_UJSON = "ujson"
+JSON_BACKEND_AUTO = "auto"
+
+
+class JsonBackend(metaclass=abc.ABCMeta):
+    """
+    JSON encoder/decoder used by hapic for responses and requests bodies.
+    Decode must raise a ValueError subclass when given data is not valid
+    JSON.
+    """
+
+    @abc.abstractmethod
+    def encode(self, obj: typing.Any) -> bytes:
+        """
+        Must return utf-8 JSON representation of given object
+        :param obj: object to encode
+        :return: utf-8 encoded JSON
+        """
+
+    @abc.abstractmethod
+    def decode(self, data: typing.Union[bytes, str]) -> typing.Any:
+        """
+        Must return object represented by given JSON.
+        Raise ValueError if data is not valid JSON.
+        :param data: JSON, as str or utf-8 bytes
+        :return: decoded object
+        """
+
+    def dumps(self, obj: typing.Any) -> str:
+        """
+        :param obj: object to encode
+        :return: JSON representation of given object as str
+        """
+        return self.encode(obj).decode("utf-8")
+
+
+class StdlibJsonBackend(JsonBackend):
+    """
+    Default JSON backend, using python json module
+    """
+
+    def encode(self, obj: typing.Any) -> bytes:
+        return json.dumps(obj).encode("utf-8")
+
+    def decode(self, data: typing.Union[bytes, str]) -> typing.Any:
+        return json.loads(data)
+
+    def dumps(self, obj: typing.Any) -> str:
+        return json.dumps(obj)
+
+
+class OrjsonBackend(JsonBackend):
+    """
+    JSON backend using orjson (https://github.com/ijl/orjson). orjson
+    produce bytes without intermediate str.
+    """
+
+    def __init__(self) -> None:
+        try:
+            import orjson
+        except ImportError as exc:
+            raise ConfigurationException("orjson package is required by OrjsonBackend") from exc
+        self._orjson = orjson
+
+    def encode(self, obj: typing.Any) -> bytes:
+        return self._orjson.dumps(obj)
+
+    def decode(self, data: typing.Union[bytes, str]) -> typing.Any:
+        return self._orjson.loads(data)
+
+
+class RapidjsonBackend(JsonBackend):
+    """
+    JSON backend using python-rapidjson
+    (https://github.com/python-rapidjson/python-rapidjson)
+    """
+
+    def __init__(self) -> None:
+        try:
+            import rapidjson
+        except ImportError as exc:
+            raise ConfigurationException(
+                "python-rapidjson package is required by RapidjsonBackend"
+            ) from exc
+        self._rapidjson = rapidjson
+
+    def encode(self, obj: typing.Any) -> bytes:
+        return self._rapidjson.dumps(obj).encode("utf-8")
+
+    def decode(self, data: typing.Union[bytes, str]) -> typing.Any:
+        return self._rapidjson.loads(data)
+
+    def dumps(self, obj: typing.Any) -> str:
+        return self._rapidjson.dumps(obj)
+
+
+class UjsonBackend(JsonBackend):
+    """
+    JSON backend using ujson (https://github.com/ultrajson/ultrajson)
+    """
+
+    def __init__(self) -> None:
+        try:
+            import ujson
+        except ImportError as exc:
+            raise ConfigurationException("ujson package is required by UjsonBackend") from exc
+        self._ujson = ujson
+
+    def encode(self, obj: typing.Any) -> bytes:
+        return self._ujson.dumps(obj).encode("utf-8")
+
+    def decode(self, data: typing.Union[bytes, str]) -> typing.Any:
+        return self._ujson.loads(data)
+
+    def dumps(self, obj: typing.Any) -> str:
+        return self._ujson.dumps(obj)
+
+
+JSON_BACKENDS = {
+    JSON_BACKEND_STDLIB: StdlibJsonBackend,
+    JSON_BACKEND_ORJSON: OrjsonBackend,
+    JSON_BACKEND_RAPIDJSON: RapidjsonBackend,
+    JSON_BACKEND_UJSON: UjsonBackend,
+}  # type: typing.Dict[str, typing.Type[JsonBackend]]
+
+# Backends tried, in this order, by "auto" backend
+AUTO_JSON_BACKENDS = (
+    JSON_BACKEND_ORJSON,
+    JSON_BACKEND_RAPIDJSON,
+    JSON_BACKEND_UJSON,
+    JSON_BACKEND_STDLIB,
+)
+
+
+def get_json_backend(json_backend: typing.Union[None, str, JsonBackend] = None) -> JsonBackend:
+    """
+    Return JsonBackend instance matching with given value.
+    :param json_backend: JsonBackend instance or backend name (one of
+        JSON_BACKENDS keys, or "auto" for the fastest installed one). Default
+        is stdlib backend.
+    :return: JsonBackend instance
+    """
+    if isinstance(json_backend, JsonBackend):
+        return json_backend
+
+    if json_backend is None:
+        return StdlibJsonBackend()
+
+    if json_backend == JSON_BACKEND_AUTO:
+        for backend_name in AUTO_JSON_BACKENDS:
+            try:
+                return JSON_BACKENDS[backend_name]()
+            except ConfigurationException:
+                pass
+
+    try:
+        return JSON_BACKENDS[json_backend]()
+    except KeyError:
+        raise ConfigurationException(
+            'Unknown json backend "{}", must be one of: {}'.format(
+                json_backend, ", ".join(list(JSON_BACKENDS.keys()) + [JSON_BACKEND_AUTO])
+            )
+        )
@@ -1,6 +1,7 @@
 import abc
+from collections import OrderedDict
 from datetime import datetime
-import os
+import threading
 import typing
 
 from apispec import BasePlugin
@@ -9,6 +10,7 @@ from multidict.__init__ import MultiDict
 from hapic.data import HapicFile
 from hapic.doc.schema import SchemaUsage
 from hapic.exception import ConfigurationException
+from hapic.file import FILE_METADATA_CACHE
 
 if typing.TYPE_CHECKING:
     from hapic.type import TYPE_SCHEMA  # noqa: F401
@@ -61,6 +63,33 @@ class RequestParameters(object):
         self.header_parameters = header_parameters
         self.files_parameters = files_parameters
 
+    def get_body_chunks(
+        self, chunk_size: int
+    ) -> typing.Union[typing.Iterator[bytes], typing.AsyncIterator[bytes]]:
+        """
+        Read request body chunk by chunk, without buffering it. Raise
+        NotImplementedError if context can't read body like that.
+        :param chunk_size: max size of chunks (in bytes)
+        :return: iterator of body chunks (async iterator with async contexts)
+        """
+        raise NotImplementedError()
+
+    def get_spooled_files_parameters(
+        self, spool_threshold: int, max_size: typing.Optional[int] = None
+    ) -> typing.Any:
+        """
+        Parse multipart request body while reading it: uploaded files are
+        written in temporary files (see hapic.file.SpooledUploadFile) instead
+        of being buffered in memory. Raise NotImplementedError if context
+        can't parse body like that.
+        :param spool_threshold: max size (in bytes) of an uploaded file kept
+            in memory, bigger files are written on disk
+        :param max_size: max size (in bytes) of an uploaded file, reading
+            raise RequestBodyTooLargeException when it is exceeded
+        :return: files parameters (awaitable with async contexts)
+        """
+        raise NotImplementedError()
+
 
 class ProcessValidationError(object):
     def __init__(
@@ -71,6 +100,26 @@ class ProcessValidationError(object):
         self.original_exception = original_exception
 
 
+class StreamField(object):
+    """
+    Schema list field read incrementally: its elements are parsed and
+    validated while view iterate on it, instead of before view call.
+    """
+
+    def __init__(
+        self, key: str, attribute: str, load_item: typing.Callable[[typing.Any], typing.Any]
+    ) -> None:
+        """
+        :param key: key of field in request body
+        :param attribute: key of field in processed data
+        :param load_item: function validating an element of field (raise
+            ProcessException if invalid) and returning processed element
+        """
+        self.key = key
+        self.attribute = attribute
+        self.load_item = load_item
+
+
 class Processor(metaclass=abc.ABCMeta):
     def __init__(self, schema: typing.Optional["TYPE_SCHEMA"] = None) -> None:
         self._schema = schema
@@ -174,6 +223,42 @@ class Processor(metaclass=abc.ABCMeta):
         :return: dumped data
         """
 
+    def dump_without_validation(self, data: typing.Any) -> typing.Any:
+        """
+        Return dumped data without validate it. Used for trusted data like
+        hapic built error bodies. Default implementation use dump method,
+        processors should override it with a cheaper implementation.
+        :param data: data to dump
+        :return: dumped data
+        """
+        return self.dump(data)
+
+    def validate_dumped(self, dumped_data: typing.Any) -> None:
+        """
+        Validate data previously dumped by dump_without_validation (used by
+        shadow output validation).
+        Raise ValidationException if dumped data is not valid.
+        :param dumped_data: dumped data to validate
+        """
+        raise NotImplementedError()
+
+    def get_stream_field(self) -> typing.Optional[StreamField]:
+        """
+        :return: schema list field marked to be read incrementally, None if
+            schema have no such field (or processor does not support it)
+        """
+        return None
+
+    def load_stream_head(self, data: typing.Any) -> typing.Any:
+        """
+        Use schema to validate given data like load, excepted for stream field
+        which can be missing. Processed data must be a dict.
+        Raise ValidationException if validation fail.
+        :param data: data to validate and process, without stream field
+        :return: updated data (like with default values)
+        """
+        raise NotImplementedError()
+
     @abc.abstractmethod
     def load_files_input(self, input_data: typing.Any) -> typing.Any:
         """
@@ -205,7 +290,7 @@ class Processor(metaclass=abc.ABCMeta):
             error_message = "File should be either path or object, not both"
         elif not data.file_path and not data.file_object:
             error_message = "File should be either path or object"
-        elif data.file_path and not os.path.isfile(data.file_path):
+        elif data.file_path and FILE_METADATA_CACHE.get(data.file_path) is None:
             error_message = "File path is not correct, file do not exist"
         elif data.file_object and not data.mimetype:
             error_message = "File object should have explicit mimetype"
@@ -226,3 +311,84 @@ class Processor(metaclass=abc.ABCMeta):
         """
         :return: Default error builder to use for this processor
         """
+
+
+class ProcessorRegistry(object):
+    """
+    Registry of processor instances, keyed by processor class, schema and
+    processor parameters (like only, exclude, many). Processors and their
+    compiled serializers are expensive to build: use this registry where
+    a processor is needed for each response (like for errors).
+    """
+
+    def __init__(self, max_size: int = 256) -> None:
+        """
+        :param max_size: max number of kept processors. Least recently used
+            processors are dropped when this size is reached.
+        """
+        self._max_size = max_size
+        self._processors = OrderedDict()  # type: typing.Dict[typing.Hashable, Processor]
+        self._lock = threading.Lock()
+
+    def get_processor(
+        self,
+        processor_class: typing.Type[Processor],
+        schema: typing.Optional["TYPE_SCHEMA"] = None,
+        **processor_kwargs
+    ) -> Processor:
+        """
+        Return registered processor matching given parameters or create and
+        register it.
+        :param processor_class: Processor subclass
+        :param schema: schema to give to processor
+        :param processor_kwargs: processor parameters (like only, exclude,
+            many)
+        :return: Processor instance
+        """
+        try:
+            key = self._get_key(processor_class, schema, processor_kwargs)
+            hash(key)
+        except TypeError:
+            # Not hashable schema or parameter, processor can't be registered
+            return processor_class(schema, **processor_kwargs)
+
+        with self._lock:
+            try:
+                self._processors.move_to_end(key)
+                return self._processors[key]
+            except KeyError:
+                pass
+
+        processor = processor_class(schema, **processor_kwargs)
+
+        with self._lock:
+            processor = self._processors.setdefault(key, processor)
+            while len(self._processors) > self._max_size:
+                self._processors.popitem(last=False)
+
+        return processor
+
+    def clear(self) -> None:
+        with self._lock:
+            self._processors.clear()
+
+    def __len__(self) -> int:
+        return len(self._processors)
+
+    @staticmethod
+    def _get_key(
+        processor_class: typing.Type[Processor],
+        schema: typing.Optional["TYPE_SCHEMA"],
+        processor_kwargs: typing.Dict[str, typing.Any],
+    ) -> typing.Tuple[typing.Any, ...]:
+        return (
+            processor_class,
+            schema,
+            tuple(
+                (name, tuple(value) if isinstance(value, list) else value)
+                for name, value in sorted(processor_kwargs.items())
+            ),
+        )
+
+
+processor_registry = ProcessorRegistry()
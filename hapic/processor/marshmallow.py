@@ -1,9 +1,11 @@
+import functools
 import typing
 
 from apispec import BasePlugin
 from apispec_marshmallow_advanced import MarshmallowAdvancedPlugin
 from apispec_marshmallow_advanced.common import generate_schema_name
 from apispec_marshmallow_advanced.common import schema_class_resolver as schema_class_resolver_
+import marshmallow
 
 from hapic.doc.schema import SchemaUsage
 from hapic.error.main import ErrorBuilderInterface
@@ -12,6 +14,7 @@ from hapic.exception import OutputValidationException
 from hapic.exception import ValidationException
 from hapic.processor.main import Processor
 from hapic.processor.main import ProcessValidationError
+from hapic.processor.main import StreamField
 
 
 class MarshmallowProcessor(Processor):
@@ -128,7 +131,12 @@ class MarshmallowProcessor(Processor):
         clean_data = self.clean_data(data)
         unmarshall = self.schema.load(clean_data)
         if unmarshall.errors:
-            raise ValidationException("Error when loading: {}".format(str(unmarshall.errors)))
+            raise ValidationException(
+                "Error when loading: {}".format(str(unmarshall.errors)),
+                validation_error=ProcessValidationError(
+                    message="Validation error of input data", details=unmarshall.errors
+                ),
+            )
 
         return unmarshall.data
 
@@ -145,10 +153,97 @@ class MarshmallowProcessor(Processor):
         # Re-validate with dumped data
         errors = self.schema.load(dump_data).errors
         if errors:
-            raise ValidationException("Error when dumping: {}".format(str(errors)))
+            raise ValidationException(
+                "Error when dumping: {}".format(str(errors)),
+                validation_error=ProcessValidationError(
+                    message="Validation error of output data", details=errors
+                ),
+            )
 
         return dump_data
 
+    def dump_without_validation(self, data: typing.Any) -> typing.Any:
+        """
+        Use schema to dump given data without re-validate dumped data.
+        :param data: data to dump
+        :return: dumped data
+        """
+        return self.schema.dump(self.clean_data(data)).data
+
+    def validate_dumped(self, dumped_data: typing.Any) -> None:
+        """
+        Validate data previously dumped by dump_without_validation.
+        If validation fail, raise ValidationException
+        :param dumped_data: dumped data to validate
+        """
+        errors = self.schema.load(dumped_data).errors
+        if errors:
+            raise ValidationException(
+                "Error when validate dumped data: {}".format(str(errors)),
+                validation_error=ProcessValidationError(
+                    message="Validation error of output data", details=errors
+                ),
+            )
+
+    def get_stream_field(self) -> typing.Optional[StreamField]:
+        """
+        Stream field is a List field marked with stream metadata, like
+        `fields.List(fields.Nested(ItemSchema), stream=True)`.
+        :return: StreamField of schema stream field, if any
+        """
+        schema_field = self._get_stream_schema_field()
+        if schema_field is None:
+            return None
+
+        name, field = schema_field
+        return StreamField(
+            key=field.load_from or name,
+            attribute=field.attribute or name,
+            load_item=functools.partial(self._load_stream_item, field),
+        )
+
+    def load_stream_head(self, data: typing.Any) -> typing.Any:
+        """
+        Use schema to validate given data without stream field.
+        If validation fail, raise ValidationException
+        :param data: data to validate and process
+        :return: updated data (like with default values)
+        """
+        name, _ = self._get_stream_schema_field()
+        clean_data = self.clean_data(data)
+        unmarshall = self.schema.load(clean_data, partial=(name,))
+        if unmarshall.errors:
+            raise ValidationException(
+                "Error when loading: {}".format(str(unmarshall.errors)),
+                validation_error=ProcessValidationError(
+                    message="Validation error of input data", details=unmarshall.errors
+                ),
+            )
+
+        return unmarshall.data
+
+    def _get_stream_schema_field(
+        self,
+    ) -> typing.Optional[typing.Tuple[str, marshmallow.fields.List]]:
+        if self.schema.many:
+            return None
+
+        for name, field in self.schema.fields.items():
+            if isinstance(field, marshmallow.fields.List) and field.metadata.get("stream"):
+                return name, field
+        return None
+
+    def _load_stream_item(self, field: marshmallow.fields.List, data: typing.Any) -> typing.Any:
+        try:
+            return field.container.deserialize(data)
+        except marshmallow.ValidationError as exc:
+            raise ValidationException(
+                "Error when loading: {}".format(str(exc.messages)),
+                validation_error=ProcessValidationError(
+                    message="Validation error of input data", details=exc.messages
+                ),
+            ) from exc
+
     def load_files_input(self, input_data: typing.Any) -> typing.Any:
         """
         Validate input files and raise OutputValidationException if validation errors.
@@ -160,10 +255,15 @@ class MarshmallowProcessor(Processor):
         additional_errors = self._get_input_files_errors(unmarshall.data)
 
         if unmarshall.errors or additional_errors:
+            errors = dict(unmarshall.errors)
+            errors.update(additional_errors)
             raise OutputValidationException(
                 "Error when validate ouput: {}".format(
                     ", ".join([str(unmarshall.errors), str(additional_errors)])
-                )
+                ),
+                validation_error=ProcessValidationError(
+                    message="Validation error of input data", details=errors
+                ),
             )
 
         return unmarshall.data
@@ -199,7 +299,12 @@ class MarshmallowProcessor(Processor):
         # Validate
         errors = self.schema.load(dump_data).errors
         if errors:
-            raise OutputValidationException("Error when validate input: {}".format(str(errors)))
+            raise OutputValidationException(
+                "Error when validate input: {}".format(str(errors)),
+                validation_error=ProcessValidationError(
+                    message="Validation error of output data", details=errors
+                ),
+            )
 
         return dump_data
 
@@ -221,7 +326,11 @@ class MarshmallowProcessor(Processor):
         validation_error_message = self._get_ouput_file_validation_error_message(data)
         if validation_error_message:
             raise OutputValidationException(
-                "Error when validate output file : {}".format(validation_error_message)
+                "Error when validate output file : {}".format(validation_error_message),
+                validation_error=ProcessValidationError(
+                    message="Validation error of output file",
+                    details={"output_file": validation_error_message},
+                ),
             )
 
     @classmethod
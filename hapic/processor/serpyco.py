@@ -1,4 +1,5 @@
 import dataclasses
+import functools
 import logging
 import typing
 
@@ -23,6 +24,26 @@ from hapic.type import TYPE_SCHEMA
 from hapic.util import LOGGER_NAME
 
 
+@functools.lru_cache(maxsize=512)
+def _get_serializer(
+    schema: TYPE_SCHEMA,
+    only: typing.Optional[typing.Tuple[str, ...]],
+    exclude: typing.Optional[typing.Tuple[str, ...]],
+    many: bool,
+) -> Serializer:
+    """
+    Return serializer for given parameters. Serializers are cached because
+    building them (class introspection, validator compilation) is expensive.
+    """
+    return serpyco.Serializer(
+        schema,
+        only=list(only) if only is not None else None,
+        exclude=list(exclude) if exclude is not None else None,
+        many=many,
+        omit_none=False,
+    )
+
+
 class SerpycoProcessor(Processor):
     def __init__(
         self,
@@ -92,16 +113,19 @@ class SerpycoProcessor(Processor):
         :return: serializer instance
         """
         if self._serializer is None:
-            self._serializer = serpyco.Serializer(
+            self._serializer = _get_serializer(
                 self.schema,
-                only=self._only,
-                exclude=self._exclude,
-                many=self._many,
-                omit_none=False,
+                tuple(self._only) if self._only is not None else None,
+                tuple(self._exclude) if self._exclude is not None else None,
+                self._many,
             )
 
         return self._serializer
 
+    def set_schema(self, schema: typing.Any) -> None:
+        super().set_schema(schema)
+        self._serializer = None
+
     def clean_data(self, raw_data: typing.Any) -> dict:
         """
         Return given data. Update this method if potential "None" value must be adapted fo serpyco
@@ -205,10 +229,23 @@ class SerpycoProcessor(Processor):
         try:
             return self.serializer.load(data)
         except ValidationError as exc:
-            raise ValidationException("Error when loading: {}".format(exc.args[0])) from exc
+            raise ValidationException(
+                "Error when loading: {}".format(exc.args[0]),
+                validation_error=ProcessValidationError(
+                    message='Validation error of input data: "{}"'.format(exc.args[0]),
+                    details=exc.args[1],
+                    original_exception=exc,
+                ),
+            ) from exc
         except Exception as exc:
             raise ValidationException(
-                'Unknown error when serpyco load: "{}": "{}"'.format(type(exc).__name__, str(exc))
+                'Unknown error when serpyco load: "{}": "{}"'.format(type(exc).__name__, str(exc)),
+                validation_error=ProcessValidationError(
+                    message="Unknown error during validation "
+                    'of input data: "{}": "{}"'.format(type(exc).__name__, str(exc)),
+                    details={},
+                    original_exception=exc,
+                ),
             ) from exc
 
     def dump(self, data: typing.Any) -> typing.Any:
@@ -222,13 +259,52 @@ class SerpycoProcessor(Processor):
         try:
             return self.serializer.dump(data, validate=True)
         except ValidationError as exc:
-            raise ValidationException("Error when dumping: {}".format(exc.args[0])) from exc
+            raise ValidationException(
+                "Error when dumping: {}".format(exc.args[0]),
+                validation_error=ProcessValidationError(
+                    message='Validation error of output data: "{}"'.format(exc.args[0]),
+                    details=exc.args[1],
+                    original_exception=exc,
+                ),
+            ) from exc
         except Exception as exc:
             self._logger.exception(
                 'Unknown error during serpyco dump: "{}": "{}"'.format(type(exc).__name__, str(exc))
             )
             raise ValidationException(
-                'Unknown error when serpyco dump: "{}": "{}"'.format(type(exc).__name__, str(exc))
+                'Unknown error when serpyco dump: "{}": "{}"'.format(type(exc).__name__, str(exc)),
+                validation_error=ProcessValidationError(
+                    message="Unknown error during validation error "
+                    'of output data: "{}": "{}"'.format(type(exc).__name__, str(exc)),
+                    details={},
+                    original_exception=exc,
+                ),
+            ) from exc
+
+    def dump_without_validation(self, data: typing.Any) -> typing.Any:
+        """
+        Dump given data (like dataclass instance) without validation.
+        :param data: data to dump
+        :return: dumped data
+        """
+        return self.serializer.dump(data, validate=False)
+
+    def validate_dumped(self, dumped_data: typing.Any) -> None:
+        """
+        Validate data previously dumped by dump_without_validation.
+        If validation fail, raise ValidationException
+        :param dumped_data: dumped data to validate
+        """
+        try:
+            self.serializer.load(dumped_data, validate=True)
+        except ValidationError as exc:
+            raise ValidationException(
+                "Error when validate dumped data: {}".format(exc.args[0]),
+                validation_error=ProcessValidationError(
+                    message='Validation error of output data: "{}"'.format(exc.args[0]),
+                    details=exc.args[1],
+                    original_exception=exc,
+                ),
             ) from exc
 
     def load_files_input(self, input_data: typing.Dict[str, typing.Any]) -> object:
@@ -251,7 +327,11 @@ class SerpycoProcessor(Processor):
 
         if missing_names:
             raise OutputValidationException(
-                '"{}" files are missing'.format('", "'.join(missing_names))
+                '"{}" files are missing'.format('", "'.join(missing_names)),
+                validation_error=ProcessValidationError(
+                    message="Validation error of input data",
+                    details={name: "data is missing" for name in missing_names},
+                ),
             )
 
         return self.schema(**input_data)
@@ -274,7 +354,11 @@ class SerpycoProcessor(Processor):
         validation_error_message = self._get_ouput_file_validation_error_message(data)
         if validation_error_message:
             raise OutputValidationException(
-                "Error when validate output file : {}".format(validation_error_message)
+                "Error when validate output file : {}".format(validation_error_message),
+                validation_error=ProcessValidationError(
+                    message="Validation error of output file",
+                    details={"output_file": validation_error_message},
+                ),
             )
 
     @classmethod
@@ -0,0 +1,703 @@
+# -*- coding: utf-8 -*-
+import asyncio
+import json
+import re
+import typing
+
+from hapic.exception import ConfigurationException
+from hapic.exception import InputStreamValidationException
+from hapic.exception import ProcessException
+from hapic.exception import ValidationException
+from hapic.processor.main import ProcessValidationError
+
+# Put in queue by producer when all chunks have been produced
+_END_OF_STREAM = object()
+# json structural characters (out of strings) and string special characters
+_JSON_STRUCTURE_RE = re.compile(rb'[\[\]{}",:]')
+_JSON_STRING_RE = re.compile(rb'["\\]')
+_JSON_WHITESPACES = b" \t\n\r"
+
+
+class StreamFormat(object):
+    """
+    Wire format of output streams: how encoded items are framed in response
+    body. Framing is made item by item, so streams are never buffered.
+    """
+
+    name = "text"
+    mimetype = "text/plain; charset=utf-8"
+    # additional response headers
+    headers = []  # type: typing.List[typing.Tuple[str, str]]
+    # chunk written when no item was written since keep_alive_interval
+    # seconds (async streams only), to prevent proxies to close connection
+    keep_alive_chunk = None  # type: typing.Optional[bytes]
+    keep_alive_interval = 15.0
+
+    def get_start(self) -> bytes:
+        """:return: bytes written before first item"""
+        return b""
+
+    def get_item(self, encoded_item: bytes, index: int) -> bytes:
+        """
+        :param encoded_item: json encoded item
+        :param index: position of item in stream
+        :return: bytes written for this item
+        """
+        return encoded_item + b"\n"
+
+    def get_end(self) -> bytes:
+        """:return: bytes written after last item"""
+        return b""
+
+    def get_chunks(self, encoded_items: typing.Iterable[bytes]) -> typing.Iterator[bytes]:
+        """
+        :param encoded_items: json encoded items
+        :return: lazy iterator of response body chunks
+        """
+        start = self.get_start()
+        if start:
+            yield start
+        for index, encoded_item in enumerate(encoded_items):
+            yield self.get_item(encoded_item, index)
+        end = self.get_end()
+        if end:
+            yield end
+
+
+class NdjsonStreamFormat(StreamFormat):
+    """Newline delimited json documents (http://ndjson.org)"""
+
+    name = "ndjson"
+    mimetype = "application/x-ndjson"
+
+
+class JsonArrayStreamFormat(StreamFormat):
+    """Body is a json array, for clients only able to parse json documents"""
+
+    name = "json"
+    mimetype = "application/json"
+
+    def get_start(self) -> bytes:
+        return b"["
+
+    def get_item(self, encoded_item: bytes, index: int) -> bytes:
+        if index:
+            return b"," + encoded_item
+        return encoded_item
+
+    def get_end(self) -> bytes:
+        return b"]"
+
+
+class JsonArrayChunksStreamFormat(JsonArrayStreamFormat):
+    """
+    Like JsonArrayStreamFormat, but each encoded item is a json array of
+    several items (a chunk): chunks are joined into one json array. Used by
+    output_body stream responses to encode items by chunks.
+    """
+
+    name = "json_chunks"
+
+    def get_item(self, encoded_item: bytes, index: int) -> bytes:
+        # NOTE: chunks are never empty, their brackets are removed
+        return super().get_item(encoded_item.strip()[1:-1], index)
+
+
+class SseStreamFormat(StreamFormat):
+    """
+    Server-Sent Events: each item is the data of a message event. A comment
+    is written as keep-alive when stream is idle.
+    """
+
+    name = "sse"
+    mimetype = "text/event-stream"
+    headers = [("Cache-Control", "no-cache")]
+    keep_alive_chunk = b": keep-alive\n\n"
+
+    def __init__(self, keep_alive_interval: float = 15.0) -> None:
+        """
+        :param keep_alive_interval: idle time in seconds before writing a
+            keep-alive comment
+        """
+        if keep_alive_interval <= 0:
+            raise ConfigurationException("keep_alive_interval must be greater than 0")
+        self.keep_alive_interval = keep_alive_interval
+
+    def get_item(self, encoded_item: bytes, index: int) -> bytes:
+        # NOTE: a data line can't contain a line break, encoded item lines
+        # (if any) are sent as many data lines
+        return b"data: " + encoded_item.replace(b"\n", b"\ndata: ") + b"\n\n"
+
+
+DEFAULT_STREAM_FORMAT = StreamFormat()
+JSON_ARRAY_CHUNKS_STREAM_FORMAT = JsonArrayChunksStreamFormat()
+
+STREAM_FORMATS = {
+    stream_format_class.name: stream_format_class
+    for stream_format_class in (
+        StreamFormat,
+        NdjsonStreamFormat,
+        JsonArrayStreamFormat,
+        SseStreamFormat,
+    )
+}  # type: typing.Dict[str, typing.Type[StreamFormat]]
+
+
+def get_stream_format(value: typing.Union[str, StreamFormat]) -> StreamFormat:
+    """
+    :param value: stream format name ("text", "ndjson", "json", "sse") or
+        StreamFormat instance
+    :return: StreamFormat instance
+    """
+    if isinstance(value, StreamFormat):
+        return value
+
+    try:
+        return STREAM_FORMATS[value]()
+    except KeyError:
+        raise ConfigurationException(
+            'Unknown stream format "{}", available formats are: {}'.format(
+                value, ", ".join(STREAM_FORMATS)
+            )
+        )
+
+
+class BufferedStreamWriter(object):
+    """
+    Write chunks of an async stream by batch: chunks are buffered and
+    written together when flush_size bytes are buffered or when oldest
+    buffered chunk waited flush_interval seconds, whichever comes first.
+
+    Chunks production (serialization) and writing are decoupled with a
+    bounded queue: when client read slowly, write wait for it, queue become
+    full and chunks production is paused instead of growing memory.
+    """
+
+    def __init__(
+        self,
+        flush_size: int = 64 * 1024,
+        flush_interval: float = 0.05,
+        max_queue_size: int = 256,
+    ) -> None:
+        """
+        :param flush_size: buffered bytes count triggering a write. If 0,
+            each chunk is written as soon as it is produced.
+        :param flush_interval: max time (in seconds) a chunk can be
+            buffered before being written
+        :param max_queue_size: max number of produced chunks waiting to be
+            buffered
+        """
+        if flush_size < 0 or flush_interval < 0:
+            raise ConfigurationException("flush_size and flush_interval must be positive")
+        if max_queue_size < 1:
+            raise ConfigurationException("max_queue_size must be greater than 0")
+
+        self.flush_size = flush_size
+        self.flush_interval = flush_interval
+        self.max_queue_size = max_queue_size
+
+    async def write_chunks(
+        self,
+        chunks: typing.AsyncIterable[bytes],
+        write: typing.Callable[[bytes], typing.Awaitable[None]],
+        keep_alive_chunk: typing.Optional[bytes] = None,
+        keep_alive_interval: float = 15.0,
+    ) -> None:
+        """
+        Produce given chunks in a separated task and write them with given
+        write coroutine function until end of chunks. Exception raised by
+        chunks production is raised here after previously produced chunks
+        have been written.
+        :param keep_alive_chunk: if given, chunk written each time nothing
+            was written since keep_alive_interval seconds
+        """
+        queue = asyncio.Queue(maxsize=self.max_queue_size)
+        producer = asyncio.ensure_future(self._produce_chunks(chunks, queue))
+        try:
+            await self._write_queued_chunks(queue, write, keep_alive_chunk, keep_alive_interval)
+        finally:
+            if not producer.done():
+                producer.cancel()
+
+    async def _produce_chunks(
+        self, chunks: typing.AsyncIterable[bytes], queue: asyncio.Queue
+    ) -> None:
+        try:
+            async for chunk in chunks:
+                await queue.put(chunk)
+        except Exception as exc:
+            # NOTE: writer is still consuming queue, so this put can't block
+            # forever. Writer raise it after previous chunks written.
+            await queue.put(exc)
+        else:
+            await queue.put(_END_OF_STREAM)
+        finally:
+            # NOTE: if writer stopped (cancellation, write error), chunks
+            # generator is closed now instead of when garbage collected
+            aclose = getattr(chunks, "aclose", None)
+            if aclose is not None:
+                await aclose()
+
+    async def _write_queued_chunks(
+        self,
+        queue: asyncio.Queue,
+        write: typing.Callable[[bytes], typing.Awaitable[None]],
+        keep_alive_chunk: typing.Optional[bytes],
+        keep_alive_interval: float,
+    ) -> None:
+        loop = asyncio.get_event_loop()
+        buffer = []  # type: typing.List[bytes]
+        buffer_size = 0
+        flush_deadline = 0.0
+        getter = None  # type: typing.Optional[asyncio.Future]
+
+        try:
+            while True:
+                if getter is None and not queue.empty():
+                    # fast path: no need to suspend while chunks are queued
+                    chunk = queue.get_nowait()
+                else:
+                    # NOTE: same getter is kept after a timeout so queued
+                    # chunks are always received in order
+                    if getter is None:
+                        getter = asyncio.ensure_future(queue.get())
+                    if buffer:
+                        await asyncio.wait((getter,), timeout=flush_deadline - loop.time())
+                        if not getter.done():
+                            await write(b"".join(buffer))
+                            buffer = []
+                            buffer_size = 0
+                            continue
+                    elif keep_alive_chunk is not None:
+                        await asyncio.wait((getter,), timeout=keep_alive_interval)
+                        if not getter.done():
+                            await write(keep_alive_chunk)
+                            continue
+                    chunk = await getter
+                    getter = None
+
+                if chunk is _END_OF_STREAM or isinstance(chunk, Exception):
+                    if buffer:
+                        await write(b"".join(buffer))
+                    if chunk is not _END_OF_STREAM:
+                        raise chunk
+                    return
+
+                if not buffer:
+                    flush_deadline = loop.time() + self.flush_interval
+                buffer.append(chunk)
+                buffer_size += len(chunk)
+
+                if buffer_size >= self.flush_size or loop.time() >= flush_deadline:
+                    await write(b"".join(buffer))
+                    buffer = []
+                    buffer_size = 0
+        finally:
+            if getter is not None:
+                getter.cancel()
+
+
+INPUT_STREAM_ERROR_POLICIES = ("abort", "skip", "collect")
+
+
+def check_input_stream_error_policy(value: str) -> str:
+    """
+    :param value: input stream error policy ("abort", "skip", "collect")
+    :return: given value if it is a known error policy
+    """
+    if value not in INPUT_STREAM_ERROR_POLICIES:
+        raise ConfigurationException(
+            'Unknown input stream error policy "{}", available policies are: {}'.format(
+                value, ", ".join(INPUT_STREAM_ERROR_POLICIES)
+            )
+        )
+    return value
+
+
+async def get_lines(
+    chunks: typing.AsyncIterable[bytes], max_line_size: int
+) -> typing.AsyncIterator[typing.Optional[bytes]]:
+    """
+    Split given chunks into lines (without their newline). Lines longer
+    than max_line_size bytes are not buffered: they are discarded until
+    their end and None is given instead, so memory usage stay bounded.
+    :param chunks: body chunks
+    :param max_line_size: max size of a line (in bytes)
+    :return: async iterator of lines
+    """
+    buffer = bytearray()
+    too_long = False
+    try:
+        async for chunk in chunks:
+            start = 0
+            while True:
+                end = chunk.find(b"\n", start)
+                if end == -1:
+                    if not too_long:
+                        buffer.extend(chunk[start:])
+                        if len(buffer) > max_line_size:
+                            buffer.clear()
+                            too_long = True
+                    break
+
+                if too_long or len(buffer) + end - start > max_line_size:
+                    yield None
+                elif buffer:
+                    buffer.extend(chunk[start:end])
+                    yield bytes(buffer)
+                else:
+                    # NOTE: most lines are entirely in one chunk: no copy in
+                    # buffer for them
+                    yield chunk[start:end]
+                buffer.clear()
+                too_long = False
+                start = end + 1
+
+        if too_long:
+            yield None
+        elif buffer:
+            yield bytes(buffer)
+    finally:
+        aclose = getattr(chunks, "aclose", None)
+        if aclose is not None:
+            await aclose()
+
+
+class JsonArrayMemberParser(object):
+    """
+    Incremental parser of a json object document with a large array member.
+    Members before the array (the head) are buffered, then array elements are
+    split one by one as soon as they are complete: memory usage track one
+    element instead of whole document. Parser does not decode elements, it
+    only split them.
+    """
+
+    # parser states: members before array, between key and array, array
+    # elements, after array
+    HEAD = "head"
+    ARRAY_START = "array_start"
+    ELEMENTS = "elements"
+    TAIL = "tail"
+
+    def __init__(self, key: str, max_size: int = 1024 * 1024) -> None:
+        """
+        :param key: key of the array member in json object
+        :param max_size: max size of an element, and of members before and
+            after array (in bytes)
+        """
+        self.key = key
+        self.max_size = max_size
+        self.state = self.HEAD
+        # json object of members before the array, known when array start
+        # is read (or at end if there is no array for key)
+        self.head = None  # type: typing.Optional[bytes]
+        # members after array, known at end
+        self.tail = None  # type: typing.Optional[bytes]
+        self._buffer = bytearray()
+        self._position = 0
+        self._depth = 0
+        self._in_string = False
+        self._escaped = False
+        self._string_start = 0
+        self._last_string = None  # type: typing.Optional[typing.Tuple[int, int]]
+        self._key_start = 0
+        self._too_long = False
+
+    @property
+    def array_found(self) -> bool:
+        return self.state in (self.ELEMENTS, self.TAIL)
+
+    def feed(self, chunk: bytes) -> typing.List[typing.Optional[bytes]]:
+        """
+        Parse given chunk of document.
+        Raise ValueError if head or tail exceed max_size.
+        :param chunk: next bytes of document
+        :return: array elements completed by this chunk (None for elements
+            longer than max_size, which are not kept)
+        """
+        elements = []  # type: typing.List[typing.Optional[bytes]]
+        self._buffer.extend(chunk)
+        self._scan(elements)
+
+        if len(self._buffer) > self.max_size:
+            if self.state != self.ELEMENTS:
+                raise ValueError("Json members exceed {} bytes".format(self.max_size))
+            # NOTE: scanned bytes of current element are dropped, scan
+            # state is enough to find its end
+            self._too_long = True
+            del self._buffer[: self._position]
+            self._position = 0
+
+        return elements
+
+    def close(self) -> None:
+        """
+        Finish parsing at end of document.
+        Raise ValueError if document ended in the array.
+        """
+        if self.state == self.HEAD:
+            self.head = bytes(self._buffer)
+        elif self.state == self.TAIL:
+            self.tail = bytes(self._buffer)
+        else:
+            raise ValueError('Unexpected end of json document in "{}" array'.format(self.key))
+        self._buffer = bytearray()
+
+    @property
+    def has_tail_members(self) -> bool:
+        """:return: True if document have members after array"""
+        return self.tail is not None and self.tail.strip(_JSON_WHITESPACES) != b"}"
+
+    def _add_element(self, elements: typing.List[typing.Optional[bytes]], end: int) -> None:
+        if self._too_long or end > self.max_size:
+            elements.append(None)
+            self._too_long = False
+            return
+
+        element = bytes(self._buffer[:end]).strip(_JSON_WHITESPACES)
+        if element:
+            elements.append(element)
+
+    def _scan(self, elements: typing.List[typing.Optional[bytes]]) -> None:
+        buffer = self._buffer
+        position = self._position
+
+        while position < len(buffer):
+            if self.state == self.ARRAY_START:
+                while position < len(buffer) and buffer[position] in _JSON_WHITESPACES:
+                    position += 1
+                if position == len(buffer):
+                    break
+                if buffer[position] == ord("["):
+                    head = bytes(buffer[: self._key_start]).rstrip(_JSON_WHITESPACES)
+                    self.head = head.rstrip(b",") + b"}"
+                    if len(self.head) > self.max_size:
+                        raise ValueError("Json members exceed {} bytes".format(self.max_size))
+                    self.state = self.ELEMENTS
+                    self._depth += 1
+                    del buffer[: position + 1]
+                    position = 0
+                else:
+                    # NOTE: member is not an array, it is part of head
+                    self.state = self.HEAD
+                continue
+
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                    position += 1
+                    continue
+                match = _JSON_STRING_RE.search(buffer, position)
+                if match is None:
+                    position = len(buffer)
+                    break
+                position = match.end()
+                if buffer[match.start()] == ord("\\"):
+                    self._escaped = True
+                    continue
+                self._in_string = False
+                if self._depth == 1 and self.state == self.HEAD:
+                    self._last_string = (self._string_start, position)
+                continue
+
+            match = _JSON_STRUCTURE_RE.search(buffer, position)
+            if match is None:
+                position = len(buffer)
+                break
+            index = match.start()
+            char = buffer[index]
+            position = index + 1
+
+            if char == ord('"'):
+                self._in_string = True
+                self._string_start = index
+                continue
+            if char in b"[{":
+                self._depth += 1
+            elif char in b"]}":
+                self._depth -= 1
+                if self.state == self.ELEMENTS and self._depth == 1:
+                    self._add_element(elements, index)
+                    self.state = self.TAIL
+                    del buffer[:position]
+                    position = 0
+            elif char == ord(","):
+                if self.state == self.ELEMENTS and self._depth == 2:
+                    self._add_element(elements, index)
+                    del buffer[:position]
+                    position = 0
+            elif char == ord(":") and self._depth == 1 and self._last_string is not None:
+                key_start, key_end = self._last_string
+                if json.loads(bytes(buffer[key_start:key_end])) == self.key:
+                    self.state = self.ARRAY_START
+                    self._key_start = key_start
+            self._last_string = None
+
+        self._position = position
+
+
+class InputStreamError(object):
+    def __init__(self, line_number: int, validation_error: ProcessValidationError) -> None:
+        """
+        :param line_number: line of invalid item in stream (starting at 1)
+        :param validation_error: detail of item validation error
+        """
+        self.line_number = line_number
+        self.validation_error = validation_error
+
+
+class InputStream(object):
+    """
+    Iterator of validated items of a streamed request body, like a newline
+    delimited json body. Items are read, decoded and validated one by one
+    while iterating, so memory usage does not depend on body size. It is an
+    async iterator with async contexts and an iterator with others.
+
+    When an item is invalid, on_error policy is applied:
+    - "abort": InputStreamValidationException is raised by iteration
+    - "skip": item is ignored
+    - "collect": item is ignored and its error is added to errors
+    """
+
+    def __init__(
+        self,
+        lines: typing.Union[
+            typing.Iterable[typing.Optional[bytes]], typing.AsyncIterable[typing.Optional[bytes]]
+        ],
+        decode: typing.Callable[[bytes], typing.Any],
+        load: typing.Callable[[typing.Any], typing.Any],
+        on_error: str = "abort",
+        error_caught: typing.Optional[typing.Callable[[ProcessException], None]] = None,
+        location_format: str = "line {}",
+    ) -> None:
+        """
+        :param lines: encoded items, None for an item too long to be read.
+            If it raises ProcessException (like a malformed body), iteration
+            raises InputStreamValidationException, whatever is on_error.
+        :param decode: function decoding json of a line
+        :param load: function validating a decoded item and returning
+            processed item (raise ProcessException if item is invalid)
+        :param on_error: invalid item policy: "abort", "skip" or "collect"
+        :param error_caught: function called with exception of each invalid
+            item, whatever is on_error
+        :param location_format: format of item location in error messages,
+            formatted with item number (starting at 1)
+        """
+        self._lines = lines
+        self._decode = decode
+        self._load = load
+        self._error_caught = error_caught
+        self._location_format = location_format
+        self.on_error = check_input_stream_error_policy(on_error)
+        # count of valid items given by iteration
+        self.items_count = 0
+        # errors of invalid items, with "collect" policy only
+        self.errors = []  # type: typing.List[InputStreamError]
+
+    def __aiter__(self) -> typing.AsyncIterator[typing.Any]:
+        return self._get_items()
+
+    def __iter__(self) -> typing.Iterator[typing.Any]:
+        return self._get_sync_items()
+
+    async def _get_items(self) -> typing.AsyncIterator[typing.Any]:
+        line_number = 0
+        try:
+            async for line in self._lines:
+                line_number += 1
+                is_item, item = self._read_line(line, line_number)
+                if is_item:
+                    yield item
+        except InputStreamValidationException:
+            raise
+        except ProcessException as exc:
+            raise self._get_stream_exception(exc, line_number) from exc
+        finally:
+            aclose = getattr(self._lines, "aclose", None)
+            if aclose is not None:
+                await aclose()
+
+    # NOTE: sync version of _get_items. TAG: REFACT_ASYNC
+    def _get_sync_items(self) -> typing.Iterator[typing.Any]:
+        line_number = 0
+        try:
+            for line in self._lines:
+                line_number += 1
+                is_item, item = self._read_line(line, line_number)
+                if is_item:
+                    yield item
+        except InputStreamValidationException:
+            raise
+        except ProcessException as exc:
+            raise self._get_stream_exception(exc, line_number) from exc
+        finally:
+            close = getattr(self._lines, "close", None)
+            if close is not None:
+                close()
+
+    def _read_line(
+        self, line: typing.Optional[bytes], line_number: int
+    ) -> typing.Tuple[bool, typing.Any]:
+        """
+        :return: (True, processed item) or (False, None) if line is blank
+            or its item is ignored
+        """
+        if line is not None and not line.strip():
+            return False, None
+
+        try:
+            item = self._get_item(line, line_number)
+        except ProcessException as exc:
+            validation_error = self._get_validation_error(exc, line_number)
+            if self._error_caught is not None:
+                self._error_caught(exc)
+            if self.on_error == "abort":
+                raise InputStreamValidationException(
+                    validation_error.message, validation_error=validation_error, input_stream=self
+                ) from exc
+            if self.on_error == "collect":
+                self.errors.append(InputStreamError(line_number, validation_error))
+            return False, None
+
+        self.items_count += 1
+        return True, item
+
+    def _get_item(self, line: typing.Optional[bytes], line_number: int) -> typing.Any:
+        location = self._location_format.format(line_number)
+        if line is None:
+            raise ValidationException("Item at {} is too long".format(location))
+
+        try:
+            data = self._decode(line)
+        except ValueError as exc:
+            raise ValidationException(
+                "Item at {} is not valid json: {}".format(location, exc)
+            ) from exc
+
+        return self._load(data)
+
+    def _get_validation_error(
+        self, exc: ProcessException, line_number: int
+    ) -> ProcessValidationError:
+        if exc.validation_error is None:
+            return ProcessValidationError(message=str(exc), details={}, original_exception=exc)
+
+        return ProcessValidationError(
+            message="Validation error of input stream item at {}".format(
+                self._location_format.format(line_number)
+            ),
+            details=exc.validation_error.details,
+            original_exception=exc,
+        )
+
+    def _get_stream_exception(
+        self, exc: ProcessException, line_number: int
+    ) -> InputStreamValidationException:
+        validation_error = exc.validation_error or ProcessValidationError(
+            message=str(exc), details={}, original_exception=exc
+        )
+        if self._error_caught is not None:
+            self._error_caught(exc)
+        return InputStreamValidationException(
+            validation_error.message, validation_error=validation_error, input_stream=self
+        )
@@ -4,3 +4,8 @@ import typing
 # Note: Schema can be anything. This is the Processor
 # responsability to be able deal with it.
 TYPE_SCHEMA = typing.Any
+# Response body given to contexts: str will be utf-8 encoded, bytes like
+# objects are used as is
+TYPE_RESPONSE_BODY = typing.Union[str, bytes, memoryview]
+# Additional response headers given to contexts
+TYPE_RESPONSE_HEADERS = typing.List[typing.Tuple[str, str]]
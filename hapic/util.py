@@ -1,11 +1,157 @@
 # -*- coding: utf-8 -*-
+from datetime import datetime
+from datetime import timezone
+import email.utils
+import hashlib
 import typing
 
 from hapic.exception import NotLowercaseCaseException
+from hapic.type import TYPE_RESPONSE_BODY
 
 LOGGER_NAME = "hapic"
 
 
+def get_response_body_bytes(
+    body: TYPE_RESPONSE_BODY, encoding: str = "utf-8"
+) -> typing.Union[bytes, memoryview]:
+    """
+    Return given response body as bytes like object. Only str body is
+    encoded (copied), bytes and memoryview are returned as is.
+    :param body: response body
+    :param encoding: encoding to use if body is a str
+    :return: bytes like body
+    """
+    if isinstance(body, str):
+        return body.encode(encoding)
+    return body
+
+
+def get_response_body_length(body: typing.Union[bytes, memoryview]) -> int:
+    """
+    :param body: bytes like response body
+    :return: body length in bytes (Content-Length value)
+    """
+    if isinstance(body, memoryview):
+        return body.nbytes
+    return len(body)
+
+
+def is_body_allowed(http_code: int) -> bool:
+    """
+    :param http_code: response http code
+    :return: False if response with this http code must not have body (and
+        Content-Type), see https://tools.ietf.org/html/rfc7230#section-3.3
+    """
+    return not (http_code in (204, 304) or 100 <= http_code <= 199)
+
+
+def get_body_etag(body: typing.Union[bytes, memoryview]) -> str:
+    """
+    :param body: bytes like response body
+    :return: strong ETag header value computed from given body
+    """
+    return '"{}"'.format(hashlib.blake2b(body, digest_size=16).hexdigest())
+
+
+def is_etag_matching(if_none_match: typing.Optional[str], etag: str) -> bool:
+    """
+    Compare If-None-Match request header value with an ETag with weak
+    comparison, as required for If-None-Match (see
+    https://tools.ietf.org/html/rfc7232#section-3.2)
+    :param if_none_match: If-None-Match header value
+    :param etag: ETag of current representation
+    :return: True if ETag match (not modified response can be returned)
+    """
+    if not if_none_match:
+        return False
+
+    if if_none_match.strip() == "*":
+        return True
+
+    opaque_etag = etag[2:] if etag.startswith("W/") else etag
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == opaque_etag:
+            return True
+
+    return False
+
+
+def get_http_date(date: datetime) -> str:
+    """
+    :param date: date to format, naive dates are considered as UTC dates
+    :return: HTTP date (like "Wed, 21 Oct 2015 07:28:00 GMT")
+    """
+    if date.tzinfo is None:
+        date = date.replace(tzinfo=timezone.utc)
+    return email.utils.format_datetime(date.astimezone(timezone.utc), usegmt=True)
+
+
+def parse_http_date(value: typing.Optional[str]) -> typing.Optional[datetime]:
+    """
+    :param value: HTTP date header value
+    :return: aware datetime or None if value is not a valid HTTP date
+    """
+    if not value:
+        return None
+
+    try:
+        date = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError, IndexError):
+        return None
+
+    if date.tzinfo is None:
+        date = date.replace(tzinfo=timezone.utc)
+    return date
+
+
+def get_version_etag(version: typing.Any) -> str:
+    """
+    :param version: version token of a resource (str, int, datetime, etc.)
+    :return: strong ETag header value computed from given version
+    """
+    if isinstance(version, datetime):
+        version = version.isoformat()
+    return get_body_etag(str(version).encode("utf-8"))
+
+
+def get_version_headers(version: typing.Any) -> typing.List[typing.Tuple[str, str]]:
+    """
+    :param version: version token of a resource (str, int, datetime, etc.)
+    :return: ETag header, and Last-Modified header if version is a datetime
+    """
+    headers = [("ETag", get_version_etag(version))]
+    if isinstance(version, datetime):
+        headers.append(("Last-Modified", get_http_date(version)))
+    return headers
+
+
+def is_version_not_modified(version: typing.Any, header_parameters: typing.Dict[str, str]) -> bool:
+    """
+    Evaluate If-None-Match and If-Modified-Since request headers with
+    version token of a resource (see
+    https://tools.ietf.org/html/rfc7232#section-6)
+    :param version: version token of a resource (str, int, datetime, etc.)
+    :param header_parameters: request headers, with lowercase keys
+    :return: True if a not modified response can be returned
+    """
+    if_none_match = header_parameters.get("if-none-match")
+    if if_none_match:
+        return is_etag_matching(if_none_match, get_version_etag(version))
+
+    if isinstance(version, datetime):
+        if_modified_since = parse_http_date(header_parameters.get("if-modified-since"))
+        if if_modified_since is not None:
+            if version.tzinfo is None:
+                version = version.replace(tzinfo=timezone.utc)
+            # HTTP dates have a one second precision
+            return version.replace(microsecond=0) <= if_modified_since
+
+    return False
+
+
 class LowercaseKeysDict(dict):
     """
     Like a dict but try to use lowercase version of given keys.
@@ -0,0 +1,345 @@
+# coding: utf-8
+import asyncio
+import logging
+import queue
+import threading
+import typing
+import weakref
+
+from hapic.exception import ConfigurationException
+from hapic.exception import ProcessException
+from hapic.util import LOGGER_NAME
+
+if typing.TYPE_CHECKING:
+    from hapic.processor.main import Processor  # noqa: F401
+
+OUTPUT_VALIDATION_FULL = "full"
+OUTPUT_VALIDATION_SAMPLE = "sample"
+OUTPUT_VALIDATION_TRUSTED = "trusted"
+OUTPUT_VALIDATION_AUTO = "auto"
+OUTPUT_VALIDATION_SHADOW = "shadow"
+OUTPUT_VALIDATION_MODES = (
+    OUTPUT_VALIDATION_FULL,
+    OUTPUT_VALIDATION_SAMPLE,
+    OUTPUT_VALIDATION_TRUSTED,
+    OUTPUT_VALIDATION_AUTO,
+    OUTPUT_VALIDATION_SHADOW,
+)
+
+DROP_NEWEST = "drop_newest"
+DROP_OLDEST = "drop_oldest"
+DROP_POLICIES = (DROP_NEWEST, DROP_OLDEST)
+
+
+class OutputValidation(object):
+    """
+    Output validation policy of an output wrapper. Decide, for each response,
+    if output data must be validated when dumped or only dumped. Modes are:
+    - "full": validate all responses
+    - "sample": validate one response of `sample_rate`
+    - "trusted": never validate, only dump
+    - "auto": validate all responses until `auto_threshold` consecutive
+      responses are valid, then validate like "sample" mode. Come back to
+      full validation at first validation error.
+    - "shadow": only dump, then dumped data is validated out of the request
+      by `shadow_validator` (see ShadowOutputValidator)
+    """
+
+    def __init__(
+        self,
+        mode: str = OUTPUT_VALIDATION_FULL,
+        sample_rate: int = 10,
+        auto_threshold: int = 100,
+        shadow_validator: typing.Optional["ShadowOutputValidator"] = None,
+    ) -> None:
+        """
+        :param mode: one of OUTPUT_VALIDATION_MODES
+        :param sample_rate: in "sample" and "auto" mode, validate one
+            response of sample_rate
+        :param auto_threshold: in "auto" mode, number of consecutive valid
+            responses before use sampling
+        :param shadow_validator: in "shadow" mode, validator to use. If not
+            given, hapic give its default one.
+        """
+        if mode not in OUTPUT_VALIDATION_MODES:
+            raise ConfigurationException(
+                'Unknown output validation mode "{}", must be one of: {}'.format(
+                    mode, ", ".join(OUTPUT_VALIDATION_MODES)
+                )
+            )
+
+        if sample_rate < 1:
+            raise ConfigurationException("Output validation sample_rate must be positive")
+
+        self.mode = mode
+        self.sample_rate = sample_rate
+        self.auto_threshold = auto_threshold
+        self.shadow_validator = shadow_validator
+        self._lock = threading.Lock()
+        self._counter = 0
+        self._consecutive_valid = 0
+
+    @classmethod
+    def from_value(
+        cls, value: typing.Union[None, str, "OutputValidation"], default: "OutputValidation" = None
+    ) -> "OutputValidation":
+        """
+        Build a new OutputValidation from decorator or hapic parameter value.
+        Returned instance is always a new one because it keep per wrapper
+        counters.
+        :param value: mode name or OutputValidation instance or None
+        :param default: OutputValidation to copy if value is None
+        :return: new OutputValidation instance
+        """
+        if value is None:
+            value = default
+
+        if value is None:
+            return cls()
+
+        if isinstance(value, OutputValidation):
+            return value.copy()
+
+        return cls(value)
+
+    def copy(self) -> "OutputValidation":
+        return type(self)(
+            self.mode,
+            sample_rate=self.sample_rate,
+            auto_threshold=self.auto_threshold,
+            shadow_validator=self.shadow_validator,
+        )
+
+    @property
+    def shadow(self) -> bool:
+        """
+        :return: True if responses are validated by shadow validator
+        """
+        return self.mode == OUTPUT_VALIDATION_SHADOW
+
+    @property
+    def sampling(self) -> bool:
+        """
+        :return: True if responses are currently validated by sampling
+        """
+        if self.mode == OUTPUT_VALIDATION_SAMPLE:
+            return True
+
+        if self.mode == OUTPUT_VALIDATION_AUTO:
+            return self._consecutive_valid >= self.auto_threshold
+
+        return False
+
+    def must_validate(self) -> bool:
+        """
+        :return: True if current response must be validated
+        """
+        if self.mode == OUTPUT_VALIDATION_FULL:
+            return True
+
+        if self.mode in (OUTPUT_VALIDATION_TRUSTED, OUTPUT_VALIDATION_SHADOW):
+            return False
+
+        if not self.sampling:
+            return True
+
+        with self._lock:
+            self._counter += 1
+            if self._counter >= self.sample_rate:
+                self._counter = 0
+                return True
+            return False
+
+    def validation_succeed(self) -> None:
+        """
+        Inform about a valid response
+        """
+        if self.mode == OUTPUT_VALIDATION_AUTO:
+            with self._lock:
+                self._consecutive_valid += 1
+
+    def validation_failed(self) -> None:
+        """
+        Inform about an invalid response
+        """
+        if self.mode == OUTPUT_VALIDATION_AUTO:
+            with self._lock:
+                self._consecutive_valid = 0
+                self._counter = 0
+
+
+class ShadowOutputValidator(object):
+    """
+    Validate dumped output data out of the request: responses are sent
+    after a trusted dump and validation jobs are executed later by
+    background worker threads. Violations are given to job callback (hapic
+    give context.output_validation_error_caught) and counted.
+    Jobs are stored in a bounded queue. When queue is full, drop_policy
+    decide to drop the new job ("drop_newest") or the oldest waiting job
+    ("drop_oldest"). Dropped jobs are counted.
+    """
+
+    def __init__(
+        self, max_queue_size: int = 1000, workers: int = 1, drop_policy: str = DROP_NEWEST
+    ) -> None:
+        """
+        :param max_queue_size: max number of waiting validation jobs
+        :param workers: number of validation workers
+        :param drop_policy: one of DROP_POLICIES
+        """
+        if drop_policy not in DROP_POLICIES:
+            raise ConfigurationException(
+                'Unknown drop policy "{}", must be one of: {}'.format(
+                    drop_policy, ", ".join(DROP_POLICIES)
+                )
+            )
+
+        self.max_queue_size = max_queue_size
+        self.workers = workers
+        self.drop_policy = drop_policy
+        self.validated = 0
+        self.violations = 0
+        self.dropped = 0
+        self._lock = threading.Lock()
+        self._logger = logging.getLogger(LOGGER_NAME)
+        self._queue = None  # type: queue.Queue
+        self._threads = []  # type: typing.List[threading.Thread]
+
+    def submit(
+        self,
+        processor: "Processor",
+        dumped_data: typing.Any,
+        on_violation: typing.Callable[[ProcessException], None],
+    ) -> bool:
+        """
+        Add a validation job
+        :param processor: processor to use to validate dumped data
+        :param dumped_data: data dumped by processor
+        :param on_violation: called with ProcessException if data is not
+            valid
+        :return: False if job (or another one, depending on drop policy) has
+            been dropped
+        """
+        job = (processor, dumped_data, on_violation)
+        job_queue = self._get_queue()
+
+        try:
+            job_queue.put_nowait(job)
+            return True
+        except (queue.Full, asyncio.QueueFull):
+            pass
+
+        self._count_dropped()
+        if self.drop_policy == DROP_NEWEST:
+            return False
+
+        try:
+            job_queue.get_nowait()
+            job_queue.task_done()
+        except (queue.Empty, asyncio.QueueEmpty):
+            pass
+
+        try:
+            job_queue.put_nowait(job)
+        except (queue.Full, asyncio.QueueFull):
+            self._count_dropped()
+
+        return False
+
+    def join(self) -> None:
+        """
+        Wait for all submitted validation jobs to be done
+        """
+        if self._queue is not None:
+            self._queue.join()
+
+    def _get_queue(self) -> queue.Queue:
+        if self._queue is None:
+            with self._lock:
+                if self._queue is None:
+                    self._queue = queue.Queue(maxsize=self.max_queue_size)
+                    for _ in range(self.workers):
+                        thread = threading.Thread(target=self._work, daemon=True)
+                        thread.start()
+                        self._threads.append(thread)
+
+        return self._queue
+
+    def _work(self) -> None:
+        while True:
+            job = self._queue.get()
+            try:
+                self._validate(*job)
+            finally:
+                self._queue.task_done()
+
+    def _validate(
+        self,
+        processor: "Processor",
+        dumped_data: typing.Any,
+        on_violation: typing.Callable[[ProcessException], None],
+    ) -> None:
+        try:
+            processor.validate_dumped(dumped_data)
+        except ProcessException as exc:
+            with self._lock:
+                self.violations += 1
+            self._logger.warning("Shadow output validation error: {}".format(str(exc)))
+            try:
+                on_violation(exc)
+            except Exception:
+                self._logger.exception("Error when report shadow output validation error")
+        except Exception:
+            self._logger.exception("Unknown error during shadow output validation")
+        finally:
+            with self._lock:
+                self.validated += 1
+
+    def _count_dropped(self) -> None:
+        with self._lock:
+            self.dropped += 1
+
+
+class AsyncShadowOutputValidator(ShadowOutputValidator):
+    """
+    Asyncio version of ShadowOutputValidator: validation jobs are executed
+    by tasks of running event loop. Tasks let other tasks run before each
+    validation job to keep validation at low priority.
+    """
+
+    def __init__(
+        self, max_queue_size: int = 1000, workers: int = 1, drop_policy: str = DROP_NEWEST
+    ) -> None:
+        super().__init__(max_queue_size, workers, drop_policy)
+        # NOTE: asyncio queue and worker tasks are bound to an event loop, so
+        # there is one queue (and its workers) by event loop (like when
+        # application is restarted with a new event loop)
+        self._loop_queues = weakref.WeakKeyDictionary()  # type: weakref.WeakKeyDictionary
+
+    def _get_queue(self) -> asyncio.Queue:
+        loop = asyncio.get_event_loop()
+        try:
+            return self._loop_queues[loop]
+        except KeyError:
+            pass
+
+        job_queue = asyncio.Queue(maxsize=self.max_queue_size)
+        self._loop_queues[loop] = job_queue
+        for _ in range(self.workers):
+            asyncio.ensure_future(self._work(job_queue))
+        return job_queue
+
+    async def _work(self, job_queue: asyncio.Queue) -> None:
+        while True:
+            job = await job_queue.get()
+            try:
+                # Let pending tasks (like responses writing) run before
+                await asyncio.sleep(0)
+                self._validate(*job)
+            finally:
+                job_queue.task_done()
+
+    async def join(self) -> None:
+        job_queue = self._loop_queues.get(asyncio.get_event_loop())
+        if job_queue is not None:
+            await job_queue.join()
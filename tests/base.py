@@ -1,8 +1,18 @@
 # -*- coding: utf-8 -*-
+import re
 import sys
+import typing
 
+import bottle
+import flask
+from pyramid.config import Configurator
 import pytest
 
+from hapic import Hapic
+from hapic.ext.bottle import BottleContext
+from hapic.ext.flask import FlaskContext
+from hapic.ext.pyramid import PyramidContext
+
 
 class Base(object):
     pass
@@ -11,3 +21,53 @@ class Base(object):
 serpyco_compatible_python = pytest.mark.skipif(
     sys.version_info < (3, 6), reason="serpyco dataclasses required python>3.6"
 )
+
+
+def get_flask_app(
+    hapic: Hapic, views: typing.Dict[str, typing.Callable], method: str = "GET"
+) -> typing.Callable:
+    """
+    Build a flask app serving given views with hapic flask context.
+    :param hapic: hapic instance used to decorate views
+    :param views: decorated views by route path (like "/users/<user_id>")
+    :param method: http method of routes
+    :return: wsgi app
+    """
+    app = flask.Flask(__name__)
+    hapic.set_context(FlaskContext(app))
+    for path, view in views.items():
+        app.add_url_rule(path, endpoint=path, view_func=view, methods=[method])
+    return app
+
+
+def get_bottle_app(
+    hapic: Hapic, views: typing.Dict[str, typing.Callable], method: str = "GET"
+) -> typing.Callable:
+    """
+    Build a bottle app serving given views with hapic bottle context.
+    See get_flask_app for parameters.
+    """
+    app = bottle.Bottle()
+    hapic.set_context(BottleContext(app))
+    for path, view in views.items():
+        app.route(path, method=method, callback=view)
+    return app
+
+
+def get_pyramid_app(
+    hapic: Hapic, views: typing.Dict[str, typing.Callable], method: str = "GET"
+) -> typing.Callable:
+    """
+    Build a pyramid app serving given views with hapic pyramid context.
+    See get_flask_app for parameters.
+    """
+    configurator = Configurator(autocommit=True)
+    hapic.set_context(PyramidContext(configurator))
+    for path, view in views.items():
+        configurator.add_route(path, re.sub(r"<(\w+)>", r"{\1}", path), request_method=method)
+        # NOTE: string renderer is used by views not returning a response
+        configurator.add_view(view, route_name=path, renderer="string")
+    return configurator.make_wsgi_app()
+
+
+WSGI_APP_BUILDERS = [get_flask_app, get_bottle_app, get_pyramid_app]
@@ -1,9 +1,17 @@
 # coding: utf-8
+import asyncio
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures import ThreadPoolExecutor
+import gzip
 from http import HTTPStatus
 import io
 import json
 import sys
+import threading
+import time
+import zlib
 
+import aiohttp
 from aiohttp import hdrs
 from aiohttp import web
 from aiohttp.web_request import FileField
@@ -16,10 +24,34 @@ import pytest
 from hapic import Hapic
 from hapic import HapicData
 from hapic import MarshmallowProcessor
+from hapic.compression import RequestDecompression
+from hapic.data import HapicFile
 from hapic.error.marshmallow import MarshmallowDefaultErrorBuilder
 from hapic.exception import ProcessException
 from hapic.ext.aiohttp.context import AiohttpContext
+from hapic.ext.aiohttp.context import HapicFileResponse
+from hapic.file import SpooledUploadFile
 from hapic.processor.main import RequestParameters
+from hapic.stream import SseStreamFormat
+
+
+class SlowItemSchema(marshmallow.Schema):
+    name = marshmallow.fields.String(required=True)
+    rank = marshmallow.fields.Method("get_rank")
+
+    def get_rank(self, obj) -> int:
+        # simulate heavy item dump, longer for first items
+        time.sleep(0.001 * (10 - obj["rank"] % 10))
+        return obj["rank"]
+
+
+class DisconnectionAiohttpContext(AiohttpContext):
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self.disconnections = 0
+
+    def client_disconnection_caught(self, func_args, func_kwargs) -> None:
+        self.disconnections += 1
 
 
 class TestAiohttpExt(object):
@@ -491,6 +523,7 @@ class TestAiohttpExt(object):
         assert {"items": {"$ref": "#/definitions/OuputStreamItemSchema"}, "type": "array"} == doc[
             "paths"
         ]["/"]["get"]["responses"]["200"]["schema"]
+        assert ["text/plain; charset=utf-8"] == doc["paths"]["/"]["get"]["produces"]
 
     async def test_unit__general_exception_handling__ok__nominal_case(self, aiohttp_client, loop):
         hapic = Hapic(async_=True, processor_class=MarshmallowProcessor)
@@ -606,6 +639,68 @@ class TestAiohttpExt(object):
             "code": None,
         } == json_
 
+    async def test_unit__post_file__ok__spooled(self, aiohttp_client, loop):
+        hapic = Hapic(async_=True, processor_class=MarshmallowProcessor)
+        uploads = []
+
+        class InputFilesSchema(marshmallow.Schema):
+            avatar = marshmallow.fields.Raw(required=True)
+            thumbnail = marshmallow.fields.Raw(required=True)
+
+        @hapic.with_api_doc()
+        @hapic.input_files(InputFilesSchema(), spool_threshold=1024, max_size=200 * 1024)
+        async def update_avatar(request: Request, hapic_data: HapicData):
+            avatar = hapic_data.files["avatar"]
+            thumbnail = hapic_data.files["thumbnail"]
+            uploads.extend([avatar.file, thumbnail.file])
+            assert isinstance(avatar.file, SpooledUploadFile)
+            assert avatar.file.on_disk
+            assert not thumbnail.file.on_disk
+            assert "avatar.png" == avatar.filename
+            assert "image/png" == avatar.content_type
+            assert b"a" * 100 * 1024 == avatar.file.read()
+            assert b"small" == thumbnail.file.read()
+            return Response(body="ok")
+
+        app = web.Application(debug=True)
+        app.router.add_put("/avatar", update_avatar)
+        hapic.set_context(
+            AiohttpContext(app, default_error_builder=MarshmallowDefaultErrorBuilder())
+        )
+        client = await aiohttp_client(app)
+
+        data = aiohttp.FormData()
+        data.add_field("name", "bob")
+        data.add_field("avatar", b"a" * 100 * 1024, filename="avatar.png", content_type="image/png")
+        data.add_field("thumbnail", b"small", filename="thumbnail.png")
+        resp = await client.put("/avatar", data=data)
+        assert resp.status == 200
+        # uploaded files are closed after view
+        assert 2 == len(uploads)
+        assert all(upload.closed for upload in uploads)
+
+    async def test_unit__post_file__error__spooled_too_large(self, aiohttp_client, loop):
+        hapic = Hapic(async_=True, processor_class=MarshmallowProcessor)
+
+        class InputFilesSchema(marshmallow.Schema):
+            avatar = marshmallow.fields.Raw(required=True)
+
+        @hapic.with_api_doc()
+        @hapic.input_files(InputFilesSchema(), spool_threshold=1024, max_size=10 * 1024)
+        async def update_avatar(request: Request, hapic_data: HapicData):
+            raise AssertionError("Test should no pass here")
+
+        app = web.Application(debug=True)
+        app.router.add_put("/avatar", update_avatar)
+        hapic.set_context(
+            AiohttpContext(app, default_error_builder=MarshmallowDefaultErrorBuilder())
+        )
+        client = await aiohttp_client(app)
+
+        resp = await client.put("/avatar", data={"avatar": io.BytesIO(b"a" * 100 * 1024)})
+        assert resp.status == 413
+        assert "Uploaded file exceed 10240 bytes" == (await resp.json())["message"]
+
     async def test_request_header__ok__lowercase_key(self, aiohttp_client):
         hapic = Hapic(async_=True, processor_class=MarshmallowProcessor)
 
@@ -773,6 +868,159 @@ class TestAiohttpExt(object):
         await client.get("/user")
         assert context.hook_called
 
+    async def test_unit__output_error__ok__shadow_validation(self, aiohttp_client):
+        hapic = Hapic(async_=True, processor_class=MarshmallowProcessor, output_validation="shadow")
+
+        class OutputBodySchema(marshmallow.Schema):
+            user_id = marshmallow.fields.Int(required=True)
+
+        class MyContext(AiohttpContext):
+            def __init__(self, *args, **kwargs):
+                super().__init__(*args, **kwargs)
+                self.hook_called = False
+
+            def output_validation_error_caught(
+                self, hapic_data: HapicData, process_exception: ProcessException
+            ) -> None:
+                self.hook_called = True
+
+        @hapic.with_api_doc()
+        @hapic.output_body(OutputBodySchema())
+        async def user(request):
+            return {}
+
+        app = web.Application(debug=True)
+        context = MyContext(app)
+        hapic.set_context(context)
+        app.router.add_get("/user", user)
+        client = await aiohttp_client(app)
+
+        resp = await client.get("/user")
+        # response is sent without validation
+        assert 200 == resp.status
+        assert {} == await resp.json()
+
+        await hapic.shadow_validator.join()
+        assert context.hook_called
+        assert 1 == hapic.shadow_validator.violations
+
+    async def test_unit__output_cache__ok__concurrent_requests(self, aiohttp_client):
+        hapic = Hapic(async_=True, processor_class=MarshmallowProcessor)
+        calls = []
+
+        class OutputBodySchema(marshmallow.Schema):
+            name = marshmallow.fields.String(required=True)
+
+        class PathSchema(marshmallow.Schema):
+            name = marshmallow.fields.String(required=True)
+
+        @hapic.with_api_doc()
+        @hapic.output_cache(ttl=60)
+        @hapic.output_body(OutputBodySchema())
+        @hapic.input_path(PathSchema())
+        async def user(request, hapic_data):
+            calls.append(hapic_data.path["name"])
+            await asyncio.sleep(0.05)
+            return {"name": hapic_data.path["name"]}
+
+        app = web.Application(debug=True)
+        hapic.set_context(AiohttpContext(app))
+        app.router.add_get("/user/{name}", user)
+        client = await aiohttp_client(app)
+
+        responses = await asyncio.gather(*[client.get("/user/bob") for _ in range(5)])
+        for resp in responses:
+            assert 200 == resp.status
+            assert {"name": "bob"} == await resp.json()
+
+        resp = await client.get("/user/alice")
+        assert {"name": "alice"} == await resp.json()
+        assert ["bob", "alice"] == calls
+
+        cache = hapic.controllers[0].description.output_cache.wrapper.cache
+        assert 2 == cache.misses
+        assert 4 == cache.hits
+
+    async def test_unit__output_body_etag__ok__not_modified(self, aiohttp_client):
+        hapic = Hapic(async_=True, processor_class=MarshmallowProcessor)
+
+        class OutputBodySchema(marshmallow.Schema):
+            name = marshmallow.fields.String(required=True)
+
+        @hapic.with_api_doc()
+        @hapic.output_body(OutputBodySchema(), etag=True)
+        async def user(request):
+            return {"name": "bob"}
+
+        app = web.Application(debug=True)
+        hapic.set_context(AiohttpContext(app))
+        app.router.add_get("/user", user)
+        client = await aiohttp_client(app)
+
+        resp = await client.get("/user")
+        assert 200 == resp.status
+        etag = resp.headers["ETag"]
+
+        resp = await client.get("/user", headers={"If-None-Match": etag})
+        assert 304 == resp.status
+        assert etag == resp.headers["ETag"]
+        assert b"" == await resp.read()
+
+    async def test_unit__output_body_etag_func__ok__async_etag_func(self, aiohttp_client):
+        hapic = Hapic(async_=True, processor_class=MarshmallowProcessor)
+        calls = []
+
+        class OutputBodySchema(marshmallow.Schema):
+            name = marshmallow.fields.String(required=True)
+
+        async def get_version(hapic_data):
+            return "v1"
+
+        @hapic.with_api_doc()
+        @hapic.output_body(OutputBodySchema(), etag_func=get_version)
+        async def user(request):
+            calls.append(1)
+            return {"name": "bob"}
+
+        app = web.Application(debug=True)
+        hapic.set_context(AiohttpContext(app))
+        app.router.add_get("/user", user)
+        client = await aiohttp_client(app)
+
+        resp = await client.get("/user")
+        assert 200 == resp.status
+        assert {"name": "bob"} == await resp.json()
+        etag = resp.headers["ETag"]
+
+        resp = await client.get("/user", headers={"If-None-Match": etag})
+        assert 304 == resp.status
+        assert 1 == len(calls)
+
+    async def test_unit__get_response__ok__bytes_body(self, aiohttp_client):
+        hapic = Hapic(async_=True, processor_class=MarshmallowProcessor)
+
+        class OutputBodySchema(marshmallow.Schema):
+            name = marshmallow.fields.String(required=True)
+
+        @hapic.with_api_doc()
+        @hapic.output_body(OutputBodySchema())
+        async def user(request):
+            return {"name": "bob"}
+
+        app = web.Application(debug=True)
+        context = AiohttpContext(app)
+        hapic.set_context(context)
+        app.router.add_get("/user", user)
+        client = await aiohttp_client(app)
+
+        resp = await client.get("/user")
+        assert 200 == resp.status
+        assert "15" == resp.headers["Content-Length"]
+        assert b'{"name": "bob"}' == await resp.read()
+
+        response = context.get_response(memoryview(b'{"name": "bob"}'), 200)
+        assert 15 == response.content_length
+
     def test_unit__generate_doc_with_wildcard__ok__default_methods(self, aiohttp_client, loop):
         hapic = Hapic(async_=True, processor_class=MarshmallowProcessor)
 
@@ -813,3 +1061,768 @@ class TestAiohttpExt(object):
 
         assert 1 == len(doc["paths"]["/"])
         assert "head" in doc["paths"]["/"]
+
+    async def test_unit__output_body__ok__compressed(self, aiohttp_client):
+        hapic = Hapic(async_=True, processor_class=MarshmallowProcessor, compression=True)
+        users = [{"name": "bob{}".format(i)} for i in range(200)]
+        expected_body = json.dumps(users).encode("utf-8")
+
+        class OutputBodySchema(marshmallow.Schema):
+            name = marshmallow.fields.String(required=True)
+
+        @hapic.with_api_doc()
+        @hapic.output_body(OutputBodySchema(many=True), etag=True)
+        async def get_users(request):
+            return users
+
+        @hapic.with_api_doc()
+        @hapic.output_body(OutputBodySchema(many=True), compress=False)
+        async def get_raw_users(request):
+            return users
+
+        app = web.Application(debug=True)
+        hapic.set_context(AiohttpContext(app))
+        app.router.add_get("/users", get_users)
+        app.router.add_get("/raw_users", get_raw_users)
+        client = await aiohttp_client(app, auto_decompress=False)
+
+        resp = await client.get("/users", headers={"Accept-Encoding": "gzip"})
+        assert 200 == resp.status
+        assert "gzip" == resp.headers["Content-Encoding"]
+        assert "Accept-Encoding" == resp.headers["Vary"]
+        assert resp.headers["ETag"].startswith('W/"')
+        body = await resp.read()
+        assert str(len(body)) == resp.headers["Content-Length"]
+        # same compressed body than other contexts
+        assert hapic.context.compression.compress(expected_body, "gzip") == body
+
+        resp = await client.get("/users", headers={"Accept-Encoding": "identity"})
+        assert "Content-Encoding" not in resp.headers
+        assert expected_body == await resp.read()
+
+        resp = await client.get("/raw_users", headers={"Accept-Encoding": "gzip"})
+        assert "Content-Encoding" not in resp.headers
+        assert expected_body == await resp.read()
+
+    async def test_unit__output_stream__ok__compressed(self, aiohttp_client):
+        hapic = Hapic(async_=True, processor_class=MarshmallowProcessor, compression=True)
+
+        class OuputStreamItemSchema(marshmallow.Schema):
+            name = marshmallow.fields.String()
+
+        @hapic.output_stream(OuputStreamItemSchema())
+        async def get_users(request):
+            for i in range(100):
+                yield {"name": "bob{}".format(i)}
+
+        app = web.Application(debug=True)
+        hapic.set_context(AiohttpContext(app))
+        app.router.add_get("/users", get_users)
+        client = await aiohttp_client(app, auto_decompress=False)
+
+        resp = await client.get("/users", headers={"Accept-Encoding": "deflate"})
+        assert 200 == resp.status
+        assert "deflate" == resp.headers["Content-Encoding"]
+        lines = zlib.decompress(await resp.read()).splitlines()
+        assert 100 == len(lines)
+        assert {"name": "bob99"} == json.loads(lines[-1])
+
+    async def test_unit__output_body__ok__stream(self, aiohttp_client):
+        hapic = Hapic(async_=True, processor_class=MarshmallowProcessor)
+
+        class UserSchema(marshmallow.Schema):
+            name = marshmallow.fields.String(required=True)
+
+        @hapic.with_api_doc()
+        @hapic.output_body(UserSchema(many=True), stream=True, stream_chunk_size=7)
+        async def get_users(request):
+            for i in range(100):
+                yield {"name": "bob{}".format(i)}
+
+        @hapic.with_api_doc()
+        @hapic.output_body(UserSchema(many=True), stream=True)
+        async def get_sync_users(request):
+            return iter([{"name": "bob"}])
+
+        @hapic.with_api_doc()
+        @hapic.output_body(UserSchema(many=True), stream=True)
+        async def get_invalid_users(request):
+            yield {}
+
+        app = web.Application(debug=True)
+        hapic.set_context(AiohttpContext(app))
+        app.router.add_get("/users", get_users)
+        app.router.add_get("/sync_users", get_sync_users)
+        app.router.add_get("/invalid_users", get_invalid_users)
+        client = await aiohttp_client(app)
+
+        resp = await client.get("/users")
+        assert 200 == resp.status
+        assert resp.headers["Content-Type"].startswith("application/json")
+        assert [{"name": "bob{}".format(i)} for i in range(100)] == await resp.json()
+
+        resp = await client.get("/sync_users")
+        assert [{"name": "bob"}] == await resp.json()
+
+        resp = await client.get("/invalid_users")
+        assert 500 == resp.status
+        assert "Validation error of output data" == (await resp.json())["message"]
+
+    async def test_unit__output_file__ok__conditional_response(self, aiohttp_client):
+        hapic = Hapic(async_=True, processor_class=MarshmallowProcessor)
+
+        @hapic.with_api_doc()
+        @hapic.output_file(["text/x-python"])
+        async def get_file(request):
+            return HapicFile(file_path=__file__, etag="v1")
+
+        app = web.Application(debug=True)
+        hapic.set_context(AiohttpContext(app))
+        app.router.add_get("/file", get_file)
+        client = await aiohttp_client(app)
+        with open(__file__, "rb") as file_:
+            content = file_.read()
+
+        resp = await client.get("/file")
+        assert 200 == resp.status
+        assert "bytes" == resp.headers["Accept-Ranges"]
+        assert '"v1"' == resp.headers["ETag"]
+        assert content == await resp.read()
+
+        resp = await client.get("/file", headers={"Range": "bytes=10-19"})
+        assert 206 == resp.status
+        assert "bytes 10-19/{}".format(len(content)) == resp.headers["Content-Range"]
+        assert content[10:20] == await resp.read()
+
+        resp = await client.get("/file", headers={"Range": "bytes=0-1,-2"})
+        assert 206 == resp.status
+        assert resp.headers["Content-Type"].startswith("multipart/byteranges")
+        body = await resp.read()
+        assert content[:2] in body and content[-2:] in body
+
+        resp = await client.get("/file", headers={"Range": "bytes=100000000-"})
+        assert 416 == resp.status
+
+        resp = await client.get("/file", headers={"If-None-Match": '"v1"'})
+        assert 304 == resp.status
+        assert b"" == await resp.read()
+
+    async def test_unit__output_file__ok__file_object_read_in_executor(self, aiohttp_client):
+        hapic = Hapic(async_=True, processor_class=MarshmallowProcessor)
+        content = b"".join(b"%06d\n" % i for i in range(1000))
+        reads = []
+
+        class TrackedBytesIO(io.BytesIO):
+            def read(self, size=-1):
+                reads.append((threading.get_ident(), size))
+                return super().read(size)
+
+        @hapic.with_api_doc()
+        @hapic.output_file(["text/plain"])
+        async def get_file(request):
+            return HapicFile(file_object=TrackedBytesIO(content), mimetype="text/plain")
+
+        app = web.Application(debug=True)
+        hapic.set_context(AiohttpContext(app, file_chunk_size=1024))
+        app.router.add_get("/file", get_file)
+        client = await aiohttp_client(app)
+
+        resp = await client.get("/file")
+        assert 200 == resp.status
+        assert str(len(content)) == resp.headers["Content-Length"]
+        assert content == await resp.read()
+        assert all(size <= 1024 for _, size in reads)
+        assert threading.get_ident() not in [thread for thread, _ in reads]
+
+        resp = await client.get("/file", headers={"Range": "bytes=10-19,-5"})
+        assert 206 == resp.status
+        body = await resp.read()
+        assert content[10:20] in body and content[-5:] in body
+
+    async def test_unit__output_file__ok__file_object_sendfile(self, aiohttp_client, loop):
+        hapic = Hapic(async_=True, processor_class=MarshmallowProcessor)
+        sent = []
+        sendfile = loop.sendfile
+
+        async def spy_sendfile(transport, file, offset=0, count=None, **kwargs):
+            sent.append((offset, count))
+            return await sendfile(transport, file, offset, count, **kwargs)
+
+        loop.sendfile = spy_sendfile
+
+        @hapic.with_api_doc()
+        @hapic.output_file(["text/x-python"])
+        async def get_file(request):
+            return HapicFile(file_object=open(__file__, "rb"), mimetype="text/x-python")
+
+        app = web.Application(debug=True)
+        hapic.set_context(AiohttpContext(app))
+        app.router.add_get("/file", get_file)
+        client = await aiohttp_client(app)
+        with open(__file__, "rb") as file_:
+            content = file_.read()
+
+        resp = await client.get("/file")
+        assert content == await resp.read()
+        assert [(0, len(content))] == sent
+
+        resp = await client.get("/file", headers={"Range": "bytes=5-9"})
+        assert 206 == resp.status
+        assert content[5:10] == await resp.read()
+        assert (5, 5) == sent[-1]
+
+    async def test_unit__output_file__ok__file_object_without_loop_sendfile(
+        self, aiohttp_client, loop, monkeypatch
+    ):
+        # NOTE: loop.sendfile is not available before python 3.7
+        monkeypatch.delattr(asyncio.BaseEventLoop, "sendfile")
+        monkeypatch.delattr(asyncio.AbstractEventLoop, "sendfile")
+        hapic = Hapic(async_=True, processor_class=MarshmallowProcessor)
+
+        @hapic.with_api_doc()
+        @hapic.output_file(["text/x-python"])
+        async def get_file(request):
+            return HapicFile(file_object=open(__file__, "rb"), mimetype="text/x-python")
+
+        app = web.Application(debug=True)
+        hapic.set_context(AiohttpContext(app))
+        app.router.add_get("/file", get_file)
+        client = await aiohttp_client(app)
+        with open(__file__, "rb") as file_:
+            content = file_.read()
+
+        resp = await client.get("/file")
+        assert 200 == resp.status
+        assert content == await resp.read()
+
+    async def test_unit__file_response__ok__bounded_read_ahead(self, loop):
+        reads = []
+        can_write = asyncio.Event()
+
+        class TrackedBytesIO(io.BytesIO):
+            def read(self, size=-1):
+                reads.append(size)
+                return super().read(size)
+
+        async def write(data: bytes) -> None:
+            await can_write.wait()
+
+        response = HapicFileResponse(HapicFile(), chunk_size=10, read_ahead=2)
+        response.write = write
+        writing = asyncio.ensure_future(
+            response._write_window(TrackedBytesIO(b"x" * 1000), None, None)
+        )
+
+        await asyncio.sleep(0.1)
+        # one chunk is being written, read_ahead are queued, one is waiting
+        # for a place in queue
+        assert 4 == len(reads)
+
+        can_write.set()
+        await writing
+        # 100 chunks, and last empty read
+        assert 101 == len(reads)
+
+    async def test_unit__output_stream__ok__formats(self, aiohttp_client):
+        hapic = Hapic(async_=True, processor_class=MarshmallowProcessor)
+
+        class OuputStreamItemSchema(marshmallow.Schema):
+            name = marshmallow.fields.String(required=True)
+
+        async def get_users(request):
+            for i in range(3):
+                await asyncio.sleep(0.03)
+                # second item is invalid
+                yield {"name": "bob{}".format(i)} if i != 1 else {}
+
+        @hapic.with_api_doc()
+        @hapic.output_stream(OuputStreamItemSchema(), format="json")
+        async def get_json_users(request):
+            return get_users(request)
+
+        @hapic.with_api_doc()
+        @hapic.output_stream(OuputStreamItemSchema(), format="ndjson")
+        async def get_ndjson_users(request):
+            return get_users(request)
+
+        @hapic.with_api_doc()
+        @hapic.output_stream(
+            OuputStreamItemSchema(), format=SseStreamFormat(keep_alive_interval=0.02)
+        )
+        async def get_sse_users(request):
+            return get_users(request)
+
+        app = web.Application(debug=True)
+        hapic.set_context(AiohttpContext(app))
+        app.router.add_get("/json_users", get_json_users)
+        app.router.add_get("/ndjson_users", get_ndjson_users)
+        app.router.add_get("/sse_users", get_sse_users)
+        client = await aiohttp_client(app)
+
+        resp = await client.get("/json_users")
+        assert "application/json" == resp.headers["Content-Type"]
+        assert [{"name": "bob0"}, {"name": "bob2"}] == await resp.json()
+
+        resp = await client.get("/ndjson_users")
+        assert "application/x-ndjson" == resp.headers["Content-Type"]
+        assert b'{"name": "bob0"}\n{"name": "bob2"}\n' == await resp.read()
+
+        resp = await client.get("/sse_users")
+        assert "text/event-stream" == resp.headers["Content-Type"]
+        assert "no-cache" == resp.headers["Cache-Control"]
+        body = await resp.read()
+        # idle stream send keep-alive comments
+        assert b": keep-alive\n\n" in body
+        assert [b'data: {"name": "bob0"}', b'data: {"name": "bob2"}'] == [
+            line for line in body.split(b"\n\n") if line.startswith(b"data: ")
+        ]
+
+        doc = hapic.generate_doc()
+        assert ["application/json"] == doc["paths"]["/json_users"]["get"]["produces"]
+        assert ["text/event-stream"] == doc["paths"]["/sse_users"]["get"]["produces"]
+
+    @pytest.mark.parametrize("executor_class", [ThreadPoolExecutor, ProcessPoolExecutor])
+    async def test_unit__output_stream__ok__executor(self, aiohttp_client, executor_class):
+        hapic = Hapic(async_=True, processor_class=MarshmallowProcessor)
+        executor = executor_class(max_workers=4)
+
+        @hapic.with_api_doc()
+        @hapic.output_stream(SlowItemSchema(), format="json", executor=executor)
+        async def get_users(request):
+            for i in range(50):
+                # item 7 is invalid
+                yield {"name": "bob{}".format(i), "rank": i} if i != 7 else {"rank": i}
+
+        app = web.Application(debug=True)
+        hapic.set_context(AiohttpContext(app))
+        app.router.add_get("/users", get_users)
+        client = await aiohttp_client(app)
+
+        try:
+            resp = await client.get("/users")
+            assert 200 == resp.status
+            # items are dumped concurrently but written in view order
+            assert [
+                {"name": "bob{}".format(i), "rank": i} for i in range(50) if i != 7
+            ] == await resp.json()
+        finally:
+            executor.shutdown()
+
+    async def test_unit__output_stream__ok__executor_in_flight_window(self, aiohttp_client):
+        hapic = Hapic(async_=True, processor_class=MarshmallowProcessor)
+        executor = ThreadPoolExecutor(max_workers=1)
+        can_dump = threading.Event()
+        produced = []
+
+        class BlockingSchema(marshmallow.Schema):
+            name = marshmallow.fields.Method("get_name")
+
+            def get_name(self, obj) -> str:
+                can_dump.wait()
+                return obj["name"]
+
+        @hapic.with_api_doc()
+        @hapic.output_stream(BlockingSchema(), executor=executor, max_in_flight=4)
+        async def get_users(request):
+            for i in range(20):
+                produced.append(i)
+                yield {"name": "bob{}".format(i)}
+
+        app = web.Application(debug=True)
+        hapic.set_context(AiohttpContext(app))
+        app.router.add_get("/users", get_users)
+        client = await aiohttp_client(app)
+
+        try:
+            response_task = asyncio.ensure_future(client.get("/users"))
+            await asyncio.sleep(0.1)
+            # view generator produced items while first one is being dumped,
+            # but no more than in flight window
+            assert 4 == len(produced)
+
+            can_dump.set()
+            resp = await response_task
+            lines = (await resp.read()).splitlines()
+            assert [{"name": "bob{}".format(i)} for i in range(20)] == [
+                json.loads(line) for line in lines
+            ]
+        finally:
+            can_dump.set()
+            executor.shutdown()
+
+    async def test_unit__output_stream__ok__client_disconnection(self, aiohttp_client):
+        hapic = Hapic(async_=True, processor_class=MarshmallowProcessor)
+        produced = []
+        view_closed = asyncio.Event()
+
+        class OuputStreamItemSchema(marshmallow.Schema):
+            name = marshmallow.fields.String(required=True)
+
+        @hapic.with_api_doc()
+        @hapic.output_stream(OuputStreamItemSchema(), flush_size=0)
+        async def get_users(request):
+            try:
+                for i in range(1000):
+                    produced.append(i)
+                    await asyncio.sleep(0.01)
+                    yield {"name": "bob{}".format(i)}
+            finally:
+                view_closed.set()
+
+        app = web.Application(debug=True)
+        context = DisconnectionAiohttpContext(app, disconnect_check_interval=0.01)
+        hapic.set_context(context)
+        app.router.add_get("/users", get_users)
+        client = await aiohttp_client(app)
+
+        resp = await client.get("/users")
+        assert b'{"name": "bob0"}\n' == await resp.content.readline()
+        resp.close()
+
+        # view generator is closed and no longer consumed
+        await asyncio.wait_for(view_closed.wait(), timeout=1)
+        produced_count = len(produced)
+        await asyncio.sleep(0.1)
+        assert produced_count == len(produced) < 1000
+        assert 1 == context.disconnections
+
+    async def test_unit__output_body__ok__client_disconnection(self, aiohttp_client):
+        hapic = Hapic(async_=True, processor_class=MarshmallowProcessor)
+        view_cancelled = asyncio.Event()
+
+        class OutputBodySchema(marshmallow.Schema):
+            name = marshmallow.fields.String(required=True)
+
+        @hapic.with_api_doc()
+        @hapic.output_body(OutputBodySchema())
+        async def get_user(request):
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                view_cancelled.set()
+                raise
+            return {"name": "bob"}
+
+        app = web.Application(debug=True)
+        context = DisconnectionAiohttpContext(app, disconnect_check_interval=0.01)
+        hapic.set_context(context)
+        app.router.add_get("/user", get_user)
+        client = await aiohttp_client(app)
+
+        with pytest.raises(asyncio.TimeoutError):
+            await client.get("/user", timeout=0.1)
+
+        await asyncio.wait_for(view_cancelled.wait(), timeout=1)
+        assert 1 == context.disconnections
+
+    @pytest.mark.skipif(sys.version_info < (3, 7), reason="requires python3.7 or higher")
+    async def test_unit__output_body__ok__no_disconnection_check_by_default(self, aiohttp_client):
+        hapic = Hapic(async_=True, processor_class=MarshmallowProcessor)
+        view_tasks = []
+
+        class OutputBodySchema(marshmallow.Schema):
+            name = marshmallow.fields.String(required=True)
+
+        @hapic.with_api_doc()
+        @hapic.output_body(OutputBodySchema())
+        async def get_user(request):
+            view_tasks.append(asyncio.current_task())
+            return {"name": "bob"}
+
+        handler_tasks = []
+
+        @web.middleware
+        async def record_task(request, handler):
+            handler_tasks.append(asyncio.current_task())
+            return await handler(request)
+
+        app = web.Application(debug=True, middlewares=[record_task])
+        context = DisconnectionAiohttpContext(app)
+        hapic.set_context(context)
+        app.router.add_get("/user", get_user)
+        client = await aiohttp_client(app)
+
+        assert context.disconnect_check_interval is None
+        resp = await client.get("/user")
+        assert 200 == resp.status
+        # view is run by request handler task, not by a watching task
+        assert handler_tasks == view_tasks
+
+    async def test_unit__input_body__ok__compressed_body(self, aiohttp_client):
+        # NOTE: aiohttp server decompress payloads, hapic limit their size
+        hapic = Hapic(
+            async_=True,
+            processor_class=MarshmallowProcessor,
+            decompression=RequestDecompression(max_size=100),
+        )
+
+        class InputBodySchema(marshmallow.Schema):
+            name = marshmallow.fields.String(required=True)
+
+        @hapic.with_api_doc()
+        @hapic.input_body(InputBodySchema())
+        @hapic.output_body(InputBodySchema())
+        async def create_user(request, hapic_data):
+            return hapic_data.body
+
+        @hapic.with_api_doc()
+        @hapic.input_forms(InputBodySchema())
+        @hapic.output_body(InputBodySchema())
+        async def create_user_form(request, hapic_data):
+            return hapic_data.forms
+
+        class InputFilesSchema(marshmallow.Schema):
+            avatar = marshmallow.fields.Raw(required=True)
+
+        @hapic.with_api_doc()
+        @hapic.input_files(InputFilesSchema())
+        async def update_avatar(request, hapic_data):
+            avatar = hapic_data.files["avatar"]
+            assert isinstance(avatar, FileField)
+            assert "a.txt" == avatar.filename
+            return Response(body=avatar.file.read())
+
+        app = web.Application(debug=True)
+        hapic.set_context(AiohttpContext(app))
+        app.router.add_post("/users", create_user)
+        app.router.add_post("/users_form", create_user_form)
+        app.router.add_post("/avatar", update_avatar)
+        client = await aiohttp_client(app)
+
+        resp = await client.post(
+            "/users",
+            data=gzip.compress(b'{"name": "bob"}'),
+            headers={"Content-Type": "application/json", "Content-Encoding": "gzip"},
+        )
+        assert 200 == resp.status
+        assert {"name": "bob"} == await resp.json()
+
+        resp = await client.post(
+            "/users_form",
+            data=zlib.compress(b"name=bob"),
+            headers={
+                "Content-Type": "application/x-www-form-urlencoded",
+                "Content-Encoding": "deflate",
+            },
+        )
+        assert 200 == resp.status
+        assert {"name": "bob"} == await resp.json()
+
+        resp = await client.post(
+            "/users_form",
+            data=gzip.compress(
+                b"--boundary\r\n"
+                b'Content-Disposition: form-data; name="name"\r\n\r\n'
+                b"bob\r\n"
+                b"--boundary--\r\n"
+            ),
+            headers={
+                "Content-Type": "multipart/form-data; boundary=boundary",
+                "Content-Encoding": "gzip",
+            },
+        )
+        assert 200 == resp.status
+        assert {"name": "bob"} == await resp.json()
+
+        resp = await client.post(
+            "/avatar",
+            data=gzip.compress(
+                b"--b\r\n"
+                b'Content-Disposition: form-data; name="avatar"; filename="a.txt"\r\n\r\n'
+                b"avatar\r\n"
+                b"--b--\r\n"
+            ),
+            headers={
+                "Content-Type": "multipart/form-data; boundary=b",
+                "Content-Encoding": "gzip",
+            },
+        )
+        assert 200 == resp.status
+        assert b"avatar" == await resp.read()
+
+        resp = await client.post(
+            "/users",
+            data=gzip.compress(b'{"name": "' + b"a" * 100 + b'"}'),
+            headers={"Content-Type": "application/json", "Content-Encoding": "gzip"},
+        )
+        assert 413 == resp.status
+
+        resp = await client.post(
+            "/users",
+            data=b'{"name": "bob"}',
+            headers={"Content-Type": "application/json", "Content-Encoding": "compress"},
+        )
+        assert 415 == resp.status
+
+        resp = await client.post(
+            "/users",
+            data=b'{"name": "bob"}',
+            headers={"Content-Type": "application/json", "Content-Encoding": "gzip"},
+        )
+        assert 400 == resp.status
+
+    async def test_unit__input_stream__ok__nominal_case(self, aiohttp_client):
+        hapic = Hapic(async_=True, processor_class=MarshmallowProcessor)
+        read_lines = []
+
+        class InputStreamItemSchema(marshmallow.Schema):
+            name = marshmallow.fields.String(required=True)
+            age = marshmallow.fields.Integer(missing=42)
+
+        @hapic.with_api_doc()
+        @hapic.input_stream(InputStreamItemSchema())
+        async def import_users(request, hapic_data):
+            items = []
+            async for item in hapic_data.stream:
+                items.append(item)
+            return web.json_response(items)
+
+        async def get_body():
+            for i in range(3):
+                read_lines.append(i)
+                yield '{{"name": "bob{}"}}\n\n'.format(i).encode()
+
+        app = web.Application(debug=True)
+        hapic.set_context(AiohttpContext(app))
+        app.router.add_post("/users", import_users)
+        client = await aiohttp_client(app)
+
+        resp = await client.post(
+            "/users", data=get_body(), headers={"Content-Type": "application/x-ndjson"}
+        )
+        assert 200 == resp.status
+        assert [{"name": "bob{}".format(i), "age": 42} for i in range(3)] == await resp.json()
+        assert [0, 1, 2] == read_lines
+
+    async def test_unit__input_stream__error__abort(self, aiohttp_client):
+        hapic = Hapic(async_=True, processor_class=MarshmallowProcessor)
+        read_items = []
+
+        class InputStreamItemSchema(marshmallow.Schema):
+            name = marshmallow.fields.String(required=True)
+
+        @hapic.with_api_doc()
+        @hapic.input_stream(InputStreamItemSchema())
+        async def import_users(request, hapic_data):
+            async for item in hapic_data.stream:
+                read_items.append(item)
+            return web.json_response({})
+
+        app = web.Application(debug=True)
+        hapic.set_context(AiohttpContext(app))
+        app.router.add_post("/users", import_users)
+        client = await aiohttp_client(app)
+
+        resp = await client.post("/users", data=b'{"name": "bob"}\n{"nom": "bob"}\n{"name": "b"}')
+        assert 400 == resp.status
+        error = await resp.json()
+        assert "Validation error of input stream item at line 2" == error["message"]
+        assert {"name": ["Missing data for required field."]} == error["details"]
+        assert [{"name": "bob"}] == read_items
+
+    async def test_unit__input_stream__ok__skip_and_collect(self, aiohttp_client):
+        hapic = Hapic(async_=True, processor_class=MarshmallowProcessor)
+        caught_errors = []
+
+        class InputStreamItemSchema(marshmallow.Schema):
+            name = marshmallow.fields.String(required=True)
+
+        class ErrorsAiohttpContext(AiohttpContext):
+            def input_validation_error_caught(self, request_parameters, process_exception):
+                caught_errors.append(process_exception)
+
+        @hapic.with_api_doc()
+        @hapic.input_stream(InputStreamItemSchema(), on_error="skip")
+        async def import_users(request, hapic_data):
+            return web.json_response([item async for item in hapic_data.stream])
+
+        @hapic.with_api_doc()
+        @hapic.input_stream(InputStreamItemSchema(), on_error="collect", max_line_size=20)
+        async def import_users_collect(request, hapic_data):
+            items = [item async for item in hapic_data.stream]
+            errors = [error.line_number for error in hapic_data.stream.errors]
+            return web.json_response({"items": items, "errors": errors})
+
+        app = web.Application(debug=True)
+        hapic.set_context(ErrorsAiohttpContext(app))
+        app.router.add_post("/users", import_users)
+        app.router.add_post("/users_collect", import_users_collect)
+        client = await aiohttp_client(app)
+        body = b'{"name": "bob"}\n{"nom": "bob"}\nnot json\n{"name": "a very long name"}\n'
+
+        resp = await client.post("/users", data=body)
+        assert 200 == resp.status
+        assert [{"name": "bob"}, {"name": "a very long name"}] == await resp.json()
+        assert 2 == len(caught_errors)
+
+        resp = await client.post("/users_collect", data=body)
+        assert 200 == resp.status
+        assert {"items": [{"name": "bob"}], "errors": [2, 3, 4]} == await resp.json()
+
+    def test_unit__generate_input_stream_doc__ok__nominal_case(self):
+        hapic = Hapic(async_=True, processor_class=MarshmallowProcessor)
+
+        class InputStreamItemSchema(marshmallow.Schema):
+            name = marshmallow.fields.String(required=True)
+
+        @hapic.with_api_doc()
+        @hapic.input_stream(InputStreamItemSchema())
+        async def import_users(request, hapic_data):
+            pass
+
+        app = web.Application(debug=True)
+        app.router.add_post("/", import_users)
+        hapic.set_context(AiohttpContext(app))
+
+        doc = hapic.generate_doc("aiohttp", "testing")
+        doc = json.loads(json.dumps(doc))
+
+        operation = doc["paths"]["/"]["post"]
+        assert {"items": {"$ref": "#/definitions/InputStreamItemSchema"}, "type": "array"} == (
+            operation["parameters"][0]["schema"]
+        )
+        assert ["application/x-ndjson"] == operation["consumes"]
+        assert "InputStreamItemSchema" in doc["definitions"]
+
+    async def test_unit__input_body__ok__stream_field(self, aiohttp_client):
+        hapic = Hapic(async_=True, processor_class=MarshmallowProcessor)
+        first_item_read = asyncio.Event()
+
+        class ItemSchema(marshmallow.Schema):
+            name = marshmallow.fields.String(required=True)
+
+        class ImportSchema(marshmallow.Schema):
+            source = marshmallow.fields.String(required=True)
+            items = marshmallow.fields.List(marshmallow.fields.Nested(ItemSchema), stream=True)
+
+        @hapic.with_api_doc()
+        @hapic.input_body(ImportSchema())
+        async def import_items(request, hapic_data):
+            items = []
+            async for item in hapic_data.body["items"]:
+                items.append(item)
+                first_item_read.set()
+            return web.json_response({"source": hapic_data.body["source"], "items": items})
+
+        async def get_body():
+            yield b'{"source": "api", "items": [{"name": "bob"},'
+            # next elements are sent only when view read first one
+            await asyncio.wait_for(first_item_read.wait(), timeout=1)
+            yield b'{"name": "bill"}, {"nom": "x"}]}'
+
+        app = web.Application(debug=True)
+        hapic.set_context(AiohttpContext(app))
+        app.router.add_post("/items", import_items)
+        client = await aiohttp_client(app)
+
+        resp = await client.post("/items", data=get_body())
+        assert 400 == resp.status
+        assert (
+            'Validation error of input stream item at "items" element 3'
+            == (await resp.json())["message"]
+        )
+        assert first_item_read.is_set()
+
+        resp = await client.post("/items", data=b'{"source": "api", "items": [{"name": "bob"}]}')
+        assert 200 == resp.status
+        assert {"source": "api", "items": [{"name": "bob"}]} == await resp.json()
@@ -0,0 +1,177 @@
+# coding: utf-8
+import gzip
+import typing
+import zlib
+
+import marshmallow
+import pytest
+from webob import Request
+
+from hapic import Hapic
+from hapic import MarshmallowProcessor
+from hapic.compression import ResponseCompression
+from hapic.exception import ConfigurationException
+from tests.base import Base
+from tests.base import WSGI_APP_BUILDERS
+
+USERS = [{"name": "bob{}".format(i)} for i in range(200)]
+JSON_USERS = "[{}]".format(", ".join('{{"name": "{}"}}'.format(u["name"]) for u in USERS))
+
+
+def get(app: typing.Callable, path: str, headers: typing.Optional[dict] = None):
+    # NOTE: webtest decode compressed responses, so request is made with webob
+    return Request.blank(path, headers=headers).get_response(app)
+
+
+class UserSchema(marshmallow.Schema):
+    name = marshmallow.fields.String(required=True)
+
+
+class UserPathSchema(marshmallow.Schema):
+    user_id = marshmallow.fields.Integer(required=True)
+
+
+def decorate_views(hapic: Hapic) -> dict:
+    @hapic.with_api_doc()
+    @hapic.output_body(UserSchema(many=True), etag=True)
+    def users(*args, **kwargs):
+        return USERS
+
+    @hapic.with_api_doc()
+    @hapic.output_body(UserSchema(many=True), compress=False)
+    def raw_users(*args, **kwargs):
+        return USERS
+
+    @hapic.with_api_doc()
+    @hapic.output_body(UserSchema())
+    def user(*args, **kwargs):
+        return USERS[0]
+
+    @hapic.with_api_doc()
+    @hapic.output_body(UserSchema())
+    @hapic.input_path(UserPathSchema())
+    def invalid_user(*args, hapic_data=None, **kwargs):
+        return {"user_id": hapic_data.path["user_id"], "names": ["bob"] * 500}
+
+    return {
+        "/users": users,
+        "/raw_users": raw_users,
+        "/user": user,
+        "/invalid_user/<user_id>": invalid_user,
+    }
+
+
+def get_app(build_app: typing.Callable, compression) -> typing.Callable:
+    hapic = Hapic(processor_class=MarshmallowProcessor, compression=compression)
+    return build_app(hapic, decorate_views(hapic))
+
+
+class TestResponseCompression(Base):
+    def test_unit__get_encoding__ok__negotiation(self):
+        compression = ResponseCompression()
+
+        assert "gzip" == compression.get_encoding("gzip, deflate, br")
+        assert "deflate" == compression.get_encoding("deflate")
+        assert "deflate" == compression.get_encoding("gzip;q=0.5, deflate")
+        assert "gzip" == compression.get_encoding("*")
+        assert compression.get_encoding("gzip;q=0, deflate;q=0") is None
+        assert compression.get_encoding("br") is None
+        assert compression.get_encoding(None) is None
+
+    def test_unit__init__error__bad_parameters(self):
+        with pytest.raises(ConfigurationException):
+            ResponseCompression(level=10)
+
+        with pytest.raises(ConfigurationException):
+            ResponseCompression(encodings=("br",))
+
+    def test_unit__compress_response__ok__headers(self):
+        compression = ResponseCompression(min_size=10)
+
+        body, headers = compression.compress_response(b"a" * 100, [("ETag", '"abc"')], "gzip")
+        assert b"a" * 100 == gzip.decompress(body)
+        assert [
+            ("ETag", 'W/"abc"'),
+            ("Vary", "Accept-Encoding"),
+            ("Content-Encoding", "gzip"),
+        ] == headers
+
+        body, headers = compression.compress_response(b"a" * 100, [], None)
+        assert b"a" * 100 == body
+        assert [("Vary", "Accept-Encoding")] == headers
+
+        body, headers = compression.compress_response(b"a" * 5, [], "gzip")
+        assert b"a" * 5 == body
+        assert [("Vary", "Accept-Encoding")] == headers
+
+        body, headers = compression.compress_response(
+            b"a" * 100, [("Content-Encoding", "br")], "gzip"
+        )
+        assert b"a" * 100 == body
+        assert [("Content-Encoding", "br")] == headers
+
+
+@pytest.mark.parametrize("build_app", WSGI_APP_BUILDERS)
+class TestCompressionContexts(Base):
+    def test_func__compression__ok__gzip(self, build_app):
+        app = get_app(build_app, True)
+
+        response = get(app, "/users", headers={"Accept-Encoding": "gzip"})
+        assert 200 == response.status_code
+        assert "gzip" == response.headers["Content-Encoding"]
+        assert "Accept-Encoding" == response.headers["Vary"]
+        assert response.headers["ETag"].startswith('W/"')
+        assert str(len(response.body)) == response.headers["Content-Length"]
+        assert JSON_USERS.encode("utf-8") == gzip.decompress(response.body)
+        # compression is made by hapic: compressed bodies are identical
+        assert ResponseCompression().compress(JSON_USERS.encode("utf-8"), "gzip") == response.body
+
+        # weak etag still match
+        etag = response.headers["ETag"]
+        response = get(app, "/users", headers={"Accept-Encoding": "gzip", "If-None-Match": etag})
+        assert 304 == response.status_code
+        assert b"" == response.body
+
+    def test_func__compression__ok__deflate(self, build_app):
+        app = get_app(build_app, True)
+
+        response = get(app, "/users", headers={"Accept-Encoding": "deflate"})
+        assert "deflate" == response.headers["Content-Encoding"]
+        assert JSON_USERS.encode("utf-8") == zlib.decompress(response.body)
+
+    def test_func__compression__ok__not_accepted(self, build_app):
+        app = get_app(build_app, True)
+
+        response = get(app, "/users")
+        assert "Content-Encoding" not in response.headers
+        assert "Accept-Encoding" == response.headers["Vary"]
+        assert JSON_USERS.encode("utf-8") == response.body
+
+    def test_func__compression__ok__small_and_opt_out_not_compressed(self, build_app):
+        app = get_app(build_app, True)
+
+        response = get(app, "/user", headers={"Accept-Encoding": "gzip"})
+        assert "Content-Encoding" not in response.headers
+        assert "Accept-Encoding" == response.headers["Vary"]
+        assert b'{"name": "bob0"}' == response.body
+
+        response = get(app, "/raw_users", headers={"Accept-Encoding": "gzip"})
+        assert "Content-Encoding" not in response.headers
+        assert "Vary" not in response.headers
+        assert JSON_USERS.encode("utf-8") == response.body
+
+    def test_func__compression__ok__error_response(self, build_app):
+        app = get_app(build_app, ResponseCompression(min_size=1))
+
+        response = get(app, "/invalid_user/abc", headers={"Accept-Encoding": "gzip"})
+        assert 400 == response.status_code
+        assert "gzip" == response.headers["Content-Encoding"]
+        assert b"user_id" in gzip.decompress(response.body)
+
+    def test_func__compression__ok__disabled(self, build_app):
+        app = get_app(build_app, None)
+
+        response = get(app, "/users", headers={"Accept-Encoding": "gzip"})
+        assert "Content-Encoding" not in response.headers
+        assert "Vary" not in response.headers
+        assert JSON_USERS.encode("utf-8") == response.body
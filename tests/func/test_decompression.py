@@ -0,0 +1,232 @@
+# coding: utf-8
+import gzip
+import io
+import json
+import typing
+from unittest import mock
+import zlib
+
+import marshmallow
+import pytest
+from webtest import TestApp
+
+from hapic import Hapic
+from hapic import MarshmallowProcessor
+from hapic.compression import RequestDecompression
+from hapic.exception import RequestBodyException
+from hapic.exception import RequestBodyTooLargeException
+from hapic.exception import UnsupportedContentEncodingException
+from hapic.ext.agnostic.context import AgnosticApp
+from hapic.ext.agnostic.context import AgnosticContext
+from tests.base import Base
+from tests.base import WSGI_APP_BUILDERS
+
+USER = {"name": "bob", "tags": ["a"] * 1000}
+
+
+class UserSchema(marshmallow.Schema):
+    name = marshmallow.fields.String(required=True)
+    tags = marshmallow.fields.List(marshmallow.fields.String())
+
+
+class UserFormSchema(marshmallow.Schema):
+    name = marshmallow.fields.String(required=True)
+
+
+class UserQuerySchema(marshmallow.Schema):
+    notify = marshmallow.fields.Boolean(missing=False)
+
+
+def decorate_views(hapic: Hapic) -> dict:
+    @hapic.with_api_doc()
+    @hapic.input_body(UserSchema())
+    @hapic.output_body(UserSchema())
+    def create_user(*args, hapic_data=None, **kwargs):
+        return hapic_data.body
+
+    @hapic.with_api_doc()
+    @hapic.input_forms(UserFormSchema())
+    @hapic.output_body(UserFormSchema())
+    def create_user_form(*args, hapic_data=None, **kwargs):
+        return hapic_data.forms
+
+    # NOTE: with not fused wrappers, each wrapper get request parameters
+    @hapic.with_api_doc()
+    @hapic.input_query(UserQuerySchema())
+    @hapic.input_body(UserSchema())
+    @hapic.output_body(UserSchema(), etag=True)
+    def update_user(*args, hapic_data=None, **kwargs):
+        return hapic_data.body
+
+    return {
+        "/users": create_user,
+        "/users_form": create_user_form,
+        "/users_update": update_user,
+    }
+
+
+def get_app(build_app: typing.Callable, decompression=True, fused_wrappers=True) -> TestApp:
+    hapic = Hapic(
+        processor_class=MarshmallowProcessor,
+        decompression=decompression,
+        fused_wrappers=fused_wrappers,
+    )
+    return TestApp(build_app(hapic, decorate_views(hapic), method="POST"))
+
+
+class TestRequestDecompression(Base):
+    def test_unit__decompress_file__ok__gzip_and_deflate(self):
+        decompression = RequestDecompression(chunk_size=16)
+        body = b"a" * 10000
+
+        assert body == decompression.decompress_file(io.BytesIO(gzip.compress(body)), "gzip")
+        assert body == decompression.decompress_file(io.BytesIO(zlib.compress(body)), "deflate")
+
+    def test_unit__decompress_file__error__too_large(self):
+        decompression = RequestDecompression(max_size=1000)
+
+        assert b"a" * 1000 == decompression.decompress_file(
+            io.BytesIO(gzip.compress(b"a" * 1000)), "gzip"
+        )
+        with pytest.raises(RequestBodyTooLargeException) as exc_info:
+            decompression.decompress_file(io.BytesIO(gzip.compress(b"a" * 10**7)), "gzip")
+
+        # decompression stopped as soon as maximum size was exceeded
+        assert 1001 == exc_info.value.size
+        assert 1000 == exc_info.value.max_size
+
+    def test_unit__decompress_file__error__invalid_data(self):
+        decompression = RequestDecompression()
+        compressed = gzip.compress(b"a" * 1000)
+
+        with pytest.raises(RequestBodyException):
+            decompression.decompress_file(io.BytesIO(b"not compressed"), "gzip")
+
+        with pytest.raises(RequestBodyException):
+            decompression.decompress_file(io.BytesIO(compressed[:-10]), "gzip")
+
+        with pytest.raises(RequestBodyException):
+            decompression.decompress_file(io.BytesIO(compressed + b"foo"), "gzip")
+
+    def test_unit__get_encoding__ok__nominal_cases(self):
+        decompression = RequestDecompression()
+
+        assert decompression.get_encoding(None) is None
+        assert decompression.get_encoding("identity") is None
+        assert "gzip" == decompression.get_encoding("GZIP")
+        with pytest.raises(UnsupportedContentEncodingException):
+            decompression.get_encoding("br")
+
+
+@pytest.mark.parametrize("build_app", WSGI_APP_BUILDERS)
+class TestDecompressionContexts(Base):
+    @pytest.mark.parametrize(
+        "encoding,compress", [("gzip", gzip.compress), ("deflate", zlib.compress)]
+    )
+    def test_func__input_body__ok__compressed_body(self, build_app, encoding, compress):
+        app = get_app(build_app)
+
+        response = app.post(
+            "/users",
+            params=compress(json.dumps(USER).encode("utf-8")),
+            headers={"Content-Type": "application/json", "Content-Encoding": encoding},
+        )
+        assert 200 == response.status_code
+        assert USER == response.json
+
+    @pytest.mark.parametrize("fused_wrappers", [True, False])
+    def test_func__input_body__ok__compressed_body_read_by_wrappers(
+        self, build_app, fused_wrappers
+    ):
+        app = get_app(build_app, fused_wrappers=fused_wrappers)
+
+        response = app.post(
+            "/users_update?notify=1",
+            params=gzip.compress(json.dumps(USER).encode("utf-8")),
+            headers={"Content-Type": "application/json", "Content-Encoding": "gzip"},
+        )
+        assert 200 == response.status_code
+        assert USER == response.json
+        assert response.headers["ETag"]
+
+    def test_func__input_body__ok__decompressed_once_per_request(self, build_app):
+        app = get_app(build_app, fused_wrappers=False)
+        decompress_file = RequestDecompression.decompress_file
+
+        with mock.patch.object(
+            RequestDecompression, "decompress_file", autospec=True, side_effect=decompress_file
+        ) as decompress_file_mock:
+            response = app.post(
+                "/users_update?notify=1",
+                params=gzip.compress(json.dumps(USER).encode("utf-8")),
+                headers={"Content-Type": "application/json", "Content-Encoding": "gzip"},
+            )
+        assert 200 == response.status_code
+        assert USER == response.json
+        assert 1 == decompress_file_mock.call_count
+
+    def test_func__input_body__ok__not_compressed_body(self, build_app):
+        app = get_app(build_app)
+
+        response = app.post_json("/users", USER)
+        assert USER == response.json
+
+    def test_func__input_forms__ok__compressed_body(self, build_app):
+        app = get_app(build_app)
+
+        response = app.post(
+            "/users_form",
+            params=gzip.compress(b"name=bob"),
+            headers={
+                "Content-Type": "application/x-www-form-urlencoded",
+                "Content-Encoding": "gzip",
+            },
+        )
+        assert 200 == response.status_code
+        assert {"name": "bob"} == response.json
+
+    def test_func__input_body__error__too_large(self, build_app):
+        app = get_app(build_app, RequestDecompression(max_size=1000))
+
+        response = app.post(
+            "/users",
+            params=gzip.compress(json.dumps(USER).encode("utf-8")),
+            headers={"Content-Type": "application/json", "Content-Encoding": "gzip"},
+            status=413,
+        )
+        assert 413 == response.status_code
+
+    def test_func__input_body__error__invalid_compressed_body(self, build_app):
+        app = get_app(build_app)
+
+        app.post(
+            "/users",
+            params=json.dumps(USER).encode("utf-8"),
+            headers={"Content-Type": "application/json", "Content-Encoding": "gzip"},
+            status=400,
+        )
+
+    def test_func__input_body__error__unsupported_encoding(self, build_app):
+        app = get_app(build_app)
+
+        app.post(
+            "/users",
+            params=json.dumps(USER).encode("utf-8"),
+            headers={"Content-Type": "application/json", "Content-Encoding": "br"},
+            status=415,
+        )
+
+
+class TestDecompressionDoc(Base):
+    @pytest.mark.parametrize("decompression", [None, True])
+    def test_func__doc__ok__documented_only_if_enabled(self, decompression):
+        hapic = Hapic(processor_class=MarshmallowProcessor, decompression=decompression)
+        app = AgnosticApp()
+        hapic.set_context(AgnosticContext(app=app))
+        for path, view in decorate_views(hapic).items():
+            app.route(path, method="POST", callback=view)
+
+        operation = hapic.generate_doc()["paths"]["/users"]["post"]
+        parameter_names = [parameter["name"] for parameter in operation["parameters"]]
+        assert bool(decompression) == ("Content-Encoding" in parameter_names)
+        assert bool(decompression) == ("413" in operation["responses"])
@@ -0,0 +1,195 @@
+# coding: utf-8
+from datetime import datetime
+from unittest import mock
+
+import bottle
+import marshmallow
+from webtest import TestApp
+
+from hapic import Hapic
+from hapic import MarshmallowProcessor
+from hapic.ext.agnostic.context import AgnosticApp
+from hapic.ext.agnostic.context import AgnosticContext
+from hapic.ext.bottle import BottleContext
+from hapic.util import LowercaseKeysDict
+from hapic.util import get_body_etag
+from hapic.util import get_http_date
+from hapic.util import get_version_etag
+from hapic.util import is_etag_matching
+from tests.base import Base
+
+
+class UserSchema(marshmallow.Schema):
+    name = marshmallow.fields.String(required=True)
+
+
+class UserPathSchema(marshmallow.Schema):
+    user_id = marshmallow.fields.Integer(required=True)
+
+
+class TestEtag(Base):
+    def test_unit__is_etag_matching__ok__nominal_cases(self):
+        assert is_etag_matching('"abc"', '"abc"')
+        assert is_etag_matching('"foo", "abc"', '"abc"')
+        assert is_etag_matching('W/"abc"', '"abc"')
+        assert is_etag_matching("*", '"abc"')
+        assert not is_etag_matching('"foo"', '"abc"')
+        assert not is_etag_matching(None, '"abc"')
+
+    def test_func__output_body_etag__ok__agnostic(self):
+        hapic = Hapic(processor_class=MarshmallowProcessor)
+        context = AgnosticContext(app=None)
+        hapic.set_context(context)
+        etag = get_body_etag(b'{"name": "bob"}')
+
+        @hapic.with_api_doc()
+        @hapic.output_body(UserSchema(), etag=True)
+        def get_user(hapic_data=None):
+            return {"name": "bob"}
+
+        response = get_user()
+        assert 200 == response.status_code
+        assert etag == response.headers["ETag"]
+        assert '{"name": "bob"}' == response.body
+
+        context.header_parameters = LowercaseKeysDict([("if-none-match", etag)])
+        response = get_user()
+        assert 304 == response.status_code
+        assert etag == response.headers["ETag"]
+        assert "" == response.body
+
+        context.header_parameters = LowercaseKeysDict([("if-none-match", '"other"')])
+        assert 200 == get_user().status_code
+
+    def test_func__output_body_etag__ok__cached_response(self):
+        hapic = Hapic(processor_class=MarshmallowProcessor)
+        context = AgnosticContext(app=None)
+        hapic.set_context(context)
+        etag = get_body_etag(b'{"name": "bob"}')
+
+        @hapic.output_cache(ttl=60)
+        @hapic.output_body(UserSchema(), etag=True)
+        def get_user(hapic_data=None):
+            return {"name": "bob"}
+
+        assert etag == get_user().headers["ETag"]
+        context.header_parameters = LowercaseKeysDict([("if-none-match", etag)])
+        assert 304 == get_user().status_code
+
+    def test_func__output_body_etag__ok__bottle(self):
+        hapic = Hapic(processor_class=MarshmallowProcessor)
+        app = bottle.Bottle()
+        hapic.set_context(BottleContext(app=app))
+
+        @hapic.with_api_doc()
+        @hapic.output_body(UserSchema(), etag=True)
+        def get_user():
+            return {"name": "bob"}
+
+        app.route("/user", callback=get_user)
+        test_app = TestApp(app)
+
+        response = test_app.get("/user", status=200)
+        etag = response.headers["ETag"]
+        assert {"name": "bob"} == response.json
+
+        response = test_app.get("/user", headers={"If-None-Match": etag}, status=304)
+        assert etag == response.headers["ETag"]
+        assert b"" == response.body
+
+    def test_func__output_body_etag_doc__ok__not_modified_response(self):
+        hapic = Hapic(processor_class=MarshmallowProcessor)
+        app = AgnosticApp()
+        hapic.set_context(AgnosticContext(app=app))
+
+        @hapic.with_api_doc()
+        @hapic.output_body(UserSchema(), etag=True)
+        def get_user():
+            return {"name": "bob"}
+
+        app.route("/user", method="GET", callback=get_user)
+        doc = hapic.generate_doc()
+
+        responses = doc["paths"]["/user"]["get"]["responses"]
+        assert "ETag" in responses["200"]["headers"]
+        assert "304" in responses
+        assert "ETag" in responses["304"]["headers"]
+
+    def test_func__output_body_etag_func__ok__view_not_called(self):
+        hapic = Hapic(processor_class=MarshmallowProcessor)
+        context = AgnosticContext(app=None, path_parameters={"user_id": "1"})
+        hapic.set_context(context)
+        versions = {1: "v1", 2: "v2"}
+        calls = []
+
+        @hapic.with_api_doc()
+        @hapic.output_body(
+            UserSchema(), etag_func=lambda hapic_data: versions[hapic_data.path["user_id"]]
+        )
+        @hapic.input_path(UserPathSchema())
+        def get_user(hapic_data=None):
+            calls.append(hapic_data.path["user_id"])
+            return {"name": "bob"}
+
+        response = get_user()
+        assert 200 == response.status_code
+        assert get_version_etag("v1") == response.headers["ETag"]
+        assert [1] == calls
+
+        context.header_parameters = LowercaseKeysDict([("if-none-match", get_version_etag("v1"))])
+        response = get_user()
+        assert 304 == response.status_code
+        assert get_version_etag("v1") == response.headers["ETag"]
+        assert [1] == calls
+
+        context.path_parameters = {"user_id": "2"}
+        assert 200 == get_user().status_code
+        assert [1, 2] == calls
+
+    def test_func__output_body_etag_func__ok__request_parameters_built_once(self):
+        hapic = Hapic(processor_class=MarshmallowProcessor)
+        context = AgnosticContext(app=None, path_parameters={"user_id": "1"})
+        hapic.set_context(context)
+
+        @hapic.output_body(UserSchema(), etag_func=lambda hapic_data: "v1")
+        @hapic.input_path(UserPathSchema())
+        def get_user(hapic_data=None):
+            return {"name": "bob"}
+
+        with mock.patch.object(
+            context, "get_request_parameters", wraps=context.get_request_parameters
+        ) as get_request_parameters_mock:
+            assert 200 == get_user().status_code
+            assert 1 == get_request_parameters_mock.call_count
+
+            context.header_parameters = LowercaseKeysDict(
+                [("if-none-match", get_version_etag("v1"))]
+            )
+            assert 304 == get_user().status_code
+            assert 2 == get_request_parameters_mock.call_count
+
+    def test_func__output_body_etag_func__ok__if_modified_since(self):
+        hapic = Hapic(processor_class=MarshmallowProcessor)
+        context = AgnosticContext(app=None)
+        hapic.set_context(context)
+        updated_at = datetime(2019, 5, 3, 10, 20, 30, 1000)
+        calls = []
+
+        @hapic.output_body(UserSchema(), etag_func=lambda hapic_data: updated_at)
+        def get_user(hapic_data=None):
+            calls.append(1)
+            return {"name": "bob"}
+
+        response = get_user()
+        assert "Fri, 03 May 2019 10:20:30 GMT" == response.headers["Last-Modified"]
+
+        context.header_parameters = LowercaseKeysDict(
+            [("if-modified-since", get_http_date(updated_at))]
+        )
+        assert 304 == get_user().status_code
+
+        context.header_parameters = LowercaseKeysDict(
+            [("if-modified-since", "Fri, 03 May 2019 10:20:29 GMT")]
+        )
+        assert 200 == get_user().status_code
+        assert 2 == len(calls)
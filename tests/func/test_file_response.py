@@ -0,0 +1,181 @@
+# coding: utf-8
+from datetime import datetime
+import io
+import typing
+
+import pytest
+from webob import Request
+from webtest import TestApp
+
+from hapic import Hapic
+from hapic import MarshmallowProcessor
+from hapic.data import HapicFile
+from tests.base import Base
+from tests.base import WSGI_APP_BUILDERS
+
+CONTENT = b"".join(b"%06d\n" % i for i in range(50000))
+
+
+class TrackedBytesIO(io.BytesIO):
+    """BytesIO keeping size of its biggest read"""
+
+    max_read_size = 0
+
+    def read(self, size=-1):
+        chunk = super().read(size)
+        self.max_read_size = max(self.max_read_size, len(chunk))
+        return chunk
+
+
+def decorate_views(hapic: Hapic, file_objects: list) -> dict:
+    @hapic.with_api_doc()
+    @hapic.output_file(["text/plain"])
+    def file_object(*args, **kwargs):
+        file_objects.append(TrackedBytesIO(CONTENT))
+        return HapicFile(
+            file_object=file_objects[-1],
+            mimetype="text/plain",
+            filename="données.txt",
+            content_length=len(CONTENT),
+            last_modified=datetime(2020, 1, 2, 3, 4, 5),
+            etag="abc",
+            as_attachment=True,
+        )
+
+    @hapic.with_api_doc()
+    @hapic.output_file(["text/plain"])
+    def real_file_object(*args, **kwargs):
+        file_objects.append(open(__file__, "rb"))
+        return HapicFile(file_object=file_objects[-1], mimetype="text/plain")
+
+    @hapic.with_api_doc()
+    @hapic.output_file(["text/x-python"])
+    def file_path(*args, **kwargs):
+        return HapicFile(file_path=__file__, etag="v1")
+
+    return {
+        "/file_object": file_object,
+        "/real_file_object": real_file_object,
+        "/file_path": file_path,
+    }
+
+
+def get_app(build_app: typing.Callable, file_objects: list) -> typing.Callable:
+    hapic = Hapic(processor_class=MarshmallowProcessor)
+    return build_app(hapic, decorate_views(hapic, file_objects))
+
+
+@pytest.mark.parametrize("build_app", WSGI_APP_BUILDERS)
+class TestFileObjectResponse(Base):
+    def test_func__file_object__ok__headers_and_content(self, build_app):
+        file_objects = []
+        app = TestApp(get_app(build_app, file_objects))
+
+        response = app.get("/file_object")
+        assert 200 == response.status_code
+        assert CONTENT == response.body
+        assert response.headers["Content-Type"].startswith("text/plain")
+        assert str(len(CONTENT)) == response.headers["Content-Length"]
+        assert '"abc"' == response.headers["ETag"]
+        assert "Thu, 02 Jan 2020 03:04:05 GMT" == response.headers["Last-Modified"]
+        assert (
+            "attachment; filename=\"donn?es.txt\"; filename*=UTF-8''donn%C3%A9es.txt;"
+            == response.headers["Content-Disposition"]
+        )
+        # content is read by bounded chunks, and file object is closed
+        assert file_objects[0].max_read_size <= 64 * 1024
+        assert file_objects[0].closed
+
+    def test_func__file_object__ok__wsgi_file_wrapper(self, build_app):
+        file_objects = []
+        app = get_app(build_app, file_objects)
+        wrapped = []
+
+        def file_wrapper(file_object, chunk_size):
+            wrapped.append(file_object)
+            return iter(lambda: file_object.read(chunk_size), b"")
+
+        environ = Request.blank("/real_file_object").environ
+        environ["wsgi.file_wrapper"] = file_wrapper
+        body = b"".join(app(environ, lambda status, headers, exc_info=None: None))
+
+        with open(__file__, "rb") as file_:
+            assert file_.read() == body
+        assert file_objects == wrapped
+
+        # file objects without file descriptor are not given to file wrapper
+        environ = Request.blank("/file_object").environ
+        environ["wsgi.file_wrapper"] = file_wrapper
+        body = b"".join(app(environ, lambda status, headers, exc_info=None: None))
+        assert CONTENT == body
+        assert 1 == len(wrapped)
+        file_objects[0].close()
+
+
+with open(__file__, "rb") as file_:
+    FILE_PATH_CONTENT = file_.read()
+
+
+@pytest.mark.parametrize("build_app", WSGI_APP_BUILDERS)
+@pytest.mark.parametrize(
+    "path,content", [("/file_object", CONTENT), ("/file_path", FILE_PATH_CONTENT)]
+)
+class TestConditionalFileResponse(Base):
+    def test_func__file_response__ok__full(self, build_app, path, content):
+        app = TestApp(get_app(build_app, []))
+
+        response = app.get(path)
+        assert 200 == response.status_code
+        assert "bytes" == response.headers["Accept-Ranges"]
+        assert str(len(content)) == response.headers["Content-Length"]
+        assert content == response.body
+
+    def test_func__file_response__ok__single_range(self, build_app, path, content):
+        app = TestApp(get_app(build_app, []))
+
+        response = app.get(path, headers={"Range": "bytes=100-199"})
+        assert 206 == response.status_code
+        assert "bytes 100-199/{}".format(len(content)) == response.headers["Content-Range"]
+        assert "100" == response.headers["Content-Length"]
+        assert content[100:200] == response.body
+
+        response = app.get(path, headers={"Range": "bytes=-10"})
+        assert 206 == response.status_code
+        assert content[-10:] == response.body
+
+    def test_func__file_response__ok__multiple_ranges(self, build_app, path, content):
+        app = TestApp(get_app(build_app, []))
+
+        response = app.get(path, headers={"Range": "bytes=0-9,20-29"})
+        assert 206 == response.status_code
+        assert response.headers["Content-Type"].startswith("multipart/byteranges; boundary=")
+        assert str(len(response.body)) == response.headers["Content-Length"]
+        assert b"Content-Range: bytes 0-9/" in response.body
+        assert b"\r\n\r\n" + content[20:30] + b"\r\n--" in response.body
+
+    def test_func__file_response__ok__not_satisfiable(self, build_app, path, content):
+        app = TestApp(get_app(build_app, []))
+
+        response = app.get(path, headers={"Range": "bytes=100000000-"}, status="*")
+        assert 416 == response.status_code
+        assert "bytes */{}".format(len(content)) == response.headers["Content-Range"]
+        assert b"" == response.body
+
+    def test_func__file_response__ok__not_modified(self, build_app, path, content):
+        app = TestApp(get_app(build_app, []))
+        etag = '"abc"' if path == "/file_object" else '"v1"'
+
+        response = app.get(path, headers={"If-None-Match": etag}, status="*")
+        assert 304 == response.status_code
+        assert etag == response.headers["ETag"]
+        assert "Content-Type" not in response.headers
+        assert b"" == response.body
+
+        last_modified = app.get(path).headers["Last-Modified"]
+        response = app.get(path, headers={"If-Modified-Since": last_modified}, status="*")
+        assert 304 == response.status_code
+
+        # range is ignored if file changed
+        response = app.get(path, headers={"Range": "bytes=0-9", "If-Range": '"old"'})
+        assert 200 == response.status_code
+        assert content == response.body
@@ -0,0 +1,152 @@
+# coding: utf-8
+import json
+from unittest import mock
+
+import flask
+import marshmallow
+import pytest
+from webtest import TestApp
+
+from hapic import Hapic
+from hapic import MarshmallowProcessor
+from tests.base import Base
+from tests.base import get_bottle_app
+from tests.base import get_flask_app
+
+
+class ItemSchema(marshmallow.Schema):
+    name = marshmallow.fields.String(required=True)
+    rank = marshmallow.fields.Integer(missing=0)
+
+
+class ImportSchema(marshmallow.Schema):
+    source = marshmallow.fields.String(required=True)
+    items = marshmallow.fields.List(
+        marshmallow.fields.Nested(ItemSchema), required=True, stream=True
+    )
+
+
+def decorate_views(hapic: Hapic) -> dict:
+    @hapic.with_api_doc()
+    @hapic.input_body(ImportSchema(), stream_max_item_size=100)
+    def import_items(*args, hapic_data=None, **kwargs):
+        items = [item for item in hapic_data.body["items"]]
+        return flask.jsonify({"source": hapic_data.body["source"], "items": items})
+
+    @hapic.with_api_doc()
+    @hapic.input_body(ImportSchema(), stream_on_error="collect")
+    def import_items_collect(*args, hapic_data=None, **kwargs):
+        stream = hapic_data.body["items"]
+        items = [item for item in stream]
+        errors = [error.line_number for error in stream.errors]
+        return flask.jsonify({"items": items, "errors": errors})
+
+    return {"/items": import_items, "/items_collect": import_items_collect}
+
+
+def get_app(fused_wrappers: bool = True) -> TestApp:
+    hapic = Hapic(processor_class=MarshmallowProcessor, fused_wrappers=fused_wrappers)
+    return TestApp(get_flask_app(hapic, decorate_views(hapic), method="POST"))
+
+
+def post_json(app: TestApp, url: str, body: bytes, status: int = 200):
+    return app.post(url, body, headers={"Content-Type": "application/json"}, status=status)
+
+
+class TestInputBodyStream(Base):
+    def test_func__input_body_stream__ok__nominal_case(self):
+        app = get_app()
+        body = json.dumps(
+            {"source": "api", "items": [{"name": "bob{}".format(i)} for i in range(100)]}
+        ).encode()
+
+        resp = post_json(app, "/items", body)
+
+        assert "api" == resp.json["source"]
+        assert [{"name": "bob{}".format(i), "rank": 0} for i in range(100)] == resp.json["items"]
+
+    @pytest.mark.parametrize("fused_wrappers", [True, False])
+    def test_func__input_body_stream__error__invalid_element(self, fused_wrappers):
+        app = get_app(fused_wrappers)
+        body = b'{"source": "api", "items": [{"name": "bob"}, {"rank": 1}, {"name": "bill"}]}'
+
+        resp = post_json(app, "/items", body, status=400)
+
+        assert 'Validation error of input stream item at "items" element 2' == resp.json["message"]
+        assert {"name": ["Missing data for required field."]} == resp.json["details"]
+
+    def test_func__input_body_stream__error__invalid_head(self):
+        app = get_app()
+
+        resp = post_json(app, "/items", b'{"items": [{"name": "bob"}]}', status=400)
+
+        assert {"source": ["Missing data for required field."]} == resp.json["details"]
+
+    def test_func__input_body_stream__error__missing_stream_field(self):
+        app = get_app()
+
+        resp = post_json(app, "/items", b'{"source": "api"}', status=400)
+
+        assert {"items": ["Missing data for required field."]} == resp.json["details"]
+
+    def test_func__input_body_stream__error__members_after_stream_field(self):
+        app = get_app()
+        body = b'{"items": [{"name": "bob"}], "source": "api"}'
+
+        resp = post_json(app, "/items", body, status=400)
+
+        assert {"source": ["Missing data for required field."]} == resp.json["details"]
+
+        resp = post_json(app, "/items", b'{"source": "a", "items": [], "x": 1}', status=400)
+        assert resp.json["message"].startswith('Body members after "items" are not supported')
+
+    @pytest.mark.parametrize(
+        "body",
+        [
+            b'{"source": "api", "items": [{"name": "bob"}, {"name"',
+            b'{"source": "' + b"a" * 200 + b'", "items": []}',
+        ],
+    )
+    def test_func__input_body_stream__error__malformed_body(self, body):
+        app = get_app()
+
+        resp = post_json(app, "/items", body, status=400)
+
+        assert resp.json["message"].startswith("Request body is not valid json")
+
+    def test_func__input_body_stream__ok__collect_errors(self):
+        app = get_app()
+        body = b'{"source": "api", "items": [{"name": "bob"}, {"rank": 1}, 2, {"name": "bill"}]}'
+
+        resp = post_json(app, "/items_collect", body)
+
+        assert [{"name": "bob", "rank": 0}, {"name": "bill", "rank": 0}] == resp.json["items"]
+        assert [2, 3] == resp.json["errors"]
+
+    def test_func__input_body_stream__ok__not_streamed_context(self):
+        # NOTE: bottle context can't read body incrementally: stream field
+        # is loaded as a list
+        hapic = Hapic(processor_class=MarshmallowProcessor)
+
+        @hapic.with_api_doc()
+        @hapic.input_body(ImportSchema())
+        def import_items(hapic_data=None):
+            return {"names": [item["name"] for item in hapic_data.body["items"]]}
+
+        app = TestApp(get_bottle_app(hapic, {"/items": import_items}, method="POST"))
+        resp = post_json(app, "/items", b'{"source": "a", "items": [{"name": "bob"}]}')
+
+        assert {"names": ["bob"]} == resp.json
+
+    def test_unit__input_body_stream__ok__processor_built_at_first_call(self):
+        hapic = Hapic(processor_class=MarshmallowProcessor)
+
+        with mock.patch.object(
+            MarshmallowProcessor, "get_stream_field", autospec=True, return_value=None
+        ) as get_stream_field:
+            views = decorate_views(hapic)
+            assert not get_stream_field.called
+
+            app = TestApp(get_flask_app(hapic, views, method="POST"))
+            post_json(app, "/items", b'{"source": "a", "items": []}')
+            assert get_stream_field.called
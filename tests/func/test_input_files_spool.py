@@ -0,0 +1,204 @@
+# coding: utf-8
+import io
+import json
+import typing
+from unittest import mock
+
+import marshmallow
+import pytest
+from webtest import TestApp
+from werkzeug.datastructures import FileStorage
+
+from hapic import Hapic
+from hapic import MarshmallowProcessor
+from hapic.exception import ConfigurationException
+from hapic.ext.agnostic.context import AgnosticContext
+from hapic.file import SpooledUploadFile
+from hapic.file import check_uploads_size
+from hapic.file import get_upload_file_object
+from tests.base import Base
+from tests.base import WSGI_APP_BUILDERS
+from tests.base import get_bottle_app
+from tests.base import get_flask_app
+
+CONTENT = b"a" * 100 * 1024
+
+
+class AvatarSchema(marshmallow.Schema):
+    avatar = marshmallow.fields.Raw(required=True)
+
+
+class AvatarAndThumbnailSchema(marshmallow.Schema):
+    avatar = marshmallow.fields.Raw(required=True)
+    thumbnail = marshmallow.fields.Raw(required=True)
+
+
+def decorate_views(hapic: Hapic, file_objects: list) -> dict:
+    @hapic.with_api_doc()
+    @hapic.input_files(AvatarSchema(), spool_threshold=1024, max_size=200 * 1024)
+    def avatar(*args, hapic_data=None, **kwargs):
+        file_object = get_upload_file_object(hapic_data.files["avatar"])
+        file_objects.append(file_object)
+        return "{}".format(len(file_object.read()))
+
+    @hapic.with_api_doc()
+    @hapic.input_files(AvatarSchema(), spool_threshold=1024, max_size=10 * 1024)
+    def small_avatar(*args, hapic_data=None, **kwargs):
+        raise AssertionError("Test should no pass here")
+
+    @hapic.with_api_doc()
+    @hapic.input_files(AvatarSchema(), spool_threshold=1024, max_size=200 * 1024)
+    def broken_avatar(*args, hapic_data=None, **kwargs):
+        file_objects.append(get_upload_file_object(hapic_data.files["avatar"]))
+        raise ZeroDivisionError()
+
+    return {"/avatar": avatar, "/small_avatar": small_avatar, "/broken_avatar": broken_avatar}
+
+
+def get_app(build_app: typing.Callable, file_objects: list) -> typing.Callable:
+    hapic = Hapic(processor_class=MarshmallowProcessor)
+    return build_app(hapic, decorate_views(hapic, file_objects), method="POST")
+
+
+class TestInputFilesSpool(Base):
+    # NOTE: pyramid files (cgi.FieldStorage) can't be validated by
+    # marshmallow processor
+    @pytest.mark.parametrize("build_app", [get_flask_app, get_bottle_app])
+    def test_func__input_files_spool__ok__file_handle(self, build_app):
+        file_objects = []
+        app = TestApp(get_app(build_app, file_objects))
+
+        response = app.post("/avatar", upload_files=[("avatar", "avatar.png", CONTENT)])
+        assert 200 == response.status_code
+        assert str(len(CONTENT)) == response.text
+        # uploaded file is closed after view
+        assert 1 == len(file_objects)
+        assert file_objects[0].closed
+
+        if build_app is get_flask_app:
+            # flask context parse multipart body while read
+            assert isinstance(file_objects[0], SpooledUploadFile)
+            assert file_objects[0].on_disk
+
+    @pytest.mark.parametrize("build_app", WSGI_APP_BUILDERS)
+    def test_func__input_files_spool__error__too_large(self, build_app):
+        app = TestApp(get_app(build_app, []))
+
+        response = app.post(
+            "/small_avatar", upload_files=[("avatar", "avatar.png", CONTENT)], status="*"
+        )
+        assert 413 == response.status_code
+        assert "Uploaded file exceed 10240 bytes" == response.json["message"]
+
+    @pytest.mark.parametrize("build_app", [get_flask_app, get_bottle_app])
+    def test_func__input_files_spool__ok__closed_after_view_error(self, build_app):
+        file_objects = []
+        app = TestApp(get_app(build_app, file_objects))
+
+        response = app.post(
+            "/broken_avatar",
+            upload_files=[("avatar", "avatar.png", CONTENT)],
+            status="*",
+            expect_errors=True,
+        )
+        assert 500 == response.status_code
+        assert 1 == len(file_objects)
+        assert file_objects[0].closed
+
+    def test_func__input_files_spool__error__too_large_second_file(self):
+        uploads = []
+
+        class RecordedSpooledUploadFile(SpooledUploadFile):
+            def __init__(self, *args, **kwargs):
+                super().__init__(*args, **kwargs)
+                uploads.append(self)
+
+        app = TestApp(get_app(get_flask_app, []))
+        with mock.patch("hapic.ext.flask.context.SpooledUploadFile", RecordedSpooledUploadFile):
+            response = app.post(
+                "/small_avatar",
+                upload_files=[
+                    ("thumbnail", "thumbnail.png", b"a" * 1024),
+                    ("avatar", "avatar.png", CONTENT),
+                ],
+                status="*",
+            )
+
+        assert 413 == response.status_code
+        # file spooled before the too large one is closed too
+        assert 2 == len(uploads)
+        assert all(upload.closed for upload in uploads)
+
+
+class TestInputFilesClose(Base):
+    def test_unit__input_files__ok__size_checked_once(self):
+        file_object = io.BytesIO(CONTENT)
+        hapic = Hapic(processor_class=MarshmallowProcessor)
+        hapic.set_context(
+            AgnosticContext(
+                app=None,
+                files_parameters={"avatar": FileStorage(stream=file_object, filename="avatar.png")},
+            )
+        )
+
+        @hapic.input_files(AvatarSchema(), max_size=200 * 1024)
+        def avatar(hapic_data=None):
+            assert not file_object.closed
+            return "OK"
+
+        with mock.patch(
+            "hapic.decorator.check_uploads_size", wraps=check_uploads_size
+        ) as check_uploads_size_mock:
+            assert "OK" == avatar()
+        assert 1 == check_uploads_size_mock.call_count
+        assert file_object.closed
+
+    def test_unit__input_files__error__too_large(self):
+        file_object = io.BytesIO(CONTENT)
+        hapic = Hapic(processor_class=MarshmallowProcessor)
+        hapic.set_context(
+            AgnosticContext(
+                app=None,
+                files_parameters={"avatar": FileStorage(stream=file_object, filename="avatar.png")},
+            )
+        )
+
+        @hapic.input_files(AvatarSchema(), max_size=10 * 1024)
+        def avatar(hapic_data=None):
+            raise AssertionError("Test should no pass here")
+
+        response = avatar()
+        assert 413 == response.status_code
+        assert file_object.closed
+
+    def test_unit__input_files__error__invalid_files(self):
+        file_object = io.BytesIO(CONTENT)
+        hapic = Hapic(processor_class=MarshmallowProcessor)
+        hapic.set_context(
+            AgnosticContext(
+                app=None,
+                files_parameters={"avatar": FileStorage(stream=file_object, filename="avatar.png")},
+            )
+        )
+
+        @hapic.input_files(AvatarAndThumbnailSchema(), max_size=200 * 1024)
+        def avatar(hapic_data=None):
+            raise AssertionError("Test should no pass here")
+
+        response = avatar()
+        assert 400 == response.status_code
+        assert {"thumbnail": ["Missing data for required field"]} == json.loads(response.body)[
+            "original_error"
+        ]["details"]
+        assert file_object.closed
+
+
+class TestInputFilesSpoolConfiguration(Base):
+    def test_unit__input_files__error__bad_spool_parameters(self):
+        hapic = Hapic(processor_class=MarshmallowProcessor)
+
+        with pytest.raises(ConfigurationException):
+            hapic.input_files(AvatarSchema(), spool_threshold=-1)
+
+        with pytest.raises(ConfigurationException):
+            hapic.input_files(AvatarSchema(), max_size=0)
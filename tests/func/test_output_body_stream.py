@@ -0,0 +1,180 @@
+# coding: utf-8
+import json
+import typing
+
+import marshmallow
+import pytest
+from webob import Request
+from webtest import TestApp
+
+from hapic import Hapic
+from hapic import MarshmallowProcessor
+from hapic.exception import ConfigurationException
+from hapic.exception import DecorationException
+from hapic.exception import ProcessException
+from hapic.ext.agnostic.context import AgnosticContext
+from tests.base import Base
+from tests.base import WSGI_APP_BUILDERS
+
+
+class UserSchema(marshmallow.Schema):
+    name = marshmallow.fields.String(required=True)
+
+
+def get_users(count: int, invalid_index: int = None):
+    for i in range(count):
+        yield {"name": "bob{}".format(i)} if i != invalid_index else {}
+
+
+def decorate_views(hapic: Hapic, consumed: list) -> dict:
+    @hapic.with_api_doc()
+    @hapic.output_body(UserSchema(many=True), stream=True, stream_chunk_size=3)
+    def users(*args, **kwargs):
+        for user in get_users(10):
+            consumed.append(user)
+            yield user
+
+    @hapic.with_api_doc()
+    @hapic.output_body(UserSchema(many=True), stream=True)
+    def no_users(*args, **kwargs):
+        return iter([])
+
+    @hapic.with_api_doc()
+    @hapic.output_body(UserSchema(many=True), stream=True, stream_chunk_size=3)
+    def invalid_users(*args, **kwargs):
+        return get_users(10, invalid_index=1)
+
+    return {"/users": users, "/no_users": no_users, "/invalid_users": invalid_users}
+
+
+def get_app(build_app: typing.Callable, consumed: list) -> typing.Callable:
+    hapic = Hapic(processor_class=MarshmallowProcessor)
+    return build_app(hapic, decorate_views(hapic, consumed))
+
+
+@pytest.mark.parametrize("build_app", WSGI_APP_BUILDERS)
+class TestOutputBodyStream(Base):
+    def test_func__output_body_stream__ok__json_array(self, build_app):
+        app = TestApp(get_app(build_app, []))
+
+        response = app.get("/users")
+        assert 200 == response.status_code
+        assert "application/json" == response.headers["Content-Type"]
+        assert list(get_users(10)) == json.loads(response.body)
+
+    def test_func__output_body_stream__ok__empty(self, build_app):
+        app = TestApp(get_app(build_app, []))
+
+        response = app.get("/no_users")
+        assert 200 == response.status_code
+        assert [] == response.json
+
+    def test_func__output_body_stream__ok__lazy_consumption(self, build_app):
+        consumed = []
+        app = get_app(build_app, consumed)
+
+        started = []
+        environ = Request.blank("/users").environ
+        app_iter = app(environ, lambda status, headers, exc_info=None: started.append(headers))
+        # only first chunk is consumed before response body is sent
+        assert len(consumed) < 10
+        assert "content-length" not in [name.lower() for name, _ in started[0]]
+        body = b"".join(app_iter)
+        assert 10 == len(consumed)
+        assert list(get_users(10)) == json.loads(body)
+
+    def test_func__output_body_stream__error__first_chunk(self, build_app):
+        app = TestApp(get_app(build_app, []))
+
+        response = app.get("/invalid_users", status="*")
+        assert 500 == response.status_code
+        assert "Validation error of output data" == response.json["message"]
+
+
+class NoDetailsMarshmallowProcessor(MarshmallowProcessor):
+    """Processor raising dump errors without validation error details"""
+
+    def dump(self, data):
+        try:
+            return super().dump(data)
+        except ProcessException as exc:
+            raise ProcessException(str(exc)) from exc
+
+
+class ErrorsAgnosticContext(AgnosticContext):
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self.invalid_outputs = []
+
+    def output_validation_error_caught(self, output, process_exception) -> None:
+        self.invalid_outputs.append(list(output))
+
+
+class TestOutputBodyStreamAgnostic(Base):
+    def test_unit__output_body_stream__ok__chunks(self):
+        hapic = Hapic(processor_class=MarshmallowProcessor)
+        hapic.set_context(AgnosticContext(app=None))
+
+        @hapic.output_body(UserSchema(many=True), stream=True, stream_chunk_size=2)
+        def users(hapic_data=None):
+            return get_users(5)
+
+        response = users()
+        assert 200 == response.status_code
+        # "[", 3 chunks of (at most) two items and "]"
+        assert 5 == len(list(response.response))
+
+    def test_unit__output_body_stream__error__first_chunk_details(self):
+        hapic = Hapic(processor_class=NoDetailsMarshmallowProcessor)
+        hapic.set_context(ErrorsAgnosticContext(app=None))
+
+        @hapic.output_body(UserSchema(many=True), stream=True, stream_chunk_size=3)
+        def users(hapic_data=None):
+            return get_users(10, invalid_index=1)
+
+        response = users()
+        assert 500 == response.status_code
+        # error is the one of invalid chunk, not of remaining items
+        assert {"1": {"name": ["Missing data for required field."]}} == json.loads(response.body)[
+            "original_error"
+        ]["details"]
+
+    def test_unit__output_body_stream__error__second_chunk(self):
+        context = ErrorsAgnosticContext(app=None)
+        hapic = Hapic(processor_class=NoDetailsMarshmallowProcessor)
+        hapic.set_context(context)
+
+        @hapic.output_body(UserSchema(many=True), stream=True, stream_chunk_size=3)
+        def users(hapic_data=None):
+            return get_users(10, invalid_index=4)
+
+        response = users()
+        assert 200 == response.status_code
+        chunks = iter(response.response)
+        assert b"[" == next(chunks)
+        next(chunks)
+
+        # response is interrupted, error is the one of invalid chunk
+        with pytest.raises(ProcessException) as exc_info:
+            next(chunks)
+        assert [list(get_users(10, invalid_index=4))[3:6]] == context.invalid_outputs
+        assert {1: {"name": ["Missing data for required field."]}} == (
+            exc_info.value.validation_error.details
+        )
+
+    def test_unit__output_body_stream__error__configuration(self):
+        hapic = Hapic(processor_class=MarshmallowProcessor)
+        hapic.set_context(AgnosticContext(app=None))
+
+        with pytest.raises(ConfigurationException):
+            hapic.output_body(UserSchema(many=True), stream=True, etag=True)
+
+        with pytest.raises(ConfigurationException):
+            hapic.output_body(UserSchema(many=True), stream=True, stream_chunk_size=0)
+
+        with pytest.raises(DecorationException):
+
+            @hapic.output_cache()
+            @hapic.output_body(UserSchema(many=True), stream=True)
+            def users(hapic_data=None):
+                return []
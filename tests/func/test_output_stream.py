@@ -0,0 +1,137 @@
+# coding: utf-8
+import gzip
+import json
+import typing
+
+import marshmallow
+import pytest
+from webob import Request
+from webtest import TestApp
+
+from hapic import Hapic
+from hapic import MarshmallowProcessor
+from hapic.ext.agnostic.context import AgnosticContext
+from tests.base import Base
+from tests.base import WSGI_APP_BUILDERS
+
+
+class UserSchema(marshmallow.Schema):
+    name = marshmallow.fields.String(required=True)
+
+
+def get_users(count: int):
+    for i in range(count):
+        # third item is invalid
+        yield {"name": "bob{}".format(i)} if i != 2 else {}
+
+
+def decorate_views(hapic: Hapic, consumed: list) -> dict:
+    @hapic.with_api_doc()
+    @hapic.output_stream(UserSchema())
+    def users(*args, **kwargs):
+        for user in get_users(5):
+            consumed.append(user)
+            yield user
+
+    @hapic.with_api_doc()
+    @hapic.output_stream(UserSchema(), ignore_on_error=False)
+    def strict_users(*args, **kwargs):
+        return get_users(5)
+
+    @hapic.with_api_doc()
+    @hapic.output_stream(UserSchema(), format="json")
+    def json_users(*args, **kwargs):
+        return get_users(5)
+
+    @hapic.with_api_doc()
+    @hapic.output_stream(UserSchema(), format="sse")
+    def sse_users(*args, **kwargs):
+        return get_users(3)
+
+    return {
+        "/users": users,
+        "/strict_users": strict_users,
+        "/json_users": json_users,
+        "/sse_users": sse_users,
+    }
+
+
+def get_app(build_app: typing.Callable, consumed: list, compression=None) -> typing.Callable:
+    hapic = Hapic(processor_class=MarshmallowProcessor, compression=compression)
+    return build_app(hapic, decorate_views(hapic, consumed))
+
+
+@pytest.mark.parametrize("build_app", WSGI_APP_BUILDERS)
+class TestOutputStream(Base):
+    def test_func__output_stream__ok__ignore_on_error(self, build_app):
+        app = TestApp(get_app(build_app, []))
+
+        response = app.get("/users")
+        assert 200 == response.status_code
+        assert response.headers["Content-Type"].startswith("text/plain")
+        assert [{"name": "bob0"}, {"name": "bob1"}, {"name": "bob3"}, {"name": "bob4"}] == [
+            json.loads(line) for line in response.body.splitlines()
+        ]
+
+    def test_func__output_stream__ok__stop_on_error(self, build_app):
+        app = TestApp(get_app(build_app, []))
+
+        response = app.get("/strict_users")
+        assert 200 == response.status_code
+        assert [{"name": "bob0"}, {"name": "bob1"}] == [
+            json.loads(line) for line in response.body.splitlines()
+        ]
+
+    def test_func__output_stream__ok__json_array_format(self, build_app):
+        app = TestApp(get_app(build_app, []))
+
+        response = app.get("/json_users")
+        assert "application/json" == response.headers["Content-Type"]
+        assert [{"name": "bob0"}, {"name": "bob1"}, {"name": "bob3"}, {"name": "bob4"}] == (
+            response.json
+        )
+
+    def test_func__output_stream__ok__sse_format(self, build_app):
+        app = TestApp(get_app(build_app, []))
+
+        response = app.get("/sse_users")
+        assert "text/event-stream" == response.headers["Content-Type"]
+        assert "no-cache" == response.headers["Cache-Control"]
+        assert b'data: {"name": "bob0"}\n\ndata: {"name": "bob1"}\n\n' == response.body
+
+    def test_func__output_stream__ok__lazy_consumption(self, build_app):
+        consumed = []
+        app = get_app(build_app, consumed)
+
+        started = []
+        environ = Request.blank("/users").environ
+        app_iter = app(environ, lambda status, headers, exc_info=None: started.append(headers))
+        # view generator is consumed only while response body is sent
+        assert len(consumed) < 5
+        assert "content-length" not in [name.lower() for name, _ in started[0]]
+        body = b"".join(app_iter)
+        assert 5 == len(consumed)
+        assert 4 == len(body.splitlines())
+
+    def test_func__output_stream__ok__compressed(self, build_app):
+        app = get_app(build_app, [], compression=True)
+
+        response = Request.blank("/users", headers={"Accept-Encoding": "gzip"}).get_response(app)
+        assert "gzip" == response.headers["Content-Encoding"]
+        assert 4 == len(gzip.decompress(response.body).splitlines())
+
+
+class TestOutputStreamAgnostic(Base):
+    def test_unit__output_stream__ok__agnostic(self):
+        hapic = Hapic(processor_class=MarshmallowProcessor)
+        hapic.set_context(AgnosticContext(app=None))
+
+        @hapic.output_stream(UserSchema())
+        def users(hapic_data=None):
+            return get_users(4)
+
+        response = users()
+        assert 200 == response.status_code
+        assert [b'{"name": "bob0"}\n', b'{"name": "bob1"}\n', b'{"name": "bob3"}\n'] == list(
+            response.response
+        )
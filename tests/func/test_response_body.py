@@ -0,0 +1,56 @@
+# coding: utf-8
+from bottle import Bottle
+from flask import Flask
+from pyramid.config import Configurator
+import pytest
+
+from hapic.ext.bottle import BottleContext
+from hapic.ext.flask import FlaskContext
+from hapic.ext.pyramid import PyramidContext
+from tests.base import Base
+
+
+def get_flask_body(response) -> bytes:
+    return response.get_data()
+
+
+def get_bottle_body(response) -> bytes:
+    return response.body
+
+
+def get_pyramid_body(response) -> bytes:
+    return response.body
+
+
+@pytest.mark.parametrize(
+    "context,get_body",
+    [
+        (FlaskContext(Flask(__name__)), get_flask_body),
+        (BottleContext(Bottle()), get_bottle_body),
+        (PyramidContext(Configurator()), get_pyramid_body),
+    ],
+)
+class TestResponseBody(Base):
+    @pytest.mark.parametrize(
+        "body", ['{"name": "bob"}', b'{"name": "bob"}', memoryview(b'{"name": "bob"}')]
+    )
+    def test_func__get_response__ok__body_types(self, context, get_body, body):
+        response = context.get_response(body, 200)
+
+        assert b'{"name": "bob"}' == bytes(get_body(response))
+        assert "15" == response.headers["Content-Length"]
+        assert response.headers["Content-Type"].startswith("application/json")
+
+    def test_func__get_response__ok__headers(self, context, get_body):
+        response = context.get_response(b"{}", 200, headers=[("ETag", '"abc"')])
+
+        assert '"abc"' == response.headers["ETag"]
+        assert b"{}" == bytes(get_body(response))
+
+    def test_func__get_response__ok__not_modified_without_body(self, context, get_body):
+        response = context.get_response(b"", 304, headers=[("ETag", '"abc"')])
+
+        assert 304 == response.status_code
+        assert '"abc"' == response.headers["ETag"]
+        assert b"" == bytes(get_body(response))
+        assert "Content-Type" not in response.headers
@@ -0,0 +1,254 @@
+# coding: utf-8
+import threading
+import time
+from unittest import mock
+
+import marshmallow
+import pytest
+
+from hapic import Hapic
+from hapic import HapicData
+from hapic.cache import OutputCache
+from hapic.cache import get_default_cache_key
+from hapic.exception import ConfigurationException
+from hapic.exception import DecorationException
+from hapic.ext.agnostic.context import AgnosticContext
+from hapic.ext.agnostic.context import AgnosticResponse
+from hapic.processor.marshmallow import MarshmallowProcessor
+from tests.base import Base
+
+
+class FakeClock(object):
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class UserSchema(marshmallow.Schema):
+    name = marshmallow.fields.String(required=True)
+
+
+class UserPathSchema(marshmallow.Schema):
+    user_id = marshmallow.fields.Integer(required=True)
+
+
+class TestOutputCache(Base):
+    def test_unit__get__ok__ttl_expiration(self):
+        clock = FakeClock()
+        cache = OutputCache(ttl=10, clock=clock)
+        cache.set("a", b"42", 200)
+
+        clock.now = 9
+        assert b"42" == cache.get("a").body
+        clock.now = 10
+        assert cache.get("a") is None
+        assert 0 == len(cache)
+
+    def test_unit__set__ok__lru_eviction(self):
+        cache = OutputCache(max_entries=2)
+        cache.set("a", b"1", 200)
+        cache.set("b", b"2", 200)
+        # a become the most recently used
+        cache.get("a")
+        cache.set("c", b"3", 200)
+
+        assert cache.get("b") is None
+        assert b"1" == cache.get("a").body
+        assert b"3" == cache.get("c").body
+
+    def test_unit__init__error__bad_parameters(self):
+        with pytest.raises(ConfigurationException):
+            OutputCache(ttl=0)
+
+        with pytest.raises(ConfigurationException):
+            OutputCache(max_entries=0)
+
+    def test_unit__get_or_compute__ok__hits_and_misses(self):
+        cache = OutputCache()
+
+        def compute():
+            return cache.create_entry(b"42", 200)
+
+        assert b"42" == cache.get_or_compute("a", compute).body
+        assert b"42" == cache.get_or_compute("a", compute).body
+        assert 1 == cache.misses
+        assert 1 == cache.hits
+
+    def test_unit__get_or_compute__ok__not_cached_result(self):
+        cache = OutputCache()
+
+        assert cache.get_or_compute("a", lambda: None) is None
+        assert cache.get_or_compute("a", lambda: None) is None
+        assert 2 == cache.misses
+        assert 0 == len(cache)
+
+    def test_unit__get_or_compute__ok__concurrent_misses_compute_once(self):
+        cache = OutputCache()
+        computations = []
+        results = []
+
+        def compute():
+            computations.append(1)
+            time.sleep(0.05)
+            return cache.create_entry(b"42", 200)
+
+        def get():
+            results.append(cache.get_or_compute("a", compute).body)
+
+        threads = [threading.Thread(target=get) for _ in range(5)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert 1 == len(computations)
+        assert [b"42"] * 5 == results
+        assert 1 == cache.misses
+        assert 4 == cache.hits
+
+    def test_unit__get_default_cache_key__ok__query_and_headers(self):
+        hapic_data = HapicData()
+        hapic_data.path = {"user_id": 1}
+        hapic_data.query = {"tags": ["a", "b"], "page": 1}
+        hapic_data.headers = {"accept_language": "fr", "user_agent": "foo"}
+
+        key = get_default_cache_key(hapic_data, headers=["accept_language"])
+        hash(key)
+
+        hapic_data.headers["user_agent"] = "bar"
+        assert key == get_default_cache_key(hapic_data, headers=["accept_language"])
+
+        hapic_data.headers["accept_language"] = "en"
+        assert key != get_default_cache_key(hapic_data, headers=["accept_language"])
+
+    def test_unit__get_default_cache_key__ok__without_dataclasses(self):
+        hapic_data = HapicData()
+        hapic_data.path = {"user_id": 1}
+        hapic_data.query = {"tags": ["a", "b"]}
+
+        # dataclasses module is not available before python 3.7
+        with mock.patch("hapic.cache.dataclasses", None):
+            key = get_default_cache_key(hapic_data)
+        hash(key)
+        assert key == get_default_cache_key(hapic_data)
+
+
+class TestOutputCacheDecorator(Base):
+    def test_unit__output_cache__ok__hit_skip_view(self):
+        hapic = Hapic(processor_class=MarshmallowProcessor)
+        context = AgnosticContext(app=None, path_parameters={"user_id": "1"})
+        hapic.set_context(context)
+        calls = []
+
+        @hapic.with_api_doc()
+        @hapic.output_cache(ttl=60)
+        @hapic.output_body(UserSchema())
+        @hapic.input_path(UserPathSchema())
+        def get_user(hapic_data=None):
+            calls.append(hapic_data.path["user_id"])
+            return {"name": "bob{}".format(hapic_data.path["user_id"])}
+
+        response = get_user()
+        assert 200 == response.status_code
+        assert '{"name": "bob1"}' == response.body
+        response = get_user()
+        assert '{"name": "bob1"}' == response.body
+        assert [1] == calls
+
+        context.path_parameters = {"user_id": "2"}
+        assert '{"name": "bob2"}' == get_user().body
+        assert [1, 2] == calls
+
+        cache = hapic.controllers[0].description.output_cache.wrapper.cache
+        assert 1 == cache.hits
+        assert 2 == cache.misses
+
+    def test_unit__output_cache__ok__invalid_input_and_output_not_cached(self):
+        hapic = Hapic(processor_class=MarshmallowProcessor)
+        context = AgnosticContext(app=None, path_parameters={"user_id": "abc"})
+        hapic.set_context(context)
+        calls = []
+
+        @hapic.output_cache(ttl=60)
+        @hapic.output_body(UserSchema())
+        @hapic.input_path(UserPathSchema())
+        def get_user(hapic_data=None):
+            calls.append(hapic_data.path["user_id"])
+            return {}
+
+        assert 400 == get_user().status_code
+        assert [] == calls
+
+        context.path_parameters = {"user_id": "1"}
+        assert 500 == get_user().status_code
+        assert 500 == get_user().status_code
+        assert [1, 1] == calls
+
+    def test_unit__output_cache__ok__framework_response_not_cached(self):
+        hapic = Hapic(processor_class=MarshmallowProcessor)
+        hapic.set_context(AgnosticContext(app=None))
+        calls = []
+
+        @hapic.output_cache(ttl=60)
+        @hapic.output_body(UserSchema())
+        def get_user(hapic_data=None):
+            calls.append(1)
+            return AgnosticResponse("{}", 202, "application/json")
+
+        assert 202 == get_user().status_code
+        assert 202 == get_user().status_code
+        assert 2 == len(calls)
+
+    def test_unit__output_cache__ok__custom_key(self):
+        hapic = Hapic(processor_class=MarshmallowProcessor)
+        context = AgnosticContext(app=None, path_parameters={"user_id": "1"})
+        hapic.set_context(context)
+
+        @hapic.output_cache(ttl=60, key=lambda hapic_data: "same")
+        @hapic.output_body(UserSchema())
+        @hapic.input_path(UserPathSchema())
+        def get_user(hapic_data=None):
+            return {"name": "bob{}".format(hapic_data.path["user_id"])}
+
+        assert '{"name": "bob1"}' == get_user().body
+        context.path_parameters = {"user_id": "2"}
+        assert '{"name": "bob1"}' == get_user().body
+
+    def test_unit__output_cache__error__no_output_body(self):
+        hapic = Hapic(processor_class=MarshmallowProcessor)
+
+        with pytest.raises(DecorationException):
+
+            @hapic.output_cache(ttl=60)
+            @hapic.input_path(UserPathSchema())
+            def get_user(hapic_data=None):
+                return {}
+
+    @pytest.mark.parametrize("async_", [False, True])
+    def test_unit__output_cache__error__etag_func_output_body(self, async_):
+        hapic = Hapic(processor_class=MarshmallowProcessor, async_=async_)
+
+        with pytest.raises(DecorationException) as exc_info:
+
+            @hapic.output_cache(ttl=60)
+            @hapic.output_body(UserSchema(), etag_func=lambda hapic_data: 1)
+            @hapic.input_path(UserPathSchema())
+            def get_user(hapic_data=None):
+                return {}
+
+        assert "etag_func" in str(exc_info.value)
+
+    @pytest.mark.parametrize("async_", [False, True])
+    def test_unit__output_cache__error__stream_output_body(self, async_):
+        hapic = Hapic(processor_class=MarshmallowProcessor, async_=async_)
+
+        with pytest.raises(DecorationException) as exc_info:
+
+            @hapic.output_cache(ttl=60)
+            @hapic.output_body(UserSchema(many=True), stream=True)
+            def get_users(hapic_data=None):
+                return []
+
+        assert "stream" in str(exc_info.value)
@@ -1,4 +1,6 @@
 # -*- coding: utf-8 -*-
+import asyncio
+import functools
 import json
 import typing
 
@@ -7,12 +9,15 @@ import marshmallow
 from multidict import MultiDict
 import pytest
 
+from hapic import Hapic
 from hapic.data import HapicData
+from hapic.decorator import ControllerPipeline
 from hapic.decorator import ExceptionHandlerControllerWrapper
 from hapic.decorator import InputControllerWrapper
 from hapic.decorator import InputOutputControllerWrapper
 from hapic.decorator import InputQueryControllerWrapper
 from hapic.decorator import OutputControllerWrapper
+from hapic.decorator import await_while_connected
 from hapic.error.main import ErrorBuilderInterface
 from hapic.error.marshmallow import MarshmallowDefaultErrorBuilder
 from hapic.exception import OutputValidationException
@@ -21,6 +26,7 @@ from hapic.processor.main import Processor
 from hapic.processor.main import ProcessValidationError
 from hapic.processor.main import RequestParameters
 from hapic.processor.marshmallow import MarshmallowProcessor
+from hapic.validation import OutputValidation
 from tests.base import Base
 
 try:  # Python 3.5+
@@ -213,6 +219,29 @@ class TestInputControllerWrapper(Base):
         result = func()
         assert result == "abc"
 
+    def test_unit__input_data_wrapping__fail__no_second_validation(self):
+        class MyMarshmallowProcessor(MarshmallowProcessor):
+            def get_input_validation_error(self, data_to_validate):
+                raise AssertionError("Validation error must be taken from load exception")
+
+        context = AgnosticContext(app=None, query_parameters=MultiDict((("foo", "bar"),)))
+        processor = MyMarshmallowProcessor(MySchema())
+        wrapper = InputQueryControllerWrapper(context, lambda: processor)
+
+        @wrapper.get_wrapper
+        def func(hapic_data=None):
+            raise AssertionError("controller must not be called")
+
+        result = func()
+        assert HTTPStatus.BAD_REQUEST == result.status_code
+        assert {
+            "original_error": {
+                "details": {"name": ["Missing data for required field."]},
+                "message": "Validation error of input data",
+            },
+            "http_code": 400,
+        } == json.loads(result.body)
+
 
 class TestOutputControllerWrapper(Base):
     def test_unit__output_data_wrapping__ok__nominal_case(self):
@@ -250,6 +279,72 @@ class TestOutputControllerWrapper(Base):
             "http_code": 500,
         } == json.loads(result.body)
 
+    def test_unit__output_data_wrapping__fail__no_second_validation(self):
+        class MyMarshmallowProcessor(MarshmallowProcessor):
+            def get_output_validation_error(self, data_to_validate):
+                raise AssertionError("Validation error must be taken from dump exception")
+
+        context = AgnosticContext(app=None)
+        processor = MyMarshmallowProcessor(MySchema())
+        wrapper = OutputControllerWrapper(context, lambda: processor)
+
+        @wrapper.get_wrapper
+        def func(foo):
+            return "wrong result format"
+
+        result = func(42)
+        assert HTTPStatus.INTERNAL_SERVER_ERROR == result.status_code
+        assert {
+            "original_error": {
+                "details": {"name": ["Missing data for required field."]},
+                "message": "Validation error of output data",
+            },
+            "http_code": 500,
+        } == json.loads(result.body)
+
+    def test_unit__output_data_wrapping__ok__trusted_output_validation(self):
+        context = AgnosticContext(app=None)
+        processor = MarshmallowProcessor(MySchema())
+        wrapper = OutputControllerWrapper(
+            context, lambda: processor, output_validation=OutputValidation("trusted")
+        )
+
+        @wrapper.get_wrapper
+        def func(foo):
+            return {"nickname": "bob"}
+
+        result = func(42)
+        assert HTTPStatus.OK == result.status_code
+        assert {} == json.loads(result.body)
+
+    def test_unit__output_data_wrapping__fail__sampled_output_validation(self):
+        class MyContext(AgnosticContext):
+            caught_errors = []
+
+            def output_validation_error_caught(self, output, process_exception):
+                self.caught_errors.append(process_exception)
+
+        context = MyContext(app=None)
+        processor = MarshmallowProcessor(MySchema())
+        wrapper = OutputControllerWrapper(
+            context, lambda: processor, output_validation=OutputValidation("sample", sample_rate=3)
+        )
+
+        @wrapper.get_wrapper
+        def func(foo):
+            return {"nickname": "bob"}
+
+        status_codes = [func(42).status_code for _ in range(6)]
+        assert [
+            HTTPStatus.OK,
+            HTTPStatus.OK,
+            HTTPStatus.INTERNAL_SERVER_ERROR,
+            HTTPStatus.OK,
+            HTTPStatus.OK,
+            HTTPStatus.INTERNAL_SERVER_ERROR,
+        ] == status_codes
+        assert 2 == len(context.caught_errors)
+
 
 class TestExceptionHandlerControllerWrapper(Base):
     def test_unit__exception_handled__ok__nominal_case(self):
@@ -331,3 +426,223 @@ class TestExceptionHandlerControllerWrapper(Base):
         wrapper = wrapper.get_wrapper(raise_it)
         with pytest.raises(OutputValidationException):
             wrapper()
+
+    def test_unit__exception_handler__ok__skip_error_validation(self):
+        class MyException(Exception):
+            pass
+
+        class MyErrorBuilder(MarshmallowDefaultErrorBuilder):
+            def build_from_exception(
+                self, exception: Exception, include_traceback: bool = False
+            ) -> dict:
+                # this is not matching with DefaultErrorBuilder schema
+                return {"details": {"foo": "bar"}}
+
+        context = AgnosticContext(app=None)
+        error_builder = MyErrorBuilder(validate_errors=False)
+        wrapper = ExceptionHandlerControllerWrapper(
+            MyException,
+            context,
+            error_builder=error_builder,
+            processor_factory=lambda schema_: MarshmallowProcessor(error_builder.get_schema()),
+        )
+
+        def raise_it():
+            raise MyException()
+
+        wrapper = wrapper.get_wrapper(raise_it)
+        response = wrapper()
+        assert response.status_code == HTTPStatus.INTERNAL_SERVER_ERROR
+        assert {"details": {"foo": "bar"}} == json.loads(response.body)
+
+
+class TestControllerPipeline(Base):
+    def test_unit__pipeline__ok__request_parameters_built_once(self):
+        class CountingContext(AgnosticContext):
+            request_parameters_count = 0
+
+            def get_request_parameters(self, *args, **kwargs) -> RequestParameters:
+                self.request_parameters_count += 1
+                return super().get_request_parameters(*args, **kwargs)
+
+        context = CountingContext(
+            app=None,
+            path_parameters={"name": "bob"},
+            query_parameters=MultiDict((("name", "franck"),)),
+            header_parameters={"name": "alice"},
+        )
+        hapic = Hapic(processor_class=MarshmallowProcessor)
+        hapic.set_context(context)
+
+        @hapic.with_api_doc()
+        @hapic.output_body(MySchema())
+        @hapic.input_headers(MySchema())
+        @hapic.input_query(MySchema())
+        @hapic.input_path(MySchema())
+        def func(hapic_data=None):
+            assert hapic_data.path == {"name": "bob"}
+            assert hapic_data.query == {"name": "franck"}
+            assert hapic_data.headers == {"name": "alice"}
+            return {"name": "{}, {}".format(hapic_data.path["name"], hapic_data.query["name"])}
+
+        pipeline = ControllerPipeline.from_decorated_function(func.__wrapped__)
+        assert 4 == len(pipeline.wrappers)
+
+        assert {"name": "bob, franck"} == json.loads(func().body)
+        assert 1 == context.request_parameters_count
+
+    def test_unit__pipeline__ok__input_error_short_circuit(self):
+        context = AgnosticContext(app=None, path_parameters={})
+        hapic = Hapic(processor_class=MarshmallowProcessor)
+        hapic.set_context(context)
+
+        @hapic.with_api_doc()
+        @hapic.output_body(MySchema())
+        @hapic.input_path(MySchema())
+        def func(hapic_data=None):
+            raise AssertionError("controller must not be called")
+
+        response = func()
+        assert HTTPStatus.BAD_REQUEST == response.status_code
+        assert "name" in json.loads(response.body)["original_error"]["details"]
+
+    def test_unit__pipeline__ok__exception_handler_semantic(self):
+        class MyException(Exception):
+            pass
+
+        context = AgnosticContext(app=None)
+        hapic = Hapic(processor_class=MarshmallowProcessor)
+        hapic.set_context(context)
+
+        @hapic.with_api_doc()
+        @hapic.handle_exception(MyException, http_code=HTTPStatus.CONFLICT)
+        @hapic.output_body(MySchema())
+        def func():
+            raise MyException("We are testing")
+
+        @hapic.with_api_doc()
+        @hapic.output_body(MySchema())
+        @hapic.handle_exception(MyException, http_code=HTTPStatus.CONFLICT)
+        def func2():
+            return {"name": "bob"}
+
+        response = func()
+        assert HTTPStatus.CONFLICT == response.status_code
+        assert "We are testing" == json.loads(response.body)["message"]
+        assert {"name": "bob"} == json.loads(func2().body)
+
+    def test_unit__pipeline__ok__stop_at_foreign_decorator(self):
+        context = AgnosticContext(app=None, path_parameters={"name": "bob"})
+        hapic = Hapic(processor_class=MarshmallowProcessor)
+        hapic.set_context(context)
+
+        def foreign_decorator(func):
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                kwargs["foreign"] = True
+                return func(*args, **kwargs)
+
+            return wrapper
+
+        @hapic.with_api_doc()
+        @hapic.output_body(MySchema())
+        @foreign_decorator
+        @hapic.input_path(MySchema())
+        def func(hapic_data=None, foreign=False):
+            assert foreign
+            return hapic_data.path
+
+        pipeline = ControllerPipeline.from_decorated_function(func.__wrapped__)
+        assert 1 == len(pipeline.wrappers)
+        assert {"name": "bob"} == json.loads(func().body)
+
+    def test_unit__pipeline__ok__fused_wrappers_disabled(self):
+        context = AgnosticContext(app=None, path_parameters={"name": "bob"})
+        hapic = Hapic(processor_class=MarshmallowProcessor, fused_wrappers=False)
+        hapic.set_context(context)
+
+        @hapic.with_api_doc()
+        @hapic.output_body(MySchema())
+        @hapic.input_path(MySchema())
+        def func(hapic_data=None):
+            return hapic_data.path
+
+        assert {"name": "bob"} == json.loads(func().body)
+
+
+class DisconnectingContext(AgnosticContext):
+    def __init__(self, disconnect_check_interval: typing.Optional[float] = 0.01) -> None:
+        super().__init__(app=None)
+        self._disconnect_check_interval = disconnect_check_interval
+        self.disconnected = False
+        self.disconnections = []
+
+    @property
+    def disconnect_check_interval(self) -> typing.Optional[float]:
+        return self._disconnect_check_interval
+
+    def is_client_disconnected(self, func_args, func_kwargs) -> bool:
+        return self.disconnected
+
+    def client_disconnection_caught(self, func_args, func_kwargs) -> None:
+        self.disconnections.append(func_args)
+
+
+class TestAwaitWhileConnected(Base):
+    async def test_unit__await_while_connected__ok__connected(self, loop):
+        context = DisconnectingContext()
+
+        async def view():
+            await asyncio.sleep(0.05)
+            return 42
+
+        assert 42 == await await_while_connected(context, view(), ("request",), {})
+        assert [] == context.disconnections
+
+    async def test_unit__await_while_connected__ok__cancel_on_disconnect(self, loop):
+        context = DisconnectingContext()
+        view_steps = []
+
+        async def view():
+            try:
+                for step in range(100):
+                    view_steps.append(step)
+                    await asyncio.sleep(0.01)
+            except asyncio.CancelledError:
+                view_steps.append("cancelled")
+                raise
+
+        async def disconnect():
+            await asyncio.sleep(0.05)
+            context.disconnected = True
+
+        asyncio.ensure_future(disconnect())
+        with pytest.raises(asyncio.CancelledError):
+            await await_while_connected(context, view(), ("request",), {})
+
+        assert "cancelled" == view_steps[-1]
+        assert len(view_steps) < 20
+        assert [("request",)] == context.disconnections
+
+    async def test_unit__await_while_connected__ok__not_nested(self, loop):
+        context = DisconnectingContext()
+
+        async def view():
+            # nested watch must not report disconnection a second time
+            return await await_while_connected(context, asyncio.sleep(1), ("request",), {})
+
+        async def disconnect():
+            await asyncio.sleep(0.05)
+            context.disconnected = True
+
+        asyncio.ensure_future(disconnect())
+        with pytest.raises(asyncio.CancelledError):
+            await await_while_connected(context, view(), ("request",), {})
+        assert 1 == len(context.disconnections)
+
+    async def test_unit__await_while_connected__ok__disabled(self, loop):
+        context = DisconnectingContext(disconnect_check_interval=None)
+        context.disconnected = True
+
+        assert 42 == await await_while_connected(context, asyncio.sleep(0.02, 42), (), {})
+        assert [] == context.disconnections
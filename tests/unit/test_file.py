@@ -0,0 +1,286 @@
+# coding: utf-8
+from datetime import datetime
+import io
+import os
+
+import pytest
+
+from hapic.data import HapicFile
+from hapic.exception import RequestBodyTooLargeException
+from hapic.file import ConditionalFileResponse
+from hapic.file import FileMetadataCache
+from hapic.file import FileObjectIterator
+from hapic.file import SpooledUploadFile
+from hapic.file import check_uploads_size
+from hapic.file import close_uploads
+from hapic.file import get_file_descriptor
+from hapic.file import get_file_ranges_chunks
+from hapic.file import parse_range_header
+from tests.base import Base
+
+
+class TestFileObjectIterator(Base):
+    def test_unit__iterate__ok__chunks(self):
+        file_object = io.BytesIO(b"abcdefghij")
+
+        assert [b"abcd", b"efgh", b"ij"] == list(FileObjectIterator(file_object, chunk_size=4))
+        assert file_object.closed
+
+    def test_unit__iterate__ok__length(self):
+        file_object = io.BytesIO(b"abcdefghij")
+        file_object.seek(1)
+
+        assert [b"bcd", b"ef"] == list(FileObjectIterator(file_object, chunk_size=3, length=5))
+
+    def test_unit__get_file_descriptor__ok__real_file(self):
+        assert get_file_descriptor(io.BytesIO()) is None
+        with open(__file__, "rb") as file_:
+            assert file_.fileno() == get_file_descriptor(file_)
+
+
+class TestParseRangeHeader(Base):
+    @pytest.mark.parametrize(
+        "value,expected",
+        [
+            ("bytes=0-9", [(0, 10)]),
+            ("bytes=90-", [(90, 10)]),
+            ("bytes=-5", [(95, 5)]),
+            ("bytes=-500", [(0, 100)]),
+            ("bytes=10-19, 50-1000", [(10, 10), (50, 50)]),
+            ("bytes=100-200", []),
+            ("bytes=-0", []),
+            ("bytes=5-1", None),
+            ("bytes=a-b", None),
+            ("bytes=-", None),
+            ("items=0-9", None),
+            ("bytes=", None),
+            ("bytes=" + ",".join(["0-1"] * 101), None),
+        ],
+    )
+    def test_unit__parse_range_header__ok__nominal_cases(self, value, expected):
+        assert expected == parse_range_header(value, 100)
+
+
+class TestConditionalFileResponse(Base):
+    def get_file_response(self, **kwargs) -> HapicFile:
+        kwargs.setdefault("file_object", io.BytesIO(b"0123456789"))
+        return HapicFile(
+            mimetype="text/plain", etag="v1", last_modified=datetime(2020, 1, 2, 3, 4, 5), **kwargs
+        )
+
+    def test_unit__evaluate__ok__not_modified(self):
+        file_response = self.get_file_response()
+
+        assert 304 == ConditionalFileResponse(file_response, {"If-None-Match": '"v1"'}).http_code
+        assert 200 == ConditionalFileResponse(file_response, {"If-None-Match": '"v0"'}).http_code
+        assert (
+            304
+            == ConditionalFileResponse(
+                file_response, {"If-Modified-Since": "Thu, 02 Jan 2020 03:04:05 GMT"}
+            ).http_code
+        )
+        assert (
+            200
+            == ConditionalFileResponse(
+                file_response, {"If-Modified-Since": "Thu, 02 Jan 2020 03:04:04 GMT"}
+            ).http_code
+        )
+
+    def test_unit__evaluate__ok__single_range(self):
+        file_object = io.BytesIO(b"xx0123456789")
+        file_object.seek(2)
+        response = ConditionalFileResponse(
+            self.get_file_response(file_object=file_object), {"Range": "bytes=2-4"}
+        )
+
+        assert 206 == response.http_code
+        headers = dict(response.get_headers())
+        assert "bytes 2-4/10" == headers["Content-Range"]
+        assert "3" == headers["Content-Length"]
+        assert b"234" == b"".join(get_file_ranges_chunks(file_object, response.get_parts()))
+
+    def test_unit__evaluate__ok__multiple_ranges(self):
+        file_object = io.BytesIO(b"0123456789")
+        response = ConditionalFileResponse(
+            self.get_file_response(file_object=file_object), {"Range": "bytes=0-1,-2"}
+        )
+
+        assert 206 == response.http_code
+        headers = dict(response.get_headers())
+        body = b"".join(get_file_ranges_chunks(file_object, response.get_parts()))
+        boundary = response.boundary.encode()
+        assert (
+            b"--" + boundary + b"\r\nContent-Type: text/plain\r\n"
+            b"Content-Range: bytes 0-1/10\r\n\r\n01\r\n"
+            b"--" + boundary + b"\r\nContent-Type: text/plain\r\n"
+            b"Content-Range: bytes 8-9/10\r\n\r\n89\r\n"
+            b"--" + boundary + b"--\r\n"
+        ) == body
+        assert str(len(body)) == headers["Content-Length"]
+
+    def test_unit__evaluate__ok__if_range(self):
+        file_response = self.get_file_response()
+
+        response = ConditionalFileResponse(
+            file_response, {"Range": "bytes=0-1", "If-Range": '"v1"'}
+        )
+        assert 206 == response.http_code
+
+        response = ConditionalFileResponse(
+            file_response, {"Range": "bytes=0-1", "If-Range": '"v0"'}
+        )
+        assert 200 == response.http_code
+
+        response = ConditionalFileResponse(
+            file_response, {"Range": "bytes=0-1", "If-Range": "Thu, 02 Jan 2020 03:04:05 GMT"}
+        )
+        assert 206 == response.http_code
+
+    def test_unit__evaluate__ok__not_satisfiable(self):
+        response = ConditionalFileResponse(self.get_file_response(), {"Range": "bytes=10-"})
+
+        assert 416 == response.http_code
+        assert not response.has_body
+        assert "bytes */10" == dict(response.get_headers())["Content-Range"]
+
+    def test_unit__evaluate__ok__ranges_not_supported(self):
+        file_response = self.get_file_response(use_conditional_response=False)
+        response = ConditionalFileResponse(file_response, {"Range": "bytes=0-1"})
+        assert 200 == response.http_code
+        assert "none" == dict(response.get_headers())["Accept-Ranges"]
+
+        file_object = io.BufferedReader(io.BytesIO(b"0123456789"))
+        file_object.seekable = lambda: False
+        response = ConditionalFileResponse(
+            self.get_file_response(file_object=file_object), {"Range": "bytes=0-1"}
+        )
+        assert 200 == response.http_code
+        assert "Content-Length" not in dict(response.get_headers())
+
+    def test_unit__evaluate__ok__file_path(self):
+        response = ConditionalFileResponse(HapicFile(file_path=__file__), {"Range": "bytes=0-5"})
+
+        assert 206 == response.http_code
+        assert "text/x-python" == dict(response.get_headers())["Content-Type"]
+        assert response.last_modified is not None
+        with open(__file__, "rb") as file_:
+            expected = file_.read(6)
+        assert expected == b"".join(get_file_ranges_chunks(response.open(), response.get_parts()))
+
+
+class TestFileMetadataCache(Base):
+    def test_unit__get__ok__computed_once_per_version(self, tmp_path):
+        path = str(tmp_path / "avatar.png")
+        with open(path, "wb") as file_:
+            file_.write(b"abc")
+        os.utime(path, ns=(10**18, 10**18))
+        cache = FileMetadataCache()
+
+        metadata = cache.get(path)
+        assert 3 == metadata.size
+        assert "image/png" == metadata.mimetype
+        assert metadata.etag.startswith('"') and metadata.etag.endswith('"')
+        assert metadata is cache.get(path)
+        assert (1, 1) == (cache.hits, cache.misses)
+
+        os.utime(path, ns=(10**18, 10**18 + 1))
+        new_metadata = cache.get(path)
+        assert new_metadata is not metadata
+        assert new_metadata.etag != metadata.etag
+        assert 1 == len(cache)
+
+    def test_unit__get__ok__not_a_file(self, tmp_path):
+        cache = FileMetadataCache()
+
+        assert cache.get(str(tmp_path)) is None
+        assert cache.get(str(tmp_path / "missing")) is None
+        assert 0 == len(cache)
+
+    def test_unit__get__ok__lru_eviction(self, tmp_path):
+        paths = []
+        for name in ("a", "b", "c"):
+            paths.append(str(tmp_path / name))
+            open(paths[-1], "wb").close()
+        cache = FileMetadataCache(max_entries=2)
+
+        cache.get(paths[0])
+        cache.get(paths[1])
+        cache.get(paths[0])
+        cache.get(paths[2])
+
+        assert 2 == len(cache)
+        cache.get(paths[0])
+        assert 2 == cache.hits
+        cache.get(paths[1])
+        assert 2 == cache.hits
+
+    def test_unit__get_content_disposition__ok__cached(self):
+        metadata = FileMetadataCache().get(__file__)
+        file_response = HapicFile(file_path=__file__, filename="a.py", as_attachment=True)
+
+        disposition = metadata.get_content_disposition(file_response)
+        assert disposition == file_response.get_content_disposition_header_value()
+        assert disposition is metadata.get_content_disposition(file_response)
+
+    def test_unit__conditional_response__ok__computed_etag(self):
+        cache = FileMetadataCache()
+        etag = cache.get(__file__).etag
+
+        response = ConditionalFileResponse(
+            HapicFile(file_path=__file__), {"If-None-Match": etag}, metadata_cache=cache
+        )
+        assert 304 == response.http_code
+
+
+class Upload(object):
+    def __init__(self, content: bytes, attribute_name: str = "file") -> None:
+        setattr(self, attribute_name, io.BytesIO(content))
+
+
+class TestSpooledUploadFile(Base):
+    def test_unit__write__ok__rolled_over_threshold(self):
+        upload = SpooledUploadFile(spool_threshold=10)
+
+        upload.write(b"abcdefghij")
+        assert not upload.on_disk
+        upload.write(b"k")
+        assert upload.on_disk
+        assert get_file_descriptor(upload) is not None
+
+        upload.seek(0)
+        assert b"abcdefghijk" == upload.read()
+        upload.close()
+
+    def test_unit__init__ok__zero_threshold(self):
+        upload = SpooledUploadFile(spool_threshold=0)
+
+        assert upload.on_disk
+        upload.close()
+
+    def test_unit__write__error__too_large(self):
+        upload = SpooledUploadFile(spool_threshold=10, max_size=15)
+        upload.write(b"a" * 15)
+
+        with pytest.raises(RequestBodyTooLargeException) as exc_info:
+            upload.write(b"a")
+        assert 15 == exc_info.value.max_size
+        assert 16 == exc_info.value.size
+        upload.close()
+
+    def test_unit__check_uploads_size__ok__already_read_files(self):
+        small = Upload(b"abc")
+        small.file.seek(1)
+
+        check_uploads_size({"small": small, "other": "not a file"}, max_size=3)
+        # position is kept
+        assert 1 == small.file.tell()
+
+        with pytest.raises(RequestBodyTooLargeException):
+            check_uploads_size({"big": Upload(b"abcd", "stream")}, max_size=3)
+
+    def test_unit__close_uploads__ok__file_and_stream_attributes(self):
+        uploads = {"a": Upload(b"abc", "file"), "b": Upload(b"abc", "stream")}
+        close_uploads(uploads)
+
+        assert uploads["a"].file.closed
+        assert uploads["b"].stream.closed
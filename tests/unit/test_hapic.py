@@ -1,6 +1,10 @@
 # -*- coding: utf-8 -*-
+import marshmallow
+import pytest
+
 from hapic import Hapic
 from hapic.decorator import DECORATION_ATTRIBUTE_NAME
+from hapic.exception import ConfigurationException
 from tests.base import Base
 
 
@@ -50,3 +54,12 @@ class TestHapic(Base):
         assert MyControllers.controller_a != reference.wrapped
         assert my_controllers.controller_a != reference.wrapper
         assert my_controllers.controller_a != reference.wrapped
+
+    def test_unit__input_stream__error__sync_hapic(self):
+        hapic = Hapic()
+
+        class ItemSchema(marshmallow.Schema):
+            name = marshmallow.fields.String()
+
+        with pytest.raises(ConfigurationException):
+            hapic.input_stream(ItemSchema())
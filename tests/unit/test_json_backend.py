@@ -0,0 +1,75 @@
+# coding: utf-8
+import json
+
+import marshmallow
+import pytest
+
+from hapic import Hapic
+from hapic.exception import ConfigurationException
+from hapic.ext.agnostic.context import AgnosticContext
+from hapic.json_backend import JsonBackend
+from hapic.json_backend import RapidjsonBackend
+from hapic.json_backend import StdlibJsonBackend
+from hapic.json_backend import get_json_backend
+from hapic.processor.marshmallow import MarshmallowProcessor
+from tests.base import Base
+
+
+class MyJsonBackend(JsonBackend):
+    def encode(self, obj):
+        return json.dumps(obj, sort_keys=True, separators=(",", ":")).encode("utf-8")
+
+    def decode(self, data):
+        return json.loads(data)
+
+
+class TestJsonBackend(Base):
+    def test_unit__stdlib__ok__encode_decode(self):
+        backend = StdlibJsonBackend()
+
+        assert json.dumps({"name": "bob", "é": [1, 2]}).encode("utf-8") == backend.encode(
+            {"name": "bob", "é": [1, 2]}
+        )
+        assert {"name": "bob"} == backend.decode(b'{"name": "bob"}')
+        assert {"name": "bob"} == backend.decode('{"name": "bob"}')
+        assert '{"name": "bob"}' == backend.dumps({"name": "bob"})
+
+        with pytest.raises(ValueError):
+            backend.decode(b"{not json")
+
+    def test_unit__rapidjson__ok__encode_decode(self):
+        pytest.importorskip("rapidjson")
+        backend = RapidjsonBackend()
+
+        assert {"name": "bob"} == json.loads(backend.encode({"name": "bob"}))
+        assert {"name": "bob"} == backend.decode(b'{"name": "bob"}')
+
+        with pytest.raises(ValueError):
+            backend.decode(b"{not json")
+
+    def test_unit__get_json_backend__ok__nominal_case(self):
+        backend = MyJsonBackend()
+
+        assert isinstance(get_json_backend(), StdlibJsonBackend)
+        assert isinstance(get_json_backend("stdlib"), StdlibJsonBackend)
+        assert isinstance(get_json_backend("auto"), JsonBackend)
+        assert backend is get_json_backend(backend)
+
+        with pytest.raises(ConfigurationException):
+            get_json_backend("simdjson")
+
+    def test_unit__hapic_json_backend__ok__used_by_decorators(self):
+        class MySchema(marshmallow.Schema):
+            name = marshmallow.fields.String(required=True)
+            age = marshmallow.fields.Integer(required=True)
+
+        hapic = Hapic(processor_class=MarshmallowProcessor, json_backend=MyJsonBackend())
+        context = AgnosticContext(app=None)
+        hapic.set_context(context)
+        assert hapic.json_backend is context.json_backend
+
+        @hapic.output_body(MySchema())
+        def my_controller():
+            return {"name": "bob", "age": 42}
+
+        assert '{"age":42,"name":"bob"}' == my_controller().body
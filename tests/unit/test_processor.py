@@ -10,6 +10,7 @@ import pytest
 from hapic.data import HapicFile
 from hapic.exception import ProcessException
 from hapic.exception import ValidationException
+from hapic.processor.main import ProcessorRegistry
 from hapic.processor.marshmallow import MarshmallowProcessor
 from tests.base import Base
 
@@ -236,3 +237,71 @@ class TestProcessor(Base):
 
         data = processor.load(tested_data)
         assert {"first_name": "Alan", "last_name": "Doe"} == data
+
+    def test_unit__marshmallow_load__error__exception_carry_validation_error(self):
+        processor = MarshmallowProcessor()
+        processor.set_schema(MySchema())
+
+        with pytest.raises(ValidationException) as exc_info:
+            processor.load({"last_name": "Turing"})
+
+        validation_error = exc_info.value.validation_error
+        assert "Validation error of input data" == validation_error.message
+        assert (
+            processor.get_input_validation_error({"last_name": "Turing"}).details
+            == validation_error.details
+        )
+
+    def test_unit__marshmallow_dump__error__exception_carry_validation_error(self):
+        processor = MarshmallowProcessor()
+        processor.set_schema(MySchema())
+
+        with pytest.raises(ValidationException) as exc_info:
+            processor.dump({"last_name": "Turing"})
+
+        validation_error = exc_info.value.validation_error
+        assert "Validation error of output data" == validation_error.message
+        assert "first_name" in validation_error.details
+
+
+class TestProcessorRegistry(Base):
+    def test_unit__get_processor__ok__reuse_processor(self):
+        registry = ProcessorRegistry()
+        schema = MySchema()
+
+        processor = registry.get_processor(MarshmallowProcessor, schema)
+        assert processor is registry.get_processor(MarshmallowProcessor, schema)
+        assert processor is not registry.get_processor(MarshmallowProcessor, MySchema())
+        assert 2 == len(registry)
+
+    def test_unit__get_processor__ok__processor_kwargs_in_key(self):
+        class MyProcessor(MarshmallowProcessor):
+            def __init__(self, schema=None, only=None):
+                super().__init__(schema)
+                self.only = only
+
+        registry = ProcessorRegistry()
+        schema = MySchema()
+
+        processor = registry.get_processor(MyProcessor, schema, only=["first_name"])
+        assert ["first_name"] == processor.only
+        assert processor is registry.get_processor(MyProcessor, schema, only=["first_name"])
+        assert processor is not registry.get_processor(MyProcessor, schema)
+
+    def test_unit__get_processor__ok__max_size(self):
+        registry = ProcessorRegistry(max_size=2)
+        schema1, schema2, schema3 = MySchema(), MySchema(), MySchema()
+
+        processor1 = registry.get_processor(MarshmallowProcessor, schema1)
+        registry.get_processor(MarshmallowProcessor, schema2)
+        registry.get_processor(MarshmallowProcessor, schema3)
+
+        assert 2 == len(registry)
+        assert processor1 is not registry.get_processor(MarshmallowProcessor, schema1)
+
+    def test_unit__marshmallow_dump_without_validation__ok__nominal_case(self):
+        processor = MarshmallowProcessor(MySchema())
+
+        with pytest.raises(ValidationException):
+            processor.dump({"last_name": "Doe"})
+        assert {"last_name": "Doe"} == processor.dump_without_validation({"last_name": "Doe"})
@@ -6,6 +6,7 @@ import pytest
 from serpyco import ValidationError
 
 from hapic.exception import OutputValidationException
+from hapic.exception import ValidationException
 from hapic.processor.serpyco import SerpycoProcessor
 from tests.base import Base
 
@@ -104,3 +105,43 @@ class TestSerpycoProcessor(Base):
         # TODO BS 2019-03-27: Must be tested when
         #  https://gitlab.com/sgrignard/serpyco/issues/26 fixed
         # assert isinstance(validation_error.original_exception, ValidationError)
+
+    def test_unit__serializer__ok__shared_between_processors(self) -> None:
+        processor1 = SerpycoProcessor(UserSchema)
+        processor2 = SerpycoProcessor(UserSchema)
+        processor3 = SerpycoProcessor(UserSchema, many=True)
+
+        assert processor1.serializer is processor2.serializer
+        assert processor1.serializer is not processor3.serializer
+
+    def test_unit__set_schema__ok__reset_serializer(
+        self, serpyco_processor: SerpycoProcessor
+    ) -> None:
+        serpyco_processor.set_schema(UserSchema)
+        assert {"name": "bob"} == serpyco_processor.dump(UserSchema(name="bob"))
+
+        serpyco_processor.set_schema(OneFileSchema)
+        assert {"file1": "foo"} == serpyco_processor.dump(OneFileSchema(file1="foo"))
+
+    def test_unit__dump_without_validation__ok__nominal_case(self) -> None:
+        processor = SerpycoProcessor(UserSchema)
+
+        with pytest.raises(ValidationException):
+            processor.dump(UserSchema(name=42))
+        assert {"name": 42} == processor.dump_without_validation(UserSchema(name=42))
+
+    def test_unit__load__error__exception_carry_validation_error(
+        self, serpyco_processor: SerpycoProcessor
+    ) -> None:
+        serpyco_processor.set_schema(UserSchema)
+
+        with pytest.raises(ValidationException) as exc_info:
+            serpyco_processor.load({"name": 42})
+
+        validation_error = exc_info.value.validation_error
+        assert validation_error.message.startswith("Validation error of input data")
+        assert isinstance(validation_error.original_exception, ValidationError)
+        assert (
+            serpyco_processor.get_input_validation_error({"name": 42}).details
+            == validation_error.details
+        )
@@ -0,0 +1,269 @@
+# coding: utf-8
+import asyncio
+
+import pytest
+
+from hapic.exception import ConfigurationException
+from hapic.exception import InputStreamValidationException
+from hapic.exception import ValidationException
+from hapic.stream import BufferedStreamWriter
+from hapic.stream import InputStream
+from hapic.stream import JsonArrayChunksStreamFormat
+from hapic.stream import JsonArrayMemberParser
+from hapic.stream import JsonArrayStreamFormat
+from hapic.stream import SseStreamFormat
+from hapic.stream import get_lines
+from hapic.stream import get_stream_format
+from tests.base import Base
+
+
+class FakeStream(object):
+    def __init__(self) -> None:
+        self.writes = []
+        self.can_write = asyncio.Event()
+        self.can_write.set()
+
+    async def write(self, data: bytes) -> None:
+        await self.can_write.wait()
+        self.writes.append(data)
+
+
+async def get_chunks(count: int, delay: float = 0, produced: list = None):
+    for i in range(count):
+        if delay:
+            await asyncio.sleep(delay)
+        if produced is not None:
+            produced.append(i)
+        yield "{:04d}\n".format(i).encode()
+
+
+class TestBufferedStreamWriter(Base):
+    async def test_unit__write_chunks__ok__batched_by_size(self, loop):
+        stream = FakeStream()
+        writer = BufferedStreamWriter(flush_size=100, flush_interval=10)
+
+        await writer.write_chunks(get_chunks(1000), stream.write)
+
+        assert b"".join(b"%04d\n" % i for i in range(1000)) == b"".join(stream.writes)
+        # 5 bytes chunks are written by 20
+        assert 50 == len(stream.writes)
+
+    async def test_unit__write_chunks__ok__not_buffered(self, loop):
+        stream = FakeStream()
+        writer = BufferedStreamWriter(flush_size=0)
+
+        await writer.write_chunks(get_chunks(10), stream.write)
+
+        assert [b"%04d\n" % i for i in range(10)] == stream.writes
+
+    async def test_unit__write_chunks__ok__flushed_after_interval(self, loop):
+        stream = FakeStream()
+        writer = BufferedStreamWriter(flush_size=1024, flush_interval=0.01)
+        writing = asyncio.ensure_future(writer.write_chunks(get_chunks(3, delay=0.2), stream.write))
+
+        # first chunk is written without waiting next chunks
+        await asyncio.sleep(0.3)
+        assert [b"0000\n"] == stream.writes
+
+        await writing
+        assert [b"0000\n", b"0001\n", b"0002\n"] == stream.writes
+
+    async def test_unit__write_chunks__ok__backpressure(self, loop):
+        stream = FakeStream()
+        stream.can_write.clear()
+        produced = []
+        writer = BufferedStreamWriter(flush_size=0, max_queue_size=4)
+        writing = asyncio.ensure_future(
+            writer.write_chunks(get_chunks(1000, produced=produced), stream.write)
+        )
+
+        await asyncio.sleep(0.05)
+        # one chunk is being written, max_queue_size are queued, one is
+        # waiting for a place in queue
+        assert 6 == len(produced)
+        assert [] == stream.writes
+
+        stream.can_write.set()
+        await writing
+        assert 1000 == len(produced)
+        assert 1000 == len(stream.writes)
+
+    async def test_unit__write_chunks__error__production_error(self, loop):
+        async def get_failing_chunks():
+            yield b"a"
+            yield b"b"
+            raise ZeroDivisionError()
+
+        stream = FakeStream()
+        writer = BufferedStreamWriter()
+
+        with pytest.raises(ZeroDivisionError):
+            await writer.write_chunks(get_failing_chunks(), stream.write)
+        # chunks produced before error are written
+        assert b"ab" == b"".join(stream.writes)
+
+    async def test_unit__write_chunks__ok__producer_cancelled_on_write_error(self, loop):
+        produced = []
+
+        async def write(data: bytes) -> None:
+            raise ConnectionResetError()
+
+        writer = BufferedStreamWriter(flush_size=0, max_queue_size=1)
+        with pytest.raises(ConnectionResetError):
+            await writer.write_chunks(get_chunks(1000, produced=produced), write)
+
+        await asyncio.sleep(0.01)
+        assert len(produced) < 5
+
+    async def test_unit__write_chunks__ok__keep_alive(self, loop):
+        stream = FakeStream()
+        writer = BufferedStreamWriter(flush_size=0)
+
+        await writer.write_chunks(
+            get_chunks(2, delay=0.25),
+            stream.write,
+            keep_alive_chunk=b":\n",
+            keep_alive_interval=0.1,
+        )
+
+        assert [b":\n", b":\n", b"0000\n", b":\n", b":\n", b"0001\n"] == stream.writes
+
+    def test_unit__init__error__bad_parameters(self):
+        with pytest.raises(ConfigurationException):
+            BufferedStreamWriter(flush_size=-1)
+
+        with pytest.raises(ConfigurationException):
+            BufferedStreamWriter(max_queue_size=0)
+
+
+class TestStreamFormat(Base):
+    def test_unit__get_chunks__ok__formats(self):
+        items = [b'{"a": 1}', b'{"a": 2}']
+
+        assert b'{"a": 1}\n{"a": 2}\n' == b"".join(get_stream_format("text").get_chunks(items))
+        assert b'{"a": 1}\n{"a": 2}\n' == b"".join(get_stream_format("ndjson").get_chunks(items))
+        assert b'[{"a": 1},{"a": 2}]' == b"".join(get_stream_format("json").get_chunks(items))
+        assert b"[]" == b"".join(get_stream_format("json").get_chunks([]))
+        assert b'data: {"a": 1}\n\ndata: {"a": 2}\n\n' == b"".join(
+            get_stream_format("sse").get_chunks(items)
+        )
+
+    def test_unit__get_chunks__ok__json_chunks(self):
+        chunks = [b'[{"a": 1}, {"a": 2}]', b'[{"a": 3}]']
+
+        assert b'[{"a": 1}, {"a": 2},{"a": 3}]' == b"".join(
+            JsonArrayChunksStreamFormat().get_chunks(chunks)
+        )
+
+    def test_unit__get_item__ok__sse_multiline(self):
+        assert b"data: {\ndata: }\n\n" == SseStreamFormat().get_item(b"{\n}", 0)
+
+    def test_unit__get_stream_format__ok__instance(self):
+        stream_format = JsonArrayStreamFormat()
+
+        assert stream_format is get_stream_format(stream_format)
+        assert "application/x-ndjson" == get_stream_format("ndjson").mimetype
+
+    def test_unit__get_stream_format__error__unknown(self):
+        with pytest.raises(ConfigurationException):
+            get_stream_format("xml")
+
+        with pytest.raises(ConfigurationException):
+            SseStreamFormat(keep_alive_interval=0)
+
+
+async def iterate(items: list):
+    for item in items:
+        yield item
+
+
+def load_positive(data: int) -> int:
+    if data < 0:
+        raise ValidationException("negative")
+    return data
+
+
+class TestInputStream(Base):
+    async def test_unit__get_lines__ok__split_chunks(self, loop):
+        chunks = [b"ab\ncd", b"ef", b"\n\ngh\n", b"ij"]
+
+        assert [b"ab", b"cdef", b"", b"gh", b"ij"] == [
+            line async for line in get_lines(iterate(chunks), max_line_size=10)
+        ]
+
+    async def test_unit__get_lines__ok__too_long_lines(self, loop):
+        chunks = [b"abc\nabcdef", b"gh\nabcd", b"efgh\nab\nabcdefg"]
+
+        assert [b"abc", None, None, b"ab", None] == [
+            line async for line in get_lines(iterate(chunks), max_line_size=4)
+        ]
+
+    async def test_unit__iterate__ok__error_policies(self, loop):
+        lines = [b"1", b"", b"-2", b"x", None, b"3"]
+        caught = []
+
+        stream = InputStream(iterate(lines), int, load_positive, "skip", caught.append)
+        assert [1, 3] == [item async for item in stream]
+        assert 3 == len(caught)
+        assert 2 == stream.items_count
+
+        stream = InputStream(iterate(lines), int, load_positive, "collect")
+        assert [1, 3] == [item async for item in stream]
+        assert [3, 4, 5] == [error.line_number for error in stream.errors]
+
+        stream = InputStream(iterate(lines), int, load_positive, "abort")
+        items = []
+        with pytest.raises(InputStreamValidationException) as exc_info:
+            async for item in stream:
+                items.append(item)
+        assert [1] == items
+        assert stream is exc_info.value.input_stream
+
+    def test_unit__init__error__unknown_error_policy(self):
+        with pytest.raises(ConfigurationException):
+            InputStream(iterate([]), int, int, on_error="ignore")
+
+
+class TestJsonArrayMemberParser(Base):
+    @pytest.mark.parametrize("chunk_size", [1, 3, 1000])
+    def test_unit__feed__ok__split_elements(self, chunk_size):
+        document = (
+            b'{"a": "x\\"y]", "b": {"c": [1, 2]}, "items": '
+            b'[{"n": "a,b]"}, 2, [3, [4]], "s\\\\", {}], "z": 1}'
+        )
+        parser = JsonArrayMemberParser("items")
+        elements = []
+
+        for i in range(0, len(document), chunk_size):
+            elements.extend(parser.feed(document[i : i + chunk_size]))
+        parser.close()
+
+        assert b'{"a": "x\\"y]", "b": {"c": [1, 2]}}' == parser.head
+        assert [b'{"n": "a,b]"}', b"2", b"[3, [4]]", b'"s\\\\"', b"{}"] == elements
+        assert parser.has_tail_members
+
+    def test_unit__feed__ok__too_long_elements(self):
+        parser = JsonArrayMemberParser("items", max_size=12)
+        document = b'{"items": [1, "abcdefghijkl", 22, {"a": [1, 2, 3, 4, 5]}, 3]}'
+
+        elements = [element for byte in document for element in parser.feed(bytes([byte]))]
+        parser.close()
+
+        assert [b"1", None, b"22", None, b"3"] == elements
+        assert not parser.has_tail_members
+
+    def test_unit__close__ok__no_array(self):
+        parser = JsonArrayMemberParser("items")
+
+        assert [] == parser.feed(b'{"items": null, "a": 1}')
+        parser.close()
+
+        assert not parser.array_found
+        assert b'{"items": null, "a": 1}' == parser.head
+
+    def test_unit__close__error__unfinished_array(self):
+        parser = JsonArrayMemberParser("items")
+        parser.feed(b'{"items": [1, 2')
+
+        with pytest.raises(ValueError):
+            parser.close()
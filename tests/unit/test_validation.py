@@ -0,0 +1,155 @@
+# coding: utf-8
+import asyncio
+import threading
+
+import marshmallow
+import pytest
+
+from hapic.exception import ConfigurationException
+from hapic.processor.marshmallow import MarshmallowProcessor
+from hapic.validation import AsyncShadowOutputValidator
+from hapic.validation import DROP_OLDEST
+from hapic.validation import OutputValidation
+from hapic.validation import ShadowOutputValidator
+from tests.base import Base
+
+
+class UserSchema(marshmallow.Schema):
+    name = marshmallow.fields.String(required=True)
+
+
+class BlockingProcessor(MarshmallowProcessor):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.release = threading.Event()
+
+    def validate_dumped(self, dumped_data):
+        self.release.wait(timeout=5)
+        super().validate_dumped(dumped_data)
+
+
+class TestOutputValidation(Base):
+    def test_unit__must_validate__ok__full(self):
+        output_validation = OutputValidation("full")
+        assert all(output_validation.must_validate() for _ in range(20))
+
+    def test_unit__must_validate__ok__trusted(self):
+        output_validation = OutputValidation("trusted")
+        assert not any(output_validation.must_validate() for _ in range(20))
+
+    def test_unit__must_validate__ok__sample(self):
+        output_validation = OutputValidation("sample", sample_rate=5)
+        assert 4 == [output_validation.must_validate() for _ in range(20)].count(True)
+
+    def test_unit__must_validate__ok__auto(self):
+        output_validation = OutputValidation("auto", sample_rate=5, auto_threshold=3)
+
+        for _ in range(3):
+            assert output_validation.must_validate()
+            output_validation.validation_succeed()
+
+        assert output_validation.sampling
+        assert 1 == [output_validation.must_validate() for _ in range(5)].count(True)
+
+        output_validation.validation_failed()
+        assert not output_validation.sampling
+        assert output_validation.must_validate()
+
+    def test_unit__from_value__ok__nominal_case(self):
+        default = OutputValidation("sample", sample_rate=42)
+
+        assert "full" == OutputValidation.from_value(None).mode
+        assert "trusted" == OutputValidation.from_value("trusted", default=default).mode
+
+        output_validation = OutputValidation.from_value(None, default=default)
+        assert output_validation is not default
+        assert "sample" == output_validation.mode
+        assert 42 == output_validation.sample_rate
+
+    def test_unit__init__err__unknown_mode(self):
+        with pytest.raises(ConfigurationException):
+            OutputValidation("sometimes")
+
+
+class TestShadowOutputValidator(Base):
+    def test_unit__submit__ok__violations_reported(self):
+        shadow_validator = ShadowOutputValidator()
+        processor = MarshmallowProcessor(UserSchema())
+        caught_errors = []
+
+        assert shadow_validator.submit(processor, {"name": "bob"}, caught_errors.append)
+        assert shadow_validator.submit(processor, {}, caught_errors.append)
+        shadow_validator.join()
+
+        assert 2 == shadow_validator.validated
+        assert 1 == shadow_validator.violations
+        assert 1 == len(caught_errors)
+        assert "name" in caught_errors[0].validation_error.details
+
+    def test_unit__submit__ok__drop_newest(self):
+        shadow_validator = ShadowOutputValidator(max_queue_size=1)
+        processor = BlockingProcessor(UserSchema())
+        caught_errors = []
+
+        # First job is taken by worker, which is blocked. Second job wait in
+        # queue. Third job is dropped.
+        assert shadow_validator.submit(processor, {}, caught_errors.append)
+        while not shadow_validator._queue.empty():
+            pass
+        assert shadow_validator.submit(processor, {"name": "bob"}, caught_errors.append)
+        assert not shadow_validator.submit(processor, {"name": "bob"}, caught_errors.append)
+
+        processor.release.set()
+        shadow_validator.join()
+        assert 1 == shadow_validator.dropped
+        assert 2 == shadow_validator.validated
+        assert 1 == len(caught_errors)
+
+    def test_unit__submit__ok__drop_oldest(self):
+        shadow_validator = ShadowOutputValidator(max_queue_size=1, drop_policy=DROP_OLDEST)
+        processor = BlockingProcessor(UserSchema())
+        caught_errors = []
+
+        assert shadow_validator.submit(processor, {"name": "bob"}, caught_errors.append)
+        while not shadow_validator._queue.empty():
+            pass
+        assert shadow_validator.submit(processor, {"name": "bob"}, caught_errors.append)
+        # Waiting valid job is dropped to make room for this one
+        assert not shadow_validator.submit(processor, {}, caught_errors.append)
+
+        processor.release.set()
+        shadow_validator.join()
+        assert 1 == shadow_validator.dropped
+        assert 2 == shadow_validator.validated
+        assert 1 == len(caught_errors)
+
+    def test_unit__init__err__unknown_drop_policy(self):
+        with pytest.raises(ConfigurationException):
+            ShadowOutputValidator(drop_policy="drop_random")
+
+
+class TestAsyncShadowOutputValidator(Base):
+    def test_unit__submit__ok__several_event_loops(self):
+        shadow_validator = AsyncShadowOutputValidator()
+        processor = MarshmallowProcessor(UserSchema())
+        caught_errors = []
+
+        async def validate(dumped_data: dict) -> None:
+            assert shadow_validator.submit(processor, dumped_data, caught_errors.append)
+            await shadow_validator.join()
+
+        # like an application restarted with a new event loop
+        for dumped_data in ({"name": "bob"}, {}):
+            loop = asyncio.new_event_loop()
+            try:
+                loop.run_until_complete(validate(dumped_data))
+            finally:
+                workers = asyncio.all_tasks(loop)
+                for worker in workers:
+                    worker.cancel()
+                loop.run_until_complete(asyncio.gather(*workers, return_exceptions=True))
+                loop.close()
+
+        assert 2 == shadow_validator.validated
+        assert 1 == shadow_validator.violations
+        assert 1 == len(caught_errors)